@@ -2,16 +2,24 @@
 
 import asyncio
 import ctypes.util
+import io
 import os
-import re
 import signal
 
 import discord
 from discord.ext import commands
 
-from managers.event_manager import EventsManager
-from src.timer import GameTimer
-from src.utils.config import PREFIX, TIMER_CHANNEL_NAME, VOICE_CHANNEL_NAME, logger, COGS_DIRECTORY
+from src.gsi.gsi_manager import gsi_manager
+from src.gsi.recorder import GSIRecorder
+from src.gsi.server import GSIServer
+from src.ipc.handlers import register_handlers
+from src.ipc.server import IPCServer
+from src.managers.event_manager import EventsManager
+from src.managers.event_transfer import EventValidationError, dump_document, parse_document
+from src.managers.settings_manager import settings_manager
+from src.timer_service import GAME_MODES, TimerResult, timer_service
+from src.utils.config import PREFIX, logger, COGS_DIRECTORY, GSI_HOST, GSI_PORT, GSI_RECORD_DIR, IPC_SOCKET_PATH
+from src.utils.log_pipeline import guild_context
 from src.utils.utils import min_to_sec
 
 # Load Opus library for voice support
@@ -30,6 +38,12 @@ try:
 except ImportError:
     logger.warning("GSI module not available")
 
+# Optionally record the received GSI streams for replays
+gsi_recorder = GSIRecorder(GSI_RECORD_DIR) if GSI_RECORD_DIR else None
+
+# GSI server feeding the bot's GSI manager, started with the bot
+gsi_server = GSIServer(gsi_manager, GSI_HOST, GSI_PORT, recorder=gsi_recorder)
+
 # Initialize Discord intents
 intents = discord.Intents.default()
 intents.message_content = True
@@ -43,10 +57,12 @@ bot = commands.Bot(command_prefix=PREFIX, intents=intents, help_command=None)
 events_manager = EventsManager()
 logger.debug("EventsManager instantiated.")
 
-# Data structures to keep track of game and child timers per guild
-game_timers = {}
-timer_locks = {}  # To prevent race conditions when starting/stopping timers
-logger.debug("Game timers dictionary initialized.")
+# Game timers per guild, started and stopped through the timer service
+game_timers = timer_service.timers
+
+# Local socket the web dashboard controls the timers through
+ipc_server = IPCServer(IPC_SOCKET_PATH)
+register_handlers(ipc_server, bot)
 
 WEBHOOK_ID = os.getenv('WEBHOOK_ID')
 logger.debug(f"Webhook ID loaded: {WEBHOOK_ID}")
@@ -55,7 +71,7 @@ logger.debug(f"Webhook ID loaded: {WEBHOOK_ID}")
 @bot.event
 async def on_message(message):
     # Check if the message is from the configured timer channel
-    if message.channel.name == TIMER_CHANNEL_NAME:
+    if message.guild and message.channel.name == (await settings_manager.fetch(message.guild.id)).timer_channel_name:
         logger.info(f"Received message in timer channel '{message.channel}' from '{message.author}': {message.content}")
 
         # Check if the message is from a webhook
@@ -89,18 +105,21 @@ async def on_message(message):
 async def on_ready():
     logger.info(f'Logged in as {bot.user} (ID: {bot.user.id})')
     logger.info('------')
+    await settings_manager.preload(guild.id for guild in bot.guilds)
     for guild in bot.guilds:
-        timer_channel = discord.utils.get(guild.text_channels, name=TIMER_CHANNEL_NAME)
+        guild_settings = settings_manager.get(guild.id)
+        timer_channel = settings_manager.get_timer_channel(guild)
         if not timer_channel:
-            logger.warning(f"Channel '{TIMER_CHANNEL_NAME}' not found in guild '{guild.name}'. Please create it.")
+            logger.warning(f"Channel '{guild_settings.timer_channel_name}' not found in guild '{guild.name}'. Please create it.")
         else:
-            logger.info(f"Channel '{TIMER_CHANNEL_NAME}' found in guild '{guild.name}'.")
+            logger.info(f"Channel '{guild_settings.timer_channel_name}' found in guild '{guild.name}'.")
 
 
 @bot.event
 async def on_guild_join(guild):
     """Initialize events for a guild only if they don't already exist."""
     logger.info(f"Bot joined new guild: {guild.name} (ID: {guild.id})")
+    await settings_manager.preload([guild.id])
 
     # Check if this guild already has events
     if not events_manager.guild_has_events(guild.id):
@@ -117,6 +136,28 @@ async def on_guild_join(guild):
         logger.info(f"Sent welcome message to channel '{channel.name}' in guild '{guild.name}'.")
 
 
+@bot.event
+async def on_guild_channel_create(channel):
+    settings_manager.handle_channel_create(channel)
+
+
+@bot.event
+async def on_guild_channel_update(before, after):
+    settings_manager.handle_channel_update(before, after)
+
+
+@bot.event
+async def on_guild_channel_delete(channel):
+    settings_manager.handle_channel_delete(channel)
+
+
+@bot.before_invoke
+async def tag_command_logs(ctx):
+    """Tag the logs of a command with its guild."""
+    if ctx.guild is not None:
+        guild_context.set(ctx.guild.id)
+
+
 @bot.event
 async def on_command_error(ctx, error):
     if isinstance(error, commands.MissingRequiredArgument):
@@ -186,7 +227,7 @@ async def on_voice_state_update(member, before, after):
     # If the bot was disconnected and the game is active, attempt to reconnect
     if before.channel is not None and after.channel is None:
         logger.warning("Bot was disconnected from a voice channel. Attempting to reconnect...")
-        dota_voice_channel = discord.utils.get(guild.voice_channels, name=VOICE_CHANNEL_NAME)
+        dota_voice_channel = settings_manager.get_voice_channel(guild)
         if dota_voice_channel:
             try:
                 # Connect and get the new voice client object
@@ -204,88 +245,27 @@ async def on_voice_state_update(member, before, after):
                 )
 
 
+async def reply(ctx, result: TimerResult) -> None:
+    """Reply to a timer command unless the result was already announced in the timer channel."""
+    if not result.announced:
+        await ctx.send(result.message)
+
+
 # Command: Start game timer
 @bot.command(name="start")
 @commands.max_concurrency(1, per=commands.BucketType.guild, wait=False)
 async def start_game(ctx, countdown: str, *args):
     logger.debug(f"Command '!start' invoked by '{ctx.author}' with countdown='{countdown}' and args={args}")
-    guild_id = ctx.guild.id
-
-    # Initialize a lock for this guild if not present
-    if guild_id not in timer_locks:
-        timer_locks[guild_id] = asyncio.Lock()
-
-    async with timer_locks[guild_id]:
-        try:
-            # Validate that countdown is either MM:SS with optional leading '-' or a signed integer
-            if not re.match(r"^-?\d+$", countdown) and not re.match(r"^-?\d{1,2}:\d{2}$", countdown):
-                await ctx.send("Please enter a valid countdown format (MM:SS or signed integer in seconds).")
-                logger.error(f"Invalid countdown format provided by '{ctx.author}'. Context: {ctx.message.content}")
-                return
-            logger.info(
-                f"Inside start_game command: countdown='{countdown}', args={args}, guild_id={ctx.guild.id}, channel={ctx.channel.name}")
-
-            # Determine mode based on args
-            mode = 'regular'
-            for arg in args:
-                if arg.lower() in ['regular', 'turbo']:
-                    mode = arg.lower()
-                    logger.debug(f"Mode set to '{mode}' based on argument '{arg}'.")
-
-            # Check if a timer is already running for this guild to ensure only one timer per guild
-            if guild_id in game_timers and game_timers[guild_id].is_running():
-                await ctx.send("A game timer is already running in this server.")
-                logger.info(f"Game timer already running for guild ID {guild_id}. Start command ignored.")
-                return
 
-            # Find the voice channel
-            dota_voice_channel = discord.utils.get(ctx.guild.voice_channels, name=VOICE_CHANNEL_NAME)
-            if not dota_voice_channel:
-                await ctx.send(f"'{VOICE_CHANNEL_NAME}' voice channel not found. Please create it and try again.")
-                logger.warning(f"'{VOICE_CHANNEL_NAME}' voice channel not found in guild '{ctx.guild.name}'.")
-                return
-            else:
-                logger.info(f"Found voice channel '{VOICE_CHANNEL_NAME}' in guild '{ctx.guild.name}'.")
-
-            # Get the timer text channel
-            timer_text_channel = discord.utils.get(ctx.guild.text_channels, name=TIMER_CHANNEL_NAME)
-            if not timer_text_channel:
-                await ctx.send(f"Channel '{TIMER_CHANNEL_NAME}' not found. Please create one and try again.")
-                logger.error(f"Channel '{TIMER_CHANNEL_NAME}' not found in guild '{ctx.guild.name}'.")
-                return
-            else:
-                logger.info(f"Found text channel '{TIMER_CHANNEL_NAME}' in guild '{ctx.guild.name}'.")
-
-            # Announce the start of the game timer
-            await timer_text_channel.send(f"Starting {mode} game timer with countdown '{countdown}'.")
-            logger.info(
-                f"Starting game timer with mode='{mode}' and countdown='{countdown}' for guild ID {guild_id}.")
-
-            # Initialize and start the GameTimer
-            game_timer = GameTimer(guild_id, mode)
-            game_timer.channel = timer_text_channel
-            game_timers[guild_id] = game_timer
-            logger.debug(f"GameTimer instance created and added to game_timers for guild ID {guild_id}.")
-
-            # Connect to the voice channel
-            voice_client = discord.utils.get(bot.voice_clients, guild=ctx.guild)
-            if voice_client is None:
-                voice_client = await dota_voice_channel.connect()
-                logger.info(f"Connected to voice channel '{dota_voice_channel.name}' in guild '{ctx.guild.name}'.")
-            elif voice_client.channel != dota_voice_channel:
-                await voice_client.move_to(dota_voice_channel)
-                logger.info(f"Moved voice client to '{dota_voice_channel.name}' in guild '{ctx.guild.name}'.")
-            game_timer.voice_client = voice_client
-            logger.debug(f"Voice client assigned to GameTimer for guild ID {guild_id}.")
-
-            # Start the game timer with the countdown string directly
-            await game_timer.start(timer_text_channel, countdown)
-            logger.info(
-                f"Game timer successfully started by '{ctx.author}' with countdown='{countdown}' and mode='{mode}' for guild ID {guild_id}.")
+    # Determine mode based on args
+    mode = 'regular'
+    for arg in args:
+        if arg.lower() in GAME_MODES:
+            mode = arg.lower()
+            logger.debug(f"Mode set to '{mode}' based on argument '{arg}'.")
 
-        except Exception as e:
-            logger.error(f"Error in start_game command: {e}", exc_info=True)
-            await ctx.send("An unexpected error occurred while starting the game timer.")
+    result = await timer_service.start(ctx.guild.id, countdown, mode, actor=str(ctx.author))
+    await reply(ctx, result)
 
 
 # Command: Stop game timer
@@ -293,49 +273,7 @@ async def start_game(ctx, countdown: str, *args):
 async def stop_game(ctx):
     """Stop the game timer and all associated timers (Roshan, Glyph, Tormentor)."""
     logger.info(f"Command '!stop' invoked by '{ctx.author}'")
-    guild_id = ctx.guild.id
-
-    # Initialize a lock for this guild if not present
-    if guild_id not in timer_locks:
-        timer_locks[guild_id] = asyncio.Lock()
-
-    async with timer_locks[guild_id]:
-        if guild_id in game_timers and game_timers[guild_id].is_running():
-            timer_channel = discord.utils.get(ctx.guild.text_channels, name=TIMER_CHANNEL_NAME)
-            if timer_channel:
-                # Stop the game timer
-                try:
-                    await game_timers[guild_id].stop()
-                    await timer_channel.send("Game timer stopped.")
-                    logger.info(f"Game timer stopped by '{ctx.author}' for guild ID {guild_id}.")
-                except Exception as e:
-                    logger.error(f"Error stopping game timer for guild ID {guild_id}: {e}", exc_info=True)
-                    await ctx.send("An error occurred while stopping the game timer.")
-
-                # Remove the timer from the dictionary
-                del game_timers[guild_id]
-                logger.debug(f"GameTimer removed from game_timers for guild ID {guild_id}.")
-            else:
-                await ctx.send(f"Channel '{TIMER_CHANNEL_NAME}' not found. Please create one and try again.")
-                logger.error(f"Channel '{TIMER_CHANNEL_NAME}' not found in guild '{ctx.guild.name}'.")
-        else:
-            await ctx.send("No active game timer found.")
-            logger.warning(f"'{ctx.author}' attempted to stop the timer, but it was not running.")
-
-        # Disconnect from the voice channel
-        voice_client = discord.utils.get(bot.voice_clients, guild=ctx.guild)
-        if voice_client:
-            try:
-                await voice_client.disconnect()
-                if guild_id in game_timers:
-                    game_timers[guild_id].voice_client = None
-                    logger.debug(f"Voice client disconnected for guild ID {guild_id}.")
-                else:
-                    logger.debug(f"Voice client disconnected for guild ID {guild_id}, but no GameTimer found.")
-            except Exception as e:
-                logger.error(f"Error disconnecting voice client for guild ID {guild_id}: {e}", exc_info=True)
-        else:
-            logger.warning("Voice client was not connected.")
+    await reply(ctx, await timer_service.stop(ctx.guild.id, actor=str(ctx.author)))
 
 
 # Command: Pause game timer
@@ -343,23 +281,7 @@ async def stop_game(ctx):
 async def pause_game(ctx):
     """Pause the game timer and all events."""
     logger.info(f"Command '!pause' invoked by '{ctx.author}'")
-    guild_id = ctx.guild.id
-
-    if guild_id in game_timers and game_timers[guild_id].is_running():
-        if game_timers[guild_id].is_paused():
-            await ctx.send("Game timer is already paused.")
-            logger.warning(f"'{ctx.author}' attempted to pause the timer, but it was already paused.")
-        else:
-            try:
-                await game_timers[guild_id].pause()
-                await ctx.send("Game timer paused.")
-                logger.info(f"Game timer and all child timers paused by '{ctx.author}' for guild ID {guild_id}.")
-            except Exception as e:
-                logger.error(f"Error pausing game timer for guild ID {guild_id}: {e}", exc_info=True)
-                await ctx.send("An error occurred while pausing the game timer.")
-    else:
-        await ctx.send("No active game timer found.")
-        logger.warning(f"'{ctx.author}' attempted to pause the timer, but it was not running.")
+    await reply(ctx, await timer_service.pause(ctx.guild.id, actor=str(ctx.author)))
 
 
 # Command: Unpause game timer
@@ -367,23 +289,16 @@ async def pause_game(ctx):
 async def unpause_game(ctx):
     """Resume the game timer and all events."""
     logger.info(f"Command '!unpause' invoked by '{ctx.author}'")
-    guild_id = ctx.guild.id
+    await reply(ctx, await timer_service.resume(ctx.guild.id, actor=str(ctx.author)))
 
-    if guild_id in game_timers and game_timers[guild_id].is_running():
-        if not game_timers[guild_id].is_paused():
-            await ctx.send("Game timer is not paused.")
-            logger.warning(f"'{ctx.author}' attempted to unpause the timer, but it was not paused.")
-        else:
-            try:
-                await game_timers[guild_id].unpause()
-                await ctx.send("Game timer resumed.")
-                logger.info(f"Game timer and all child timers resumed by '{ctx.author}' for guild ID {guild_id}.")
-            except Exception as e:
-                logger.error(f"Error unpausing game timer for guild ID {guild_id}: {e}", exc_info=True)
-                await ctx.send("An error occurred while resuming the game timer.")
-    else:
-        await ctx.send("No active game timer found.")
-        logger.warning(f"'{ctx.author}' attempted to unpause the timer, but it was not running.")
+
+# Command: Sync game clock
+@bot.command(name="sync")
+async def sync_game(ctx, game_time: str, *args):
+    """Correct the running game clock to the current in-game time without restarting it."""
+    logger.info(f"Command '!sync' invoked by '{ctx.author}' with game_time='{game_time}' and args={args}")
+    replay = any(arg.lower() == 'replay' for arg in args)
+    await reply(ctx, await timer_service.sync(ctx.guild.id, game_time, replay=replay, actor=str(ctx.author)))
 
 
 # Command: Roshan timer
@@ -391,29 +306,7 @@ async def unpause_game(ctx):
 async def rosh_timer_command(ctx):
     """Log Roshan's death and start the respawn timer."""
     logger.info(f"Command '!rosh' invoked by '{ctx.author}'")
-    guild_id = ctx.guild.id
-    if guild_id not in game_timers or not game_timers[guild_id].is_running():
-        await ctx.send("Game is not active.")
-        logger.warning(f"Roshan timer attempted by '{ctx.author}' but game is not active.")
-        return
-
-    timer_channel = discord.utils.get(ctx.guild.text_channels, name=TIMER_CHANNEL_NAME)
-    if timer_channel:
-        roshan_timer = game_timers[guild_id].roshan_timer
-        if not roshan_timer.is_running:
-            try:
-                await roshan_timer.start(timer_channel)
-                await timer_channel.send("Roshan timer started.")
-                logger.info(f"Roshan timer started by '{ctx.author}' for guild ID {guild_id}.")
-            except Exception as e:
-                logger.error(f"Error starting Roshan timer for guild ID {guild_id}: {e}", exc_info=True)
-                await ctx.send("An error occurred while starting the Roshan timer.")
-        else:
-            await ctx.send("Roshan timer is already running.")
-            logger.warning(f"'{ctx.author}' attempted to start Roshan timer, but it was already running.")
-    else:
-        await ctx.send(f"Channel '{TIMER_CHANNEL_NAME}' not found. Please create one and try again.")
-        logger.warning(f"Channel '{TIMER_CHANNEL_NAME}' not found in guild '{ctx.guild.name}'.")
+    await reply(ctx, await timer_service.start_child(ctx.guild.id, 'roshan', actor=str(ctx.author)))
 
 
 # Command: Cancel Roshan timer
@@ -421,24 +314,7 @@ async def rosh_timer_command(ctx):
 async def cancel_rosh_command(ctx):
     """Cancel the Roshan respawn timer."""
     logger.info(f"Command '!cancel-rosh' invoked by '{ctx.author}'")
-    guild_id = ctx.guild.id
-    timer_channel = discord.utils.get(ctx.guild.text_channels, name=TIMER_CHANNEL_NAME)
-    if guild_id in game_timers:
-        roshan_timer = game_timers[guild_id].roshan_timer
-        if roshan_timer.is_running:
-            try:
-                await roshan_timer.stop()
-                await timer_channel.send("Roshan timer has been cancelled.")
-                logger.info(f"Roshan timer cancelled by '{ctx.author}' for guild ID {guild_id}.")
-            except Exception as e:
-                logger.error(f"Error cancelling Roshan timer for guild ID {guild_id}: {e}", exc_info=True)
-                await ctx.send("An error occurred while cancelling the Roshan timer.")
-        else:
-            await ctx.send("No active Roshan timer to cancel.")
-            logger.warning(f"No active Roshan timer found to cancel for guild ID {guild_id}.")
-    else:
-        await ctx.send("Game timer is not active.")
-        logger.warning(f"'{ctx.author}' attempted to cancel Roshan timer, but game timer is not active.")
+    await reply(ctx, await timer_service.cancel_child(ctx.guild.id, 'roshan', actor=str(ctx.author)))
 
 
 # Command: Glyph cooldown timer
@@ -446,29 +322,7 @@ async def cancel_rosh_command(ctx):
 async def glyph_timer_command(ctx):
     """Start the Glyph cooldown timer."""
     logger.info(f"Command '!glyph' invoked by '{ctx.author}'")
-    guild_id = ctx.guild.id
-    if guild_id not in game_timers or not game_timers[guild_id].is_running():
-        await ctx.send("Game is not active.")
-        logger.warning(f"Glyph timer attempted by '{ctx.author}' but game is not active.")
-        return
-
-    timer_channel = discord.utils.get(ctx.guild.text_channels, name=TIMER_CHANNEL_NAME)
-    if timer_channel:
-        glyph_timer = game_timers[guild_id].glyph_timer
-        if not glyph_timer.is_running:
-            try:
-                await glyph_timer.start(timer_channel)
-                await timer_channel.send("Glyph timer started.")
-                logger.info(f"Glyph timer started by '{ctx.author}' for guild ID {guild_id}.")
-            except Exception as e:
-                logger.error(f"Error starting Glyph timer for guild ID {guild_id}: {e}", exc_info=True)
-                await ctx.send("An error occurred while starting the Glyph timer.")
-        else:
-            await ctx.send("Glyph timer is already running.")
-            logger.warning(f"'{ctx.author}' attempted to start Glyph timer, but it was already running.")
-    else:
-        await ctx.send(f"Channel '{TIMER_CHANNEL_NAME}' not found. Please create one and try again.")
-        logger.error(f"Channel '{TIMER_CHANNEL_NAME}' not found in guild '{ctx.guild.name}'.")
+    await reply(ctx, await timer_service.start_child(ctx.guild.id, 'glyph', actor=str(ctx.author)))
 
 
 # Command: Cancel Glyph timer
@@ -476,24 +330,7 @@ async def glyph_timer_command(ctx):
 async def cancel_glyph_command(ctx):
     """Cancel the Glyph cooldown timer."""
     logger.info(f"Command '!cancel-glyph' invoked by '{ctx.author}'")
-    guild_id = ctx.guild.id
-    timer_channel = discord.utils.get(ctx.guild.text_channels, name=TIMER_CHANNEL_NAME)
-    if guild_id in game_timers:
-        glyph_timer = game_timers[guild_id].glyph_timer
-        if glyph_timer.is_running:
-            try:
-                await glyph_timer.stop()
-                await timer_channel.send("Glyph timer has been cancelled.")
-                logger.info(f"Glyph timer cancelled by '{ctx.author}' for guild ID {guild_id}.")
-            except Exception as e:
-                logger.error(f"Error cancelling Glyph timer for guild ID {guild_id}: {e}", exc_info=True)
-                await ctx.send("An error occurred while cancelling the Glyph timer.")
-        else:
-            await ctx.send("No active Glyph timer to cancel.")
-            logger.warning(f"No active Glyph timer found to cancel for guild ID {guild_id}.")
-    else:
-        await ctx.send("Game timer is not active.")
-        logger.warning(f"'{ctx.author}' attempted to cancel Glyph timer, but game timer is not active.")
+    await reply(ctx, await timer_service.cancel_child(ctx.guild.id, 'glyph', actor=str(ctx.author)))
 
 
 # Command: Tormentor timer
@@ -501,29 +338,7 @@ async def cancel_glyph_command(ctx):
 async def tormentor_timer_command(ctx):
     """Log Tormentor's death and start the respawn timer."""
     logger.info(f"Command '!tormentor' invoked by '{ctx.author}'")
-    guild_id = ctx.guild.id
-    if guild_id not in game_timers or not game_timers[guild_id].is_running():
-        await ctx.send("Game is not active.")
-        logger.warning(f"Tormentor timer attempted by '{ctx.author}' but game is not active.")
-        return
-
-    timer_channel = discord.utils.get(ctx.guild.text_channels, name=TIMER_CHANNEL_NAME)
-    if timer_channel:
-        tormentor_timer = game_timers[guild_id].tormentor_timer
-        if not tormentor_timer.is_running:
-            try:
-                await tormentor_timer.start(timer_channel)
-                await timer_channel.send("Tormentor timer started.")
-                logger.info(f"Tormentor timer started by '{ctx.author}' for guild ID {guild_id}.")
-            except Exception as e:
-                logger.error(f"Error starting Tormentor timer for guild ID {guild_id}: {e}", exc_info=True)
-                await ctx.send("An error occurred while starting the Tormentor timer.")
-        else:
-            await ctx.send("Tormentor timer is already running.")
-            logger.warning(f"'{ctx.author}' attempted to start Tormentor timer, but it was already running.")
-    else:
-        await ctx.send(f"Channel '{TIMER_CHANNEL_NAME}' not found. Please create one and try again.")
-        logger.warning(f"Channel '{TIMER_CHANNEL_NAME}' not found in guild '{ctx.guild.name}'.")
+    await reply(ctx, await timer_service.start_child(ctx.guild.id, 'tormentor', actor=str(ctx.author)))
 
 
 # Command: Cancel Tormentor timer
@@ -531,24 +346,7 @@ async def tormentor_timer_command(ctx):
 async def cancel_tormentor_command(ctx):
     """Cancel the Tormentor respawn timer."""
     logger.info(f"Command '!cancel-torm' invoked by '{ctx.author}'")
-    guild_id = ctx.guild.id
-    timer_channel = discord.utils.get(ctx.guild.text_channels, name=TIMER_CHANNEL_NAME)
-    if guild_id in game_timers:
-        tormentor_timer = game_timers[guild_id].tormentor_timer
-        if tormentor_timer.is_running:
-            try:
-                await tormentor_timer.stop()
-                await timer_channel.send("Tormentor timer has been cancelled.")
-                logger.info(f"Tormentor timer cancelled by '{ctx.author}' for guild ID {guild_id}.")
-            except Exception as e:
-                logger.error(f"Error cancelling Tormentor timer for guild ID {guild_id}: {e}", exc_info=True)
-                await ctx.send("An error occurred while cancelling the Tormentor timer.")
-        else:
-            await ctx.send("No active Tormentor timer to cancel.")
-            logger.warning(f"No active Tormentor timer found to cancel for guild ID {guild_id}.")
-    else:
-        await ctx.send("Game timer is not active.")
-        logger.warning(f"'{ctx.author}' attempted to cancel Tormentor timer, but game timer is not active.")
+    await reply(ctx, await timer_service.cancel_child(ctx.guild.id, 'tormentor', actor=str(ctx.author)))
 
 
 # Command: Add custom event
@@ -698,6 +496,79 @@ async def reset_events_command(ctx):
         logger.error(f"Error resetting events for guild ID {guild_id} by '{ctx.author}': {e}", exc_info=True)
 
 
+# Command: Export events
+@bot.command(name="export-events")
+async def export_events_command(ctx, fmt: str = "json"):
+    """Export all events of the guild as a JSON or YAML file."""
+    logger.info(f"Command '!export-events' invoked by '{ctx.author}' with format='{fmt}'")
+    guild_id = ctx.guild.id
+    fmt = fmt.lower()
+    if fmt not in ('json', 'yaml'):
+        await ctx.send("Invalid format. Use 'json' or 'yaml'.")
+        return
+
+    try:
+        document = events_manager.export_events(guild_id)
+        content = dump_document(document, fmt).encode('utf-8')
+        await ctx.send(
+            f"Exported {len(document['static_events'])} static and "
+            f"{len(document['periodic_events'])} periodic events.",
+            file=discord.File(io.BytesIO(content), filename=f"events_{guild_id}.{fmt}")
+        )
+        logger.info(f"Events exported as {fmt} by '{ctx.author}' for guild ID {guild_id}.")
+    except Exception as e:
+        await ctx.send("An error occurred while exporting events.")
+        logger.error(f"Error exporting events for guild ID {guild_id} by '{ctx.author}': {e}", exc_info=True)
+
+
+# Command: Import events
+@bot.command(name="import-events")
+@is_admin()
+async def import_events_command(ctx, action: str = "preview"):
+    """
+    Import events from an attached JSON or YAML file.
+    Usage:
+    - !import-events preview: Show what would change without applying it.
+    - !import-events replace: Replace the guild's events with the file contents.
+    - !import-events merge: Only add events from the file that don't exist yet.
+    """
+    logger.info(f"Command '!import-events' invoked by '{ctx.author}' with action='{action}'")
+    guild_id = ctx.guild.id
+    action = action.lower()
+    if action not in ('preview', 'replace', 'merge'):
+        await ctx.send("Invalid action. Use 'preview', 'replace' or 'merge'.")
+        return
+
+    if not ctx.message.attachments:
+        await ctx.send("Please attach a JSON or YAML events file.")
+        return
+
+    attachment = ctx.message.attachments[0]
+    fmt = 'yaml' if attachment.filename.lower().endswith(('.yaml', '.yml')) else 'json'
+    try:
+        document = parse_document(await attachment.read(), fmt)
+        result = events_manager.import_events(
+            guild_id, document, replace=action != 'merge', dry_run=action == 'preview')
+    except EventValidationError as e:
+        details = "\n".join(f"- {error}" for error in e.errors[:10])
+        await ctx.send(f"The events file is invalid:\n{details}")
+        logger.warning(f"Invalid events file from '{ctx.author}' for guild ID {guild_id}: {e}")
+        return
+    except Exception as e:
+        await ctx.send("An error occurred while importing events.")
+        logger.error(f"Error importing events for guild ID {guild_id} by '{ctx.author}': {e}", exc_info=True)
+        return
+
+    summary = (f"{len(result['added'])} to add, {len(result['removed'])} to remove, "
+               f"{result['unchanged']} unchanged.")
+    if action == 'preview':
+        await ctx.send(f"Import preview: {summary} Use `{PREFIX}import-events replace` or "
+                       f"`{PREFIX}import-events merge` with the same file to apply it.")
+    else:
+        await ctx.send(f"Events imported: {summary}")
+    logger.info(f"Events import ({action}) by '{ctx.author}' for guild ID {guild_id}: {summary}")
+
+
 # Command: Enable mindful messages
 @bot.command(name="enable-mindful", aliases=['enable-pma', 'pma'])
 async def enable_mindful_messages(ctx):
@@ -730,39 +601,14 @@ async def disable_mindful_messages(ctx):
 async def kill_all_game_timers(ctx):
     """Stop all game timers across all guilds."""
     logger.info(f"Command '!killall' invoked by '{ctx.author}'")
-    guild_ids = list(game_timers.keys())
-    if not guild_ids:
+    if not game_timers:
         await ctx.send("There are no active game timers to kill.")
         logger.info("No active game timers found to kill.")
         return
 
-    for guild_id in guild_ids:
-        timer_lock = timer_locks.get(guild_id)
-        if timer_lock:
-            async with timer_lock:
-                timer = game_timers.get(guild_id)
-                if timer and timer.is_running():
-                    try:
-                        await timer.stop()
-                        # Send a message to the guild's timer channel
-                        guild = bot.get_guild(guild_id)
-                        if guild:
-                            timer_channel = discord.utils.get(guild.text_channels, name=TIMER_CHANNEL_NAME)
-                            if timer_channel:
-                                await timer_channel.send("Game timer has been forcefully stopped by an admin.")
-                                logger.info(f"Game timer forcefully stopped in guild '{guild.name}' by '!killall'.")
-                        # Disconnect from voice channel
-                        voice_client = discord.utils.get(bot.voice_clients, guild=guild)
-                        if voice_client:
-                            await voice_client.disconnect()
-                            logger.info(f"Disconnected from voice channel in guild '{guild.name}'.")
-                        # Remove from game_timers
-                        del game_timers[guild_id]
-                        logger.info(f"GameTimer removed for guild ID {guild_id}.")
-                    except Exception as e:
-                        logger.error(f"Error killing game timer for guild ID {guild_id}: {e}", exc_info=True)
+    stopped = await timer_service.stop_all(actor=str(ctx.author))
     await ctx.send("All game timers have been stopped.")
-    logger.info("All game timers have been killed by '!killall'.")
+    logger.info(f"{stopped} game timer(s) have been killed by '!killall'.")
 
 
 # Graceful shutdown handling
@@ -791,6 +637,12 @@ async def shutdown():
     except Exception as e:
         logger.error(f"Error disconnecting voice clients: {e}", exc_info=True)
 
+    # Stop accepting GSI packets and dashboard requests
+    await gsi_server.stop()
+    await ipc_server.stop()
+    if gsi_recorder:
+        await asyncio.to_thread(gsi_recorder.close)  # Writes the queued packets first
+
     # Close the EventsManager session quickly
     events_manager.close()
     logger.debug("EventsManager session closed.")
@@ -814,11 +666,14 @@ logger.debug("Signal handlers registered.")
 # Main entry point
 async def main():
     async with bot:
+        timer_service.attach(bot)
         await load_cogs()
         token = os.getenv('DISCORD_BOT_TOKEN')
         if not token:
             logger.error("Bot token not found. Please set the 'DISCORD_BOT_TOKEN' environment variable.")
             return
+        await gsi_server.start()
+        await ipc_server.start()
         logger.info("Starting bot...")
         await bot.start(token)
 
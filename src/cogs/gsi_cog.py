@@ -2,12 +2,27 @@ import discord
 import asyncio
 import time
 from discord.ext import commands, tasks
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 
 from src.utils.config import logger, PREFIX
-from src.webapp.backend.gsi_endpoint import gsi_manager
+from src.gsi.gsi_manager import gsi_manager
+from src.gsi.events import GSIEvent, GSIEventType
 from src.gsi.gsi_state import gsi_state
-from src.bot import start_game, stop_game, rosh_timer_command, glyph_timer_command
+from src.managers.settings_manager import settings_manager
+from src.timer_service import TimerResult, timer_service
+from src.utils.log_pipeline import guild_context, match_context
+
+# The same GSI event is applied to a guild at most once within this many seconds
+GSI_EVENT_DEBOUNCE = 3.0
+
+# Logged as the requester of timer operations made by GSI sync
+GSI_ACTOR = "GSI sync"
+
+# Events applied to synced guilds as soon as they are detected
+SYNC_EVENT_TYPES = frozenset({
+    GSIEventType.GAME_STARTED, GSIEventType.GAME_ENDED, GSIEventType.ROSHAN_DIED,
+    GSIEventType.ROSHAN_RESPAWNED, GSIEventType.GLYPH_USED,
+})
 
 
 class GSICog(commands.Cog):
@@ -27,13 +42,17 @@ class GSICog(commands.Cog):
         """
         self.bot = bot
         self.active_games = {}  # Currently tracked games by guild ID
+        self._sync_locks: Dict[int, asyncio.Lock] = {}  # Serializes sync actions per guild
+        self._last_applied: Dict[tuple, float] = {}  # (guild ID, event type) -> monotonic time
 
-        # Start the background task for syncing
+        # Apply GSI events as they arrive; the background task reconciles anything missed
+        gsi_manager.register_callback(self.on_gsi_event, event_types=SYNC_EVENT_TYPES)
         self.gsi_sync_task.start()
         logger.info("GSI Cog initialized")
 
     def cog_unload(self):
         """Clean up when the cog is unloaded."""
+        gsi_manager.unregister_callback(self.on_gsi_event)
         self.gsi_sync_task.cancel()
 
     @commands.command(name="gsi-status")
@@ -43,8 +62,9 @@ class GSICog(commands.Cog):
 
         Shows whether Dota 2 is connected and sending game state data.
         """
-        last_update = gsi_manager.get_last_update_time()
-        in_game = gsi_manager.is_in_game()
+        guild_id = ctx.guild.id
+        last_update = gsi_manager.get_last_update_time(guild_id)
+        in_game = gsi_manager.is_in_game(guild_id)
 
         # Calculate how long since the last update
         last_update_seconds_ago = time.time() - last_update if last_update > 0 else None
@@ -76,10 +96,10 @@ class GSICog(commands.Cog):
             )
 
             if in_game:
-                game_mode = gsi_manager.get_game_mode()
-                match_id = gsi_manager.get_match_id()
-                game_time = gsi_manager.get_game_time()
-                player_team = gsi_manager.get_player_team()
+                game_mode = gsi_manager.get_game_mode(guild_id)
+                match_id = gsi_manager.get_match_id(guild_id)
+                game_time = gsi_manager.get_game_time(guild_id)
+                player_team = gsi_manager.get_player_team(guild_id)
 
                 if game_mode:
                     embed.add_field(
@@ -112,7 +132,7 @@ class GSICog(commands.Cog):
                     )
 
                 # Add Roshan info
-                roshan_state = gsi_manager.get_roshan_state()
+                roshan_state = gsi_manager.get_roshan_state(guild_id)
                 if not roshan_state["alive"] and roshan_state["death_time"] is not None:
                     embed.add_field(
                         name="Roshan",
@@ -120,7 +140,7 @@ class GSICog(commands.Cog):
                         inline=True
                     )
 
-                    game_time = gsi_manager.get_game_time() or 0
+                    game_time = gsi_manager.get_game_time(guild_id) or 0
                     min_remaining = max(0, int((roshan_state["min_respawn_time"] - game_time) // 60))
                     max_remaining = max(0, int((roshan_state["max_respawn_time"] - game_time) // 60))
 
@@ -137,7 +157,7 @@ class GSICog(commands.Cog):
                     )
 
                 # Add Glyph info
-                glyph_status = gsi_manager.are_glyph_available()
+                glyph_status = gsi_manager.are_glyph_available(guild_id)
                 embed.add_field(
                     name="Glyphs",
                     value=(
@@ -148,13 +168,20 @@ class GSICog(commands.Cog):
                 )
 
         # Add sync status for this guild
-        is_synced = ctx.guild.id in gsi_state.synced_guilds
+        is_synced = guild_id in gsi_state.synced_guilds
         embed.add_field(
             name="Auto-Sync",
             value="✅ Enabled" if is_synced else "❌ Disabled",
             inline=False
         )
 
+        has_token = gsi_state.sessions.token_for_guild(guild_id) is not None
+        embed.add_field(
+            name="GSI Token",
+            value="Server token" if has_token else f"Shared token (use {PREFIX}gsi-token for a server token)",
+            inline=False
+        )
+
         # Footer with help command
         embed.set_footer(text=f"Use {PREFIX}gsi-sync to enable/disable auto-sync")
 
@@ -170,157 +197,302 @@ class GSICog(commands.Cog):
         """
         guild_id = ctx.guild.id
 
-        # Toggle sync for this guild
-        is_enabled = gsi_state.toggle_guild_sync(guild_id)
+        # Toggle sync for this guild; reports go to the channel the command was used in
+        is_enabled = await self.set_sync(guild_id, channel=getattr(ctx, 'channel', None))
 
         if is_enabled:
-            # Add channel info to the state
-            if hasattr(ctx, 'channel') and ctx.channel:
-                # We'll store this in the active_games dict since it's specific to this cog
-                self.active_games[guild_id] = {
-                    'channel_id': ctx.channel.id,
-                    'last_sync': 0
-                }
             await ctx.send(
                 "✅ Auto-sync with Dota 2 has been **enabled**. The bot will now automatically start and stop timers based on your game state.")
             logger.info(f"GSI auto-sync enabled for guild {guild_id}")
         else:
-            # Clean up any stored info
-            if guild_id in self.active_games:
-                del self.active_games[guild_id]
             await ctx.send("✅ Auto-sync with Dota 2 has been **disabled**.")
             logger.info(f"GSI auto-sync disabled for guild {guild_id}")
 
+    async def set_sync(self, guild_id: int, enabled: Optional[bool] = None,
+                       channel: Optional[discord.abc.GuildChannel] = None) -> bool:
+        """
+        Toggle or set automatic synchronization for a guild.
+
+        Args:
+            guild_id (int): The Discord guild ID.
+            enabled (bool, optional): The new state; toggles the current one if None.
+            channel (discord.abc.GuildChannel, optional): Where sync reports go; defaults to
+                the guild's configured timer channel.
+
+        Returns:
+            bool: True if sync is now enabled for the guild.
+        """
+        if enabled is None or bool(enabled) != (guild_id in gsi_state.synced_guilds):
+            gsi_state.toggle_guild_sync(guild_id)
+        if guild_id not in gsi_state.synced_guilds:
+            # Clean up any stored info
+            self.active_games.pop(guild_id, None)
+            return False
+
+        if channel is None:
+            guild = self.bot.get_guild(guild_id)
+            if guild is not None:
+                channel = settings_manager.get_timer_channel(guild, await settings_manager.fetch(guild_id))
+        if channel is None:
+            logger.warning(f"No channel for GSI sync reports in guild {guild_id}; timers will not be synced")
+            return True
+
+        # Keep the match being tracked when sync was already enabled
+        guild_data = self.active_games.setdefault(guild_id, {'last_sync': 0})
+        guild_data['channel_id'] = channel.id
+        return True
+
+    @commands.command(name="gsi-token")
+    async def gsi_token(self, ctx: commands.Context):
+        """
+        Issue a GSI auth token for this server.
+
+        Timers of this server are then driven only by Dota clients configured with
+        this token, so several parties can use GSI at the same time. The token is sent
+        by direct message; issuing a new one revokes the previous token.
+        """
+        guild_id = ctx.guild.id
+        try:
+            token = await asyncio.to_thread(gsi_state.sessions.issue_token, guild_id)
+        except Exception as e:
+            logger.error(f"Error issuing GSI token for guild {guild_id}: {e}", exc_info=True)
+            await ctx.send("An error occurred while issuing the GSI token.")
+            return
+
+        # Synced guilds switch over to the new token right away
+        if guild_id in gsi_state.synced_guilds:
+            gsi_state.sessions.enable_sync(guild_id)
+
+        try:
+            await ctx.author.send(
+                f"GSI token for **{ctx.guild.name}**:\n```\n{token}\n```\n"
+                "Put it in the `auth` section of your `gamestate_integration` config file and restart Dota 2. "
+                "Any previously issued token for this server no longer works."
+            )
+        except discord.Forbidden:
+            await ctx.send("❌ Could not send you a direct message. Please allow DMs from server members and try again.")
+            return
+        await ctx.send("✅ A new GSI token for this server has been sent to you by direct message.")
+        logger.info(f"GSI token issued for guild {guild_id} by {ctx.author}")
+
+    def on_gsi_event(self, event: GSIEvent) -> None:
+        """
+        Receive a GSI event and apply it on the bot's event loop.
+
+        May be called from any thread.
+
+        Args:
+            event (GSIEvent): The detected event.
+        """
+        loop = self.bot.loop
+        try:
+            on_loop = asyncio.get_running_loop() is loop
+        except RuntimeError:
+            on_loop = False
+        if on_loop:
+            loop.create_task(self.apply_gsi_event(event))
+        else:
+            asyncio.run_coroutine_threadsafe(self.apply_gsi_event(event), loop)
+
+    def _debounced(self, guild_id: int, event_type: GSIEventType) -> bool:
+        """Return True if the same event was applied to the guild within the debounce window."""
+        now = time.monotonic()
+        key = (guild_id, event_type)
+        if now - self._last_applied.get(key, float('-inf')) < GSI_EVENT_DEBOUNCE:
+            return True
+        self._last_applied[key] = now
+        return False
+
+    def _sync_lock(self, guild_id: int) -> asyncio.Lock:
+        """Get the lock serializing sync actions for a guild."""
+        if guild_id not in self._sync_locks:
+            self._sync_locks[guild_id] = asyncio.Lock()
+        return self._sync_locks[guild_id]
+
+    def _sync_channel(self, guild_id: int, guild_data: Dict[str, Any]) -> Optional[discord.abc.Messageable]:
+        """Get the channel sync reports of a guild go to, or None if its guild or channel is gone."""
+        guild = self.bot.get_guild(guild_id)
+        if not guild:
+            # Guild no longer exists or bot isn't in it
+            logger.warning("Could not find guild %s, removing from synced guilds", guild_id)
+            gsi_state.sessions.disable_sync(guild_id)
+            self.active_games.pop(guild_id, None)
+            return None
+
+        channel = guild.get_channel(guild_data['channel_id'])
+        if not channel:
+            # Channel no longer exists
+            logger.warning("Could not find channel %s in guild %s", guild_data['channel_id'], guild_id)
+            return None
+        return channel
+
+    async def apply_gsi_event(self, event: GSIEvent) -> None:
+        """
+        Apply a GSI event to the timers of every guild synced to the event's session.
+
+        Args:
+            event (GSIEvent): The detected event.
+        """
+        for guild_id in gsi_state.sessions.guilds_for(event.session):
+            guild_data = self.active_games.get(guild_id)
+            if guild_data is None:
+                continue
+            guild_context.set(guild_id)
+            match_context.set(event.match_id)
+            if self._debounced(guild_id, event.type):
+                logger.debug("Debounced GSI event %s for guild %s", event.type.value, guild_id)
+                continue
+
+            try:
+                async with self._sync_lock(guild_id):
+                    channel = self._sync_channel(guild_id, guild_data)
+                    if channel is None:
+                        continue
+
+                    if event.type == GSIEventType.GAME_STARTED:
+                        await self._start_synced_game(guild_id, channel, guild_data, event.match_id,
+                                                      event.data['mode'], event.game_time or 0)
+                    elif event.type == GSIEventType.GAME_ENDED:
+                        await self._stop_synced_game(guild_id, channel, guild_data)
+                    elif guild_data.get('current_match_id'):
+                        lines = []
+                        if event.type in (GSIEventType.ROSHAN_DIED, GSIEventType.ROSHAN_RESPAWNED):
+                            lines.append(await self._sync_roshan(
+                                guild_id, guild_data, alive=event.type == GSIEventType.ROSHAN_RESPAWNED))
+                        elif event.type == GSIEventType.GLYPH_USED:
+                            if event.data['team'] == self._enemy_team(event.session.derived.player_team):
+                                lines.append(await self._sync_enemy_glyph(guild_id, guild_data, available=False))
+                        await self._send_sync_report(channel, lines)
+            except Exception as e:
+                logger.error("Error applying GSI event %s for guild %s: %s", event.type.value, guild_id, e, exc_info=True)
+
+    @staticmethod
+    def _enemy_team(player_team: Optional[str]) -> str:
+        """Return the team opposing the player's team."""
+        return "dire" if player_team == "radiant" else "radiant"
+
+    @staticmethod
+    async def _send_sync_report(channel, lines: List[Optional[str]]) -> None:
+        """Send the summary of timers adjusted by GSI sync, if any."""
+        lines = [line for line in lines if line]
+        if lines:
+            await channel.send("✅ GSI Sync:\n" + "\n".join(lines))
+
+    async def _start_synced_game(self, guild_id: int, channel, guild_data: Dict[str, Any], match_id: str,
+                                 mode: str, game_time: float) -> None:
+        """Start the game timer for a newly detected match, replacing any previous one."""
+        if not match_id or match_id == guild_data.get('current_match_id'):
+            return
+        logger.info("New game detected for guild %s: mode=%s, match_id=%s", guild_id, mode, match_id)
+
+        # Stop any existing timer
+        if guild_data.get('current_match_id'):
+            await timer_service.stop(guild_id, actor=GSI_ACTOR)
+
+        # A game that is just starting gets a positive countdown, a running one its negative time
+        countdown = "30" if game_time <= 0 else f"-{int(game_time)}"
+        result = await timer_service.start(guild_id, countdown, mode, actor=GSI_ACTOR)
+        guild_data.update(current_match_id=match_id, roshan_synced=False, enemy_glyph_synced=False,
+                          last_sync=time.time())
+        if not result.ok:
+            await channel.send(f"❌ Could not start the game timer from GSI data: {result.message}")
+            return
+
+        self._follow_clock(guild_id)
+        await channel.send(f"✅ Automatically started {mode} game timer based on GSI data.")
+
+    @staticmethod
+    def _follow_clock(guild_id: int) -> None:
+        """Drive the guild's game timer from the game clock of its GSI session."""
+        if timer_service.is_running(guild_id):
+            timer_service.get(guild_id).follow_clock(gsi_manager.get_session(guild_id).clock)
+
+    async def _stop_synced_game(self, guild_id: int, channel, guild_data: Dict[str, Any]) -> None:
+        """Stop the game timer after the synced match ended."""
+        if not guild_data.get('current_match_id'):
+            return
+        logger.info("Game ended for guild %s", guild_id)
+        await timer_service.stop(guild_id, actor=GSI_ACTOR)
+        guild_data['current_match_id'] = None
+        guild_data['last_sync'] = time.time()
+        await channel.send("✅ Automatically stopped game timer as your game has ended.")
+
+    @staticmethod
+    def _sync_report(result: TimerResult, line: str) -> Optional[str]:
+        """Get the sync report line of a child timer start, logging failures instead."""
+        if not result.ok:
+            logger.warning("GSI sync could not start a timer: %s", result.message)
+            return None
+        return line
+
+    async def _sync_roshan(self, guild_id: int, guild_data: Dict[str, Any], alive: bool) -> Optional[str]:
+        """Start the Roshan timer once per death."""
+        if not alive and not guild_data.get('roshan_synced'):
+            result = await timer_service.start_child(guild_id, 'roshan', actor=GSI_ACTOR)
+            guild_data['roshan_synced'] = True
+            guild_data['last_sync'] = time.time()
+            return self._sync_report(result, "• Synchronized Roshan timer with GSI data.")
+        if alive:
+            guild_data['roshan_synced'] = False
+        return None
+
+    async def _sync_enemy_glyph(self, guild_id: int, guild_data: Dict[str, Any], available: bool) -> Optional[str]:
+        """Start the glyph timer once per enemy glyph use."""
+        if not available and not guild_data.get('enemy_glyph_synced'):
+            result = await timer_service.start_child(guild_id, 'glyph', actor=GSI_ACTOR)
+            guild_data['enemy_glyph_synced'] = True
+            guild_data['last_sync'] = time.time()
+            return self._sync_report(result, "• Synchronized enemy glyph timer with GSI data.")
+        if available:
+            guild_data['enemy_glyph_synced'] = False
+        return None
+
     @tasks.loop(seconds=10)
     async def gsi_sync_task(self):
-        """Background task that syncs GSI data with the bot's timers."""
+        """
+        Background task that reconciles the bot's timers with GSI state.
+
+        Changes are normally applied as soon as their GSI event arrives; this catches up
+        on guilds that enabled sync mid-game or switched to another client's token.
+        """
         try:
-            # Skip if there are no synced guilds
-            if not gsi_state.synced_guilds:
-                return
+            # Drop the state of clients that stopped sending packets
+            gsi_state.sessions.evict_idle()
 
-            # Check if we're in a game
-            in_game = gsi_manager.is_in_game()
-            game_mode = gsi_manager.get_game_mode() if in_game else None
-            match_id = gsi_manager.get_match_id() if in_game else None
+            # Process each synced guild against its own client's session
+            for guild_id in gsi_state.synced_guilds:
+                guild_data = self.active_games.get(guild_id)
+                if guild_data is None:
+                    continue
 
-            # Process each synced guild
-            for guild_id in list(gsi_state.synced_guilds):
                 try:
-                    # Skip if we don't have channel info for this guild
-                    if guild_id not in self.active_games:
-                        continue
+                    async with self._sync_lock(guild_id):
+                        channel = self._sync_channel(guild_id, guild_data)
+                        if channel is None:
+                            continue
 
-                    guild_data = self.active_games[guild_id]
+                        in_game = gsi_manager.is_in_game(guild_id)
+                        derived = gsi_manager.get_session(guild_id).derived
 
-                    # Skip if we've synced recently (within 30 seconds)
-                    if time.time() - guild_data.get('last_sync', 0) < 30:
-                        continue
+                        if in_game and derived.match_id and derived.match_id != guild_data.get('current_match_id'):
+                            await self._start_synced_game(guild_id, channel, guild_data, derived.match_id,
+                                                          derived.timer_mode, derived.game_time or 0)
 
-                    # Get the guild and channel
-                    guild = self.bot.get_guild(guild_id)
-                    if not guild:
-                        # Guild no longer exists or bot isn't in it
-                        logger.warning(f"Could not find guild {guild_id}, removing from synced guilds")
-                        gsi_state.synced_guilds.discard(guild_id)
-                        if guild_id in self.active_games:
-                            del self.active_games[guild_id]
-                        continue
+                        elif not in_game and guild_data.get('current_match_id'):
+                            await self._stop_synced_game(guild_id, channel, guild_data)
 
-                    channel = guild.get_channel(guild_data['channel_id'])
-                    if not channel:
-                        # Channel no longer exists
-                        logger.warning(f"Could not find channel {guild_data['channel_id']} in guild {guild_id}")
-                        continue
+                        elif in_game and guild_data.get('current_match_id'):
+                            # The game timer follows the session's clock, which every packet corrects
+                            self._follow_clock(guild_id)
 
-                    # Create a context object for commands
-                    ctx = await self.bot.get_context(await channel.fetch_message(channel.last_message_id))
-
-                    # Check if we need to start a new game timer
-                    if in_game and match_id and match_id != guild_data.get('current_match_id'):
-                        # New game detected
-                        logger.info(f"New game detected for guild {guild_id}: mode={game_mode}, match_id={match_id}")
-
-                        # Stop any existing timer
-                        if guild_id in self.active_games and 'current_match_id' in guild_data:
-                            await stop_game(ctx)
-
-                        # Start a new timer
-                        mode_str = "turbo" if game_mode == "turbo" else "regular"
-                        game_time = gsi_manager.get_game_time() or 0
-
-                        if game_time <= 0:
-                            # Game is just starting, use positive countdown
-                            await start_game(ctx, "30", mode_str)
-                        else:
-                            # Game is already in progress, use negative time
-                            formatted_time = f"-{int(game_time)}"
-                            await start_game(ctx, formatted_time, mode_str)
-
-                        # Update guild data
-                        guild_data['current_match_id'] = match_id
-                        guild_data['last_sync'] = time.time()
-
-                        await channel.send(f"✅ Automatically started {mode_str} game timer based on GSI data.")
-
-                    # Check if we need to stop the timer because game ended
-                    elif not in_game and guild_data.get('current_match_id'):
-                        # Game ended
-                        logger.info(f"Game ended for guild {guild_id}")
-
-                        # Stop the timer
-                        await stop_game(ctx)
-
-                        # Update guild data
-                        guild_data['current_match_id'] = None
-                        guild_data['last_sync'] = time.time()
-
-                        await channel.send("✅ Automatically stopped game timer as your game has ended.")
-
-                    # Check if we need to sync Roshan/Glyph timers during the game
-                    elif in_game and guild_data.get('current_match_id'):
-                        # Currently in a game with an active timer
-                        needs_sync = False
-                        sync_message = ""
-
-                        # Check Roshan
-                        roshan_state = gsi_manager.get_roshan_state()
-                        if not roshan_state["alive"] and not guild_data.get('roshan_synced'):
-                            # Roshan is dead and we haven't synced yet
-                            await rosh_timer_command(ctx)
-                            guild_data['roshan_synced'] = True
-                            guild_data['last_sync'] = time.time()
-                            needs_sync = True
-                            sync_message += "• Synchronized Roshan timer with GSI data.\n"
-                        elif roshan_state["alive"] and guild_data.get('roshan_synced'):
-                            # Roshan is alive again
-                            guild_data['roshan_synced'] = False
-
-                        # Check Enemy Glyph
-                        player_team = gsi_manager.get_player_team()
-                        glyph_status = gsi_manager.are_glyph_available()
-
-                        if player_team and not glyph_status[player_team]:
-                            # Our team's glyph is on cooldown
-                            pass  # We don't track our own glyph, only enemy glyph
-
-                        enemy_team = "dire" if player_team == "radiant" else "radiant"
-                        if not glyph_status.get(enemy_team, True) and not guild_data.get('enemy_glyph_synced'):
-                            # Enemy glyph is on cooldown and we haven't synced yet
-                            await glyph_timer_command(ctx)
-                            guild_data['enemy_glyph_synced'] = True
-                            guild_data['last_sync'] = time.time()
-                            needs_sync = True
-                            sync_message += "• Synchronized enemy glyph timer with GSI data.\n"
-                        elif glyph_status.get(enemy_team, True) and guild_data.get('enemy_glyph_synced'):
-                            # Enemy glyph is available again
-                            guild_data['enemy_glyph_synced'] = False
-
-                        if needs_sync:
-                            await channel.send(f"✅ GSI Sync:\n{sync_message}")
+                            lines = [await self._sync_roshan(guild_id, guild_data, derived.roshan["alive"])]
+                            enemy_team = self._enemy_team(derived.player_team)
+                            lines.append(await self._sync_enemy_glyph(
+                                guild_id, guild_data, derived.glyphs.get(enemy_team, True)))
+                            await self._send_sync_report(channel, lines)
 
                 except Exception as e:
-                    logger.error(f"Error processing guild {guild_id} in GSI sync task: {e}", exc_info=True)
+                    logger.error("Error processing guild %s in GSI sync task: %s", guild_id, e, exc_info=True)
 
         except Exception as e:
             logger.error(f"Error in GSI sync task: {e}", exc_info=True)
@@ -63,6 +63,10 @@ class HelpCog(commands.Cog):
                     "name": f"{self.prefix}unpause *(Aliases: `unp`, `up`)*",
                     "value": "Resumes the game timer and all events."
                 },
+                {
+                    "name": f"{self.prefix}sync <MM:SS> [replay]",
+                    "value": "Corrects the running game clock to the in-game time without restarting it."
+                },
                 {
                     "name": f"{self.prefix}killall",
                     "value": "Stops all active game timers across all guilds. *(Admin only)*"
@@ -132,6 +136,15 @@ class HelpCog(commands.Cog):
                     "name": f"{self.prefix}reset-events",
                     "value": "Resets all events to their default values.\n**Example:** `{0}reset-events`".format(
                         self.prefix)
+                },
+                {
+                    "name": f"{self.prefix}export-events [json|yaml]",
+                    "value": "Exports all events as a file.\n**Example:** `{0}export-events yaml`".format(self.prefix)
+                },
+                {
+                    "name": f"{self.prefix}import-events [preview|replace|merge]",
+                    "value": "Imports events from an attached JSON/YAML file. *(Admin only)*\n**Example:** `{0}import-events preview`".format(
+                        self.prefix)
                 }
             ],
             "ℹ️ **General**": [
@@ -1,5 +1,5 @@
 import discord
-from src.utils.config import logger
+from src.utils.config import logger, tick_logger
 
 
 class GameStatusMessageManager:
@@ -111,6 +111,6 @@ class GameStatusMessageManager:
 
         try:
             await self.status_message.edit(embed=embed)
-            logger.debug(f"Status message (ID: {self.status_message.id}) updated successfully.")
+            tick_logger.debug("Status message (ID: %s) updated successfully.", self.status_message.id)
         except discord.DiscordException as e:
             logger.error(f"Failed to edit status message: {e}", exc_info=True)
\ No newline at end of file
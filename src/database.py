@@ -1,7 +1,14 @@
-from sqlalchemy import create_engine, Column, Integer, String
-from sqlalchemy.orm import sessionmaker, declarative_base
+import time
+from itertools import chain
+from typing import Iterable, Set, Tuple
 
-from src.utils.config import DATABASE_URL
+from sqlalchemy import create_engine, event, insert, update, Column, Float, Integer, String
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
+from sqlalchemy.sql import operators, visitors
+from sqlalchemy.sql.elements import BinaryExpression, BindParameter
+
+from src.utils.config import DATABASE_URL, logger
 
 # Initialize the SQLAlchemy engine with the provided database URL.
 # The 'check_same_thread' parameter is set to False to allow usage with multiple threads.
@@ -82,5 +89,141 @@ class PeriodicEvent(Base):
     message = Column(String, nullable=False)
 
 
+class GSIToken(Base):
+    """
+    Represents a GSI auth token issued to a guild.
+
+    Attributes:
+        id (int): Primary key for the token record.
+        token (str): The auth token the guild's Dota client sends.
+        guild_id (str): Identifier for the Discord guild/server.
+    """
+    __tablename__ = "gsi_tokens"
+
+    id = Column(Integer, primary_key=True, index=True)
+    token = Column(String, unique=True, index=True, nullable=False)
+    guild_id = Column(String, index=True, nullable=False)
+
+
+class GuildVersion(Base):
+    """
+    Counts the committed changes to a guild's events or settings.
+
+    Readers compare versions to tell whether cached data is still current; the rows are
+    maintained by the session hooks below, so every write path in every process counts.
+
+    Attributes:
+        guild_id (str): Identifier for the Discord guild/server, or ALL_GUILDS.
+        kind (str): 'events' or 'settings'.
+        version (int): Incremented by every change.
+        updated_at (float): Unix time of the latest change.
+    """
+    __tablename__ = "guild_versions"
+
+    guild_id = Column(String, primary_key=True)
+    kind = Column(String, primary_key=True)
+    version = Column(Integer, default=0, nullable=False)
+    updated_at = Column(Float, default=0, nullable=False)
+
+
+# Version row of bulk changes whose guild is unknown; counts toward every guild
+ALL_GUILDS = "*"
+
+# Versioned models with the kind of data they hold and their guild column
+VERSIONED_MODELS = {
+    StaticEvent: ("events", "guild_id"),
+    PeriodicEvent: ("events", "guild_id"),
+    ServerSettings: ("settings", "server_id"),
+}
+
+
+# Dialects with INSERT ... ON CONFLICT DO UPDATE; others update, then insert if no row matched
+UPSERT_DIALECTS = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+
+def _bump_versions(connection, changes: Iterable[Tuple[str, str]]) -> None:
+    """Increment the version of each (guild_id, kind) in the current transaction."""
+    table = GuildVersion.__table__
+    now = time.time()
+    upsert = UPSERT_DIALECTS.get(connection.dialect.name)
+    for guild_id, kind in changes:
+        if upsert is not None:
+            statement = upsert(table).values(guild_id=guild_id, kind=kind, version=1, updated_at=now)
+            connection.execute(statement.on_conflict_do_update(
+                index_elements=[table.c.guild_id, table.c.kind],
+                set_={"version": table.c.version + 1, "updated_at": now}
+            ))
+            continue
+        updated = connection.execute(update(table).where(
+            table.c.guild_id == guild_id, table.c.kind == kind
+        ).values(version=table.c.version + 1, updated_at=now))
+        if updated.rowcount == 0:
+            connection.execute(insert(table).values(guild_id=guild_id, kind=kind, version=1, updated_at=now))
+
+
+@event.listens_for(Session, "after_flush")
+def _version_flushed_changes(session: Session, flush_context) -> None:
+    """Count rows added, changed or deleted through the session."""
+    changes: Set[Tuple[str, str]] = set()
+    modified = (obj for obj in session.dirty if session.is_modified(obj))
+    for obj in chain(session.new, session.deleted, modified):
+        versioned = VERSIONED_MODELS.get(type(obj))
+        if versioned is not None:
+            kind, column = versioned
+            changes.add((str(getattr(obj, column)), kind))
+    if changes:
+        _bump_versions(session.connection(), changes)
+
+
+def _guild_ids(whereclause, column: str) -> Set[str]:
+    """Find the guild IDs a bulk statement compares its guild column with."""
+    guild_ids = set()
+    if whereclause is None:
+        return guild_ids
+    for element in visitors.iterate(whereclause):
+        if (isinstance(element, BinaryExpression) and element.operator is operators.eq
+                and getattr(element.left, "key", None) == column and isinstance(element.right, BindParameter)):
+            guild_ids.add(str(element.right.effective_value))
+    return guild_ids
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _version_bulk_changes(state) -> None:
+    """Count bulk statements, e.g. session.execute(insert(StaticEvent), rows) or query(...).delete()."""
+    if state.is_select or state.bind_mapper is None:
+        return
+    versioned = VERSIONED_MODELS.get(state.bind_mapper.class_)
+    if versioned is None:
+        return
+    kind, column = versioned
+    if state.is_insert:
+        rows = state.parameters if isinstance(state.parameters, list) else [state.parameters or {}]
+        guild_ids = {str(row[column]) for row in rows if row.get(column) is not None}
+    else:
+        guild_ids = _guild_ids(state.statement.whereclause, column)
+    if not guild_ids:
+        logger.info(f"Bulk {kind} statement names no guild; counting it as a change for every guild")
+        guild_ids = {ALL_GUILDS}
+    _bump_versions(state.session.connection(), ((guild_id, kind) for guild_id in guild_ids))
+
+
+def get_guild_version(session: Session, guild_id, kind: str) -> Tuple[int, float]:
+    """
+    Get the version of a guild's events or settings.
+
+    Args:
+        session (Session): The database session.
+        guild_id: The Discord guild ID.
+        kind (str): 'events' or 'settings'.
+
+    Returns:
+        Tuple[int, float]: The version and the Unix time of the latest change; (0, 0.0)
+        if nothing changed since versions are counted.
+    """
+    rows = session.query(GuildVersion.version, GuildVersion.updated_at).filter(
+        GuildVersion.kind == kind, GuildVersion.guild_id.in_((str(guild_id), ALL_GUILDS))).all()
+    return sum(row.version for row in rows), max((row.updated_at for row in rows), default=0.0)
+
+
 # Create all tables in the database based on the defined models.
 Base.metadata.create_all(bind=engine)
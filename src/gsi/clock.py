@@ -0,0 +1,157 @@
+"""
+Game clock disciplined by the clock times reported in GSI packets.
+
+The Dota client reports the in-game clock in whole seconds, and packets arrive with
+network and buffering jitter. The clock runs on the local monotonic clock and is
+nudged towards the reported time by a fraction of each observed error, so single
+late packets do not make it jump. Large errors (reconnects, missed pauses) move it
+to the reported time at once.
+"""
+import math
+import time
+from typing import Callable, NamedTuple, Optional
+
+from src.utils.config import logger
+
+# Fraction of an observed error corrected per packet
+CLOCK_SMOOTHING = 0.25
+
+# Errors of at least this many seconds move the clock at once instead of gradually
+CLOCK_STEP_THRESHOLD = 2.0
+
+
+class _Anchor(NamedTuple):
+    """Game time at a monotonic instant; the clock stands still while paused."""
+    game_time: float
+    at: float
+    paused: bool
+
+
+class GameClock:
+    """
+    Estimate of a client's in-game clock between GSI packets.
+
+    A packet whose whole-second clock time just advanced by one marks the start of that
+    second, which pins the estimate down; other packets only bound it to within the
+    reported second.
+
+    Attributes:
+        match_id (str): The match the clock follows.
+        error (float): Smoothed error of the estimate against the packets, in seconds.
+        steps (int): Number of times the clock was moved at once.
+    """
+
+    def __init__(self, smoothing: float = CLOCK_SMOOTHING, step_threshold: float = CLOCK_STEP_THRESHOLD,
+                 time_source: Callable[[], float] = time.monotonic):
+        """
+        Initialize a clock that has not observed any packets.
+
+        Args:
+            smoothing (float, optional): Fraction of an observed error corrected per packet.
+            step_threshold (float, optional): Errors at least this large are corrected at once.
+            time_source (callable, optional): Monotonic time source in seconds.
+        """
+        self.smoothing = smoothing
+        self.step_threshold = step_threshold
+        self._time = time_source
+        self._anchor: Optional[_Anchor] = None
+        self._last_reported: Optional[int] = None
+        self.match_id = None
+        self.error = 0.0
+        self.steps = 0
+
+    def __repr__(self) -> str:
+        return f"GameClock(now={self.now()}, paused={self.paused}, error={self.error:.3f})"
+
+    @property
+    def disciplined(self) -> bool:
+        """Whether the clock has observed a packet."""
+        return self._anchor is not None
+
+    @property
+    def paused(self) -> bool:
+        """Whether the latest packet reported the game as paused."""
+        return self._anchor is not None and self._anchor.paused
+
+    def now(self, at: Optional[float] = None) -> Optional[float]:
+        """
+        Get the estimated game clock.
+
+        Args:
+            at (float, optional): Monotonic time to estimate for; defaults to now.
+
+        Returns:
+            Optional[float]: The game clock in seconds, or None before the first packet.
+        """
+        anchor = self._anchor
+        if anchor is None:
+            return None
+        if anchor.paused:
+            return anchor.game_time
+        return anchor.game_time + ((self._time() if at is None else at) - anchor.at)
+
+    def until_next_second(self) -> float:
+        """
+        Get the time until the clock reaches its next whole second.
+
+        Returns:
+            float: Seconds to wait, or 1.0 if the clock is paused or not disciplined.
+        """
+        current = self.now()
+        if current is None or self.paused:
+            return 1.0
+        return math.floor(current) + 1 - current
+
+    def observe(self, clock_time: int, paused: bool = False, match_id: Optional[str] = None,
+                at: Optional[float] = None) -> float:
+        """
+        Correct the clock with the time reported in a packet.
+
+        Args:
+            clock_time (int): The whole-second game clock reported by the client.
+            paused (bool, optional): Whether the client reported the game as paused.
+            match_id (str, optional): The match the packet belongs to.
+            at (float, optional): Monotonic time the packet was received; defaults to now.
+
+        Returns:
+            float: The error of the estimate against the packet before correcting, in seconds.
+        """
+        at = self._time() if at is None else at
+        anchor = self._anchor
+        previous = self._last_reported
+        self._last_reported = clock_time
+
+        if anchor is None or match_id != self.match_id or paused or anchor.paused:
+            # New match, or pause state: the reported time is exact while standing still
+            if anchor is not None and not paused and match_id == self.match_id:
+                logger.debug(f"Game clock resumed at {clock_time}")
+            self.match_id = match_id
+            self._anchor = _Anchor(float(clock_time), at, paused)
+            self.error = 0.0
+            return 0.0
+
+        predicted = anchor.game_time + (at - anchor.at)
+        if previous is not None and clock_time == previous + 1:
+            # The reported second just began
+            error = clock_time - predicted
+        else:
+            # Only known to be within the reported second
+            error = min(max(predicted, clock_time), clock_time + 1) - predicted
+
+        if abs(error) >= self.step_threshold:
+            logger.info(f"Game clock moved from {predicted:.2f} to {clock_time} (error {error:+.2f}s)")
+            self._anchor = _Anchor(float(clock_time), at, False)
+            self.steps += 1
+            self.error = 0.0
+            return error
+
+        self._anchor = _Anchor(predicted + self.smoothing * error, at, False)
+        self.error += self.smoothing * (error - self.error)
+        return error
+
+    def reset(self) -> None:
+        """Forget all observations."""
+        self._anchor = None
+        self._last_reported = None
+        self.match_id = None
+        self.error = 0.0
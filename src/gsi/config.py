@@ -23,6 +23,9 @@ def load_gsi_config():
     # Set the auth token in the GSI state manager
     gsi_state.auth_token = gsi_auth_token
 
+    # Load the tokens issued to individual guilds
+    gsi_state.sessions.load_tokens()
+
     return {
         "auth_token": gsi_auth_token
     }
\ No newline at end of file
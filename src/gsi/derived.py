@@ -0,0 +1,223 @@
+"""
+Values derived from a single GSI snapshot.
+
+Each value is computed on first access and cached for the lifetime of the snapshot,
+so repeated queries between two packets cost a dictionary lookup.
+"""
+from functools import cached_property
+from typing import Any, Dict, List, Optional
+
+from src.gsi.projection import ingest_fields
+from src.gsi.snapshot import EMPTY_SNAPSHOT, GSISnapshot
+from src.utils.config import logger
+
+# GSI game mode IDs mapped to mode names
+GAME_MODES = {
+    1: "all_pick",
+    2: "captains_mode",
+    3: "random_draft",
+    4: "single_draft",
+    5: "all_random",
+    22: "turbo"
+}
+
+# Roshan respawn window after death in seconds: 8-11 minutes in regular mode, 4-5.5 in turbo
+ROSHAN_RESPAWN = {"regular": (480, 660), "turbo": (240, 330)}
+
+# Glyph cooldown in seconds: 5 minutes in regular mode, 3 in turbo
+GLYPH_COOLDOWN = {"regular": 300, "turbo": 180}
+
+IN_PROGRESS = "DOTA_GAMERULES_STATE_GAME_IN_PROGRESS"
+
+# Packet fields the derived values are read from
+DERIVED_FIELDS = (
+    "map", "roshan", "events", "buildings.*.glyph", "player.team_number",
+    "hero.name", "hero.level", "hero.health", "hero.max_health", "hero.mana", "hero.max_mana",
+)
+ingest_fields.require(*DERIVED_FIELDS)
+
+
+def game_events(snapshot: GSISnapshot, event_type: str) -> List[Any]:
+    """
+    Get the entries of a packet's events list of one type.
+
+    Args:
+        snapshot (GSISnapshot): The packet.
+        event_type (str): The "event_type" of the entries, e.g. "roshan_killed".
+
+    Returns:
+        list: The matching entries, in packet order.
+    """
+    return [event for event in snapshot.get("events") or () if event.get("event_type") == event_type]
+
+
+class DerivedState:
+    """
+    Lazily computed view of one GSI packet.
+
+    Attributes:
+        snapshot (GSISnapshot): The packet the values are derived from.
+        sequence (int): Sequence number of the packet.
+    """
+
+    def __init__(self, snapshot: GSISnapshot = EMPTY_SNAPSHOT, sequence: int = 0):
+        """
+        Initialize the derived state.
+
+        Args:
+            snapshot (GSISnapshot, optional): The packet to derive values from.
+            sequence (int, optional): Sequence number of the packet.
+        """
+        self.snapshot = snapshot
+        self.sequence = sequence
+
+    @cached_property
+    def map(self):
+        return self.snapshot.get("map") or {}
+
+    @cached_property
+    def game_time(self) -> Optional[float]:
+        return self.map.get("game_time")
+
+    @cached_property
+    def clock_time(self) -> Optional[int]:
+        return self.map.get("clock_time")
+
+    @cached_property
+    def paused(self) -> bool:
+        return bool(self.map.get("paused", False))
+
+    @cached_property
+    def match_id(self) -> Optional[str]:
+        return self.map.get("matchid")
+
+    @cached_property
+    def in_progress(self) -> bool:
+        return self.map.get("game_state") == IN_PROGRESS
+
+    @cached_property
+    def game_mode(self) -> str:
+        mode_id = self.map.get("game_mode")
+        return GAME_MODES.get(mode_id, f"mode_{mode_id}")
+
+    @cached_property
+    def timer_mode(self) -> str:
+        """The timer mode ('regular' or 'turbo') matching the game mode."""
+        return "turbo" if self.game_mode == "turbo" else "regular"
+
+    @cached_property
+    def player_team(self) -> Optional[str]:
+        team_num = (self.snapshot.get("player") or {}).get("team_number")
+        if team_num == 0:
+            return "radiant"
+        elif team_num == 1:
+            return "dire"
+        return None
+
+    def _roshan_death(self, result: Dict[str, Any], death_time) -> None:
+        """Fill in the death and respawn window fields of a Roshan state."""
+        min_respawn, max_respawn = ROSHAN_RESPAWN[self.timer_mode]
+        result["death_time"] = death_time
+        result["last_killed_time"] = death_time
+        result["min_respawn_time"] = death_time + min_respawn
+        result["max_respawn_time"] = death_time + max_respawn
+
+    @cached_property
+    def roshan(self) -> Dict[str, Any]:
+        result = {
+            "alive": True,
+            "death_time": None,
+            "min_respawn_time": None,
+            "max_respawn_time": None,
+            "health_percent": 100,
+            "last_killed_time": None
+        }
+
+        try:
+            # First, try to get direct Roshan info if available
+            if "roshan" in self.snapshot:
+                roshan_data = self.snapshot["roshan"]
+
+                if "alive" in roshan_data:
+                    result["alive"] = roshan_data["alive"]
+
+                if not result["alive"] and "respawn_timer" in roshan_data:
+                    self._roshan_death(result, (self.game_time or 0) - roshan_data["respawn_timer"])
+
+                if "health_percent" in roshan_data:
+                    result["health_percent"] = roshan_data["health_percent"]
+
+            # If we don't have direct Roshan status, try to infer from game events
+            elif "events" in self.snapshot:
+                for event in game_events(self.snapshot, "roshan_killed"):
+                    result["alive"] = False
+                    self._roshan_death(result, event.get("game_time"))
+                    result["health_percent"] = 0
+                    break
+
+        except Exception as e:
+            logger.error(f"Error getting Roshan state: {e}", exc_info=True)
+
+        return result
+
+    @cached_property
+    def glyphs(self) -> Dict[str, bool]:
+        result = {
+            "radiant": False,
+            "dire": False
+        }
+
+        try:
+            if "buildings" in self.snapshot:
+                buildings = self.snapshot["buildings"]
+                for team in ("radiant", "dire"):
+                    if team in buildings and "glyph" in buildings[team]:
+                        result[team] = buildings[team]["glyph"]["cooldown"] == 0
+
+            # If we don't have direct glyph info, try to infer from the most recent glyph events
+            elif "events" in self.snapshot:
+                last_used = {}
+                for event in game_events(self.snapshot, "glyph_used"):
+                    team = event.get("team")
+                    event_time = event.get("game_time", 0)
+                    if team in result and (team not in last_used or event_time > last_used[team]):
+                        last_used[team] = event_time
+
+                game_time = self.game_time or 0
+                cooldown = GLYPH_COOLDOWN[self.timer_mode]
+                for team, used_at in last_used.items():
+                    result[team] = (game_time - used_at) >= cooldown
+
+        except Exception as e:
+            logger.error(f"Error checking glyph availability: {e}", exc_info=True)
+
+        return result
+
+    @cached_property
+    def hero(self) -> Dict[str, Any]:
+        result = {
+            "name": None,
+            "level": None,
+            "health": None,
+            "max_health": None,
+            "health_percent": None,
+            "mana": None,
+            "max_mana": None,
+            "mana_percent": None
+        }
+
+        try:
+            hero = self.snapshot.get("hero", {})
+            if hero:
+                result["name"] = hero.get("name", "").replace("npc_dota_hero_", "")
+                result["level"] = hero.get("level")
+
+                for stat in ("health", "mana"):
+                    result[stat] = hero.get(stat)
+                    result[f"max_{stat}"] = hero.get(f"max_{stat}")
+                    if result[stat] is not None and result[f"max_{stat}"]:
+                        result[f"{stat}_percent"] = round((result[stat] / result[f"max_{stat}"]) * 100)
+        except Exception as e:
+            logger.error(f"Error getting player hero information: {e}", exc_info=True)
+
+        return result
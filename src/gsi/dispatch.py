@@ -0,0 +1,314 @@
+"""
+Bounded, asynchronous delivery of GSI packets to subscribers.
+
+Ingestion only enqueues a packet and returns; worker threads run the subscribed
+callbacks. Each session is served by one worker, so its packets and events reach the
+callbacks in the order they arrived. When subscribers fall behind, the queues stay
+within their bound according to the overflow policy instead of slowing down
+ingestion; the events of a discarded packet are delivered with the session's next one.
+"""
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, FrozenSet, List, Optional
+
+from src.utils.config import logger
+
+# Overflow policies
+DROP_OLDEST = "drop-oldest"  # discard the oldest queued packet, keeping its events
+LATEST_WINS = "latest-wins"  # keep one queued packet per session, replacing older ones
+OVERFLOW_POLICIES = (DROP_OLDEST, LATEST_WINS)
+
+
+@dataclass
+class DispatchItem:
+    """
+    A packet waiting for delivery.
+
+    Attributes:
+        key (str): The session the packet belongs to.
+        snapshot: The packet.
+        events (list): Events detected in the packet.
+        enqueued_at (float): Monotonic time at which the packet was queued.
+    """
+    key: str
+    snapshot: Any
+    events: List[Any] = field(default_factory=list)
+    enqueued_at: float = 0.0
+
+
+@dataclass
+class CallbackStats:
+    """
+    Delivery statistics of one subscriber.
+
+    Attributes:
+        calls (int): Number of invocations.
+        errors (int): Number of invocations that raised.
+        total_time (float): Total seconds spent in the callback.
+        max_time (float): Longest single invocation in seconds.
+    """
+    calls: int = 0
+    errors: int = 0
+    total_time: float = 0.0
+    max_time: float = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "avg_ms": round(self.total_time / self.calls * 1000, 3) if self.calls else 0.0,
+            "max_ms": round(self.max_time * 1000, 3),
+        }
+
+
+class _Shard:
+    """The queue of the sessions served by one worker thread."""
+
+    def __init__(self, overflow: str, lock: threading.Lock):
+        # drop-oldest keeps arrival order; latest-wins keeps one entry per session
+        self.pending: Any = deque() if overflow == DROP_OLDEST else OrderedDict()
+        # Events of discarded packets whose session had no later packet queued, by session
+        self.carried: Dict[str, List[Any]] = {}
+        self.ready = threading.Condition(lock)
+
+
+class GSIDispatcher:
+    """
+    Delivers packets and their events to subscribed callbacks on worker threads.
+
+    Callbacks subscribed without event types receive every snapshot; callbacks
+    subscribed with event types receive each matching event. Sessions are spread
+    over the workers by key, and each worker delivers its sessions' packets in order.
+    """
+
+    def __init__(self, max_pending: int = 256, overflow: str = DROP_OLDEST, workers: int = 2):
+        """
+        Initialize the dispatcher. Worker threads start with the first packet.
+
+        Args:
+            max_pending (int, optional): Packets queued at most, split evenly across the workers.
+            overflow (str, optional): 'drop-oldest' or 'latest-wins'.
+            workers (int, optional): Number of worker threads.
+
+        Raises:
+            ValueError: If the overflow policy is unknown.
+        """
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy '{overflow}'")
+        self.max_pending = max(1, max_pending)
+        self.overflow = overflow
+        self.workers = max(1, workers)
+        self.shard_capacity = max(1, -(-self.max_pending // self.workers))
+        self._callbacks: List[tuple] = []  # (callback, event types or None)
+        self._stats: Dict[str, CallbackStats] = {}
+        self._lock = threading.Lock()
+        # Notified when a worker finishes a packet
+        self._condition = threading.Condition(self._lock)
+        self._shards = [_Shard(overflow, self._lock) for _ in range(self.workers)]
+        self._threads: List[threading.Thread] = []
+        self._running = False
+        self._busy = 0
+        self.enqueued = 0
+        self.dropped = 0
+        self.max_depth = 0
+
+    def subscribe(self, callback: Callable[[Any], None], event_types: Optional[FrozenSet] = None) -> None:
+        """
+        Subscribe a callback.
+
+        Args:
+            callback: The function to call.
+            event_types: Event types to receive, or None to receive every snapshot.
+        """
+        with self._lock:
+            self._callbacks = self._callbacks + [(callback, event_types)]
+            self._stats.setdefault(callback.__name__, CallbackStats())
+
+    def unsubscribe(self, callback: Callable[[Any], None]) -> bool:
+        """
+        Unsubscribe a callback.
+
+        Args:
+            callback: The function to remove.
+
+        Returns:
+            bool: True if the callback was subscribed.
+        """
+        with self._lock:
+            remaining = [entry for entry in self._callbacks if entry[0] != callback]
+            removed = len(remaining) != len(self._callbacks)
+            self._callbacks = remaining
+        return removed
+
+    def _shard(self, key: str) -> _Shard:
+        """Get the shard serving a session."""
+        return self._shards[hash(key) % self.workers]
+
+    def submit(self, key: str, snapshot: Any, events: Optional[List[Any]] = None) -> None:
+        """
+        Queue a packet for delivery without waiting for subscribers.
+
+        Args:
+            key (str): The session the packet belongs to.
+            snapshot: The packet.
+            events (list, optional): Events detected in the packet.
+        """
+        item = DispatchItem(key, snapshot, list(events or ()), time.monotonic())
+        with self._lock:
+            if not self._callbacks:
+                return
+            self._ensure_workers()
+            shard = self._shard(key)
+            if key in shard.carried:
+                item.events = shard.carried.pop(key) + item.events
+            if self.overflow == LATEST_WINS:
+                # A replaced packet keeps its place in the queue
+                replaced = shard.pending.get(key)
+                if replaced is not None:
+                    # Only the snapshot is superseded; its events are still delivered
+                    item.events = replaced.events + item.events
+                    item.enqueued_at = replaced.enqueued_at
+                    self.dropped += 1
+                shard.pending[key] = item
+                if len(shard.pending) > self.shard_capacity:
+                    self._discard(shard, shard.pending.popitem(last=False)[1])
+            else:
+                shard.pending.append(item)
+                if len(shard.pending) > self.shard_capacity:
+                    self._discard(shard, shard.pending.popleft())
+            self.enqueued += 1
+            self.max_depth = max(self.max_depth, sum(len(other.pending) for other in self._shards))
+            shard.ready.notify()
+
+    def _discard(self, shard: _Shard, item: DispatchItem) -> None:
+        """
+        Drop a queued packet, keeping its events for the session's next packet.
+        Called with the lock held.
+        """
+        self.dropped += 1
+        if not item.events:
+            return
+        if self.overflow == DROP_OLDEST:
+            successor = next((queued for queued in shard.pending if queued.key == item.key), None)
+            if successor is not None:
+                successor.events = item.events + successor.events
+                return
+        shard.carried[item.key] = item.events + shard.carried.get(item.key, [])
+
+    def _ensure_workers(self) -> None:
+        """Start the worker threads if they are not running. Called with the lock held."""
+        if self._running:
+            return
+        self._running = True
+        self._threads = [
+            threading.Thread(target=self._work, args=(shard,), name=f"gsi-dispatch-{index}", daemon=True)
+            for index, shard in enumerate(self._shards)
+        ]
+        for thread in self._threads:
+            thread.start()
+        logger.debug(f"Started {self.workers} GSI dispatch worker(s).")
+
+    def _next_item(self, shard: _Shard) -> Optional[DispatchItem]:
+        """Wait for the shard's next queued packet; None once the dispatcher is stopped."""
+        with self._lock:
+            while self._running and not shard.pending:
+                shard.ready.wait()
+            if not self._running:
+                return None
+            self._busy += 1
+            if self.overflow == LATEST_WINS:
+                return shard.pending.popitem(last=False)[1]
+            return shard.pending.popleft()
+
+    def _work(self, shard: _Shard) -> None:
+        """Worker loop delivering the shard's queued packets."""
+        while True:
+            item = self._next_item(shard)
+            if item is None:
+                return
+            try:
+                self.deliver(item)
+            finally:
+                with self._lock:
+                    self._busy -= 1
+                    self._condition.notify_all()
+
+    def deliver(self, item: DispatchItem) -> None:
+        """
+        Run the subscribed callbacks for a packet on the calling thread.
+
+        Args:
+            item (DispatchItem): The packet to deliver.
+        """
+        for callback, event_types in self._callbacks:
+            if event_types is None:
+                self._call(callback, item.snapshot)
+            else:
+                for event in item.events:
+                    if event.type in event_types:
+                        self._call(callback, event)
+
+    def _call(self, callback: Callable[[Any], None], argument: Any) -> None:
+        """Invoke a callback and record its latency."""
+        start = time.perf_counter()
+        failed = False
+        try:
+            callback(argument)
+        except Exception as e:
+            failed = True
+            logger.error(f"Error in GSI callback {callback.__name__}: {e}", exc_info=True)
+        elapsed = time.perf_counter() - start
+
+        stats = self._stats.setdefault(callback.__name__, CallbackStats())
+        with self._lock:
+            stats.calls += 1
+            stats.errors += failed
+            stats.total_time += elapsed
+            stats.max_time = max(stats.max_time, elapsed)
+
+    def join(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until every queued packet has been delivered.
+
+        Args:
+            timeout (float, optional): Seconds to wait at most.
+
+        Returns:
+            bool: True if the queue drained, False on timeout.
+        """
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: not self._busy and not any(shard.pending for shard in self._shards), timeout)
+
+    def stop(self) -> None:
+        """Stop the worker threads; queued packets are discarded."""
+        with self._lock:
+            self._running = False
+            for shard in self._shards:
+                shard.pending.clear()
+                shard.carried.clear()
+                shard.ready.notify_all()
+        for thread in self._threads:
+            thread.join(timeout=1)
+        self._threads = []
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get queue and per-callback delivery statistics.
+
+        Returns:
+            dict: Queue counters and latency per callback.
+        """
+        with self._lock:
+            return {
+                "overflow": self.overflow,
+                "max_pending": self.max_pending,
+                "workers": self.workers,
+                "pending": sum(len(shard.pending) for shard in self._shards),
+                "max_depth": self.max_depth,
+                "enqueued": self.enqueued,
+                "dropped": self.dropped,
+                "callbacks": {name: stats.as_dict() for name, stats in self._stats.items()},
+            }
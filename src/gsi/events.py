@@ -0,0 +1,214 @@
+"""
+Typed change events detected between consecutive GSI packets.
+
+Detectors declare the packet paths they depend on. Each packet is diffed once against
+the previous one over the registered paths, and only detectors whose paths changed run,
+so adding a detector costs a few dictionary lookups per packet.
+"""
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from src.gsi.derived import DerivedState, game_events
+from src.gsi.history import get_path
+from src.gsi.projection import ingest_fields
+from src.gsi.snapshot import EMPTY_SNAPSHOT, unwrap
+
+
+class GSIEventType(str, Enum):
+    """Kinds of changes detected in the GSI stream."""
+    GAME_STARTED = "game_started"
+    GAME_ENDED = "game_ended"
+    ROSHAN_DIED = "roshan_died"
+    ROSHAN_RESPAWNED = "roshan_respawned"
+    GLYPH_USED = "glyph_used"
+    TORMENTOR_KILLED = "tormentor_killed"
+    BUILDING_DESTROYED = "building_destroyed"
+    GAME_PAUSED = "game_paused"
+    GAME_UNPAUSED = "game_unpaused"
+    DAY_STARTED = "day_started"
+    NIGHT_STARTED = "night_started"
+    HERO_DIED = "hero_died"
+    BUYBACK_USED = "buyback_used"
+
+
+@dataclass(frozen=True)
+class GSIEvent:
+    """
+    A change detected in one client's GSI stream.
+
+    Attributes:
+        type (GSIEventType): What changed.
+        session: The GSISession of the client that sent the packet.
+        game_time (float): Game time of the packet in which the change was seen.
+        match_id (str): The match the packet belongs to.
+        data (dict): Details, e.g. {'team': 'dire'} for GLYPH_USED.
+    """
+    type: GSIEventType
+    session: Any = field(repr=False, compare=False)
+    game_time: Optional[float] = None
+    match_id: Optional[str] = None
+    data: Dict[str, Any] = field(default_factory=dict)
+
+
+# A detector returns (event type, data) pairs for the change between two packets
+Detection = Tuple[GSIEventType, Dict[str, Any]]
+Detector = Callable[[DerivedState, DerivedState], Iterable[Detection]]
+
+# Registered detectors with the key paths they depend on
+_detectors: List[Tuple[Tuple[Tuple[str, ...], ...], Detector]] = []
+_watched_paths: Dict[str, Tuple[str, ...]] = {}
+
+
+def register_detector(detector: Detector, paths: Iterable[str], fields: Iterable[str] = ()) -> None:
+    """
+    Register a detector that runs when any of its paths changed between two packets.
+
+    The paths and fields are kept in ingested packets.
+
+    Args:
+        detector: Function taking the previous and current derived states.
+        paths: Dotted paths whose change triggers the detector.
+        fields: Further dotted paths the detector reads.
+    """
+    paths = tuple(paths)
+    for path in paths:
+        _watched_paths.setdefault(path, tuple(path.split(".")))
+    ingest_fields.require(*paths, *fields)
+    _detectors.append((tuple(_watched_paths[path] for path in paths), detector))
+
+
+def detector(*paths: str, fields: Iterable[str] = ()) -> Callable[[Detector], Detector]:
+    """Decorator registering a detector; see register_detector."""
+    def decorate(func: Detector) -> Detector:
+        register_detector(func, paths, fields)
+        return func
+    return decorate
+
+
+def changed_paths(previous: DerivedState, current: DerivedState) -> set:
+    """
+    Get the watched key paths whose value differs between two packets.
+
+    Args:
+        previous (DerivedState): Derived state of the previous packet.
+        current (DerivedState): Derived state of the new packet.
+
+    Returns:
+        set: Key path tuples that changed.
+    """
+    old, new = unwrap(previous.snapshot), unwrap(current.snapshot)
+    return {path for path in _watched_paths.values() if get_path(old, path) != get_path(new, path)}
+
+
+def detect_events(previous: DerivedState, current: DerivedState, session=None) -> List[GSIEvent]:
+    """
+    Detect the changes between two consecutive packets of a client.
+
+    Args:
+        previous (DerivedState): Derived state of the previous packet.
+        current (DerivedState): Derived state of the new packet.
+        session (GSISession, optional): The client's session, attached to the events.
+
+    Returns:
+        list: The detected events, in the order they should be applied.
+    """
+    events = []
+
+    def emit(event_type: GSIEventType, data: Dict[str, Any]) -> None:
+        events.append(GSIEvent(event_type, session, current.game_time, current.match_id, data))
+
+    if "map" not in current.snapshot:
+        return events
+
+    was_in_game = previous.in_progress and previous.match_id == current.match_id
+    if current.in_progress and not was_in_game:
+        emit(GSIEventType.GAME_STARTED, {"mode": current.timer_mode})
+    elif previous.in_progress and not current.in_progress:
+        emit(GSIEventType.GAME_ENDED, {})
+
+    if not current.in_progress:
+        return events
+
+    # The first packet of a match is compared against an empty packet
+    if not was_in_game:
+        previous = DerivedState(EMPTY_SNAPSHOT)
+    changed = changed_paths(previous, current)
+    if not changed:
+        return events
+    for paths, detect in _detectors:
+        if any(path in changed for path in paths):
+            for event_type, data in detect(previous, current):
+                emit(event_type, data)
+    return events
+
+
+def _new_events(previous: DerivedState, current: DerivedState, event_type: str) -> List[Any]:
+    """Get the entries of the packet's events list of a type that the previous packet did not have."""
+    seen = {(event.get("game_time"), event.get("team")) for event in game_events(previous.snapshot, event_type)}
+    return [event for event in game_events(current.snapshot, event_type)
+            if (event.get("game_time"), event.get("team")) not in seen]
+
+
+@detector("roshan", "events")
+def _roshan(previous: DerivedState, current: DerivedState) -> Iterable[Detection]:
+    if previous.roshan["alive"] and not current.roshan["alive"]:
+        yield GSIEventType.ROSHAN_DIED, {"death_time": current.roshan["death_time"]}
+    elif not previous.roshan["alive"] and current.roshan["alive"]:
+        yield GSIEventType.ROSHAN_RESPAWNED, {}
+
+
+@detector("buildings.radiant.glyph", "buildings.dire.glyph", "events")
+def _glyph(previous: DerivedState, current: DerivedState) -> Iterable[Detection]:
+    if previous.snapshot is EMPTY_SNAPSHOT:
+        return
+    for team in ("radiant", "dire"):
+        if previous.glyphs[team] and not current.glyphs[team]:
+            yield GSIEventType.GLYPH_USED, {"team": team}
+
+
+@detector("events")
+def _tormentor(previous: DerivedState, current: DerivedState) -> Iterable[Detection]:
+    for event in _new_events(previous, current, "tormentor_killed"):
+        yield GSIEventType.TORMENTOR_KILLED, {"team": event.get("team"), "death_time": event.get("game_time")}
+
+
+@detector("buildings")
+def _buildings(previous: DerivedState, current: DerivedState) -> Iterable[Detection]:
+    before = previous.snapshot.get("buildings") or {}
+    after = current.snapshot.get("buildings") or {}
+    for team, buildings in before.items():
+        remaining = after.get(team) or {}
+        for name, building in buildings.items():
+            if name == "glyph" or not building.get("health"):
+                continue
+            if not (remaining.get(name) or {}).get("health"):
+                yield GSIEventType.BUILDING_DESTROYED, {"team": team, "building": name}
+
+
+@detector("map.paused")
+def _pause(previous: DerivedState, current: DerivedState) -> Iterable[Detection]:
+    if current.paused != previous.paused:
+        yield (GSIEventType.GAME_PAUSED if current.paused else GSIEventType.GAME_UNPAUSED), {}
+
+
+@detector("map.daytime")
+def _day_night(previous: DerivedState, current: DerivedState) -> Iterable[Detection]:
+    daytime = current.map.get("daytime")
+    if daytime is not None and previous.map.get("daytime") is not None:
+        yield (GSIEventType.DAY_STARTED if daytime else GSIEventType.NIGHT_STARTED), {}
+
+
+@detector("hero.alive", fields=("hero.respawn_seconds",))
+def _hero_death(previous: DerivedState, current: DerivedState) -> Iterable[Detection]:
+    hero = current.snapshot.get("hero") or {}
+    if (previous.snapshot.get("hero") or {}).get("alive") and hero.get("alive") is False:
+        yield GSIEventType.HERO_DIED, {"hero": current.hero["name"], "respawn_seconds": hero.get("respawn_seconds")}
+
+
+@detector("hero.buyback_cooldown")
+def _buyback(previous: DerivedState, current: DerivedState) -> Iterable[Detection]:
+    before = (previous.snapshot.get("hero") or {}).get("buyback_cooldown")
+    after = (current.snapshot.get("hero") or {}).get("buyback_cooldown")
+    if before == 0 and after:
+        yield GSIEventType.BUYBACK_USED, {"hero": current.hero["name"], "cooldown": after}
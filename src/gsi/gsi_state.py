@@ -1,81 +1,99 @@
 """
 Manages GSI sync state between the web API and the Discord bot.
 """
-from typing import Dict, Any, Set
+from typing import Dict, Any, FrozenSet, Union
+
+from src.gsi.sessions import GSISession, SessionRegistry
+from src.gsi.snapshot import GSISnapshot
 from src.utils.config import logger
 
 
 class GSIStateManager:
     """
     Singleton class to manage GSI state across the Discord bot and web API.
+
+    Each Dota client has its own session in ``sessions``, keyed by the auth token it sends.
+    The auth token, game state and in-game properties below refer to the session of the
+    shared token, which any guild can use when it has no token of its own.
     """
     _instance = None
 
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(GSIStateManager, cls).__new__(cls)
-            cls._instance._synced_guilds = set()
-            cls._instance._auth_token = "your_secret_token"  # Default token, should be overridden
-            cls._instance._game_state = {}
-            cls._instance._is_in_game = False
+            cls._instance.sessions = SessionRegistry()
+            cls._instance.sessions.set_default_token("your_secret_token")  # Default token, should be overridden
             logger.info("GSIStateManager initialized")
         return cls._instance
 
     @property
-    def synced_guilds(self) -> Set[int]:
+    def synced_guilds(self) -> FrozenSet[int]:
         """Get the set of guild IDs that have GSI sync enabled."""
-        return self._synced_guilds
+        return self.sessions.synced_guilds
 
     def toggle_guild_sync(self, guild_id: int) -> bool:
         """
         Toggle GSI sync for a guild.
 
+        The guild is driven by its own token's session if it has one, otherwise by the
+        shared token's session.
+
         Args:
             guild_id: The guild ID to toggle
 
         Returns:
             bool: True if sync is now enabled, False if disabled
         """
-        if guild_id in self._synced_guilds:
-            self._synced_guilds.remove(guild_id)
+        if guild_id in self.sessions.synced_guilds:
+            self.sessions.disable_sync(guild_id)
             logger.info(f"Disabled GSI sync for guild {guild_id}")
             return False
         else:
-            self._synced_guilds.add(guild_id)
+            self.sessions.enable_sync(guild_id)
             logger.info(f"Enabled GSI sync for guild {guild_id}")
             return True
 
     @property
     def auth_token(self) -> str:
-        """Get the GSI authentication token."""
-        return self._auth_token
+        """Get the shared GSI authentication token."""
+        return self.sessions.default_token
 
     @auth_token.setter
     def auth_token(self, token: str) -> None:
-        """Set the GSI authentication token."""
-        self._auth_token = token
+        """Set the shared GSI authentication token."""
+        self.sessions.set_default_token(token)
         logger.info("GSI authentication token updated")
 
     @property
-    def game_state(self) -> Dict[str, Any]:
-        """Get the current game state."""
-        return self._game_state
+    def default_session(self) -> GSISession:
+        """Get the session of the shared token."""
+        return self.sessions.resolve(self.sessions.default_token)
+
+    @property
+    def game_state(self) -> GSISnapshot:
+        """
+        Get the latest game state snapshot of the shared token.
+
+        Snapshots are immutable and replaced as a whole, so a reader holding one
+        sees a consistent packet even while newer packets arrive.
+        """
+        return self.default_session.game_state
 
     @game_state.setter
-    def game_state(self, state: Dict[str, Any]) -> None:
-        """Set the current game state."""
-        self._game_state = state
+    def game_state(self, state: Union[GSISnapshot, Dict[str, Any]]) -> None:
+        """Publish a new game state snapshot by swapping the reference."""
+        self.default_session.game_state = state if isinstance(state, GSISnapshot) else GSISnapshot(state)
 
     @property
     def is_in_game(self) -> bool:
         """Check if currently in a game."""
-        return self._is_in_game
+        return self.default_session.is_in_game
 
     @is_in_game.setter
     def is_in_game(self, value: bool) -> None:
         """Set the in-game status."""
-        self._is_in_game = value
+        self.default_session.is_in_game = value
 
 
 # Create a global instance of the state manager
-gsi_state = GSIStateManager()
\ No newline at end of file
+gsi_state = GSIStateManager()
@@ -0,0 +1,337 @@
+"""
+Time-indexed history of GSI packets.
+
+Packets are stored in segments, each made of a full keyframe followed by structural
+deltas against the previous packet. Deltas share unchanged subtrees with the immutable
+snapshots they were computed from, so a match worth of packets fits in a few segments.
+Each segment tracks the JSON encoded size of its keyframe and deltas; whole segments are
+evicted once the history exceeds its byte budget, so every retained packet can always be
+rebuilt from its segment's keyframe. Packets vary from a few hundred bytes to tens of
+kilobytes, so a byte budget bounds memory where a packet count would not.
+"""
+import bisect
+from collections import deque
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from src.gsi.snapshot import FrozenView, dumps, unwrap
+from src.utils.config import logger
+
+# Packets between keyframes; bounds the number of deltas replayed per lookup.
+KEYFRAME_INTERVAL = 256
+
+# Encoded bytes retained by default. Unchanged packets are not stored and deltas are
+# small, so this covers a full match at the 0.1 s GSI throttle with room to spare.
+HISTORY_MAX_BYTES = 16 * 1024 * 1024
+
+
+class _Removed:
+    """Marker for a key that was removed from the state."""
+    __slots__ = ()
+
+    def __repr__(self) -> str:
+        return "REMOVED"
+
+
+REMOVED = _Removed()
+
+
+class Delta(dict):
+    """
+    Structural changes to a dict.
+
+    Values are the new value for the key, REMOVED for deleted keys, or a nested
+    Delta for a dict that changed in place. Plain dict values replace the old value.
+    """
+    __slots__ = ()
+
+
+def compute_delta(old: Dict[str, Any], new: Dict[str, Any]) -> Delta:
+    """
+    Compute the structural changes turning one state into another.
+
+    Lists and scalars are compared as whole values; dicts are compared key by key.
+
+    Args:
+        old (dict): The previous state.
+        new (dict): The current state.
+
+    Returns:
+        Delta: The changes, empty if the states are equal.
+    """
+    delta = Delta()
+    for key, value in new.items():
+        if key not in old:
+            delta[key] = value
+            continue
+        previous = old[key]
+        if previous is value:
+            continue
+        if isinstance(value, dict) and isinstance(previous, dict):
+            nested = compute_delta(previous, value)
+            if nested:
+                delta[key] = nested
+        elif previous != value:
+            delta[key] = value
+    for key in old:
+        if key not in new:
+            delta[key] = REMOVED
+    return delta
+
+
+def apply_delta(base: Dict[str, Any], delta: Delta) -> Dict[str, Any]:
+    """
+    Apply a delta to a state without modifying it.
+
+    Only dicts along changed paths are copied; everything else is shared with ``base``.
+
+    Args:
+        base (dict): The state the delta was computed against.
+        delta (Delta): The changes to apply.
+
+    Returns:
+        dict: The resulting state.
+    """
+    result = dict(base)
+    for key, change in delta.items():
+        if change is REMOVED:
+            result.pop(key, None)
+        elif isinstance(change, Delta):
+            previous = base.get(key)
+            result[key] = apply_delta(previous if isinstance(previous, dict) else {}, change)
+        else:
+            result[key] = change
+    return result
+
+
+def _encodable(value: Any) -> Any:
+    """Turn a delta into plain dicts that can be encoded, with REMOVED as null."""
+    if isinstance(value, Delta):
+        return {key: None if change is REMOVED else _encodable(change) for key, change in value.items()}
+    return value
+
+
+def encoded_size(value: Any) -> int:
+    """Return the size in bytes of a state or delta encoded as compact JSON."""
+    return len(dumps(_encodable(value)))
+
+
+def get_path(state: Any, path: Sequence[str]) -> Any:
+    """Return the value at a key path in nested dicts, or None if any key is missing."""
+    for key in path:
+        if not isinstance(state, dict):
+            return None
+        state = state.get(key)
+    return state
+
+
+def _resolve_change(delta: Delta, path: Sequence[str], current: Any) -> Tuple[bool, Any]:
+    """Return whether a delta touches a key path, and the value at the path afterwards."""
+    node = delta
+    for depth, key in enumerate(path):
+        if key not in node:
+            return False, current
+        node = node[key]
+        if node is REMOVED:
+            return True, None
+        if not isinstance(node, Delta):
+            return True, get_path(node, path[depth + 1:])
+    return True, apply_delta(current if isinstance(current, dict) else {}, node)
+
+
+class _Segment:
+    """A keyframe and the deltas of the packets that followed it, with their encoded size."""
+    __slots__ = ('keyframe', 'times', 'deltas', 'size')
+
+    def __init__(self, game_time: int, keyframe: Dict[str, Any]):
+        self.keyframe = keyframe
+        self.times: List[int] = [game_time]
+        self.deltas: List[Delta] = []
+        self.size = encoded_size(keyframe)
+
+    def append(self, game_time: int, delta: Delta) -> int:
+        """Add a packet's delta and return its encoded size."""
+        size = encoded_size(delta)
+        self.times.append(game_time)
+        self.deltas.append(delta)
+        self.size += size
+        return size
+
+    def state_at(self, index: int) -> Dict[str, Any]:
+        """Rebuild the state of the packet at the given index within the segment."""
+        state = self.keyframe
+        for delta in self.deltas[:index]:
+            state = apply_delta(state, delta)
+        return state
+
+
+class GSIHistory:
+    """
+    Byte-bounded history of one match's GSI packets, indexed by game time.
+
+    Packets must be recorded in game time order. A packet from a different match, or
+    one whose game time went backwards, starts a new history.
+    """
+
+    def __init__(self, max_bytes: int = HISTORY_MAX_BYTES, keyframe_interval: int = KEYFRAME_INTERVAL):
+        """
+        Initialize an empty history.
+
+        Args:
+            max_bytes (int, optional): Encoded bytes retained; the oldest segments are evicted
+                beyond this, but the current segment is always kept.
+            keyframe_interval (int, optional): Packets per segment.
+        """
+        self.max_bytes = max_bytes
+        self.keyframe_interval = keyframe_interval
+        self._segments: deque = deque()
+        self._starts: deque = deque()  # first game time of each segment, for bisecting
+        self._size = 0
+        self._latest: Optional[Dict[str, Any]] = None
+        self.match_id: Optional[str] = None
+
+    def __len__(self) -> int:
+        return sum(len(segment.times) for segment in self._segments)
+
+    @property
+    def size(self) -> int:
+        """The encoded size in bytes of the retained packets."""
+        return self._size
+
+    def clear(self) -> None:
+        """Drop all recorded packets."""
+        self._segments.clear()
+        self._starts.clear()
+        self._size = 0
+        self._latest = None
+        self.match_id = None
+
+    @property
+    def time_range(self) -> Optional[Tuple[int, int]]:
+        """The (first, last) game time retained, or None if the history is empty."""
+        if not self._segments:
+            return None
+        return self._segments[0].times[0], self._segments[-1].times[-1]
+
+    def record(self, state) -> bool:
+        """
+        Record a packet.
+
+        Args:
+            state: A GSISnapshot or decoded packet dict. It must not be modified afterwards.
+
+        Returns:
+            bool: True if the packet was stored, False if it had no game time or no changes.
+        """
+        data = unwrap(state)
+        game_time = get_path(data, ("map", "game_time"))
+        if game_time is None:
+            return False
+
+        match_id = get_path(data, ("map", "matchid"))
+        last_time = self._segments[-1].times[-1] if self._segments else None
+        if self._segments and (match_id != self.match_id or game_time < last_time):
+            logger.debug(f"GSI history reset for match {match_id} at game time {game_time}.")
+            self.clear()
+        self.match_id = match_id
+
+        if self._segments and len(self._segments[-1].times) < self.keyframe_interval:
+            delta = compute_delta(self._latest, data)
+            if not delta:
+                return False
+            self._size += self._segments[-1].append(game_time, delta)
+        else:
+            segment = _Segment(game_time, data)
+            self._segments.append(segment)
+            self._starts.append(game_time)
+            self._size += segment.size
+
+        while self._size > self.max_bytes and len(self._segments) > 1:
+            self._starts.popleft()
+            self._size -= self._segments.popleft().size
+
+        self._latest = data
+        return True
+
+    def _locate(self, game_time: int) -> Optional[Tuple[_Segment, int]]:
+        """Find the segment and index of the last packet at or before a game time."""
+        position = bisect.bisect_right(self._starts, game_time) - 1
+        if position < 0:
+            return None
+        segment = self._segments[position]
+        return segment, bisect.bisect_right(segment.times, game_time) - 1
+
+    def state_at(self, game_time: int) -> Optional[FrozenView]:
+        """
+        Get the state as of a game time.
+
+        Args:
+            game_time (int): The game time in seconds.
+
+        Returns:
+            FrozenView: The last packet recorded at or before the game time, or None
+            if the time is before the retained history.
+        """
+        located = self._locate(game_time)
+        if located is None:
+            return None
+        segment, index = located
+        return FrozenView(segment.state_at(index))
+
+    def changes(self, path: Sequence[str], since: Optional[int] = None) -> Iterator[Tuple[int, Any, Any]]:
+        """
+        Iterate over the packets in which the value at a key path changed.
+
+        Only deltas that touch the path are examined, so no full states are rebuilt.
+
+        Args:
+            path (sequence): Keys leading to the value, e.g. ("roshan", "alive").
+            since (int, optional): Only report changes after this game time.
+
+        Yields:
+            tuple: (game time, old value, new value) for each change, oldest first.
+        """
+        path = tuple(path)
+        value = None
+        started = False
+        for segment in list(self._segments):
+            keyframe_value = get_path(segment.keyframe, path)
+            if started and keyframe_value != value and (since is None or segment.times[0] > since):
+                yield segment.times[0], value, keyframe_value
+            value = keyframe_value
+            started = True
+            for game_time, delta in zip(segment.times[1:], segment.deltas):
+                touched, new_value = _resolve_change(delta, path, value)
+                if touched and new_value != value:
+                    if since is None or game_time > since:
+                        yield game_time, value, new_value
+                    value = new_value
+
+    def first_change(self, path: Sequence[str], since: Optional[int] = None) -> Optional[Tuple[int, Any, Any]]:
+        """
+        Find the first packet in which the value at a key path changed.
+
+        Args:
+            path (sequence): Keys leading to the value, e.g. ("roshan", "alive").
+            since (int, optional): Only consider changes after this game time.
+
+        Returns:
+            tuple: (game time, old value, new value), or None if the value never changed.
+        """
+        return next(self.changes(path, since), None)
+
+    def diff(self, start: int, end: int) -> Optional[Delta]:
+        """
+        Compute the structural changes between two game times.
+
+        Args:
+            start (int): The earlier game time.
+            end (int): The later game time.
+
+        Returns:
+            Delta: The changes, or None if ``start`` is before the retained history.
+        """
+        before = self.state_at(start)
+        after = self.state_at(end)
+        if before is None or after is None:
+            return None
+        return compute_delta(unwrap(before), unwrap(after))
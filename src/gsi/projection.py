@@ -0,0 +1,155 @@
+"""
+Ingest-time pruning of GSI packets to the fields the bot uses.
+
+Consumers declare the fields they read as dotted paths, e.g. "map" or
+"buildings.*.glyph", where "*" matches any key. Packets are reduced to those fields
+before they are stored in sessions and histories, so unused subtrees (abilities,
+items, wearables, ...) are neither kept in memory nor diffed.
+"""
+import threading
+from typing import Any, Dict, FrozenSet, Iterable, Optional
+
+from src.gsi.snapshot import GSISnapshot, unwrap
+from src.utils.config import GSI_INGEST_FIELDS, logger
+
+WILDCARD = "*"
+
+
+class _Node:
+    """Trie node of a projection."""
+    __slots__ = ("children", "whole")
+
+    def __init__(self):
+        self.children: Dict[str, '_Node'] = {}
+        self.whole = False  # Keep the entire subtree
+
+
+def _merge(target: _Node, source: _Node) -> None:
+    """Add the fields of source to target."""
+    if target.whole:
+        return
+    if source.whole:
+        target.whole = True
+        target.children = {}
+        return
+    for key, child in source.children.items():
+        _merge(target.children.setdefault(key, _Node()), child)
+
+
+def _compile(paths: Iterable[str]) -> Optional[_Node]:
+    """Build the trie of a set of paths; None if everything is kept."""
+    root = _Node()
+    for path in paths:
+        if path == WILDCARD:
+            return None
+        leaf = _Node()
+        leaf.whole = True
+        for key in reversed(path.split(".")):
+            parent = _Node()
+            parent.children[key] = leaf
+            leaf = parent
+        _merge(root, leaf)
+
+    def spread_wildcards(node: _Node) -> None:
+        # Explicit keys also receive the fields requested for any key
+        wildcard = node.children.get(WILDCARD)
+        for key, child in node.children.items():
+            if wildcard is not None and key != WILDCARD:
+                _merge(child, wildcard)
+            spread_wildcards(child)
+
+    spread_wildcards(root)
+    return root
+
+
+def _project(value: Any, node: _Node) -> Any:
+    """Reduce a value to the fields of a trie node."""
+    if node.whole:
+        return value
+    if isinstance(value, dict):
+        result = {}
+        for key, item in value.items():
+            child = node.children.get(key) or node.children.get(WILDCARD)
+            if child is not None:
+                result[key] = _project(item, child)
+        return result
+    if isinstance(value, list):
+        return [_project(item, node) for item in value]
+    return value
+
+
+class FieldProjection:
+    """
+    Whitelist of GSI fields registered by the packet consumers.
+
+    Attributes:
+        paths (frozenset): The registered paths.
+    """
+
+    def __init__(self, paths: Iterable[str] = ()):
+        """
+        Initialize the projection.
+
+        Args:
+            paths (iterable, optional): Paths to keep from the start.
+        """
+        self.paths: FrozenSet[str] = frozenset()
+        self._root: Optional[_Node] = _compile(())
+        self._lock = threading.Lock()
+        self.require(*paths)
+
+    def require(self, *paths: str) -> None:
+        """
+        Keep additional fields in ingested packets.
+
+        Args:
+            *paths (str): Dotted paths; "*" as a path keeps whole packets.
+        """
+        with self._lock:
+            new_paths = self.paths.union(path.strip(".") for path in paths if path)
+            if new_paths == self.paths:
+                return
+            # Packets are projected without the lock, so the trie is replaced, not modified
+            self._root = _compile(new_paths)
+            self.paths = frozenset(new_paths)
+        logger.debug(f"GSI ingest fields: {sorted(self.paths)}")
+
+    @property
+    def keeps_everything(self) -> bool:
+        """Whether packets are stored whole."""
+        return self._root is None
+
+    def apply(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Reduce a decoded packet to the registered fields.
+
+        The result shares the kept subtrees with the input.
+
+        Args:
+            data (dict): The decoded packet.
+
+        Returns:
+            dict: The packet with only the registered fields.
+        """
+        root = self._root
+        if root is None:
+            return data
+        return _project(data, root)
+
+    def project(self, snapshot: GSISnapshot) -> GSISnapshot:
+        """
+        Reduce a snapshot to the registered fields.
+
+        Args:
+            snapshot (GSISnapshot): The received packet.
+
+        Returns:
+            GSISnapshot: A snapshot of the kept fields, with the original reception time and size.
+        """
+        if self._root is None:
+            return snapshot
+        return GSISnapshot(self.apply(unwrap(snapshot)), snapshot.received_at, snapshot.size)
+
+
+# Fields kept by GSIManager for all consumers; extend with ingest_fields.require(...)
+ingest_fields = FieldProjection(GSI_INGEST_FIELDS or ())
@@ -0,0 +1,175 @@
+"""
+Recording of GSI streams to compressed JSONL files.
+
+Each line holds one packet and the Unix time it was received:
+{"t": 1700000000.123, "packet": {...}}. Auth tokens are never written; replays supply
+their own. Recordings are read back by src/utils/gsi_replay.py.
+"""
+import gzip
+import hashlib
+import os
+import queue
+import threading
+import time
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from src.gsi.snapshot import GSISnapshot, dumps, loads, unwrap
+from src.utils.config import logger
+
+# Packets written between flushes of a recording file
+FLUSH_INTERVAL = 32
+
+# Packets waiting for the writer thread; further packets are dropped from the recording
+RECORD_QUEUE_SIZE = 1024
+
+# Queued in place of a packet to stop the writer thread
+_STOP = object()
+
+
+class _Recording:
+    """An open recording file of one client's match."""
+
+    def __init__(self, path: str, match_id: Optional[str]):
+        self.path = path
+        self.match_id = match_id
+        self.file = gzip.open(path, "ab")
+        self.unflushed = 0
+
+
+class GSIRecorder:
+    """
+    Appends GSI packets to gzip-compressed JSONL files, one file per client and match.
+
+    Pass it to the GSIServer to capture live matches; the server records packets as they
+    arrive, before they are reduced to the ingest fields. Recorded packets are encoded,
+    compressed and written by one writer thread, in the order they were recorded.
+
+    Attributes:
+        dropped (int): Packets left out of the recordings because the writer fell behind.
+    """
+
+    def __init__(self, directory: str, queue_size: int = RECORD_QUEUE_SIZE):
+        """
+        Initialize the recorder.
+
+        Args:
+            directory (str): The directory recordings are written to; created if missing.
+            queue_size (int, optional): Packets that may wait for the writer thread.
+        """
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.dropped = 0
+        self._recordings: Dict[str, _Recording] = {}
+        self._lock = threading.Lock()
+        self._queue: "queue.Queue" = queue.Queue(maxsize=queue_size)
+        self._writer: Optional[threading.Thread] = None
+
+    def record(self, snapshot: GSISnapshot) -> None:
+        """
+        Queue a packet for recording. Packets without map data (client in menus) are skipped.
+
+        Does no I/O, so it can be called on the event loop.
+
+        Args:
+            snapshot (GSISnapshot): The received packet.
+        """
+        if "map" not in snapshot:
+            return
+        with self._lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._run, name="gsi-recorder", daemon=True)
+                self._writer.start()
+        try:
+            self._queue.put_nowait((snapshot, snapshot.received_at or time.time()))
+        except queue.Full:
+            self.dropped += 1
+            logger.warning("GSI recorder queue is full; dropped packet (%s dropped in total)", self.dropped)
+
+    def _run(self) -> None:
+        """Write queued packets until stopped."""
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            snapshot, received_at = item
+            try:
+                data = unwrap(snapshot)
+                packet = {key: value for key, value in data.items() if key != "auth"}
+                self.write(snapshot.auth_token, packet, received_at)
+            except Exception as e:
+                logger.error(f"Error recording GSI packet: {e}", exc_info=True)
+
+    def write(self, client: str, packet: Dict[str, Any], received_at: float) -> None:
+        """
+        Append a packet to the current recording of a client.
+
+        Args:
+            client (str): Identifies the client, e.g. its auth token; only a hash is stored.
+            packet (dict): The packet without its auth section.
+            received_at (float): Unix time the packet was received.
+        """
+        match_id = packet.get("map", {}).get("matchid")
+        line = dumps({"t": received_at, "packet": packet}) + b"\n"
+        with self._lock:
+            recording = self._recordings.get(client)
+            if recording is None or recording.match_id != match_id:
+                if recording is not None:
+                    recording.file.close()
+                recording = self._open(client, match_id, received_at)
+                self._recordings[client] = recording
+            recording.file.write(line)
+            recording.unflushed += 1
+            if recording.unflushed >= FLUSH_INTERVAL:
+                recording.file.flush()
+                recording.unflushed = 0
+
+    def _open(self, client: str, match_id: Optional[str], received_at: float) -> _Recording:
+        """Open a new recording file. Called with the lock held."""
+        client_hash = hashlib.sha256(client.encode()).hexdigest()[:8]
+        started = time.strftime("%Y%m%d-%H%M%S", time.gmtime(received_at))
+        path = os.path.join(self.directory, f"gsi-{started}-{match_id or 'none'}-{client_hash}.jsonl.gz")
+        logger.info(f"Recording GSI packets of match {match_id} to {path}")
+        return _Recording(path, match_id)
+
+    def close(self) -> None:
+        """Write the queued packets, then close all open recording files."""
+        with self._lock:
+            writer, self._writer = self._writer, None
+        if writer is not None:
+            self._queue.put(_STOP)
+            writer.join()
+        with self._lock:
+            for recording in self._recordings.values():
+                try:
+                    recording.file.close()
+                except OSError as e:
+                    logger.error(f"Error closing GSI recording {recording.path}: {e}", exc_info=True)
+            self._recordings.clear()
+
+
+def read_recording(path: str) -> Iterator[Tuple[float, Dict[str, Any]]]:
+    """
+    Read the packets of a recording.
+
+    A truncated last line, left by a process that stopped while recording, is ignored.
+
+    Args:
+        path (str): Path of a .jsonl.gz (or uncompressed .jsonl) recording.
+
+    Yields:
+        tuple: (Unix time the packet was received, packet dict)
+    """
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rb") as file:
+        try:
+            for line in file:
+                if not line.strip():
+                    continue
+                try:
+                    entry = loads(line)
+                except ValueError:
+                    logger.warning(f"Skipping malformed line in GSI recording {path}")
+                    continue
+                yield entry["t"], entry["packet"]
+        except EOFError:
+            logger.warning(f"GSI recording {path} ends early; it was not closed cleanly")
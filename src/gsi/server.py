@@ -0,0 +1,107 @@
+"""
+GSI listener running on the bot's event loop.
+
+The Dota 2 client posts its game state here directly, so packets reach the bot's
+GSIManager in-process instead of going through the web dashboard container.
+"""
+import asyncio
+from typing import Optional
+
+from aiohttp import web
+
+from src.gsi.gsi_manager import GSIManager
+from src.gsi.gsi_state import gsi_state
+from src.gsi.recorder import GSIRecorder
+from src.gsi.snapshot import GSISnapshot
+from src.utils.config import logger
+
+# Seconds an idle client connection is kept open; the client posts at least every heartbeat
+KEEPALIVE_TIMEOUT = 75
+
+# GSI packets are a few KB; anything much larger is not a game state
+MAX_PACKET_SIZE = 1024 * 1024
+
+
+class GSIServer:
+    """
+    Minimal HTTP server accepting GSI packets.
+
+    Packets are parsed and published on the event loop; callbacks run on the manager's
+    dispatcher, so the client gets its response as soon as the packet is accepted. The
+    only database query, reloading the tokens for an unknown one, runs in a thread.
+    """
+
+    def __init__(self, manager: GSIManager, host: str = "0.0.0.0", port: int = 3000,
+                 recorder: Optional[GSIRecorder] = None):
+        """
+        Initialize the server.
+
+        Args:
+            manager (GSIManager): The manager receiving the packets.
+            host (str, optional): The interface to listen on.
+            port (int, optional): The port to listen on.
+            recorder (GSIRecorder, optional): Records every accepted packet whole, in the
+                order the packets arrive.
+        """
+        self.manager = manager
+        self.recorder = recorder
+        self.host = host
+        self.port = port
+        self.app = web.Application(client_max_size=MAX_PACKET_SIZE)
+        # Older GSI configs point at the dashboard's /api/gsi/ path
+        self.app.router.add_post("/", self.handle_packet)
+        self.app.router.add_post("/api/gsi/", self.handle_packet)
+        self._runner: Optional[web.AppRunner] = None
+
+    async def handle_packet(self, request: web.Request) -> web.Response:
+        """
+        Accept a GSI packet.
+
+        Args:
+            request (web.Request): The client's POST request.
+
+        Returns:
+            web.Response: An empty 200 response if the packet was accepted, 400 if it is
+            not a JSON object and 401 if its auth token is unknown.
+        """
+        try:
+            snapshot = GSISnapshot.from_bytes(await request.read())
+        except ValueError:
+            logger.warning("Received malformed GSI request")
+            return web.Response(status=400)
+
+        sessions = gsi_state.sessions
+        if not sessions.knows(snapshot.auth_token):
+            # The token may have been issued by the dashboard since the last reload
+            await asyncio.to_thread(sessions.refresh)
+
+        if not self.manager.process_request(snapshot.auth_token, snapshot):
+            return web.Response(status=401)
+        if self.recorder is not None:
+            # The parsed packet, not the manager's copy reduced to the ingest fields; only
+            # queued here, the recorder's thread writes it
+            self.recorder.record(snapshot)
+        return web.Response()
+
+    async def start(self) -> None:
+        """Start listening on the configured host and port."""
+        if self._runner is not None:
+            return
+        runner = web.AppRunner(self.app, access_log=None, keepalive_timeout=KEEPALIVE_TIMEOUT)
+        await runner.setup()
+        try:
+            await web.TCPSite(runner, self.host, self.port).start()
+        except OSError as e:
+            await runner.cleanup()
+            logger.error(f"Could not start GSI server on {self.host}:{self.port}: {e}", exc_info=True)
+            return
+        self._runner = runner
+        logger.info(f"GSI server listening on {self.host}:{self.port}")
+
+    async def stop(self) -> None:
+        """Stop the server and close client connections."""
+        if self._runner is None:
+            return
+        await self._runner.cleanup()
+        self._runner = None
+        logger.info("GSI server stopped")
@@ -0,0 +1,345 @@
+"""
+GSI sessions keyed by auth token.
+
+Every Dota client sends its own auth token. Each token gets a session holding that
+client's latest snapshot, derived state, history and the guilds whose timers it drives,
+so several parties can feed the bot at the same time.
+"""
+import secrets
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Dict, Iterator, List, Optional
+
+from src.database import GSIToken, SessionLocal
+from src.gsi.clock import GameClock
+from src.gsi.derived import DerivedState
+from src.gsi.events import GSIEvent, detect_events
+from src.gsi.history import GSIHistory
+from src.gsi.snapshot import EMPTY_SNAPSHOT, GSISnapshot
+from src.utils.config import logger
+
+# Seconds without packets after which a client is considered disconnected
+DISCONNECT_TIMEOUT = 60
+
+# Seconds without packets after which a session's state is dropped
+SESSION_IDLE_TIMEOUT = 2 * 60 * 60
+
+# Live sessions kept at once; the least recently active one is dropped beyond this
+MAX_SESSIONS = 256
+
+# Encoded bytes of history kept per session
+SESSION_HISTORY_BYTES = 8 * 1024 * 1024
+
+# Recent packets kept per session for comparing consecutive states
+RECENT_PACKETS = 10
+
+# Minimum seconds between reloads of the token index after an unknown token
+TOKEN_REFRESH_INTERVAL = 30
+
+
+class GSISession:
+    """
+    State received from one Dota client.
+
+    Attributes:
+        token (str): The client's auth token.
+        guild_id (int): The guild the token was issued for, or None for the shared token.
+        game_state (GSISnapshot): The latest packet.
+        is_in_game (bool): Whether the latest packet reported a match in progress.
+        last_update (float): Unix timestamp of the latest packet, 0 if none was received.
+        history (GSIHistory): Packets of the current match.
+        recent (deque): The most recent packets.
+        clock (GameClock): The client's game clock, corrected by every packet.
+    """
+
+    def __init__(self, token: str, guild_id: Optional[int] = None,
+                 history_bytes: int = SESSION_HISTORY_BYTES):
+        """
+        Initialize an empty session.
+
+        Args:
+            token (str): The client's auth token.
+            guild_id (int, optional): The guild the token was issued for.
+            history_bytes (int, optional): Encoded bytes of history to keep.
+        """
+        self.token = token
+        self.guild_id = guild_id
+        self.game_state = EMPTY_SNAPSHOT
+        self.is_in_game = False
+        self.last_update = 0.0
+        self.history = GSIHistory(max_bytes=history_bytes)
+        self.recent = deque(maxlen=RECENT_PACKETS)
+        self.clock = GameClock()
+        self._sequence = 0
+        self._derived = DerivedState(self.game_state)
+
+    def __repr__(self) -> str:
+        return f"GSISession(guild_id={self.guild_id}, in_game={self.is_in_game})"
+
+    @property
+    def derived(self) -> DerivedState:
+        """Values derived from the latest packet, cached until the next packet."""
+        derived = self._derived
+        snapshot = self.game_state
+        if derived.snapshot is not snapshot:
+            self._sequence += 1
+            derived = DerivedState(snapshot, self._sequence)
+            self._derived = derived
+        return derived
+
+    def publish(self, snapshot: GSISnapshot) -> List[GSIEvent]:
+        """
+        Make a packet the session's current state.
+
+        Args:
+            snapshot (GSISnapshot): The received packet.
+
+        Returns:
+            list: Events detected against the previous packet.
+        """
+        received = time.monotonic()
+        previous = self.derived
+        self.recent.append(snapshot)
+        self.history.record(snapshot)
+        self.game_state = snapshot
+        self.last_update = time.time()
+
+        derived = self.derived
+        if "map" in snapshot:
+            in_game = derived.in_progress
+            if in_game != self.is_in_game:
+                if in_game:
+                    logger.info(f"Game started: match ID {derived.match_id}, mode {derived.game_mode}")
+                else:
+                    logger.info(f"Game ended: match ID {derived.match_id}")
+            self.is_in_game = in_game
+            if derived.clock_time is not None:
+                self.clock.observe(derived.clock_time, derived.paused, derived.match_id, at=received)
+        return detect_events(previous, derived, self)
+
+    def is_connected(self, now: Optional[float] = None) -> bool:
+        """Whether a packet was received within the disconnect timeout."""
+        return (now or time.time()) - self.last_update < DISCONNECT_TIMEOUT
+
+
+class SessionRegistry:
+    """
+    Token index and live sessions.
+
+    Tokens map to the guild they were issued for; guilds map to the token whose
+    session drives their timers. Both lookups are dictionary lookups. Sessions are
+    created on a token's first packet and dropped when idle or when the registry is
+    full; the token itself stays valid and simply starts a fresh session.
+    """
+
+    def __init__(self, max_sessions: int = MAX_SESSIONS, idle_timeout: float = SESSION_IDLE_TIMEOUT,
+                 history_bytes: int = SESSION_HISTORY_BYTES):
+        """
+        Initialize an empty registry.
+
+        Args:
+            max_sessions (int, optional): Live sessions kept at once.
+            idle_timeout (float, optional): Seconds without packets before a session is dropped.
+            history_bytes (int, optional): Encoded bytes of history kept per session.
+        """
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.history_bytes = history_bytes
+        self.default_token: Optional[str] = None
+        self._tokens: Dict[str, Optional[int]] = {}  # token -> guild it was issued for
+        self._issued: Dict[int, str] = {}  # guild -> token issued for it
+        self._guild_tokens: Dict[int, str] = {}  # guild -> token driving its timers
+        self._sessions: "OrderedDict[str, GSISession]" = OrderedDict()  # least recently active first
+        self._lock = threading.RLock()
+        self._refreshed_at = 0.0
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __iter__(self) -> Iterator[GSISession]:
+        with self._lock:
+            return iter(list(self._sessions.values()))
+
+    def set_default_token(self, token: str) -> None:
+        """
+        Set the shared token accepted for any guild.
+
+        Args:
+            token (str): The token.
+        """
+        with self._lock:
+            if self.default_token and self.default_token != token:
+                self._tokens.pop(self.default_token, None)
+                self._sessions.pop(self.default_token, None)
+                for guild_id, bound in list(self._guild_tokens.items()):
+                    if bound == self.default_token:
+                        self._guild_tokens[guild_id] = token
+            self.default_token = token
+            self._tokens[token] = None
+
+    def load_tokens(self) -> None:
+        """Load the tokens issued to guilds from the database."""
+        try:
+            with SessionLocal() as db:
+                rows = db.query(GSIToken.token, GSIToken.guild_id).all()
+        except Exception as e:
+            logger.error(f"Error loading GSI tokens: {e}", exc_info=True)
+            return
+        with self._lock:
+            # Rebuild the index so tokens revoked by another process stop working too
+            tokens = {token: int(guild_id) for token, guild_id in rows}
+            if self.default_token:
+                tokens[self.default_token] = None
+            self._tokens = tokens
+            self._issued = {guild_id: token for token, guild_id in tokens.items() if guild_id is not None}
+            for token in [token for token in self._sessions if token not in tokens]:
+                del self._sessions[token]
+            self._refreshed_at = time.monotonic()
+        logger.info(f"Loaded {len(rows)} GSI token(s).")
+
+    def issue_token(self, guild_id: int) -> str:
+        """
+        Issue a new token for a guild, revoking its previous one.
+
+        Args:
+            guild_id (int): The ID of the Discord guild.
+
+        Returns:
+            str: The new token.
+        """
+        token = secrets.token_urlsafe(24)
+        with SessionLocal() as db:
+            db.query(GSIToken).filter_by(guild_id=str(guild_id)).delete()
+            db.add(GSIToken(token=token, guild_id=str(guild_id)))
+            db.commit()
+
+        with self._lock:
+            old_token = self._issued.get(guild_id)
+            if old_token:
+                self._tokens.pop(old_token, None)
+                self._sessions.pop(old_token, None)
+            self._tokens[token] = guild_id
+            self._issued[guild_id] = token
+            if guild_id in self._guild_tokens:
+                self._guild_tokens[guild_id] = token
+        logger.info(f"Issued a new GSI token for guild ID {guild_id}.")
+        return token
+
+    def knows(self, token: str) -> bool:
+        """Whether a token is in the token index."""
+        with self._lock:
+            return token in self._tokens
+
+    def refresh(self) -> None:
+        """
+        Reload tokens issued by another process, at most once per refresh interval.
+
+        This queries the database; on the event loop, run it in a thread.
+        """
+        with self._lock:
+            if time.monotonic() - self._refreshed_at < TOKEN_REFRESH_INTERVAL:
+                return
+            self._refreshed_at = time.monotonic()
+        self.load_tokens()
+
+    def resolve(self, token: str) -> Optional[GSISession]:
+        """
+        Get the session for a token, creating it on first use.
+
+        An unknown token triggers a token reload, which is rate limited; callers on the
+        event loop should call refresh() in a thread first so the reload is a no-op here.
+
+        Args:
+            token (str): The auth token sent by the client.
+
+        Returns:
+            GSISession: The session, or None if the token is unknown.
+        """
+        if not self.knows(token):
+            # Outside the lock, so other packets are not held up by the query
+            self.refresh()
+
+        with self._lock:
+            session = self._sessions.get(token)
+            if session is not None:
+                self._sessions.move_to_end(token)
+                return session
+            if token not in self._tokens:
+                return None
+
+            session = GSISession(token, self._tokens[token], self.history_bytes)
+            self._sessions[token] = session
+            while len(self._sessions) > self.max_sessions:
+                evicted, _ = self._sessions.popitem(last=False)
+                logger.info(f"Dropped least recently active GSI session {self._tokens.get(evicted)}.")
+            return session
+
+    def get(self, token: str) -> Optional[GSISession]:
+        """Get the live session for a token without creating one."""
+        with self._lock:
+            return self._sessions.get(token)
+
+    def session_for_guild(self, guild_id: int) -> Optional[GSISession]:
+        """
+        Get the live session relevant to a guild.
+
+        That is the session driving its timers if the guild is synced, otherwise the
+        session of the guild's own token, otherwise the shared token's session.
+
+        Args:
+            guild_id (int): The ID of the Discord guild.
+
+        Returns:
+            GSISession: The session, or None if it has not received packets yet.
+        """
+        with self._lock:
+            token = self._guild_tokens.get(guild_id) or self._issued.get(guild_id) or self.default_token
+            return self._sessions.get(token)
+
+    def token_for_guild(self, guild_id: int) -> Optional[str]:
+        """Get the token issued for a guild, or None if it has none."""
+        with self._lock:
+            return self._issued.get(guild_id)
+
+    @property
+    def synced_guilds(self) -> frozenset:
+        """The guilds whose timers are driven by a GSI session."""
+        with self._lock:
+            return frozenset(self._guild_tokens)
+
+    def guilds_for(self, session: GSISession) -> List[int]:
+        """Get the guilds whose timers a session drives."""
+        with self._lock:
+            return [guild_id for guild_id, token in self._guild_tokens.items() if token == session.token]
+
+    def enable_sync(self, guild_id: int) -> None:
+        """Drive a guild's timers from its own token, or the shared token if it has none."""
+        token = self.token_for_guild(guild_id) or self.default_token
+        with self._lock:
+            self._guild_tokens[guild_id] = token
+
+    def disable_sync(self, guild_id: int) -> None:
+        """Stop driving a guild's timers from GSI."""
+        with self._lock:
+            self._guild_tokens.pop(guild_id, None)
+
+    def evict_idle(self, now: Optional[float] = None) -> List[str]:
+        """
+        Drop sessions that received no packets within the idle timeout.
+
+        Args:
+            now (float, optional): Current Unix timestamp. Defaults to now.
+
+        Returns:
+            list: Tokens of the dropped sessions.
+        """
+        now = now or time.time()
+        with self._lock:
+            idle = [token for token, session in self._sessions.items()
+                    if now - session.last_update >= self.idle_timeout]
+            for token in idle:
+                del self._sessions[token]
+        if idle:
+            logger.info(f"Dropped {len(idle)} idle GSI session(s).")
+        return idle
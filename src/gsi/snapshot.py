@@ -0,0 +1,212 @@
+"""
+Immutable snapshots of Dota 2 GSI packets.
+
+A packet is parsed once into plain dicts and lists that are owned by the snapshot and
+never handed out directly. Readers get read-only views that wrap nested values on access,
+so sharing a snapshot across threads needs neither copies nor locks.
+"""
+import json
+import time
+from collections.abc import Mapping, Sequence
+from typing import Any, Dict, Iterator, Union
+
+try:
+    import orjson
+except ImportError:  # Fall back to the standard library parser
+    orjson = None
+
+
+def loads(raw: Union[bytes, str]) -> Any:
+    """
+    Parse JSON, using orjson when it is installed.
+
+    Args:
+        raw (bytes | str): The JSON document.
+
+    Returns:
+        Any: The decoded value.
+    """
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def dumps(value: Any) -> bytes:
+    """
+    Encode a value as compact JSON, using orjson when it is installed.
+
+    Args:
+        value (Any): Plain dicts, lists and scalars.
+
+    Returns:
+        bytes: The UTF-8 encoded JSON document.
+    """
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, separators=(',', ':')).encode()
+
+
+def _wrap(value: Any) -> Any:
+    """Wrap containers in read-only views; scalars are returned as is."""
+    if isinstance(value, dict):
+        return FrozenView(value)
+    if isinstance(value, list):
+        return FrozenList(value)
+    return value
+
+
+def unwrap(value: Any) -> Any:
+    """
+    Return the data underneath a read-only view without copying it.
+
+    The result is shared with the view and must not be modified.
+
+    Args:
+        value (Any): A FrozenView, FrozenList or plain value.
+
+    Returns:
+        Any: The underlying dict or list, or the value itself.
+    """
+    if isinstance(value, (FrozenView, FrozenList)):
+        return value._data
+    return value
+
+
+def _thaw(value: Any) -> Any:
+    """Return a mutable deep copy of a view or raw container."""
+    if isinstance(value, (FrozenView, dict)):
+        return {key: _thaw(item) for key, item in value.items()}
+    if isinstance(value, (FrozenList, list)):
+        return [_thaw(item) for item in value]
+    return value
+
+
+class FrozenView(Mapping):
+    """
+    Read-only view of a dict that wraps nested dicts and lists on access.
+    """
+    __slots__ = ('_data',)
+
+    def __init__(self, data: Dict[str, Any]):
+        self._data = data
+
+    def __getitem__(self, key: str) -> Any:
+        return _wrap(self._data[key])
+
+    def get(self, key: str, default: Any = None) -> Any:
+        # Faster than the Mapping mixin, which goes through __getitem__ and KeyError
+        value = self._data.get(key, default)
+        return value if value is default else _wrap(value)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._data
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, FrozenView):
+            return self._data == other._data
+        return self._data == other
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self._data!r})"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Return a mutable deep copy, e.g. for JSON serialization.
+
+        Returns:
+            Dict[str, Any]: The copied data.
+        """
+        return _thaw(self._data)
+
+
+class FrozenList(Sequence):
+    """
+    Read-only view of a list that wraps nested dicts and lists on access.
+    """
+    __slots__ = ('_data',)
+
+    def __init__(self, data: list):
+        self._data = data
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return FrozenList(self._data[index])
+        return _wrap(self._data[index])
+
+    def __iter__(self) -> Iterator[Any]:
+        return map(_wrap, self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, FrozenList):
+            return self._data == other._data
+        return self._data == other
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self._data!r})"
+
+
+class GSISnapshot(FrozenView):
+    """
+    An immutable, fully parsed GSI packet.
+
+    Attributes:
+        received_at (float): Unix timestamp at which the packet was received.
+        size (int): Size of the raw packet in bytes, or 0 if it was not parsed from bytes.
+    """
+    __slots__ = ('received_at', 'size')
+
+    def __init__(self, data: Dict[str, Any], received_at: float = 0.0, size: int = 0):
+        """
+        Wrap already decoded packet data. The snapshot takes ownership of ``data``;
+        callers must not modify it afterwards.
+
+        Args:
+            data (Dict[str, Any]): The decoded packet.
+            received_at (float, optional): Unix timestamp of reception. Defaults to 0.0.
+            size (int, optional): Raw packet size in bytes. Defaults to 0.
+        """
+        if not isinstance(data, dict):
+            raise ValueError("GSI packet must be a JSON object")
+        super().__init__(data)
+        self.received_at = received_at
+        self.size = size
+
+    @classmethod
+    def from_bytes(cls, raw: Union[bytes, str], received_at: float = None) -> 'GSISnapshot':
+        """
+        Parse a raw GSI packet.
+
+        Args:
+            raw (bytes | str): The request body.
+            received_at (float, optional): Unix timestamp of reception. Defaults to now.
+
+        Returns:
+            GSISnapshot: The parsed snapshot.
+
+        Raises:
+            ValueError: If the body is not a JSON object.
+        """
+        return cls(loads(raw), time.time() if received_at is None else received_at, len(raw))
+
+    @property
+    def auth_token(self) -> str:
+        """The auth token sent by the client, or an empty string."""
+        auth = self._data.get("auth")
+        return auth.get("token", "") if isinstance(auth, dict) else ""
+
+
+# Snapshot published before any packet has been received
+EMPTY_SNAPSHOT = GSISnapshot({})
@@ -0,0 +1,5 @@
+from .client import IPCClient, IPCConnectionError, IPCError
+from .server import IPCServer
+
+# Export the IPC server and client
+__all__ = ['IPCClient', 'IPCConnectionError', 'IPCError', 'IPCServer']
@@ -0,0 +1,160 @@
+"""
+Blocking IPC client used by the web dashboard to reach the bot.
+
+Connections are kept open and reused across requests, so a request costs one write
+and one read on a local socket. Each request has a timeout; a dead bot shows up as an
+IPCConnectionError instead of a hanging dashboard request.
+"""
+import itertools
+import socket
+import threading
+from collections import deque
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+from src.ipc.protocol import HEARTBEAT_INTERVAL, ProtocolError, encode, recv_message
+from src.utils.config import IPC_SOCKET_PATH, IPC_TIMEOUT
+
+# Idle connections kept open for reuse
+POOL_SIZE = 4
+
+
+class IPCError(Exception):
+    """The bot could not carry out an IPC request."""
+
+
+class IPCConnectionError(IPCError):
+    """The bot could not be reached or did not answer in time."""
+
+
+class IPCClient:
+    """
+    Sends requests to the bot's IPC server. Safe to use from several threads.
+    """
+
+    def __init__(self, path: str = IPC_SOCKET_PATH, timeout: float = IPC_TIMEOUT, pool_size: int = POOL_SIZE):
+        """
+        Initialize the client. Connections are opened on first use.
+
+        Args:
+            path (str, optional): Path of the bot's socket file.
+            timeout (float, optional): Default seconds to wait for a response.
+            pool_size (int, optional): Idle connections kept open for reuse.
+        """
+        self.path = path
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self._idle: deque = deque()
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+
+    def _connect(self, timeout: float) -> socket.socket:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(timeout)
+        try:
+            sock.connect(self.path)
+        except OSError as e:
+            sock.close()
+            raise IPCConnectionError(f"Bot is not reachable at {self.path}: {e}") from e
+        return sock
+
+    def _acquire(self, timeout: float) -> Tuple[socket.socket, bool]:
+        """Get an idle connection, or open one. Returns the socket and whether it was reused."""
+        with self._lock:
+            sock = self._idle.pop() if self._idle else None
+        if sock is None:
+            return self._connect(timeout), False
+        sock.settimeout(timeout)
+        return sock, True
+
+    def _release(self, sock: socket.socket) -> None:
+        with self._lock:
+            if len(self._idle) < self.pool_size:
+                self._idle.append(sock)
+                return
+        sock.close()
+
+    def request(self, op: str, timeout: Optional[float] = None, **args: Any) -> Any:
+        """
+        Run an operation in the bot and wait for its result.
+
+        Args:
+            op (str): The operation, e.g. "timers.pause".
+            timeout (float, optional): Seconds to wait; defaults to the client's timeout.
+            **args: Arguments of the operation.
+
+        Returns:
+            The operation's result.
+
+        Raises:
+            IPCConnectionError: If the bot is unreachable or did not answer in time.
+            IPCError: If the operation failed in the bot.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        request_id = next(self._ids)
+        frame = encode({"id": request_id, "op": op, "args": args})
+        while True:
+            sock, reused = self._acquire(timeout)
+            try:
+                sock.sendall(frame)
+                response = recv_message(sock)
+            except socket.timeout as e:
+                sock.close()
+                raise IPCConnectionError(f"Bot did not answer '{op}' within {timeout} seconds") from e
+            except (OSError, ProtocolError) as e:
+                sock.close()
+                if reused:
+                    # The bot closed the idle connection, e.g. after a restart; retry on a new one
+                    continue
+                raise IPCConnectionError(f"IPC request '{op}' failed: {e}") from e
+            break
+
+        if response.get("id") != request_id:
+            sock.close()
+            raise IPCConnectionError(f"IPC response to '{op}' does not match the request")
+        self._release(sock)
+        if not response.get("ok"):
+            raise IPCError(response.get("error") or f"IPC request '{op}' failed")
+        return response.get("result")
+
+    def subscribe(self, topics: Iterable[str] = (),
+                  timeout: float = 3 * HEARTBEAT_INTERVAL) -> Iterator[Dict[str, Any]]:
+        """
+        Receive the pushes of topics on a dedicated connection.
+
+        The current state of each topic arrives first; idle subscriptions receive
+        heartbeats, so a silent connection means the bot is gone. Closing the
+        generator closes the connection.
+
+        Args:
+            topics (iterable, optional): Topics to receive; all topics if empty.
+            timeout (float, optional): Seconds without any push after which the bot is considered gone.
+
+        Yields:
+            dict: Pushes as {"topic": ..., "data": ...}, heartbeats included.
+
+        Raises:
+            IPCConnectionError: If the bot is unreachable, closes the connection or stays silent.
+            IPCError: If a topic is unknown.
+        """
+        sock = self._connect(self.timeout)
+        try:
+            try:
+                sock.sendall(encode({"id": next(self._ids), "op": "subscribe", "args": {"topics": list(topics)}}))
+                response = recv_message(sock)
+                if not response.get("ok"):
+                    raise IPCError(response.get("error") or "IPC subscription failed")
+                sock.settimeout(timeout)
+                while True:
+                    yield recv_message(sock)
+            except socket.timeout as e:
+                raise IPCConnectionError(f"No IPC push within {timeout} seconds") from e
+            except (OSError, ProtocolError) as e:
+                raise IPCConnectionError(f"IPC subscription closed: {e}") from e
+        finally:
+            sock.close()
+
+    def close(self) -> None:
+        """Close the idle connections."""
+        with self._lock:
+            while self._idle:
+                self._idle.pop().close()
@@ -0,0 +1,143 @@
+"""
+Operations and topics the bot serves to the web dashboard over IPC.
+
+Operations:
+    ping, status (with gsi=True, also the GSI status of guild_ids), timers.list, timers.start, timers.stop, timers.pause, timers.resume,
+    timers.sync, timers.start_child, timers.cancel_child
+    events.changed: the dashboard changed a guild's events; patches running timers
+    settings.invalidate: the dashboard changed a guild's settings; reloads the cached ones
+    gsi.sync: toggle or set GSI sync for a guild
+    gsi.status: the GSI connection and game state of a guild's session
+    gsi.history: query the match history of a guild's session
+
+Topics:
+    guilds: the game timer and GSI status of every guild with a timer or GSI sync,
+        keyed by guild ID, pushed when it changes
+"""
+from typing import Any, Dict, List, Optional
+
+from src.gsi.gsi_manager import gsi_manager
+from src.gsi.gsi_state import gsi_state
+from src.ipc.server import IPCServer
+from src.managers.event_manager import EventChange, publish_event_change
+from src.managers.settings_manager import settings_manager
+from src.timer_service import TimerService, timer_service
+
+# Seconds between checks for guild state changes to push; timers tick once per second
+GUILD_STATE_INTERVAL = 0.5
+
+# Logged as the requester of timer operations received over IPC unless the client names one
+IPC_ACTOR = "IPC"
+
+
+def register_handlers(server: IPCServer, bot, service: TimerService = timer_service) -> None:
+    """
+    Register the bot's operations and topics on an IPC server.
+
+    Args:
+        server (IPCServer): The server.
+        bot (commands.Bot): The bot.
+        service (TimerService, optional): The timer service the operations control.
+    """
+    def guild_states() -> Dict[int, Dict[str, Any]]:
+        synced = gsi_state.synced_guilds
+        return {
+            guild_id: {
+                "timer": service.describe(guild_id),
+                "gsi": {
+                    "sync": guild_id in synced,
+                    "connected": gsi_manager.is_connected(guild_id),
+                    "in_game": gsi_manager.is_in_game(guild_id),
+                },
+            }
+            for guild_id in set(service.timers) | set(synced)
+        }
+
+    async def ping():
+        return "pong"
+
+    async def status(gsi: bool = False, guild_ids: Optional[List[int]] = None):
+        timers = service.describe_all()
+        result = {
+            "bot_running": bot.is_ready(),
+            "guilds": len(bot.guilds),
+            "active_timers_count": len(timers),
+            "active_timers": timers,
+        }
+        if gsi:
+            # The GSI state of the given guilds, or of those with a timer
+            result["gsi"] = {int(guild_id): gsi_manager.describe_status(int(guild_id))
+                             for guild_id in (timers if guild_ids is None else guild_ids)}
+        return result
+
+    async def list_timers():
+        return service.describe_all()
+
+    async def start(guild_id: int, countdown: str, mode: str = 'regular', actor: str = IPC_ACTOR):
+        return (await service.start(int(guild_id), str(countdown), mode, actor=actor)).to_dict()
+
+    async def stop(guild_id: int, actor: str = IPC_ACTOR):
+        return (await service.stop(int(guild_id), actor=actor)).to_dict()
+
+    async def pause(guild_id: int, actor: str = IPC_ACTOR):
+        return (await service.pause(int(guild_id), actor=actor)).to_dict()
+
+    async def resume(guild_id: int, actor: str = IPC_ACTOR):
+        return (await service.resume(int(guild_id), actor=actor)).to_dict()
+
+    async def sync(guild_id: int, game_time: str, replay: bool = False, actor: str = IPC_ACTOR):
+        return (await service.sync(int(guild_id), str(game_time), replay=bool(replay), actor=actor)).to_dict()
+
+    async def start_child(guild_id: int, name: str, actor: str = IPC_ACTOR):
+        return (await service.start_child(int(guild_id), name, actor=actor)).to_dict()
+
+    async def cancel_child(guild_id: int, name: str, actor: str = IPC_ACTOR):
+        return (await service.cancel_child(int(guild_id), name, actor=actor)).to_dict()
+
+    async def events_changed(changes: List[Dict[str, Any]]):
+        for change in changes:
+            publish_event_change(EventChange(**change))
+        return len(changes)
+
+    async def settings_invalidate(guild_id: Optional[int] = None):
+        settings_manager.invalidate(guild_id)
+        # Reload now rather than on the event loop when the guild's next message arrives
+        await settings_manager.preload([guild_id] if guild_id is not None else [guild.id for guild in bot.guilds])
+        return True
+
+    async def gsi_sync(guild_id: int, enabled: Optional[bool] = None):
+        guild_id = int(guild_id)
+        cog = bot.get_cog("GSICog")
+        if cog is not None:
+            # Registers the guild's timer channel for sync reports, as the gsi-sync command does
+            enabled = await cog.set_sync(guild_id, None if enabled is None else bool(enabled))
+            return {"guild_id": guild_id, "sync_enabled": enabled}
+        if enabled is None or bool(enabled) != (guild_id in gsi_state.synced_guilds):
+            gsi_state.toggle_guild_sync(guild_id)
+        return {"guild_id": guild_id, "sync_enabled": guild_id in gsi_state.synced_guilds}
+
+    async def gsi_status(guild_id: Optional[int] = None):
+        return gsi_manager.describe_status(None if guild_id is None else int(guild_id))
+
+    async def gsi_history(guild_id: Optional[int] = None, game_time: Optional[int] = None,
+                          path: Optional[str] = None, since: Optional[int] = None):
+        history = gsi_manager.get_session(None if guild_id is None else int(guild_id)).history
+        data = {"time_range": history.time_range, "packets": len(history)}
+        if game_time is not None:
+            state = history.state_at(int(game_time))
+            data["state"] = state.to_dict() if state is not None else None
+        if path:
+            data["changes"] = [
+                {"game_time": changed_at, "old": old, "new": new}
+                for changed_at, old, new in history.changes(path.split('.'), since)
+            ]
+        return data
+
+    for op, handler in (("ping", ping), ("status", status), ("timers.list", list_timers),
+                        ("timers.start", start), ("timers.stop", stop), ("timers.pause", pause),
+                        ("timers.resume", resume), ("timers.sync", sync),
+                        ("timers.start_child", start_child), ("timers.cancel_child", cancel_child),
+                        ("events.changed", events_changed), ("settings.invalidate", settings_invalidate),
+                        ("gsi.sync", gsi_sync), ("gsi.status", gsi_status), ("gsi.history", gsi_history)):
+        server.register(op, handler)
+    server.register_topic("guilds", guild_states, poll_interval=GUILD_STATE_INTERVAL)
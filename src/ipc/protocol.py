@@ -0,0 +1,98 @@
+"""
+Framing of IPC messages between the bot and the web dashboard.
+
+Every message is a msgpack-encoded map preceded by its length as a 4-byte big-endian
+unsigned integer. Messages are one of:
+
+- request:  {"id": 1, "op": "timers.pause", "args": {"guild_id": 123}}
+- response: {"id": 1, "ok": true, "result": ...} or {"id": 1, "ok": false, "error": "..."}
+- push:     {"topic": "guilds", "data": ...} on a connection that sent a "subscribe" request
+"""
+import asyncio
+import socket
+import struct
+from typing import Any, Dict
+
+import msgpack
+
+_HEADER = struct.Struct(">I")
+
+# Largest message accepted in either direction
+MAX_MESSAGE_SIZE = 4 * 1024 * 1024
+
+# Topic of the keep-alive pushes sent on idle subscriptions, and their interval in seconds
+HEARTBEAT_TOPIC = "heartbeat"
+HEARTBEAT_INTERVAL = 15
+
+
+class ProtocolError(Exception):
+    """A peer sent data that is not a valid IPC message."""
+
+
+def encode(message: Dict[str, Any]) -> bytes:
+    """
+    Encode a message with its length header.
+
+    Args:
+        message (dict): The message.
+
+    Returns:
+        bytes: The framed message.
+    """
+    body = msgpack.packb(message, use_bin_type=True)
+    if len(body) > MAX_MESSAGE_SIZE:
+        raise ProtocolError(f"IPC message of {len(body)} bytes exceeds the limit of {MAX_MESSAGE_SIZE}")
+    return _HEADER.pack(len(body)) + body
+
+
+def decode(body: bytes) -> Dict[str, Any]:
+    """Decode a message body; guild IDs are used as map keys, so integer keys are allowed."""
+    try:
+        message = msgpack.unpackb(body, raw=False, strict_map_key=False)
+    except (ValueError, msgpack.UnpackException) as e:
+        raise ProtocolError(f"Malformed IPC message: {e}") from e
+    if not isinstance(message, dict):
+        raise ProtocolError("IPC message is not a map")
+    return message
+
+
+def _check_size(size: int) -> None:
+    if size > MAX_MESSAGE_SIZE:
+        raise ProtocolError(f"IPC message of {size} bytes exceeds the limit of {MAX_MESSAGE_SIZE}")
+
+
+async def read_message(reader: asyncio.StreamReader) -> Dict[str, Any]:
+    """
+    Read one message from a stream.
+
+    Raises:
+        asyncio.IncompleteReadError: If the peer closed the connection.
+        ProtocolError: If the message is invalid.
+    """
+    size, = _HEADER.unpack(await reader.readexactly(_HEADER.size))
+    _check_size(size)
+    return decode(await reader.readexactly(size))
+
+
+def _recv_exactly(sock: socket.socket, size: int) -> bytes:
+    buffer = bytearray()
+    while len(buffer) < size:
+        chunk = sock.recv(size - len(buffer))
+        if not chunk:
+            raise ConnectionError("IPC connection closed by peer")
+        buffer += chunk
+    return bytes(buffer)
+
+
+def recv_message(sock: socket.socket) -> Dict[str, Any]:
+    """
+    Read one message from a blocking socket, honouring its timeout.
+
+    Raises:
+        ConnectionError: If the peer closed the connection.
+        socket.timeout: If the socket's timeout expired.
+        ProtocolError: If the message is invalid.
+    """
+    size, = _HEADER.unpack(_recv_exactly(sock, _HEADER.size))
+    _check_size(size)
+    return decode(_recv_exactly(sock, size))
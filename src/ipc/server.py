@@ -0,0 +1,258 @@
+"""
+IPC server running on the bot's event loop.
+
+The web dashboard runs in another process (or container) and controls the bot through
+a Unix domain socket. A connection either sends requests and reads one response per
+request, or sends a single "subscribe" request and then receives pushes for the
+topics it subscribed to.
+"""
+import asyncio
+import os
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Set
+
+from src.ipc.protocol import HEARTBEAT_INTERVAL, HEARTBEAT_TOPIC, ProtocolError, encode, read_message
+from src.utils.config import logger
+
+# Pushes waiting for a slow subscriber at most; the oldest are dropped beyond this
+SUBSCRIBER_QUEUE_SIZE = 64
+
+Handler = Callable[..., Awaitable[Any]]
+
+
+class _Subscriber:
+    """A connection receiving pushes."""
+
+    def __init__(self, topics: Set[str], queue_size: int):
+        self.topics = topics  # Empty for all topics
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.dropped = 0
+
+    def wants(self, topic: str) -> bool:
+        return not self.topics or topic in self.topics
+
+    def push(self, message: Dict[str, Any]) -> None:
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(message)
+
+
+class _Topic:
+    """A registered topic with the function returning its current state."""
+
+    def __init__(self, snapshot: Callable[[], Any], poll_interval: Optional[float]):
+        self.snapshot = snapshot
+        self.poll_interval = poll_interval
+
+
+class IPCServer:
+    """
+    Serves registered operations and topics on a Unix domain socket.
+    """
+
+    def __init__(self, path: str, queue_size: int = SUBSCRIBER_QUEUE_SIZE,
+                 heartbeat_interval: float = HEARTBEAT_INTERVAL):
+        """
+        Initialize the server.
+
+        Args:
+            path (str): Path of the socket file.
+            queue_size (int, optional): Pushes buffered per subscriber.
+            heartbeat_interval (float, optional): Seconds after which an idle subscription gets a heartbeat.
+        """
+        self.path = path
+        self.queue_size = queue_size
+        self.heartbeat_interval = heartbeat_interval
+        self._handlers: Dict[str, Handler] = {}
+        self._topics: Dict[str, _Topic] = {}
+        self._subscribers: Set[_Subscriber] = set()
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    def register(self, op: str, handler: Handler) -> None:
+        """
+        Register an operation.
+
+        Args:
+            op (str): Name of the operation, e.g. "timers.pause".
+            handler: Coroutine function called with the request's args as keyword arguments.
+                Its result must be encodable by msgpack.
+        """
+        self._handlers[op] = handler
+
+    def register_topic(self, topic: str, snapshot: Callable[[], Any], poll_interval: Optional[float] = None) -> None:
+        """
+        Register a topic clients can subscribe to.
+
+        New subscribers first receive the topic's current state.
+
+        Args:
+            topic (str): Name of the topic.
+            snapshot: Function returning the topic's current state.
+            poll_interval (float, optional): If set, the state is polled this often while
+                the server runs and published whenever it changed.
+        """
+        self._topics[topic] = _Topic(snapshot, poll_interval)
+
+    def publish(self, topic: str, data: Any) -> None:
+        """
+        Push data to the subscribers of a topic. May be called from any thread.
+
+        Args:
+            topic (str): The topic.
+            data: The pushed data; must be encodable by msgpack.
+        """
+        loop = self._loop
+        if loop is None:
+            return
+        try:
+            on_loop = asyncio.get_running_loop() is loop
+        except RuntimeError:
+            on_loop = False
+        if on_loop:
+            self._publish(topic, data)
+        else:
+            loop.call_soon_threadsafe(self._publish, topic, data)
+
+    def _publish(self, topic: str, data: Any) -> None:
+        message = {"topic": topic, "data": data}
+        for subscriber in self._subscribers:
+            if subscriber.wants(topic):
+                subscriber.push(message)
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    async def start(self) -> None:
+        """Start listening, replacing a socket file left by a previous run."""
+        if self._server is not None:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        try:
+            self._server = await asyncio.start_unix_server(self._handle_connection, path=self.path)
+        except OSError as e:
+            logger.error(f"Could not start IPC server on {self.path}: {e}", exc_info=True)
+            return
+        os.chmod(self.path, 0o660)
+        self._loop = asyncio.get_running_loop()
+        for topic, registered in self._topics.items():
+            if registered.poll_interval:
+                self._spawn(self._poll_topic(topic, registered))
+        logger.info(f"IPC server listening on {self.path}")
+
+    async def stop(self) -> None:
+        """Stop listening and close all connections."""
+        if self._server is None:
+            return
+        self._server.close()
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        await self._server.wait_closed()
+        self._server = None
+        self._loop = None
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        logger.info("IPC server stopped")
+
+    def _spawn(self, coro) -> None:
+        task = asyncio.ensure_future(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _poll_topic(self, topic: str, registered: _Topic) -> None:
+        """Publish a topic's state whenever it changed."""
+        last = None
+        while True:
+            try:
+                state = registered.snapshot()
+                if state != last:
+                    self._publish(topic, state)
+                    last = state
+            except Exception as e:
+                logger.error(f"Error polling IPC topic '{topic}': {e}", exc_info=True)
+            await asyncio.sleep(registered.poll_interval)
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._track_current_task()
+        try:
+            while True:
+                message = await read_message(reader)
+                if message.get("op") == "subscribe":
+                    await self._stream(message, reader, writer)
+                    return
+                writer.write(encode(await self._dispatch(message)))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except ProtocolError as e:
+            logger.warning(f"Closing IPC connection: {e}")
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.error(f"Error on IPC connection: {e}", exc_info=True)
+        finally:
+            writer.close()
+
+    def _track_current_task(self) -> None:
+        """Track the connection's task so stop() can close it."""
+        task = asyncio.current_task()
+        if task is not None:
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _dispatch(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        """Run a request and build its response."""
+        request_id = message.get("id")
+        op = message.get("op")
+        handler = self._handlers.get(op)
+        if handler is None:
+            return {"id": request_id, "ok": False, "error": f"Unknown operation '{op}'"}
+        try:
+            result = await handler(**(message.get("args") or {}))
+        except TypeError as e:
+            return {"id": request_id, "ok": False, "error": f"Invalid arguments for '{op}': {e}"}
+        except Exception as e:
+            logger.error(f"Error in IPC operation '{op}': {e}", exc_info=True)
+            return {"id": request_id, "ok": False, "error": str(e)}
+        return {"id": request_id, "ok": True, "result": result}
+
+    async def _stream(self, message: Dict[str, Any], reader: asyncio.StreamReader,
+                      writer: asyncio.StreamWriter) -> None:
+        """Serve a subscription until the client disconnects."""
+        topics: Iterable[str] = (message.get("args") or {}).get("topics") or ()
+        unknown = [topic for topic in topics if topic not in self._topics]
+        if unknown:
+            writer.write(encode({"id": message.get("id"), "ok": False, "error": f"Unknown topics: {unknown}"}))
+            await writer.drain()
+            return
+
+        subscriber = _Subscriber(set(topics), self.queue_size)
+        writer.write(encode({"id": message.get("id"), "ok": True, "result": {"topics": sorted(subscriber.topics)}}))
+        for topic, registered in self._topics.items():
+            if subscriber.wants(topic):
+                subscriber.push({"topic": topic, "data": registered.snapshot()})
+        self._subscribers.add(subscriber)
+
+        # The client sends nothing after subscribing; reading detects when it goes away
+        closed = asyncio.ensure_future(reader.read())
+        try:
+            while not closed.done():
+                push = asyncio.ensure_future(subscriber.queue.get())
+                await asyncio.wait({push, closed}, timeout=self.heartbeat_interval,
+                                   return_when=asyncio.FIRST_COMPLETED)
+                if push.done():
+                    writer.write(encode(push.result()))
+                else:
+                    push.cancel()
+                    if closed.done():
+                        break
+                    writer.write(encode({"topic": HEARTBEAT_TOPIC, "data": {"dropped": subscriber.dropped}}))
+                await writer.drain()
+        finally:
+            self._subscribers.discard(subscriber)
+            closed.cancel()
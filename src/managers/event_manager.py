@@ -1,3 +1,6 @@
+from dataclasses import dataclass
+from typing import Callable, List, Optional
+
 from sqlalchemy.orm import sessionmaker
 
 from src.database import StaticEvent, PeriodicEvent, engine, ServerSettings
@@ -7,12 +10,98 @@ from src.event_definitions import (
     turbo_static_events,
     turbo_periodic_events,
 )
+from src.managers import event_transfer
 from src.utils.config import logger
 
 # Create a configured "Session" class for database interactions
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 logger.debug("Database session maker created.")
 
+
+@dataclass(frozen=True)
+class EventChange:
+    """
+    Describes a change to a guild's event set, published to running game timers.
+
+    Attributes:
+        guild_id (int): The ID of the Discord guild.
+        action (str): 'added', 'removed', or 'reloaded' when the whole event set was replaced.
+        kind (str): 'static' or 'periodic'. None for 'reloaded'.
+        event_id (int): The ID of the changed event. None for 'reloaded'.
+        mode (str): The game mode of the changed event. None for 'reloaded'.
+        event (dict): The event details in the same shape as get_static_events/get_periodic_events.
+    """
+    guild_id: int
+    action: str
+    kind: Optional[str] = None
+    event_id: Optional[int] = None
+    mode: Optional[str] = None
+    event: Optional[dict] = None
+
+
+# Callbacks notified of every published EventChange
+_event_listeners: List[Callable[[EventChange], None]] = []
+
+
+def add_event_listener(listener: Callable[[EventChange], None]) -> None:
+    """
+    Register a callback that receives every published EventChange.
+
+    Args:
+        listener (Callable): Called with the EventChange, possibly from a non-event-loop thread.
+    """
+    if listener not in _event_listeners:
+        _event_listeners.append(listener)
+
+
+def remove_event_listener(listener: Callable[[EventChange], None]) -> None:
+    """
+    Unregister a callback added with add_event_listener.
+
+    Args:
+        listener (Callable): The callback to remove.
+    """
+    if listener in _event_listeners:
+        _event_listeners.remove(listener)
+
+
+def publish_event_change(change: EventChange) -> None:
+    """
+    Notify all registered listeners of an event change.
+
+    Args:
+        change (EventChange): The change to publish.
+    """
+    for listener in list(_event_listeners):
+        try:
+            listener(change)
+        except Exception as e:
+            logger.error(f"Error in event change listener: {e}", exc_info=True)
+
+
+def event_change_from_row(action: str, event) -> EventChange:
+    """
+    Build an EventChange from a StaticEvent or PeriodicEvent row.
+
+    Args:
+        action (str): 'added' or 'removed'.
+        event (StaticEvent | PeriodicEvent): The changed row.
+
+    Returns:
+        EventChange: The change describing the row.
+    """
+    if isinstance(event, StaticEvent):
+        kind, details = 'static', {"time": event.time, "message": event.message}
+    else:
+        kind, details = 'periodic', {
+            "start_time": event.start_time,
+            "interval": event.interval,
+            "end_time": event.end_time,
+            "message": event.message
+        }
+    return EventChange(int(event.guild_id), action, kind, event.id, event.mode, details)
+
+
 class EventsManager:
     """
     Manages static and periodic events for different game modes within Discord guilds.
@@ -82,6 +171,7 @@ class EventsManager:
 
             self.session.commit()
             logger.info(f"Successfully populated events for guild ID {guild_id}.")
+            publish_event_change(EventChange(int(guild_id), 'reloaded'))
 
         except Exception as e:
             self.session.rollback()
@@ -156,6 +246,8 @@ class EventsManager:
             self.session.add(new_event)
             self.session.commit()
             logger.info(f"Added static event ID {new_event.id} for guild ID {guild_id}.")
+            publish_event_change(EventChange(
+                int(guild_id), 'added', 'static', new_event.id, mode, {"time": time, "message": message}))
             return new_event.id
         except Exception as e:
             self.session.rollback()
@@ -201,6 +293,12 @@ class EventsManager:
             self.session.add(new_event)
             self.session.commit()
             logger.info(f"Added periodic event ID {new_event.id} for guild ID {guild_id}.")
+            publish_event_change(EventChange(int(guild_id), 'added', 'periodic', new_event.id, mode, {
+                "start_time": start_time,
+                "interval": interval,
+                "end_time": end_time,
+                "message": message
+            }))
             return new_event.id
         except Exception as e:
             self.session.rollback()
@@ -227,9 +325,11 @@ class EventsManager:
                 event = self.session.query(PeriodicEvent).filter_by(guild_id=str(guild_id), id=event_id).first()
 
             if event:
+                change = event_change_from_row('removed', event)
                 self.session.delete(event)
                 self.session.commit()
                 logger.info(f"Removed event ID {event_id} for guild ID {guild_id}.")
+                publish_event_change(change)
                 return True
             else:
                 logger.warning(f"Event ID {event_id} not found for guild ID {guild_id}.")
@@ -239,6 +339,43 @@ class EventsManager:
             logger.error(f"Error removing event ID {event_id} for guild ID {guild_id}: {e}", exc_info=True)
             return False
 
+    def export_events(self, guild_id: int) -> dict:
+        """
+        Export the full event set of a guild as a portable document.
+
+        Args:
+            guild_id (int): The ID of the Discord guild.
+
+        Returns:
+            dict: The export document containing static and periodic events for all modes.
+        """
+        current = event_transfer.load_guild_events(self.session, guild_id)
+        logger.info(
+            f"Exported {len(current['static'])} static and {len(current['periodic'])} periodic events "
+            f"for guild ID {guild_id}.")
+        return event_transfer.build_export_document(current)
+
+    def import_events(self, guild_id: int, document: dict, replace: bool = True, dry_run: bool = False) -> dict:
+        """
+        Import a full event set for a guild in a single transaction.
+
+        Args:
+            guild_id (int): The ID of the Discord guild.
+            document (dict): The decoded import document.
+            replace (bool, optional): Remove events that are missing from the document. Defaults to True.
+            dry_run (bool, optional): Only compute the diff preview without writing. Defaults to False.
+
+        Returns:
+            dict: The diff preview ('added', 'removed', 'unchanged') and an 'applied' flag.
+
+        Raises:
+            EventValidationError: If the document contains invalid records.
+        """
+        result = event_transfer.import_events(self.session, guild_id, document, replace=replace, dry_run=dry_run)
+        if result['applied']:
+            publish_event_change(EventChange(int(guild_id), 'reloaded'))
+        return result
+
     def close(self) -> None:
         """
         Close the current database session.
@@ -265,6 +402,7 @@ class EventsManager:
 
             self.session.commit()
             logger.info(f"All events deleted for guild ID {guild_id}.")
+            publish_event_change(EventChange(int(guild_id), 'reloaded'))
         except Exception as e:
             self.session.rollback()
             logger.error(f"Error deleting events for guild ID {guild_id}: {e}", exc_info=True)
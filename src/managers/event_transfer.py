@@ -0,0 +1,362 @@
+import json
+from collections import Counter
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+import yaml
+from sqlalchemy import delete, insert
+
+from src.database import StaticEvent, PeriodicEvent
+from src.utils.config import logger
+from src.utils.utils import min_to_sec
+
+# Version of the import/export document layout.
+EXPORT_FORMAT_VERSION = 1
+
+# Game modes accepted in imported documents.
+VALID_MODES = ('regular', 'turbo')
+
+# Validation stops collecting errors after this many problems.
+MAX_VALIDATION_ERRORS = 50
+
+
+class EventValidationError(ValueError):
+    """
+    Raised when an imported event document contains invalid records.
+
+    Attributes:
+        errors (list): Human-readable descriptions of every invalid record found.
+    """
+
+    def __init__(self, errors: List[str]):
+        self.errors = errors
+        super().__init__(f"{len(errors)} invalid event record(s): " + "; ".join(errors[:5]))
+
+
+def parse_document(content: Any, fmt: str = 'json') -> Dict[str, Any]:
+    """
+    Parse a raw import document.
+
+    Args:
+        content (Any): Raw bytes/str content, or an already decoded dictionary.
+        fmt (str, optional): 'json' or 'yaml'. Defaults to 'json'.
+
+    Returns:
+        dict: The decoded document.
+
+    Raises:
+        EventValidationError: If the content cannot be decoded.
+    """
+    if isinstance(content, dict):
+        return content
+    if isinstance(content, bytes):
+        content = content.decode('utf-8')
+
+    try:
+        if fmt in ('yaml', 'yml'):
+            document = yaml.safe_load(content)
+        elif fmt == 'json':
+            document = json.loads(content)
+        else:
+            raise EventValidationError([f"Unsupported format '{fmt}'"])
+    except (ValueError, yaml.YAMLError) as e:
+        if isinstance(e, EventValidationError):
+            raise
+        raise EventValidationError([f"Could not parse {fmt} document: {e}"])
+
+    if not isinstance(document, dict):
+        raise EventValidationError(["Document root must be a mapping"])
+    return document
+
+
+def _to_seconds(value: Any) -> int:
+    """Convert an int or 'MM:SS' string into seconds."""
+    if isinstance(value, bool):
+        raise ValueError("boolean is not a time value")
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str):
+        return min_to_sec(value.strip())
+    raise ValueError(f"unsupported time value {value!r}")
+
+
+def _validate_static(record: Dict[str, Any], mode: str) -> Dict[str, Any]:
+    """Validate and normalize a single static event record."""
+    time = _to_seconds(record.get('time'))
+    if time < 0:
+        raise ValueError("time must not be negative")
+    return {"mode": mode, "time": time, "message": record['message']}
+
+
+def _validate_periodic(record: Dict[str, Any], mode: str) -> Dict[str, Any]:
+    """Validate and normalize a single periodic event record."""
+    start_time = _to_seconds(record.get('start_time'))
+    interval = _to_seconds(record.get('interval'))
+    end_time = _to_seconds(record.get('end_time'))
+    if start_time < 0:
+        raise ValueError("start_time must not be negative")
+    if interval <= 0:
+        raise ValueError("interval must be positive")
+    if end_time < start_time:
+        raise ValueError("end_time must not be before start_time")
+    return {
+        "mode": mode,
+        "start_time": start_time,
+        "interval": interval,
+        "end_time": end_time,
+        "message": record['message']
+    }
+
+
+def validate_record(kind: str, record: Any, default_mode: str = 'regular') -> Dict[str, Any]:
+    """
+    Validate and normalize a single static or periodic event record.
+
+    Args:
+        kind (str): 'static' or 'periodic'.
+        record (Any): The raw record.
+        default_mode (str, optional): Mode used when the record has none. Defaults to 'regular'.
+
+    Returns:
+        dict: The normalized row.
+
+    Raises:
+        ValueError: If the record is invalid.
+    """
+    if not isinstance(record, dict):
+        raise ValueError("record must be a mapping")
+    mode = record.get('mode', default_mode)
+    if mode not in VALID_MODES:
+        raise ValueError(f"invalid mode '{mode}'")
+    message = record.get('message')
+    if not isinstance(message, str) or not message.strip():
+        raise ValueError("message must be a non-empty string")
+    try:
+        if kind == 'static':
+            return _validate_static(record, mode)
+        if kind == 'periodic':
+            return _validate_periodic(record, mode)
+    except (KeyError, TypeError) as e:
+        raise ValueError(str(e))
+    raise ValueError(f"invalid event type '{kind}'")
+
+
+def iter_validated_events(document: Dict[str, Any], errors: List[str]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Validate event records one at a time, yielding normalized rows.
+
+    Invalid records are skipped and described in ``errors``; iteration stops
+    early once MAX_VALIDATION_ERRORS problems have been collected.
+
+    Args:
+        document (dict): The decoded import document.
+        errors (list): List that receives validation error descriptions.
+
+    Yields:
+        tuple: ('static' or 'periodic', normalized row dictionary).
+    """
+    default_mode = document.get('mode', 'regular')
+
+    for kind, key in (('static', 'static_events'), ('periodic', 'periodic_events')):
+        records = document.get(key) or []
+        if not isinstance(records, list):
+            errors.append(f"'{key}' must be a list")
+            continue
+
+        for index, record in enumerate(records):
+            if len(errors) >= MAX_VALIDATION_ERRORS:
+                return
+            try:
+                yield kind, validate_record(kind, record, default_mode)
+            except ValueError as e:
+                errors.append(f"{key}[{index}]: {e}")
+
+
+def _without(row: Dict[str, Any], key: str) -> Dict[str, Any]:
+    """Return a copy of a row without the given key."""
+    return {k: v for k, v in row.items() if k != key}
+
+
+def _row_key(kind: str, row: Dict[str, Any]) -> tuple:
+    """Build a hashable identity for an event row, ignoring its database ID."""
+    if kind == 'static':
+        return kind, row['mode'], row['time'], row['message']
+    return kind, row['mode'], row['start_time'], row['interval'], row['end_time'], row['message']
+
+
+def load_guild_events(session, guild_id: int) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Load every static and periodic event for a guild across all modes.
+
+    Args:
+        session: An open SQLAlchemy session.
+        guild_id (int): The ID of the Discord guild.
+
+    Returns:
+        dict: {'static': [...], 'periodic': [...]} rows including their IDs.
+    """
+    static_rows = [
+        {"id": e.id, "mode": e.mode, "time": e.time, "message": e.message}
+        for e in session.query(StaticEvent).filter_by(guild_id=str(guild_id)).order_by(StaticEvent.time)
+    ]
+    periodic_rows = [
+        {"id": e.id, "mode": e.mode, "start_time": e.start_time, "interval": e.interval,
+         "end_time": e.end_time, "message": e.message}
+        for e in session.query(PeriodicEvent).filter_by(guild_id=str(guild_id)).order_by(PeriodicEvent.start_time)
+    ]
+    return {"static": static_rows, "periodic": periodic_rows}
+
+
+def build_export_document(current: Dict[str, List[Dict[str, Any]]]) -> Dict[str, Any]:
+    """
+    Build a portable export document from loaded guild events.
+
+    Args:
+        current (dict): Rows as returned by load_guild_events.
+
+    Returns:
+        dict: The export document without database IDs.
+    """
+    return {
+        "version": EXPORT_FORMAT_VERSION,
+        "static_events": [_without(row, 'id') for row in current['static']],
+        "periodic_events": [_without(row, 'id') for row in current['periodic']],
+    }
+
+
+def dump_document(document: Dict[str, Any], fmt: str = 'json') -> str:
+    """
+    Serialize an export document.
+
+    Args:
+        document (dict): The export document.
+        fmt (str, optional): 'json' or 'yaml'. Defaults to 'json'.
+
+    Returns:
+        str: The serialized document.
+    """
+    if fmt in ('yaml', 'yml'):
+        return yaml.safe_dump(document, sort_keys=False, allow_unicode=True)
+    return json.dumps(document, indent=2, ensure_ascii=False)
+
+
+def diff_event_sets(
+    current: Dict[str, List[Dict[str, Any]]],
+    incoming: Iterable[Tuple[str, Dict[str, Any]]],
+    replace: bool = True
+) -> Dict[str, Any]:
+    """
+    Compare the current event set with an incoming one.
+
+    Events are matched by content, so duplicates are handled as a multiset.
+
+    Args:
+        current (dict): Rows as returned by load_guild_events.
+        incoming (iterable): (kind, row) pairs from iter_validated_events.
+        replace (bool, optional): When False, nothing is removed. Defaults to True.
+
+    Returns:
+        dict: 'added' rows, 'removed' rows (with IDs) and the 'unchanged' count.
+    """
+    existing = {}
+    for kind in ('static', 'periodic'):
+        for row in current[kind]:
+            existing.setdefault(_row_key(kind, row), []).append(row)
+
+    incoming_counts = Counter()
+    added = []
+    for kind, row in incoming:
+        key = _row_key(kind, row)
+        incoming_counts[key] += 1
+        if incoming_counts[key] > len(existing.get(key, ())):
+            added.append(dict(row, type=kind))
+
+    removed = []
+    unchanged = 0
+    for key, rows in existing.items():
+        keep = min(incoming_counts.get(key, 0), len(rows))
+        unchanged += keep
+        if replace:
+            removed.extend(dict(row, type=key[0]) for row in rows[keep:])
+        else:
+            unchanged += len(rows) - keep
+
+    return {"added": added, "removed": removed, "unchanged": unchanged}
+
+
+def apply_event_diff(session, guild_id: int, diff: Dict[str, Any]) -> None:
+    """
+    Apply a diff with bulk statements inside the caller's transaction.
+
+    The caller is responsible for committing or rolling back the session.
+
+    Args:
+        session: An open SQLAlchemy session.
+        guild_id (int): The ID of the Discord guild.
+        diff (dict): A diff as returned by diff_event_sets.
+    """
+    removed_static = [row['id'] for row in diff['removed'] if row['type'] == 'static']
+    removed_periodic = [row['id'] for row in diff['removed'] if row['type'] == 'periodic']
+    if removed_static:
+        session.execute(delete(StaticEvent).where(
+            StaticEvent.guild_id == str(guild_id), StaticEvent.id.in_(removed_static)))
+    if removed_periodic:
+        session.execute(delete(PeriodicEvent).where(
+            PeriodicEvent.guild_id == str(guild_id), PeriodicEvent.id.in_(removed_periodic)))
+
+    added_static = [dict(_without(row, 'type'), guild_id=str(guild_id))
+                    for row in diff['added'] if row['type'] == 'static']
+    added_periodic = [dict(_without(row, 'type'), guild_id=str(guild_id))
+                      for row in diff['added'] if row['type'] == 'periodic']
+    if added_static:
+        session.execute(insert(StaticEvent), added_static)
+    if added_periodic:
+        session.execute(insert(PeriodicEvent), added_periodic)
+
+    logger.debug(
+        f"Applied event diff for guild ID {guild_id}: +{len(added_static)} static, +{len(added_periodic)} periodic, "
+        f"-{len(removed_static)} static, -{len(removed_periodic)} periodic.")
+
+
+def import_events(
+    session,
+    guild_id: int,
+    document: Dict[str, Any],
+    replace: bool = True,
+    dry_run: bool = False
+) -> Dict[str, Any]:
+    """
+    Validate an import document and apply it to a guild in a single transaction.
+
+    Args:
+        session: An open SQLAlchemy session.
+        guild_id (int): The ID of the Discord guild.
+        document (dict): The decoded import document.
+        replace (bool, optional): Remove events missing from the document. Defaults to True.
+        dry_run (bool, optional): Only compute the diff preview. Defaults to False.
+
+    Returns:
+        dict: The diff preview plus an 'applied' flag.
+
+    Raises:
+        EventValidationError: If any record in the document is invalid.
+    """
+    errors = []
+    current = load_guild_events(session, guild_id)
+    diff = diff_event_sets(current, iter_validated_events(document, errors), replace=replace)
+    if errors:
+        raise EventValidationError(errors)
+
+    applied = False
+    if not dry_run and (diff['added'] or diff['removed']):
+        try:
+            apply_event_diff(session, guild_id, diff)
+            session.commit()
+            applied = True
+        except Exception:
+            session.rollback()
+            raise
+
+    logger.info(
+        f"Event import for guild ID {guild_id}: {len(diff['added'])} added, {len(diff['removed'])} removed, "
+        f"{diff['unchanged']} unchanged (dry_run={dry_run}, replace={replace}).")
+    return dict(diff, applied=applied)
@@ -0,0 +1,240 @@
+import asyncio
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional
+
+import discord
+
+from src.database import ServerSettings, SessionLocal
+from src.utils.config import TIMER_CHANNEL_NAME, VOICE_CHANNEL_NAME, logger
+
+# Cached settings are reloaded from the database after this many seconds. The webapp
+# invalidates a guild's settings over IPC when it changes them; the reload also picks up
+# changes made while the bot could not be reached.
+SETTINGS_MAX_AGE = 60.0
+
+# Channel kinds tracked per guild, mapped to the guild attribute listing candidate channels.
+CHANNEL_KINDS = {
+    'voice': 'voice_channels',
+    'timer': 'text_channels',
+}
+
+
+@dataclass
+class GuildSettings:
+    """
+    Runtime settings for a single guild.
+
+    Attributes:
+        guild_id (int): The ID of the Discord guild.
+        channel_names (dict): Configured channel name per channel kind ('timer', 'voice').
+        tts_language (str): TTS voice configured for the guild, or None to keep the default.
+        loaded_at (float): Monotonic time at which the settings were loaded.
+        channel_ids (dict): Resolved channel ID per channel kind. A kind that is absent has not
+            been resolved yet; a value of None means no matching channel exists.
+    """
+    guild_id: int
+    channel_names: Dict[str, str]
+    tts_language: Optional[str] = None
+    loaded_at: float = 0.0
+    channel_ids: Dict[str, Optional[int]] = field(default_factory=dict)
+
+    @property
+    def timer_channel_name(self) -> str:
+        return self.channel_names['timer']
+
+    @property
+    def voice_channel_name(self) -> str:
+        return self.channel_names['voice']
+
+
+class SettingsManager:
+    """
+    Caches per-guild settings and resolved channel IDs.
+
+    Settings are loaded from the database on first use. Channels are looked up by name
+    once and afterwards fetched by ID, so command handling does not scan the guild's
+    channel list. Channel create/update/delete events drop affected resolutions.
+    """
+
+    def __init__(self, max_age: float = SETTINGS_MAX_AGE):
+        """
+        Initialize the SettingsManager.
+
+        Args:
+            max_age (float, optional): Seconds before cached settings are reloaded.
+        """
+        self.max_age = max_age
+        self._cache: Dict[int, GuildSettings] = {}
+        self._lock = threading.Lock()
+        logger.debug("SettingsManager initialized.")
+
+    def _load_many(self, guild_ids: List[int]) -> List[GuildSettings]:
+        """Load settings for guilds from the database with one query, falling back to the config defaults."""
+        loaded = {
+            guild_id: GuildSettings(
+                guild_id=guild_id,
+                channel_names={'timer': TIMER_CHANNEL_NAME, 'voice': VOICE_CHANNEL_NAME},
+                loaded_at=time.monotonic()
+            )
+            for guild_id in guild_ids
+        }
+        try:
+            with SessionLocal() as session:
+                rows = session.query(ServerSettings).filter(
+                    ServerSettings.server_id.in_([str(guild_id) for guild_id in loaded])).all()
+                for row in rows:
+                    settings = loaded[int(row.server_id)]
+                    settings.channel_names = {'timer': row.timer_channel, 'voice': row.voice_channel}
+                    settings.tts_language = row.tts_language
+        except Exception as e:
+            logger.error(f"Error loading settings for guild IDs {guild_ids}: {e}", exc_info=True)
+        logger.debug(f"Loaded settings for {len(loaded)} guild(s).")
+        return list(loaded.values())
+
+    def _load(self, guild_id: int) -> GuildSettings:
+        """Load settings for a guild from the database, falling back to the config defaults."""
+        return self._load_many([guild_id])[0]
+
+    def _cached(self, guild_id: int):
+        """Get the cached settings of a guild and whether they are still fresh."""
+        with self._lock:
+            settings = self._cache.get(guild_id)
+        return settings, settings is not None and time.monotonic() - settings.loaded_at < self.max_age
+
+    def _store(self, fresh: GuildSettings) -> GuildSettings:
+        """Cache freshly loaded settings, keeping resolved channels whose names did not change."""
+        with self._lock:
+            previous = self._cache.get(fresh.guild_id)
+            if previous and previous.channel_names == fresh.channel_names:
+                fresh.channel_ids = previous.channel_ids
+            self._cache[fresh.guild_id] = fresh
+        return fresh
+
+    def get(self, guild_id: int) -> GuildSettings:
+        """
+        Get the cached settings for a guild, loading them if needed.
+
+        Loading queries the database on the calling thread; on the event loop, use
+        fetch, or preload the guilds' settings.
+
+        Args:
+            guild_id (int): The ID of the Discord guild.
+
+        Returns:
+            GuildSettings: The guild's runtime settings.
+        """
+        settings, fresh = self._cached(guild_id)
+        if fresh:
+            return settings
+        return self._store(self._load(guild_id))
+
+    async def fetch(self, guild_id: int) -> GuildSettings:
+        """
+        Get the cached settings for a guild, loading them on a worker thread if needed.
+
+        Args:
+            guild_id (int): The ID of the Discord guild.
+
+        Returns:
+            GuildSettings: The guild's runtime settings.
+        """
+        settings, fresh = self._cached(guild_id)
+        if fresh:
+            return settings
+        return self._store(await asyncio.to_thread(self._load, guild_id))
+
+    async def preload(self, guild_ids: Iterable[int]) -> None:
+        """
+        Load the settings of guilds with one query on a worker thread.
+
+        Args:
+            guild_ids (Iterable[int]): The IDs of the Discord guilds.
+        """
+        guild_ids = [int(guild_id) for guild_id in guild_ids]
+        if not guild_ids:
+            return
+        for fresh in await asyncio.to_thread(self._load_many, guild_ids):
+            self._store(fresh)
+
+    def invalidate(self, guild_id: Optional[int] = None) -> None:
+        """
+        Drop cached settings so they are reloaded on next use.
+
+        Args:
+            guild_id (int, optional): The guild to invalidate. Invalidates all guilds when None.
+        """
+        with self._lock:
+            if guild_id is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(int(guild_id), None)
+        logger.debug(f"Invalidated settings cache for guild ID {guild_id if guild_id is not None else 'all'}.")
+
+    def get_channel(self, guild, kind: str, settings: Optional[GuildSettings] = None):
+        """
+        Resolve the configured channel of the given kind for a guild.
+
+        Args:
+            guild (discord.Guild): The guild to look in.
+            kind (str): 'timer' or 'voice'.
+            settings (GuildSettings, optional): The guild's settings, e.g. from fetch; read
+                from the cache if not given.
+
+        Returns:
+            The channel, or None if the guild has no channel with the configured name.
+        """
+        if settings is None:
+            settings = self.get(guild.id)
+        name = settings.channel_names[kind]
+
+        if kind in settings.channel_ids:
+            channel_id = settings.channel_ids[kind]
+            if channel_id is None:
+                return None
+            channel = guild.get_channel(channel_id)
+            if channel is not None and channel.name == name:
+                return channel
+            logger.debug(f"Cached {kind} channel ID {channel_id} is stale in guild '{guild.name}'.")
+
+        channel = discord.utils.get(getattr(guild, CHANNEL_KINDS[kind]), name=name)
+        settings.channel_ids[kind] = channel.id if channel else None
+        return channel
+
+    def get_timer_channel(self, guild, settings: Optional[GuildSettings] = None):
+        """Return the guild's configured timer text channel, or None."""
+        return self.get_channel(guild, 'timer', settings)
+
+    def get_voice_channel(self, guild, settings: Optional[GuildSettings] = None):
+        """Return the guild's configured voice channel, or None."""
+        return self.get_channel(guild, 'voice', settings)
+
+    def _forget_channel(self, channel, *names: str) -> None:
+        """Drop resolutions that refer to the channel's ID or to any of the given names."""
+        with self._lock:
+            settings = self._cache.get(channel.guild.id)
+        if not settings:
+            return
+        for kind, configured_name in settings.channel_names.items():
+            if kind in settings.channel_ids and (
+                    configured_name in names or settings.channel_ids[kind] == channel.id):
+                settings.channel_ids.pop(kind, None)
+                logger.debug(f"Dropped cached {kind} channel for guild ID {channel.guild.id}.")
+
+    def handle_channel_create(self, channel) -> None:
+        """Handle a created guild channel."""
+        self._forget_channel(channel, channel.name)
+
+    def handle_channel_update(self, before, after) -> None:
+        """Handle an updated guild channel."""
+        if before.name != after.name:
+            self._forget_channel(after, before.name, after.name)
+
+    def handle_channel_delete(self, channel) -> None:
+        """Handle a deleted guild channel."""
+        self._forget_channel(channel, channel.name)
+
+
+# Shared instance used by the bot and the webapp
+settings_manager = SettingsManager()
@@ -0,0 +1,193 @@
+import bisect
+from typing import Dict, List, Optional, Set, Tuple
+
+from src.utils.config import logger
+
+# A scheduled occurrence: (time, kind, event_id, message). Sorting by time, then kind and ID,
+# keeps entries unique because static and periodic IDs come from separate tables.
+ScheduleEntry = Tuple[int, str, int, str]
+
+
+class EventSchedule:
+    """
+    Sorted timeline of event occurrences for a running game.
+
+    Static events contribute one occurrence and periodic events one occurrence per interval.
+    A cursor points at the first occurrence after the current position, so each tick only
+    looks at the occurrences that are due. Events can be added or removed while the game is
+    running; the cost depends only on the number of occurrences touched.
+
+    After the clock jumps back without replay, the occurrences that were already announced
+    between the new position and ``announced_until`` are remembered so they are not
+    repeated; events added to that window later are still announced.
+
+    Attributes:
+        position (int): The last game time that was processed.
+        announced_until (int): The latest game time whose occurrences were announced or
+            skipped; ahead of position after a backward jump.
+    """
+
+    def __init__(self):
+        """
+        Initialize an empty schedule.
+        """
+        self.position = 0
+        self.announced_until = 0
+        self._entries: List[ScheduleEntry] = []
+        self._times: List[int] = []  # entry times, kept in step with _entries for bisecting by time
+        self._events: Dict[Tuple[str, int], dict] = {}
+        self._cursor = 0
+        self._announced: Set[ScheduleEntry] = set()  # announced entries after the cursor
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Tuple[str, int]) -> bool:
+        return key in self._events
+
+    @staticmethod
+    def _occurrences(kind: str, event: dict) -> range:
+        """Return the game times at which an event occurs."""
+        if kind == 'static':
+            return range(event['time'], event['time'] + 1)
+        return range(event['start_time'], event['end_time'] + 1, event['interval'])
+
+    def load(self, static_events: dict, periodic_events: dict, position: int,
+             announced_until: Optional[int] = None) -> None:
+        """
+        Replace the schedule contents.
+
+        Args:
+            static_events (dict): Static events keyed by event ID.
+            periodic_events (dict): Periodic events keyed by event ID.
+            position (int): The current game time; occurrences at or before it are treated as past.
+            announced_until (int, optional): Occurrences after position up to this game time are
+                treated as already announced. Defaults to position.
+        """
+        self._events = {}
+        entries = []
+        for kind, events in (('static', static_events), ('periodic', periodic_events)):
+            for event_id, event in events.items():
+                self._events[(kind, event_id)] = event
+                entries.extend((time, kind, event_id, event['message'])
+                               for time in self._occurrences(kind, event))
+        entries.sort()
+        self._entries = entries
+        self._times = [entry[0] for entry in entries]
+        self.position = position
+        self._cursor = bisect.bisect_right(self._times, position)
+        self.announced_until = max(position, announced_until if announced_until is not None else position)
+        self._announced = set(entries[self._cursor:bisect.bisect_right(self._times, self.announced_until)])
+        logger.debug(f"Schedule loaded with {len(self._events)} events and {len(entries)} occurrences.")
+
+    def add(self, kind: str, event_id: int, event: dict) -> None:
+        """
+        Insert an event into the running schedule.
+
+        Occurrences at or before the current position are kept for seeking but not announced.
+
+        Args:
+            kind (str): 'static' or 'periodic'.
+            event_id (int): The event ID.
+            event (dict): The event details.
+        """
+        if (kind, event_id) in self._events:
+            self.remove(kind, event_id)
+        self._events[(kind, event_id)] = event
+        for time in self._occurrences(kind, event):
+            entry = (time, kind, event_id, event['message'])
+            index = bisect.bisect_left(self._entries, entry)
+            self._entries.insert(index, entry)
+            self._times.insert(index, time)
+            if time <= self.position:
+                self._cursor += 1
+
+    def remove(self, kind: str, event_id: int) -> bool:
+        """
+        Remove an event from the running schedule.
+
+        Args:
+            kind (str): 'static' or 'periodic'.
+            event_id (int): The event ID.
+
+        Returns:
+            bool: True if the event was scheduled, False otherwise.
+        """
+        event = self._events.pop((kind, event_id), None)
+        if event is None:
+            return False
+        for time in self._occurrences(kind, event):
+            entry = (time, kind, event_id, event['message'])
+            index = bisect.bisect_left(self._entries, entry)
+            if index < len(self._entries) and self._entries[index] == entry:
+                self._announced.discard(entry)
+                del self._entries[index]
+                del self._times[index]
+                if index < self._cursor:
+                    self._cursor -= 1
+        return True
+
+    def _advance(self, end: int) -> List[ScheduleEntry]:
+        """Move the cursor to end and return the passed entries that were not announced yet."""
+        passed = self._entries[self._cursor:end]
+        self._cursor = end
+        if self._announced:
+            fresh = [entry for entry in passed if entry not in self._announced]
+            self._announced.difference_update(passed)
+            return fresh
+        return passed
+
+    def due(self, time: int) -> List[ScheduleEntry]:
+        """
+        Advance the schedule to the given game time.
+
+        Args:
+            time (int): The current game time.
+
+        Returns:
+            list: Occurrences that became due since the last call, in order.
+        """
+        if time <= self.position:
+            return []
+        due = self._advance(bisect.bisect_right(self._times, time, lo=self._cursor))
+        self.position = time
+        self.announced_until = max(self.announced_until, time)
+        return due
+
+    def seek(self, time: int, replay: bool = False, catch_up: int = 0) -> Tuple[List[ScheduleEntry], int]:
+        """
+        Move the schedule to a new game time after the clock was corrected.
+
+        Jumping forward skips the occurrences in between, except those within ``catch_up``
+        seconds of the new time, which are returned so they can still be announced.
+        Jumping backward keeps already announced occurrences from being repeated unless
+        ``replay`` is set.
+
+        Args:
+            time (int): The corrected game time.
+            replay (bool, optional): Announce occurrences again after a backward jump. Defaults to False.
+            catch_up (int, optional): Seconds before the new time whose skipped occurrences are
+                still returned. Defaults to 0.
+
+        Returns:
+            tuple: (occurrences to announce now, number of occurrences skipped).
+        """
+        if time >= self.position:
+            end = bisect.bisect_right(self._times, time, lo=self._cursor)
+            keep_from = bisect.bisect_right(self._times, time - catch_up, lo=self._cursor, hi=end)
+            skipped = len(self._advance(keep_from))
+            due = self._advance(end)
+            self.position = time
+            self.announced_until = max(self.announced_until, time)
+            return due, skipped
+
+        cursor = bisect.bisect_right(self._times, time)
+        if replay:
+            self._announced.clear()
+            self.announced_until = time
+        else:
+            # Everything between the new and the old position was announced or skipped
+            self._announced.update(self._entries[cursor:self._cursor])
+        self._cursor = cursor
+        self.position = time
+        return [], 0
@@ -4,14 +4,19 @@ from discord.ext import tasks
 
 from src.communication.announcement import Announcement
 from src.communication.game_status_manager import GameStatusMessageManager
-from src.managers.event_manager import EventsManager
+from src.managers.event_manager import EventChange, EventsManager, add_event_listener, remove_event_listener
+from src.schedule import EventSchedule
 from src.timers.glyph import GlyphTimer
 from src.timers.mindful import MindfulTimer
 from src.timers.roshan import RoshanTimer
 from src.timers.tormentor import TormentorTimer
-from src.utils.config import logger
+from src.utils.config import logger, tick_logger
+from src.utils.log_pipeline import guild_context
 from src.utils.utils import parse_initial_countdown
 
+# When the clock is moved forward, events skipped within this many seconds of the new time are still announced.
+SYNC_CATCH_UP_SECONDS = 5
+
 
 class GameTimer:
     """
@@ -33,7 +38,9 @@ class GameTimer:
         mindful_timer (MindfulTimer): Timer for sending mindful messages.
         static_events (dict): Static events loaded for the guild.
         periodic_events (dict): Periodic events loaded for the guild.
+        schedule (EventSchedule): Sorted occurrences of the loaded events.
         recent_events (list): List of recent event descriptions.
+        clock (GameClock): GSI game clock the timer follows, or None to count seconds on its own.
     """
 
     def __init__(self, guild_id: int, mode: str = 'regular'):
@@ -65,6 +72,10 @@ class GameTimer:
 
         self.static_events = {}
         self.periodic_events = {}
+        self.schedule = EventSchedule()
+        self.clock = None
+        self._paused_by_clock = False
+        self._loop = None
 
     async def start(self, channel: 'discord.TextChannel', countdown: str) -> None:
         """
@@ -88,8 +99,13 @@ class GameTimer:
         # Load event definitions for the guild and specified mode.
         self.static_events = self.events_manager.get_static_events(self.guild_id, self.mode)
         self.periodic_events = self.events_manager.get_periodic_events(self.guild_id, self.mode)
+        self.schedule.load(self.static_events, self.periodic_events, self.time_elapsed)
         logger.debug(f"Loaded static/periodic events for guild ID {self.guild_id} in mode '{self.mode}'.")
 
+        # Receive event additions and removals made while the game is running.
+        self._loop = asyncio.get_running_loop()
+        add_event_listener(self.on_event_change)
+
         # Start the main timer loop if it's not already running.
         if not self.timer_task.is_running():
             self.timer_task.start()
@@ -106,7 +122,10 @@ class GameTimer:
         Stop the game timer and all associated child timers.
         """
         logger.info(f"Stopping GameTimer for guild ID {self.guild_id}.")
+        remove_event_listener(self.on_event_change)
         self.timer_task.cancel()
+        self.clock = None
+        self._paused_by_clock = False
         self.paused = False
         self.status_manager.status_message = None
         await self._stop_all_child_timers()
@@ -148,27 +167,71 @@ class GameTimer:
             paused=self.paused
         )
 
+    async def sync(self, game_time: int, replay: bool = False) -> dict:
+        """
+        Move the running game clock to a corrected time without restarting the timer.
+
+        Args:
+            game_time (int): The corrected game time in seconds (negative before the horn).
+            replay (bool, optional): When moving backward, announce events again. Defaults to False.
+
+        Returns:
+            dict: 'previous' and 'current' times, plus the number of 'skipped' and 'announced' events.
+        """
+        previous = self.time_elapsed
+        self.time_elapsed = game_time
+        due, skipped = self.schedule.seek(game_time, replay=replay, catch_up=SYNC_CATCH_UP_SECONDS)
+        logger.info(
+            f"GameTimer for guild ID {self.guild_id} synced from {previous} to {game_time} seconds "
+            f"({skipped} events skipped, {len(due)} caught up, replay={replay}).")
+
+        await self._announce(due)
+        await self.status_manager.update_status_message(
+            time_elapsed=self.time_elapsed,
+            mode=self.mode,
+            recent_events=self.recent_events,
+            paused=self.paused
+        )
+        return {"previous": previous, "current": game_time, "skipped": skipped, "announced": len(due)}
+
+    def follow_clock(self, clock: 'GameClock') -> None:
+        """
+        Drive the timer from a GSI game clock instead of counting seconds.
+
+        Every tick then moves to the clock's current second, and pauses reported by the
+        client pause and resume the timer.
+
+        Args:
+            clock (GameClock): The clock to follow.
+        """
+        if clock is not self.clock:
+            self.clock = clock
+            logger.info(f"GameTimer for guild ID {self.guild_id} now follows the GSI game clock.")
+
     @tasks.loop(seconds=1)
     async def timer_task(self) -> None:
         """
-        Main timer loop that increments the elapsed time every second and checks for event triggers.
+        Main timer loop that advances the elapsed time every second and checks for event triggers.
         """
+        guild_context.set(self.guild_id)
         try:
-            if self.paused:
-                await self.pause_event.wait()
-
-            # Handle countdown and elapsed time logic
-            if self.time_elapsed < 0:
-                self.time_elapsed += 1  # Countdown
+            if self.clock is not None and self.clock.disciplined:
+                await self._follow_clock_tick()
             else:
-                self.time_elapsed += 1  # Elapsed game time
+                if self.paused:
+                    await self.pause_event.wait()
+
+                # Handle countdown and elapsed time logic
+                if self.time_elapsed < 0:
+                    self.time_elapsed += 1  # Countdown
+                else:
+                    self.time_elapsed += 1  # Elapsed game time
 
-            logger.debug(f"Time elapsed: {self.time_elapsed} seconds (guild_id={self.guild_id})")
+                tick_logger.debug("Time elapsed: %s seconds (guild_id=%s)", self.time_elapsed, self.guild_id)
 
-            # Check and trigger both static and periodic events if the game has started
-            if self.time_elapsed >= 0:
-                await self._check_static_events()
-                await self._check_periodic_events()
+                # Check and trigger both static and periodic events if the game has started
+                if self.time_elapsed >= 0:
+                    await self._announce_due_events()
 
             # Update the status message via the manager
             await self.status_manager.update_status_message(
@@ -182,33 +245,114 @@ class GameTimer:
         except Exception as e:
             logger.error(f"Unexpected error in GameTimer loop for guild ID {self.guild_id}: {e}", exc_info=True)
 
-    async def _check_static_events(self) -> None:
+    @timer_task.after_loop
+    async def _after_timer_task(self) -> None:
+        """
+        Stop receiving event changes once the main loop has ended, however it ended.
         """
-        Check and trigger static events based on the elapsed time.
+        remove_event_listener(self.on_event_change)
+
+    async def _follow_clock_tick(self) -> None:
+        """
+        Move the timer to the GSI clock's next whole second and announce what became due.
+
+        Waits for the second to begin, so announcements line up with the in-game clock.
+        Late ticks and clock corrections move the schedule position instead of counting.
+        """
+        clock = self.clock
+        if clock.paused:
+            if not self.paused:
+                await self.pause()
+                self._paused_by_clock = True
+            return
+        if self._paused_by_clock:
+            self._paused_by_clock = False
+            await self.unpause()
+        elif self.paused:
+            # Paused with a command; wait for the matching resume
+            await self.pause_event.wait()
+
+        await asyncio.sleep(clock.until_next_second())
+        current = round(clock.now())
+        expected = self.time_elapsed + 1
+        if current != expected:
+            tick_logger.debug("GameTimer for guild ID %s moved to %s (expected %s).", self.guild_id, current, expected)
+
+        if current < 0:
+            self.time_elapsed = current
+            return
+        due, skipped = self.schedule.seek(current, catch_up=SYNC_CATCH_UP_SECONDS)
+        if skipped:
+            logger.info(f"GameTimer for guild ID {self.guild_id} skipped {skipped} events moving to {current}.")
+        self.time_elapsed = current
+        await self._announce(due)
+
+    async def _announce_due_events(self) -> None:
+        """
+        Announce the static and periodic event occurrences that became due since the last tick.
+        """
+        await self._announce(self.schedule.due(self.time_elapsed))
+
+    async def _announce(self, entries: list) -> None:
+        """
+        Announce schedule occurrences in order.
+
+        Args:
+            entries (list): Occurrences as returned by EventSchedule.due or EventSchedule.seek.
+        """
+        for time, kind, event_id, message in entries:
+            logger.info("Triggering %s event ID %s for guild ID %s: '%s' at %s seconds.",
+                        kind, event_id, self.guild_id, message, self.time_elapsed)
+            await self.announcement_manager.announce(self, message)
+            self.add_recent_event(f"{message}")
+            logger.info("%s event triggered: ID=%s, time=%s, message='%s'", kind.capitalize(), event_id, time, message)
+
+    def on_event_change(self, change: EventChange) -> None:
+        """
+        Receive a published event change and apply it on the timer's event loop.
+
+        May be called from any thread; changes for other guilds or modes are ignored.
+
+        Args:
+            change (EventChange): The published change.
+        """
+        if change.guild_id != self.guild_id or self._loop is None:
+            return
+        if change.action == 'added' and change.mode != self.mode:
+            return
+
+        try:
+            on_loop = asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            on_loop = False
+        if on_loop:
+            self.apply_event_change(change)
+        else:
+            self._loop.call_soon_threadsafe(self.apply_event_change, change)
+
+    def apply_event_change(self, change: EventChange) -> None:
+        """
+        Apply an event change to the live schedule.
+
+        Args:
+            change (EventChange): The change to apply.
         """
-        for event_id, event in self.static_events.items():
-            if self.time_elapsed == event["time"]:
-                message = event['message']
+        events = self.static_events if change.kind == 'static' else self.periodic_events
+        if change.action == 'added':
+            events[change.event_id] = change.event
+            self.schedule.add(change.kind, change.event_id, change.event)
+            logger.info(f"Added {change.kind} event ID {change.event_id} to running game for guild ID {self.guild_id}.")
+        elif change.action == 'removed':
+            events.pop(change.event_id, None)
+            if self.schedule.remove(change.kind, change.event_id):
                 logger.info(
-                    f"Triggering static event ID {event_id} for guild ID {self.guild_id}: '{message}' at {self.time_elapsed} seconds.")
-                await self.announcement_manager.announce(self, message)
-                self.add_recent_event(f"{ message}")
-                logger.info(f"Static event triggered: ID={event_id}, time={event['time']}, message='{message}'")
-
-    async def _check_periodic_events(self) -> None:
-        """
-        Check and trigger periodic events based on the elapsed time.
-        """
-        for event_id, event in self.periodic_events.items():
-            if event["start_time"] <= self.time_elapsed <= event["end_time"]:
-                if (self.time_elapsed - event["start_time"]) % event["interval"] == 0:
-                    message = event['message']
-                    logger.info(
-                        f"Triggering periodic event ID {event_id} for guild ID {self.guild_id}: '{message}' at {self.time_elapsed} seconds.")
-                    await self.announcement_manager.announce(self, message)
-                    self.add_recent_event(f"{ message}")
-                    logger.info(
-                        f"Periodic event triggered: ID={event_id}, message='{message}', interval={event['interval']}")
+                    f"Removed {change.kind} event ID {change.event_id} from running game for guild ID {self.guild_id}.")
+        elif change.action == 'reloaded':
+            self.static_events = self.events_manager.get_static_events(self.guild_id, self.mode)
+            self.periodic_events = self.events_manager.get_periodic_events(self.guild_id, self.mode)
+            self.schedule.load(self.static_events, self.periodic_events, self.schedule.position,
+                               self.schedule.announced_until)
+            logger.info(f"Reloaded events of running game for guild ID {self.guild_id}.")
 
     async def _stop_all_child_timers(self) -> None:
         """
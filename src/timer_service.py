@@ -0,0 +1,459 @@
+"""
+Control of the game timers of all guilds by guild ID.
+
+Discord commands, GSI sync and the web dashboard all go through the TimerService, so
+timers can be controlled without a command context. Operations return a TimerResult
+instead of replying themselves; announcements that belong in the timer channel are
+still sent there. Guilds and channels are resolved from the bot's cache, so no
+operation costs a Discord request beyond the messages and voice connections it makes.
+"""
+import asyncio
+import re
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Dict, Optional
+
+import discord
+
+from src.managers.settings_manager import GuildSettings, settings_manager
+from src.timer import GameTimer
+from src.utils.config import logger
+from src.utils.utils import format_game_time, parse_game_time
+
+# Game modes a timer can be started in
+GAME_MODES = ('regular', 'turbo')
+
+# Child timers of a GameTimer by name, with the label used in messages
+CHILD_TIMERS = {
+    'roshan': 'Roshan',
+    'glyph': 'Glyph',
+    'tormentor': 'Tormentor',
+}
+
+_TIME_PATTERN = re.compile(r"^-?(\d+|\d{1,2}:\d{2})$")
+
+
+class TimerResultCode(str, Enum):
+    """Outcome of a timer operation."""
+    OK = "ok"
+    INVALID_ARGUMENT = "invalid_argument"
+    NOT_RUNNING = "not_running"
+    ALREADY_RUNNING = "already_running"
+    ALREADY_PAUSED = "already_paused"
+    NOT_PAUSED = "not_paused"
+    GUILD_NOT_FOUND = "guild_not_found"
+    CHANNEL_NOT_FOUND = "channel_not_found"
+    ERROR = "error"
+
+
+@dataclass
+class TimerResult:
+    """
+    Result of a timer operation.
+
+    Attributes:
+        code (TimerResultCode): The outcome.
+        message (str): A reply for the user who requested the operation.
+        announced (bool): Whether the message was already sent to the guild's timer channel.
+        data (dict): Details, e.g. the previous and current time of a sync.
+    """
+    code: TimerResultCode
+    message: str
+    announced: bool = False
+    data: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def ok(self) -> bool:
+        return self.code == TimerResultCode.OK
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the result as a JSON-serializable dict."""
+        return {"ok": self.ok, "code": self.code.value, "message": self.message,
+                "announced": self.announced, "data": self.data}
+
+
+def is_valid_game_time(value: str) -> bool:
+    """Check for a signed time in MM:SS format or in seconds."""
+    return bool(_TIME_PATTERN.match(value.strip()))
+
+
+class TimerService:
+    """
+    Starts, stops and adjusts the game timer and child timers of each guild.
+
+    Attributes:
+        bot (commands.Bot): The bot the timers run in; set by attach.
+        timers (dict): Game timers by guild ID.
+    """
+
+    def __init__(self):
+        """Initialize the service without a bot; attach one before starting timers."""
+        self.bot = None
+        self.timers: Dict[int, GameTimer] = {}
+        self._locks: Dict[int, asyncio.Lock] = {}  # Serializes starting and stopping per guild
+
+    def attach(self, bot) -> None:
+        """
+        Attach the bot whose guilds, channels and voice clients the timers use.
+
+        Args:
+            bot (commands.Bot): The bot.
+        """
+        self.bot = bot
+
+    def get(self, guild_id: int) -> Optional[GameTimer]:
+        """Get the game timer of a guild, if any."""
+        return self.timers.get(guild_id)
+
+    def is_running(self, guild_id: int) -> bool:
+        """Check whether a guild's game timer is running."""
+        timer = self.timers.get(guild_id)
+        return timer is not None and timer.is_running()
+
+    def describe(self, guild_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Describe the state of a guild's game timer.
+
+        Args:
+            guild_id (int): The Discord guild ID.
+
+        Returns:
+            dict: Mode, elapsed time, pause state, child timer states and recent events,
+            or None if the guild has no timer.
+        """
+        timer = self.timers.get(guild_id)
+        if timer is None:
+            return None
+        return {
+            "guild_id": guild_id,
+            "mode": timer.mode,
+            "elapsed_time": timer.time_elapsed,
+            "paused": timer.paused,
+            "roshan_active": timer.roshan_timer.is_running,
+            "glyph_active": timer.glyph_timer.is_running,
+            "tormentor_active": timer.tormentor_timer.is_running,
+            "recent_events": list(timer.recent_events),
+        }
+
+    def describe_all(self) -> Dict[int, Dict[str, Any]]:
+        """Describe the game timers of all guilds, keyed by guild ID."""
+        return {guild_id: self.describe(guild_id) for guild_id in list(self.timers)}
+
+    def _lock(self, guild_id: int) -> asyncio.Lock:
+        """Get the lock serializing start and stop for a guild."""
+        if guild_id not in self._locks:
+            self._locks[guild_id] = asyncio.Lock()
+        return self._locks[guild_id]
+
+    def _guild(self, guild_id: int) -> Optional[discord.Guild]:
+        """Get a guild from the bot's cache."""
+        return self.bot.get_guild(guild_id) if self.bot is not None else None
+
+    def _voice_client(self, guild: Optional[discord.Guild]):
+        """Get the bot's voice client in a guild, if connected."""
+        if guild is None or self.bot is None:
+            return None
+        return discord.utils.get(self.bot.voice_clients, guild=guild)
+
+    @staticmethod
+    def _channel_missing(settings: GuildSettings, kind: str) -> TimerResult:
+        """
+        Log and describe a configured channel that does not exist in its guild.
+
+        Args:
+            settings (GuildSettings): The guild's settings, naming the channel.
+            kind (str): 'timer' or 'voice'.
+
+        Returns:
+            TimerResult: A CHANNEL_NOT_FOUND result asking the user to create the channel.
+        """
+        guild_id = settings.guild_id
+        name = settings.timer_channel_name if kind == 'timer' else settings.voice_channel_name
+        if kind == 'timer':
+            message = f"Channel '{name}' not found. Please create one and try again."
+        else:
+            message = f"'{name}' voice channel not found. Please create it and try again."
+        logger.warning(f"{kind.title()} channel '{name}' not found in guild ID {guild_id}.")
+        return TimerResult(TimerResultCode.CHANNEL_NOT_FOUND, message)
+
+    async def start(self, guild_id: int, countdown: str, mode: str = 'regular', actor: str = 'system') -> TimerResult:
+        """
+        Start the game timer of a guild and join its voice channel.
+
+        Args:
+            guild_id (int): The Discord guild ID.
+            countdown (str): MM:SS or seconds, negative if the game is already running.
+            mode (str, optional): 'regular' or 'turbo'. Defaults to 'regular'.
+            actor (str, optional): Who requested the operation, for the logs.
+
+        Returns:
+            TimerResult: The outcome; announced in the timer channel on success.
+        """
+        if not is_valid_game_time(countdown):
+            return TimerResult(TimerResultCode.INVALID_ARGUMENT,
+                               "Please enter a valid countdown format (MM:SS or signed integer in seconds).")
+        mode = mode.lower() if mode and mode.lower() in GAME_MODES else 'regular'
+
+        async with self._lock(guild_id):
+            if self.is_running(guild_id):
+                logger.info(f"Game timer already running for guild ID {guild_id}. Start by '{actor}' ignored.")
+                return TimerResult(TimerResultCode.ALREADY_RUNNING, "A game timer is already running in this server.")
+
+            guild = self._guild(guild_id)
+            if guild is None:
+                logger.warning(f"Guild ID {guild_id} not found; cannot start the game timer.")
+                return TimerResult(TimerResultCode.GUILD_NOT_FOUND, f"Server {guild_id} not found.")
+
+            guild_settings = await settings_manager.fetch(guild_id)
+            voice_channel = settings_manager.get_voice_channel(guild, guild_settings)
+            if not voice_channel:
+                return self._channel_missing(guild_settings, 'voice')
+            timer_channel = settings_manager.get_timer_channel(guild, guild_settings)
+            if not timer_channel:
+                return self._channel_missing(guild_settings, 'timer')
+
+            message = f"Starting {mode} game timer with countdown '{countdown}'."
+            try:
+                await timer_channel.send(message)
+
+                game_timer = GameTimer(guild_id, mode)
+                game_timer.channel = timer_channel
+                self.timers[guild_id] = game_timer
+
+                # Apply the guild's configured TTS voice
+                if guild_settings.tts_language:
+                    await game_timer.announcement_manager.tts_manager.set_voice(guild_settings.tts_language)
+
+                voice_client = self._voice_client(guild)
+                if voice_client is None:
+                    voice_client = await voice_channel.connect()
+                    logger.info(f"Connected to voice channel '{voice_channel.name}' in guild ID {guild_id}.")
+                elif voice_client.channel != voice_channel:
+                    await voice_client.move_to(voice_channel)
+                    logger.info(f"Moved voice client to '{voice_channel.name}' in guild ID {guild_id}.")
+                game_timer.voice_client = voice_client
+
+                await game_timer.start(timer_channel, countdown)
+            except Exception as e:
+                logger.error(f"Error starting game timer for guild ID {guild_id}: {e}", exc_info=True)
+                return TimerResult(TimerResultCode.ERROR, "An unexpected error occurred while starting the game timer.")
+
+        logger.info(f"Game timer started by '{actor}' with countdown='{countdown}' and mode='{mode}' "
+                    f"for guild ID {guild_id}.")
+        return TimerResult(TimerResultCode.OK, message, announced=True, data={"mode": mode, "countdown": countdown})
+
+    async def stop(self, guild_id: int, actor: str = 'system', message: str = "Game timer stopped.") -> TimerResult:
+        """
+        Stop the game timer of a guild with all child timers and leave its voice channel.
+
+        Args:
+            guild_id (int): The Discord guild ID.
+            actor (str, optional): Who requested the operation, for the logs.
+            message (str, optional): Announcement sent to the timer channel.
+
+        Returns:
+            TimerResult: The outcome.
+        """
+        async with self._lock(guild_id):
+            guild = self._guild(guild_id)
+            result = TimerResult(TimerResultCode.OK, message)
+            if self.is_running(guild_id):
+                try:
+                    await self.timers[guild_id].stop()
+                    logger.info(f"Game timer stopped by '{actor}' for guild ID {guild_id}.")
+                except Exception as e:
+                    logger.error(f"Error stopping game timer for guild ID {guild_id}: {e}", exc_info=True)
+                    result = TimerResult(TimerResultCode.ERROR, "An error occurred while stopping the game timer.")
+                del self.timers[guild_id]
+
+                timer_channel = None
+                if guild:
+                    timer_channel = settings_manager.get_timer_channel(guild, await settings_manager.fetch(guild_id))
+                if result.ok and timer_channel:
+                    await timer_channel.send(message)
+                    result.announced = True
+            else:
+                logger.warning(f"'{actor}' attempted to stop the timer of guild ID {guild_id}, but it was not running.")
+                result = TimerResult(TimerResultCode.NOT_RUNNING, "No active game timer found.")
+
+            voice_client = self._voice_client(guild)
+            if voice_client:
+                try:
+                    await voice_client.disconnect()
+                    logger.debug(f"Voice client disconnected for guild ID {guild_id}.")
+                except Exception as e:
+                    logger.error(f"Error disconnecting voice client for guild ID {guild_id}: {e}", exc_info=True)
+            return result
+
+    async def stop_all(self, actor: str = 'system',
+                       message: str = "Game timer has been forcefully stopped by an admin.") -> int:
+        """
+        Stop the game timers of all guilds.
+
+        Args:
+            actor (str, optional): Who requested the operation, for the logs.
+            message (str, optional): Announcement sent to each timer channel.
+
+        Returns:
+            int: Number of timers stopped.
+        """
+        stopped = 0
+        for guild_id in list(self.timers):
+            result = await self.stop(guild_id, actor, message)
+            stopped += result.ok
+        return stopped
+
+    async def pause(self, guild_id: int, actor: str = 'system') -> TimerResult:
+        """
+        Pause the game timer of a guild and all child timers.
+
+        Args:
+            guild_id (int): The Discord guild ID.
+            actor (str, optional): Who requested the operation, for the logs.
+
+        Returns:
+            TimerResult: The outcome.
+        """
+        if not self.is_running(guild_id):
+            return TimerResult(TimerResultCode.NOT_RUNNING, "No active game timer found.")
+        timer = self.timers[guild_id]
+        if timer.is_paused():
+            return TimerResult(TimerResultCode.ALREADY_PAUSED, "Game timer is already paused.")
+        try:
+            await timer.pause()
+        except Exception as e:
+            logger.error(f"Error pausing game timer for guild ID {guild_id}: {e}", exc_info=True)
+            return TimerResult(TimerResultCode.ERROR, "An error occurred while pausing the game timer.")
+        logger.info(f"Game timer and all child timers paused by '{actor}' for guild ID {guild_id}.")
+        return TimerResult(TimerResultCode.OK, "Game timer paused.")
+
+    async def resume(self, guild_id: int, actor: str = 'system') -> TimerResult:
+        """
+        Resume the paused game timer of a guild and all child timers.
+
+        Args:
+            guild_id (int): The Discord guild ID.
+            actor (str, optional): Who requested the operation, for the logs.
+
+        Returns:
+            TimerResult: The outcome.
+        """
+        if not self.is_running(guild_id):
+            return TimerResult(TimerResultCode.NOT_RUNNING, "No active game timer found.")
+        timer = self.timers[guild_id]
+        if not timer.is_paused():
+            return TimerResult(TimerResultCode.NOT_PAUSED, "Game timer is not paused.")
+        try:
+            await timer.unpause()
+        except Exception as e:
+            logger.error(f"Error unpausing game timer for guild ID {guild_id}: {e}", exc_info=True)
+            return TimerResult(TimerResultCode.ERROR, "An error occurred while resuming the game timer.")
+        logger.info(f"Game timer and all child timers resumed by '{actor}' for guild ID {guild_id}.")
+        return TimerResult(TimerResultCode.OK, "Game timer resumed.")
+
+    async def sync(self, guild_id: int, game_time: str, replay: bool = False, actor: str = 'system') -> TimerResult:
+        """
+        Correct the clock of a running game timer without restarting it.
+
+        Args:
+            guild_id (int): The Discord guild ID.
+            game_time (str): The in-game time, MM:SS or seconds, negative before the horn.
+            replay (bool, optional): Announce events again after a backward jump. Defaults to False.
+            actor (str, optional): Who requested the operation, for the logs.
+
+        Returns:
+            TimerResult: The outcome, with the sync details from GameTimer.sync as data.
+        """
+        if not is_valid_game_time(game_time):
+            return TimerResult(TimerResultCode.INVALID_ARGUMENT,
+                               "Please enter a valid game time (MM:SS or signed integer in seconds).")
+        if not self.is_running(guild_id):
+            return TimerResult(TimerResultCode.NOT_RUNNING, "No active game timer found.")
+        try:
+            details = await self.timers[guild_id].sync(parse_game_time(game_time), replay=replay)
+        except Exception as e:
+            logger.error(f"Error syncing game timer for guild ID {guild_id}: {e}", exc_info=True)
+            return TimerResult(TimerResultCode.ERROR, "An error occurred while syncing the game timer.")
+
+        message = (f"Game clock synced to {format_game_time(details['current'])} "
+                   f"(was {format_game_time(details['previous'])}).")
+        if details['skipped']:
+            message += f" Skipped {details['skipped']} event(s)."
+        logger.info(f"Game timer synced by '{actor}' for guild ID {guild_id}: {details}")
+        return TimerResult(TimerResultCode.OK, message, data=details)
+
+    async def start_child(self, guild_id: int, name: str, actor: str = 'system') -> TimerResult:
+        """
+        Start a child timer (Roshan respawn, Glyph cooldown, Tormentor respawn) of a running game.
+
+        Args:
+            guild_id (int): The Discord guild ID.
+            name (str): 'roshan', 'glyph' or 'tormentor'.
+            actor (str, optional): Who requested the operation, for the logs.
+
+        Returns:
+            TimerResult: The outcome; announced in the timer channel on success.
+        """
+        label = CHILD_TIMERS.get(name)
+        if label is None:
+            return TimerResult(TimerResultCode.INVALID_ARGUMENT, f"Unknown timer '{name}'.")
+        if not self.is_running(guild_id):
+            return TimerResult(TimerResultCode.NOT_RUNNING, "Game is not active.")
+
+        guild = self._guild(guild_id)
+        guild_settings = await settings_manager.fetch(guild_id)
+        timer_channel = settings_manager.get_timer_channel(guild, guild_settings) if guild else None
+        if not timer_channel:
+            return self._channel_missing(guild_settings, 'timer')
+
+        child = getattr(self.timers[guild_id], f"{name}_timer")
+        if child.is_running:
+            return TimerResult(TimerResultCode.ALREADY_RUNNING, f"{label} timer is already running.")
+        try:
+            await child.start(timer_channel)
+            await timer_channel.send(f"{label} timer started.")
+        except Exception as e:
+            logger.error(f"Error starting {label} timer for guild ID {guild_id}: {e}", exc_info=True)
+            return TimerResult(TimerResultCode.ERROR, f"An error occurred while starting the {label} timer.")
+        logger.info(f"{label} timer started by '{actor}' for guild ID {guild_id}.")
+        return TimerResult(TimerResultCode.OK, f"{label} timer started.", announced=True)
+
+    async def cancel_child(self, guild_id: int, name: str, actor: str = 'system') -> TimerResult:
+        """
+        Cancel a running child timer.
+
+        Args:
+            guild_id (int): The Discord guild ID.
+            name (str): 'roshan', 'glyph' or 'tormentor'.
+            actor (str, optional): Who requested the operation, for the logs.
+
+        Returns:
+            TimerResult: The outcome; announced in the timer channel on success.
+        """
+        label = CHILD_TIMERS.get(name)
+        if label is None:
+            return TimerResult(TimerResultCode.INVALID_ARGUMENT, f"Unknown timer '{name}'.")
+        if guild_id not in self.timers:
+            return TimerResult(TimerResultCode.NOT_RUNNING, "Game timer is not active.")
+
+        child = getattr(self.timers[guild_id], f"{name}_timer")
+        if not child.is_running:
+            return TimerResult(TimerResultCode.NOT_RUNNING, f"No active {label} timer to cancel.")
+        message = f"{label} timer has been cancelled."
+        try:
+            await child.stop()
+            guild = self._guild(guild_id)
+            timer_channel = None
+            if guild:
+                timer_channel = settings_manager.get_timer_channel(guild, await settings_manager.fetch(guild_id))
+            if timer_channel:
+                await timer_channel.send(message)
+        except Exception as e:
+            logger.error(f"Error cancelling {label} timer for guild ID {guild_id}: {e}", exc_info=True)
+            return TimerResult(TimerResultCode.ERROR, f"An error occurred while cancelling the {label} timer.")
+        logger.info(f"{label} timer cancelled by '{actor}' for guild ID {guild_id}.")
+        return TimerResult(TimerResultCode.OK, message, announced=timer_channel is not None)
+
+
+# Timers of all guilds; bot.py attaches the bot on startup
+timer_service = TimerService()
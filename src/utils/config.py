@@ -1,11 +1,15 @@
 # src/utils/config.py
 
+import atexit
 import logging
 import os
-from logging.handlers import RotatingFileHandler
+import queue
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 
 import yaml
 
+from src.utils.log_pipeline import ContextFilter, JsonFormatter, SamplingFilter
+
 # Set base directory to the current directory where the script is running
 BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
 CONFIG_PATH = os.path.join(BASE_DIR, "config.yaml")
@@ -31,6 +35,20 @@ TIMER_CHANNEL_NAME = CONFIG.get("timer_channel", "timer-bot")
 VOICE_CHANNEL_NAME = CONFIG.get("voice_channel", "DOTA")
 DATABASE_URL = CONFIG.get("database_url", "sqlite:///bot.db")
 CONSOLE_LOG_LEVEL = CONFIG.get("console_log_level", "INFO").upper()  # Default to INFO if not set
+LOG_FORMAT = CONFIG.get("log_format", "json")  # Options: json (one object per line), text
+LOG_SAMPLE_RATES = CONFIG.get("log_sample_rates", {"DotaDiscordBot.ticks": 0.1})  # Fraction of debug records kept per logger
+GSI_HOST = CONFIG.get("gsi_host", "0.0.0.0")
+GSI_PORT = CONFIG.get("gsi_port", 3000)
+GSI_INGEST_FIELDS = CONFIG.get("gsi_ingest_fields", [])  # Extra GSI fields to keep, e.g. "hero.gold"
+GSI_RECORD_DIR = CONFIG.get("gsi_record_dir")  # Record GSI packets here when set
+GSI_DISPATCH_QUEUE_SIZE = CONFIG.get("gsi_dispatch_queue_size", 256)
+GSI_DISPATCH_OVERFLOW = CONFIG.get("gsi_dispatch_overflow", "drop-oldest")  # Options: drop-oldest, latest-wins
+GSI_DISPATCH_WORKERS = CONFIG.get("gsi_dispatch_workers", 2)
+IPC_SOCKET_PATH = os.path.join(BASE_DIR, CONFIG.get("ipc_socket", "data/bot.sock"))  # Shared by bot and webapp
+IPC_TIMEOUT = CONFIG.get("ipc_timeout", 2.0)  # Seconds the webapp waits for the bot
+STREAM_HEARTBEAT_INTERVAL = CONFIG.get("stream_heartbeat_interval", 15)  # Seconds between heartbeats on idle dashboard streams
+STREAM_MAX_CLIENTS = CONFIG.get("stream_max_clients", 100)  # Dashboard streams open at once at most
+RESPONSE_CACHE_SIZE = CONFIG.get("response_cache_size", 256)  # Dashboard API responses cached at most
 
 # Ensure directories exist
 os.makedirs(LOG_DIR, exist_ok=True)
@@ -40,7 +58,7 @@ os.makedirs(TTS_CACHE_DIR, exist_ok=True)
 LOG_FILE_PATH = os.path.join(LOG_DIR, "bot.log")
 
 # Create custom formatters
-file_formatter = logging.Formatter(
+file_formatter = JsonFormatter() if LOG_FORMAT == "json" else logging.Formatter(
     '%(asctime)s - %(levelname)s - %(name)s - %(funcName)s - %(lineno)d - %(message)s'
 )
 console_formatter = logging.Formatter(
@@ -57,13 +75,23 @@ console_handler = logging.StreamHandler()
 console_handler.setLevel(getattr(logging, CONSOLE_LOG_LEVEL, logging.INFO))  # Apply level from config
 console_handler.setFormatter(console_formatter)
 
+# Records are queued by the logging code and written by a background thread, so the
+# event loop never waits for the disk or the console
+log_queue = queue.SimpleQueue()
+queue_handler = QueueHandler(log_queue)
+queue_handler.addFilter(ContextFilter())
+queue_handler.addFilter(SamplingFilter(LOG_SAMPLE_RATES))
+log_listener = QueueListener(log_queue, file_handler, console_handler, respect_handler_level=True)
+log_listener.start()
+atexit.register(log_listener.stop)  # Writes the records still queued at exit
+
 # Create a logger instance for the application
 logger = logging.getLogger("DotaDiscordBot")
 logger.setLevel(logging.DEBUG)  # Set logger to the lowest level, handlers control output
+logger.addHandler(queue_handler)
 
-# Add handlers to the logger
-logger.addHandler(file_handler)
-logger.addHandler(console_handler)
+# Logger for messages repeated every second per guild; sampled by LOG_SAMPLE_RATES
+tick_logger = logger.getChild("ticks")
 
 # Example usage: Log a debug message with context
 logger.debug("Logger initialized with advanced configuration.")
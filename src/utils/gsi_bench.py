@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+GSI Ingest Benchmark
+
+Compares the previous ingest path (decode the request, then deep copy it through a
+json round trip) with the snapshot path (parse once into an immutable GSISnapshot),
+with and without pruning to the registered ingest fields.
+Reports packets per second and allocations per packet for each.
+"""
+
+import os
+import time
+import argparse
+import json
+import sys
+import tracemalloc
+
+# Add the project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from src.gsi.derived import DERIVED_FIELDS
+from src.gsi.projection import FieldProjection
+from src.gsi.snapshot import GSISnapshot, dumps, orjson, unwrap
+
+projection = FieldProjection(DERIVED_FIELDS)
+
+
+def build_packet(players: int = 10, events: int = 20) -> bytes:
+    """
+    Build a GSI packet shaped like the ones sent by a spectating client.
+
+    Args:
+        players (int): Number of player entries.
+        events (int): Number of entries in the events list.
+
+    Returns:
+        bytes: The encoded packet.
+    """
+    packet = {
+        "provider": {"name": "Dota 2", "appid": 570, "version": 47, "timestamp": 1700000000},
+        "map": {
+            "name": "start", "matchid": "7000000000", "game_time": 1234, "clock_time": 1174,
+            "daytime": True, "game_state": "DOTA_GAMERULES_STATE_GAME_IN_PROGRESS",
+            "paused": False, "win_team": "none", "customgamename": "", "game_mode": 22,
+            "radiant_score": 12, "dire_score": 9,
+        },
+        "player": {
+            f"player{i}": {"steamid": str(76561198000000000 + i), "name": f"Player {i}",
+                           "kills": i, "deaths": 2, "assists": 5, "gold": 1500 + i,
+                           "gpm": 420, "xpm": 510, "team_name": "radiant" if i < 5 else "dire"}
+            for i in range(players)
+        },
+        "hero": {
+            f"player{i}": {"id": i + 1, "name": f"npc_dota_hero_{i}", "level": 12, "alive": True,
+                           "health": 1200, "max_health": 1500, "mana": 600, "max_mana": 800,
+                           "abilities": [{"name": f"ability_{j}", "level": 3, "cooldown": 0}
+                                         for j in range(4)]}
+            for i in range(players)
+        },
+        "buildings": {
+            "radiant": {"glyph": {"cooldown": 0}, "dota_goodguys_tower1_top": {"health": 1800, "max_health": 1800}},
+            "dire": {"glyph": {"cooldown": 120}, "dota_badguys_tower1_top": {"health": 900, "max_health": 1800}},
+        },
+        "events": [{"event_type": "courier_killed", "game_time": 100 + i, "team": "radiant"}
+                   for i in range(events)],
+        "auth": {"token": "bench"},
+    }
+    return json.dumps(packet).encode()
+
+
+def ingest_round_trip(raw: bytes):
+    """The previous ingest path: decode, then deep copy via json."""
+    data = json.loads(raw)
+    return json.loads(json.dumps(data))
+
+
+def ingest_snapshot(raw: bytes):
+    """The snapshot ingest path: parse once, no copy."""
+    return GSISnapshot.from_bytes(raw)
+
+
+def ingest_projected(raw: bytes):
+    """The snapshot ingest path, pruned to the fields the bot uses."""
+    return projection.project(GSISnapshot.from_bytes(raw))
+
+
+def measure(ingest, raw: bytes, packets: int) -> dict:
+    """
+    Measure throughput and allocations of an ingest function.
+
+    Args:
+        ingest: Function taking the raw packet.
+        raw (bytes): The packet to ingest.
+        packets (int): Number of packets to ingest.
+
+    Returns:
+        dict: packets_per_sec and allocations_per_packet.
+    """
+    start = time.perf_counter()
+    for _ in range(packets):
+        ingest(raw)
+    elapsed = time.perf_counter() - start
+
+    # Count allocated blocks separately, tracing slows down the loop considerably
+    sample = min(packets, 1000)
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    results = [ingest(raw) for _ in range(sample)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    blocks = sum(stat.count_diff for stat in after.compare_to(before, 'filename'))
+    del results
+
+    return {
+        "packets_per_sec": packets / elapsed,
+        "allocations_per_packet": blocks / sample,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark GSI packet ingestion')
+    parser.add_argument('--packets', type=int, default=20000, help='Number of packets per run')
+    parser.add_argument('--players', type=int, default=10, help='Players per packet')
+    args = parser.parse_args()
+
+    raw = build_packet(players=args.players)
+    print(f"Packet size: {len(raw)} bytes, parser: {'orjson' if orjson else 'json'}")
+    print(f"Pruned size: {len(dumps(unwrap(ingest_projected(raw))))} bytes")
+
+    for name, ingest in (("json round trip", ingest_round_trip), ("snapshot", ingest_snapshot),
+                         ("pruned snapshot", ingest_projected)):
+        result = measure(ingest, raw, args.packets)
+        print(f"{name:>16}: {result['packets_per_sec']:>10.0f} packets/s, "
+              f"{result['allocations_per_packet']:>8.1f} allocations/packet")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+GSI Replay Load Generator
+
+Replays recorded GSI streams (see src/gsi/recorder.py) against a GSI endpoint at a
+chosen speed with a number of concurrent synthetic players, and reports throughput,
+latency percentiles and error rates.
+
+Each player replays one recording, cycling through the given recordings and tokens.
+Players sharing a token feed the same session on the server.
+"""
+
+import os
+import time
+import argparse
+import asyncio
+import sys
+from collections import Counter
+from typing import Dict, List, Tuple
+
+import aiohttp
+
+# Add the project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from src.gsi.recorder import read_recording
+from src.gsi.snapshot import dumps
+
+
+class ReplayStats:
+    """Results collected from all players."""
+
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.statuses = Counter()
+        self.errors = Counter()
+        self.late = 0  # Packets sent after their scheduled time because the player fell behind
+
+    @property
+    def sent(self) -> int:
+        return len(self.latencies) + sum(self.errors.values())
+
+    @property
+    def failed(self) -> int:
+        return sum(self.errors.values()) + sum(count for status, count in self.statuses.items() if status != 200)
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """
+    Get a percentile of a sorted list by the nearest-rank method.
+
+    Args:
+        values (list): Sorted values.
+        fraction (float): The percentile as a fraction, e.g. 0.99.
+
+    Returns:
+        float: The value, or 0.0 for an empty list.
+    """
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, max(0, int(round(fraction * len(values))) - 1))]
+
+
+def load_recording(path: str, token: str) -> List[Tuple[float, bytes]]:
+    """
+    Load a recording as request bodies carrying the given auth token.
+
+    Args:
+        path (str): The recording file.
+        token (str): The auth token to send.
+
+    Returns:
+        list: (seconds since the first packet, encoded packet) pairs.
+    """
+    packets = []
+    start = None
+    for received_at, packet in read_recording(path):
+        start = received_at if start is None else start
+        packet["auth"] = {"token": token}
+        packets.append((received_at - start, dumps(packet)))
+    return packets
+
+
+async def play(url: str, packets: List[Tuple[float, bytes]], speed: float, delay: float,
+               timeout: float, stats: ReplayStats) -> None:
+    """
+    Replay packets as one client over a single keep-alive connection.
+
+    Args:
+        url (str): The GSI endpoint.
+        packets (list): Packets as returned by load_recording.
+        speed (float): Replay speed factor.
+        delay (float): Seconds to wait before the first packet.
+        timeout (float): Request timeout in seconds.
+        stats (ReplayStats): Collects the results.
+    """
+    await asyncio.sleep(delay)
+    connector = aiohttp.TCPConnector(limit=1)
+    headers = {"Content-Type": "application/json"}
+    async with aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=timeout)) as session:
+        start = time.perf_counter()
+        for offset, body in packets:
+            wait = offset / speed - (time.perf_counter() - start)
+            if wait > 0:
+                await asyncio.sleep(wait)
+            elif wait < -0.1:
+                stats.late += 1
+
+            sent = time.perf_counter()
+            try:
+                async with session.post(url, data=body, headers=headers) as response:
+                    await response.read()
+                    stats.statuses[response.status] += 1
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                stats.errors[type(e).__name__] += 1
+                continue
+            stats.latencies.append(time.perf_counter() - sent)
+
+
+async def replay(args) -> Tuple[ReplayStats, float]:
+    """Run all players and return the results and the elapsed time."""
+    cache: Dict[Tuple[str, str], List[Tuple[float, bytes]]] = {}
+    players = []
+    for index in range(args.players):
+        key = (args.recordings[index % len(args.recordings)], args.token[index % len(args.token)])
+        if key not in cache:
+            cache[key] = load_recording(*key)
+        players.append(cache[key])
+
+    stats = ReplayStats()
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        play(args.url, packets, args.speed, index * args.stagger / args.players, args.timeout, stats)
+        for index, packets in enumerate(players)
+    ))
+    return stats, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay recorded GSI streams against a GSI endpoint')
+    parser.add_argument('recordings', nargs='+', help='Recording files (.jsonl.gz)')
+    parser.add_argument('--url', default='http://localhost:3000/', help='GSI endpoint (default: http://localhost:3000/)')
+    parser.add_argument('--token', action='append', help='Auth token to send; repeat to give players different tokens')
+    parser.add_argument('--speed', type=float, default=1.0, help='Replay speed factor (default: 1)')
+    parser.add_argument('--players', type=int, default=1, help='Number of concurrent players (default: 1)')
+    parser.add_argument('--stagger', type=float, default=1.0, help='Seconds over which player starts are spread')
+    parser.add_argument('--timeout', type=float, default=5.0, help='Request timeout in seconds (default: 5)')
+    args = parser.parse_args()
+    args.token = args.token or [os.getenv('GSI_AUTH_TOKEN', 'your_secret_token')]
+
+    stats, elapsed = asyncio.run(replay(args))
+
+    latencies = sorted(stats.latencies)
+    print(f"Players: {args.players}, speed: {args.speed}x, duration: {elapsed:.1f}s")
+    print(f"Sent: {stats.sent} packets, {stats.sent / elapsed:.1f} packets/s")
+    print(f"Failed: {stats.failed} ({stats.failed / max(stats.sent, 1):.2%}), late: {stats.late}")
+    print(f"Statuses: {dict(stats.statuses)}" + (f", errors: {dict(stats.errors)}" if stats.errors else ""))
+    print("Latency ms: " + ", ".join(
+        f"{name} {percentile(latencies, fraction) * 1000:.2f}"
+        for name, fraction in (("p50", 0.5), ("p90", 0.9), ("p99", 0.99), ("max", 1.0))))
+
+
+if __name__ == "__main__":
+    main()
@@ -3,7 +3,8 @@
 GSI Verification Script
 
 This script helps verify that GSI (Game State Integration) is properly set up and working.
-It creates a config file for GSI and monitors incoming GSI data.
+It creates a config file for GSI and monitors incoming GSI data, optionally recording
+it for src/utils/gsi_replay.py.
 """
 
 import os
@@ -17,6 +18,7 @@ import sys
 # Add the project root to path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
+from src.gsi.recorder import GSIRecorder
 from src.utils.config import logger
 
 # Default auth token
@@ -44,6 +46,9 @@ class GSIHandler(http.server.BaseHTTPRequestHandler):
 
             # Process GSI data
             self._process_gsi_data(data)
+            if self.server.recorder and 'map' in data:
+                packet = {key: value for key, value in data.items() if key != 'auth'}
+                self.server.recorder.write(auth_token, packet, time.time())
 
             # Send response
             self.send_response(200)
@@ -173,6 +178,7 @@ def main():
     parser = argparse.ArgumentParser(description="GSI Verification Tool")
     parser.add_argument("--port", type=int, default=3000, help="Port to listen on (default: 3000)")
     parser.add_argument("--auth", type=str, default=DEFAULT_AUTH_TOKEN, help="Auth token for GSI")
+    parser.add_argument("--record", type=str, metavar="DIR", help="Record received packets to this directory")
     args = parser.parse_args()
 
     # Create GSI config file
@@ -191,11 +197,15 @@ def main():
 
     # Create and start the server
     class GSIServer(socketserver.TCPServer):
-        def __init__(self, server_address, handler_class, auth_token):
+        def __init__(self, server_address, handler_class, auth_token, recorder):
             super().__init__(server_address, handler_class)
             self.auth_token = auth_token
+            self.recorder = recorder
 
-    server = GSIServer(("", args.port), GSIHandler, args.auth)
+    recorder = GSIRecorder(args.record) if args.record else None
+    if recorder:
+        print(f"💾 Recording packets to {args.record}")
+    server = GSIServer(("", args.port), GSIHandler, args.auth, recorder)
 
     try:
         server.serve_forever()
@@ -203,6 +213,8 @@ def main():
         print("\n👋 GSI verification server stopped")
     finally:
         server.server_close()
+        if recorder:
+            recorder.close()
 
 
 if __name__ == "__main__":
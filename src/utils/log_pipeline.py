@@ -0,0 +1,113 @@
+"""
+Building blocks of the bot's logging pipeline, wired up in src.utils.config.
+
+Records are put on a queue by the thread or task that logs them and written to the log
+file and console by a background thread, so logging never waits for the disk. Before a
+record is queued, it is tagged with the guild and match the current task works for and
+hot-path debug records are sampled.
+"""
+import json
+import logging
+from contextvars import ContextVar
+from itertools import count
+from typing import Dict, Optional
+
+# Guild and match the current task works for; attached to the task's log records
+guild_context: ContextVar[Optional[int]] = ContextVar("guild_id", default=None)
+match_context: ContextVar[Optional[str]] = ContextVar("match_id", default=None)
+
+
+class ContextFilter(logging.Filter):
+    """
+    Tags records with the guild and match of the task that logged them.
+
+    Must run where the record is created, i.e. on the queueing handler, not on the
+    handlers behind the queue.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if getattr(record, "guild_id", None) is None:
+            record.guild_id = guild_context.get()
+        if getattr(record, "match_id", None) is None:
+            record.match_id = match_context.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps a fraction of the debug records of chosen loggers.
+
+    Records are counted per logger, message template and guild, and every n-th one is
+    kept, so each guild's repeated messages stay visible at a reduced rate. Hot paths
+    should log with %-style arguments so records of the same message share a template.
+    """
+
+    def __init__(self, rates: Dict[str, float]):
+        """
+        Initialize the filter.
+
+        Args:
+            rates (dict): Fraction of debug records to keep, keyed by logger name; child
+                loggers use the rate of their nearest configured parent.
+        """
+        super().__init__()
+        self.every = {name: max(1, round(1 / rate)) if rate > 0 else 0 for name, rate in rates.items()}
+        self._counters: Dict[tuple, count] = {}
+        self._resolved: Dict[str, Optional[int]] = {}
+
+    def _every(self, name: str) -> Optional[int]:
+        if name not in self._resolved:
+            every = None
+            candidate = name
+            while candidate:
+                if candidate in self.every:
+                    every = self.every[candidate]
+                    break
+                candidate = candidate.rpartition(".")[0]
+            self._resolved[name] = every
+        return self._resolved[name]
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG:
+            return True
+        every = self._every(record.name)
+        if every is None or every == 1:
+            return True
+        if every == 0:
+            return False
+        key = (record.name, record.msg, getattr(record, "guild_id", None))
+        counter = self._counters.get(key)
+        if counter is None:
+            counter = self._counters[key] = count()
+        if next(counter) % every:
+            return False
+        record.sampled = every
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Formats records as one JSON object per line.
+
+    Keys: time, level, logger, function, line, message, and guild_id, match_id and
+    sampled (1 of how many records was kept) when set.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "function": record.funcName,
+            "line": record.lineno,
+            "message": record.getMessage(),
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["message"] += "\n" + record.exc_text
+        for key in ("guild_id", "match_id", "sampled"):
+            value = getattr(record, key, None)
+            if value is not None:
+                entry[key] = value
+        return json.dumps(entry, default=str)
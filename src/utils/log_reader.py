@@ -0,0 +1,284 @@
+"""
+Reads the bot's log file and its rotated backups from the end.
+
+Queries read backward from the end of bot.log and continue into bot.log.1, bot.log.2
+and so on. They stop as soon as enough matching entries were found, so the cost depends
+on the entries returned, not on the size of the logs.
+
+Both log formats are read: JSON lines, and text lines in which lines that do not start
+with a timestamp, such as tracebacks, belong to the entry above them.
+"""
+import json
+import logging
+import os
+import re
+import time
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from src.utils.config import LOG_FILE_PATH, file_handler
+
+# Bytes read per step when scanning a file backward
+CHUNK_SIZE = 64 * 1024
+
+# Seconds between checks for new lines when following the log
+FOLLOW_INTERVAL = 1.0
+
+# An entry's first line is a JSON object or starts with its timestamp, e.g. "2025-03-01 18:02:11,532 - "
+_ENTRY_START = re.compile(r'^(\{"|\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2},\d{3} - )')
+
+# Keys of JSON records copied into entries besides the standard ones
+_CONTEXT_KEYS = ("guild_id", "match_id", "sampled")
+
+LogEntry = Dict[str, Any]
+
+
+def _parse_json_line(line: str) -> Optional[LogEntry]:
+    """Parse a line written by the JSON formatter, or return None if it is not one."""
+    try:
+        record = json.loads(line)
+    except ValueError:
+        return None
+    if not isinstance(record, dict):
+        return None
+    entry = {
+        "timestamp": str(record.get("time", "")),
+        "level": str(record.get("level", "")),
+        "logger": str(record.get("logger", "")),
+        "function": str(record.get("function", "")),
+        "line": str(record.get("line", "")),
+        "message": str(record.get("message", ""))
+    }
+    for key in _CONTEXT_KEYS:
+        if key in record:
+            entry[key] = record[key]
+    return entry
+
+
+def parse_log_line(line: str) -> LogEntry:
+    """
+    Parse a line written by the bot's file formatter.
+
+    Args:
+        line (str): A JSON record, or "time - level - logger - function - line number - message".
+
+    Returns:
+        Dict: timestamp, level, logger, function, line and message, plus guild_id and
+        match_id if the record has them. Lines in another format have only a message.
+    """
+    if line.startswith('{'):
+        entry = _parse_json_line(line)
+        if entry is not None:
+            return entry
+    parts = line.split(' - ', 5)
+    if len(parts) == 6 and _ENTRY_START.match(line):
+        timestamp, level, logger_name, function, line_number, message = parts
+        return {
+            "timestamp": timestamp.strip(),
+            "level": level.strip(),
+            "logger": logger_name.strip(),
+            "function": function.strip(),
+            "line": line_number.strip(),
+            "message": message.rstrip()
+        }
+    return {
+        "timestamp": "",
+        "level": "",
+        "logger": "",
+        "function": "",
+        "line": "",
+        "message": line.rstrip()
+    }
+
+
+def _reverse_lines(path: str, chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+    """Yield the lines of a file from the last to the first."""
+    with open(path, 'rb') as f:
+        position = f.seek(0, os.SEEK_END)
+        remainder = b''
+        while position > 0:
+            size = min(chunk_size, position)
+            position -= size
+            f.seek(position)
+            lines = (f.read(size) + remainder).split(b'\n')
+            # The first piece may be the end of a line that starts in the previous chunk
+            remainder = lines.pop(0)
+            for line in reversed(lines):
+                yield line.decode('utf-8', errors='replace')
+        yield remainder.decode('utf-8', errors='replace')
+
+
+def _group_backward(lines: Iterable[str]) -> Iterator[LogEntry]:
+    """Group lines read backward into entries, attaching continuation lines to their entry."""
+    continuation: List[str] = []
+    for line in lines:
+        line = line.rstrip('\r')
+        if not line:
+            continue
+        if not _ENTRY_START.match(line):
+            continuation.append(line)
+            continue
+        entry = parse_log_line(line)
+        if continuation:
+            entry["message"] += "\n" + "\n".join(reversed(continuation))
+            continuation = []
+        yield entry
+    if continuation:
+        # The first entry of the file started in an older backup
+        yield parse_log_line("\n".join(reversed(continuation)))
+
+
+class LogFilter:
+    """
+    Matches log entries by minimum level, logger and guild.
+    """
+
+    def __init__(self, level: Optional[str] = None, logger_name: Optional[str] = None,
+                 guild_id: Optional[int] = None):
+        """
+        Initialize the filter. Criteria left as None match every entry.
+
+        Args:
+            level (str, optional): Minimum level, e.g. "WARNING".
+            logger_name (str, optional): Logger name; its child loggers match too.
+            guild_id (int, optional): Guild the entry is tagged with or that appears in the message.
+
+        Raises:
+            ValueError: If the level is unknown.
+        """
+        self.level = None
+        if level:
+            self.level = logging.getLevelName(level.upper())
+            if not isinstance(self.level, int):
+                raise ValueError(f"Unknown log level '{level}'")
+        self.logger_name = logger_name
+        self.guild_id = int(guild_id) if guild_id is not None else None
+        self.guild_pattern = re.compile(rf"\b{self.guild_id}\b") if guild_id is not None else None
+
+    def __call__(self, entry: LogEntry) -> bool:
+        if self.level is not None:
+            level = logging.getLevelName(entry["level"])
+            if not isinstance(level, int) or level < self.level:
+                return False
+        if self.logger_name and not (entry["logger"] == self.logger_name
+                                     or entry["logger"].startswith(self.logger_name + ".")):
+            return False
+        if self.guild_pattern is not None and entry.get("guild_id") != self.guild_id \
+                and not self.guild_pattern.search(entry["message"]):
+            return False
+        return True
+
+
+class LogReader:
+    """
+    Queries and follows the bot's log across rotated files.
+    """
+
+    def __init__(self, path: str = LOG_FILE_PATH, backup_count: int = file_handler.backupCount):
+        """
+        Initialize the reader.
+
+        Args:
+            path (str, optional): The current log file.
+            backup_count (int, optional): Rotated backups kept next to it (path.1, path.2, ...).
+        """
+        self.path = path
+        self.backup_count = backup_count
+
+    def files(self) -> List[str]:
+        """Get the existing log files, newest first."""
+        paths = [self.path] + [f"{self.path}.{n}" for n in range(1, self.backup_count + 1)]
+        return [path for path in paths if os.path.exists(path)]
+
+    def entries(self) -> Iterator[LogEntry]:
+        """Yield log entries from the newest to the oldest."""
+        for path in self.files():
+            try:
+                yield from _group_backward(_reverse_lines(path))
+            except FileNotFoundError:
+                # Rotated away while reading; its entries are in the next backup
+                continue
+
+    def query(self, limit: int = 100, offset: int = 0, log_filter: Optional[LogFilter] = None) -> List[LogEntry]:
+        """
+        Get the latest log entries.
+
+        Args:
+            limit (int, optional): Entries to return at most. Defaults to 100.
+            offset (int, optional): Latest matching entries to skip. Defaults to 0.
+            log_filter (LogFilter, optional): Only return matching entries.
+
+        Returns:
+            List[Dict]: The entries, oldest first.
+        """
+        entries = self.entries()
+        if log_filter is not None:
+            entries = filter(log_filter, entries)
+        page = list(islice(entries, max(offset, 0), max(offset, 0) + max(limit, 0)))
+        page.reverse()
+        return page
+
+    def follow(self, log_filter: Optional[LogFilter] = None,
+               interval: float = FOLLOW_INTERVAL) -> Iterator[List[LogEntry]]:
+        """
+        Follow new log entries, like tail -f, across rotations.
+
+        Args:
+            log_filter (LogFilter, optional): Only yield matching entries.
+            interval (float, optional): Seconds between checks for new lines.
+
+        Yields:
+            List[Dict]: The entries written since the previous check, oldest first;
+            empty when nothing matching was written.
+        """
+        f = None
+        from_start = not os.path.exists(self.path)  # Only entries written from now on
+        buffer = b''
+        held: Optional[LogEntry] = None  # Latest entry; traceback lines may still follow
+        try:
+            while True:
+                if f is None and os.path.exists(self.path):
+                    f = open(self.path, 'rb')
+                    if not from_start:
+                        f.seek(0, os.SEEK_END)
+                data = f.read() if f is not None else b''
+                rotated = f is not None and self._rotated(f)
+                if rotated:
+                    # Read what was written before the rotation, then continue in the new file
+                    data += f.read()
+                    f.close()
+                    f = None
+                    from_start = True
+
+                buffer += data
+                *lines, buffer = buffer.split(b'\n')
+                entries: List[LogEntry] = []
+                for line in lines:
+                    line = line.decode('utf-8', errors='replace').rstrip('\r')
+                    if not line:
+                        continue
+                    if _ENTRY_START.match(line) or held is None:
+                        if held is not None:
+                            entries.append(held)
+                        held = parse_log_line(line)
+                    else:
+                        held["message"] += "\n" + line
+                if held is not None and (rotated or not data):
+                    # Nothing more was written to its file; the entry is complete
+                    entries.append(held)
+                    held = None
+
+                yield [entry for entry in entries if log_filter is None or log_filter(entry)]
+                time.sleep(interval)
+        finally:
+            if f is not None:
+                f.close()
+
+    def _rotated(self, f) -> bool:
+        """Check whether the open file was renamed away or truncated."""
+        try:
+            current = os.stat(self.path)
+        except FileNotFoundError:
+            return True
+        opened = os.fstat(f.fileno())
+        return current.st_ino != opened.st_ino or current.st_size < f.tell()
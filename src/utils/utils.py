@@ -8,6 +8,26 @@ def min_to_sec(time_str):
     return int(time_str)
 
 
+def parse_game_time(time_str):
+    """
+    Convert an in-game clock reading ('25:30', '-00:45', '1530', '-45') to seconds.
+
+    Unlike parse_initial_countdown, the value is read as the game clock itself:
+    negative values are before the horn.
+    """
+    time_str = time_str.strip()
+    negative = time_str.startswith("-")
+    seconds = min_to_sec(time_str.lstrip("-"))
+    return -seconds if negative else seconds
+
+
+def format_game_time(seconds):
+    """Format game seconds as 'MM:SS', with a leading '-' before the horn."""
+    sign = "-" if seconds < 0 else ""
+    minutes, secs = divmod(abs(int(seconds)), 60)
+    return f"{sign}{minutes:02d}:{secs:02d}"
+
+
 def parse_initial_countdown(countdown_str):
     """
     Interprets an input string (like '10:00', '-05:30', '300', '-120') as either a positive countdown or
@@ -1,17 +1,51 @@
 """
 API endpoints for the Dota Discord Bot Dashboard.
 """
-import asyncio
+import hashlib
+import time
 
-from flask import Blueprint, request, jsonify
+import msgpack
+from flask import Blueprint, request, jsonify, Response
 from typing import Dict, List, Any, Optional, Union
 
-from .bot_connector import BotConnector
-from .db_connector import get_events, add_event, remove_event, get_settings, update_settings
+from src.managers.event_transfer import EventValidationError, dump_document, parse_document
+from src.ipc.client import IPCConnectionError
+from src.utils.log_reader import LogFilter
+from .bot_connector import bot_connector
+from .state_stream import GuildStateStream, StreamLimitError, format_event
+from .db_connector import (
+    get_events, add_event, remove_event, get_settings, update_settings, export_events, import_events,
+    apply_batch, get_data_version, get_guild_data
+)
+from .response_cache import ResponseCache, conditional_json
 
 # Initialize blueprint
 api_blueprint = Blueprint('api', __name__)
-bot_connector = BotConnector()
+guild_stream = GuildStateStream(bot_connector.ipc)
+response_cache = ResponseCache()
+
+# Parts of a guild snapshot that can be selected with the fields parameter
+SNAPSHOT_FIELDS = ("status", "timer", "gsi", "events", "settings")
+
+
+def control_response(result: Dict[str, Any]):
+    """
+    Build the response to a timer operation from its TimerResult dict.
+
+    Operations refused in the current timer state are answered with 409, invalid
+    arguments with 400 and failures with 500.
+    """
+    if result["ok"]:
+        return jsonify({
+            "status": "success",
+            "data": result
+        })
+    status_code = {"invalid_argument": 400, "error": 500}.get(result["code"], 409)
+    return jsonify({
+        "status": "error",
+        "message": result["message"],
+        "data": result
+    }), status_code
 
 
 # Status endpoint
@@ -48,6 +82,116 @@ def get_timers() -> Dict[str, Any]:
         }), 500
 
 
+@api_blueprint.route('/stream', methods=['GET'])
+def stream_guild_state():
+    """
+    Stream live timer and GSI state as server-sent events.
+
+    Query parameters:
+        guild_id: Guild to receive; repeat it or separate IDs with commas. All guilds if omitted.
+    """
+    try:
+        guild_ids = [int(guild_id) for value in request.args.getlist('guild_id')
+                     for guild_id in value.split(',') if guild_id.strip()]
+    except ValueError:
+        return jsonify({
+            "status": "error",
+            "message": "guild_id must be a number"
+        }), 400
+
+    try:
+        events = guild_stream.open(guild_ids or None)
+    except StreamLimitError as e:
+        return jsonify({
+            "status": "error",
+            "message": str(e)
+        }), 503
+
+    return Response(events, mimetype='text/event-stream', headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no",  # Keep reverse proxies from buffering the stream
+    })
+
+
+@api_blueprint.route('/snapshot', methods=['GET'])
+def get_snapshot():
+    """
+    Get everything a dashboard view shows in one request.
+
+    Query parameters:
+        guild_id: Guild to include; repeat it or separate IDs with commas. Guilds with an
+            active timer if omitted.
+        fields: Parts to include, separated by commas: status, timer, gsi, events, settings.
+            All if omitted.
+        mode: Game mode of the events. Defaults to 'regular'.
+        format: 'msgpack' for a msgpack body instead of JSON; also chosen by
+            Accept: application/msgpack.
+
+    Returns:
+        {"status": "success", "data": {"status": ..., "guilds": {guild_id: {...}}}}, or 304
+        if the client's copy is current.
+    """
+    try:
+        guild_ids = [int(guild_id) for value in request.args.getlist('guild_id')
+                     for guild_id in value.split(',') if guild_id.strip()]
+    except ValueError:
+        return jsonify({
+            "status": "error",
+            "message": "guild_id must be a number"
+        }), 400
+
+    fields = [field.strip() for field in request.args.get('fields', ','.join(SNAPSHOT_FIELDS)).split(',')
+              if field.strip()]
+    unknown = set(fields) - set(SNAPSHOT_FIELDS)
+    if unknown:
+        return jsonify({
+            "status": "error",
+            "message": f"Unknown fields: {', '.join(sorted(unknown))}"
+        }), 400
+    mode = request.args.get('mode', 'regular')
+
+    try:
+        snapshot: Dict[str, Any] = {}
+        timers: Dict[str, Any] = {}
+        gsi: Dict[str, Any] = {}
+        if "status" in fields or "timer" in fields or "gsi" in fields or not guild_ids:
+            # One IPC request answers the bot status, the timers and the GSI state
+            status = bot_connector.get_status(gsi="gsi" in fields, guild_ids=guild_ids or None)
+            timers = {str(guild_id): timer for guild_id, timer in status.pop("active_timers", {}).items()}
+            gsi = {str(guild_id): state for guild_id, state in status.pop("gsi", {}).items()}
+            if "status" in fields:
+                snapshot["status"] = status
+        if not guild_ids:
+            guild_ids = [int(guild_id) for guild_id in timers]
+
+        guilds = get_guild_data(guild_ids, mode, events="events" in fields, settings="settings" in fields) \
+            if "events" in fields or "settings" in fields else {str(guild_id): {} for guild_id in guild_ids}
+        for guild_id in guild_ids:
+            guild = guilds[str(guild_id)]
+            if "timer" in fields:
+                guild["timer"] = timers.get(str(guild_id))
+            if "gsi" in fields:
+                guild["gsi"] = gsi.get(str(guild_id))
+        snapshot["guilds"] = guilds
+
+        payload = {"status": "success", "data": snapshot}
+        if request.args.get('format') == 'msgpack' or request.accept_mimetypes.best_match(
+                ['application/json', 'application/msgpack']) == 'application/msgpack':
+            response = Response(msgpack.packb(payload, use_bin_type=True, default=str),
+                                mimetype='application/msgpack')
+        else:
+            response = jsonify(payload)
+
+        response.set_etag(hashlib.blake2b(response.get_data(), digest_size=8).hexdigest())
+        response.headers["Cache-Control"] = "no-cache"
+        return response.make_conditional(request)
+    except Exception as e:
+        return jsonify({
+            "status": "error",
+            "message": str(e)
+        }), 500
+
+
 @api_blueprint.route('/timers/start', methods=['POST'])
 def start_timer() -> Dict[str, Any]:
     """Start a new game timer."""
@@ -63,11 +207,12 @@ def start_timer() -> Dict[str, Any]:
                 "message": "guild_id and countdown are required"
             }), 400
 
-        result = bot_connector.start_timer(guild_id, countdown, mode)
+        return control_response(bot_connector.start_timer(guild_id, countdown, mode))
+    except IPCConnectionError as e:
         return jsonify({
-            "status": "success",
-            "data": result
-        })
+            "status": "error",
+            "message": str(e)
+        }), 503
     except Exception as e:
         return jsonify({
             "status": "error",
@@ -88,11 +233,12 @@ def stop_timer() -> Dict[str, Any]:
                 "message": "guild_id is required"
             }), 400
 
-        result = bot_connector.stop_timer(guild_id)
+        return control_response(bot_connector.stop_timer(guild_id))
+    except IPCConnectionError as e:
         return jsonify({
-            "status": "success",
-            "data": result
-        })
+            "status": "error",
+            "message": str(e)
+        }), 503
     except Exception as e:
         return jsonify({
             "status": "error",
@@ -113,11 +259,12 @@ def pause_timer() -> Dict[str, Any]:
                 "message": "guild_id is required"
             }), 400
 
-        result = bot_connector.pause_timer(guild_id)
+        return control_response(bot_connector.pause_timer(guild_id))
+    except IPCConnectionError as e:
         return jsonify({
-            "status": "success",
-            "data": result
-        })
+            "status": "error",
+            "message": str(e)
+        }), 503
     except Exception as e:
         return jsonify({
             "status": "error",
@@ -138,11 +285,40 @@ def unpause_timer() -> Dict[str, Any]:
                 "message": "guild_id is required"
             }), 400
 
-        result = bot_connector.unpause_timer(guild_id)
+        return control_response(bot_connector.unpause_timer(guild_id))
+    except IPCConnectionError as e:
         return jsonify({
-            "status": "success",
-            "data": result
-        })
+            "status": "error",
+            "message": str(e)
+        }), 503
+    except Exception as e:
+        return jsonify({
+            "status": "error",
+            "message": str(e)
+        }), 500
+
+
+@api_blueprint.route('/timers/sync', methods=['POST'])
+def sync_timer() -> Dict[str, Any]:
+    """Correct the clock of an active game timer to the given in-game time."""
+    data = request.json
+    try:
+        guild_id = data.get('guild_id')
+        game_time = data.get('time')
+        replay = bool(data.get('replay', False))
+
+        if not guild_id or game_time is None:
+            return jsonify({
+                "status": "error",
+                "message": "guild_id and time are required"
+            }), 400
+
+        return control_response(bot_connector.sync_timer(guild_id, str(game_time), replay))
+    except IPCConnectionError as e:
+        return jsonify({
+            "status": "error",
+            "message": str(e)
+        }), 503
     except Exception as e:
         return jsonify({
             "status": "error",
@@ -153,7 +329,7 @@ def unpause_timer() -> Dict[str, Any]:
 # Events endpoints
 @api_blueprint.route('/events', methods=['GET'])
 def get_all_events() -> Dict[str, Any]:
-    """Get all events for a guild."""
+    """Get all events for a guild. Answered with 304 if the client's copy is current."""
     guild_id = request.args.get('guild_id')
     mode = request.args.get('mode', 'regular')
 
@@ -164,11 +340,9 @@ def get_all_events() -> Dict[str, Any]:
         }), 400
 
     try:
-        events = get_events(guild_id, mode)
-        return jsonify({
-            "status": "success",
-            "data": events
-        })
+        version, updated_at = get_data_version(guild_id, 'events')
+        return conditional_json(('events', str(guild_id), mode), version, updated_at,
+                                lambda: get_events(guild_id, mode), response_cache)
     except Exception as e:
         return jsonify({
             "status": "error",
@@ -264,11 +438,11 @@ def delete_event(event_id: int) -> Dict[str, Any]:
         }), 500
 
 
-# Settings endpoints
-@api_blueprint.route('/settings', methods=['GET'])
-def get_all_settings() -> Dict[str, Any]:
-    """Get all settings for a guild."""
+@api_blueprint.route('/events/export', methods=['GET'])
+def export_all_events():
+    """Export the full event set of a guild as JSON or YAML."""
     guild_id = request.args.get('guild_id')
+    fmt = request.args.get('format', 'json').lower()
 
     if not guild_id:
         return jsonify({
@@ -276,11 +450,134 @@ def get_all_settings() -> Dict[str, Any]:
             "message": "guild_id is required"
         }), 400
 
+    if fmt not in ('json', 'yaml'):
+        return jsonify({
+            "status": "error",
+            "message": "format must be 'json' or 'yaml'"
+        }), 400
+
+    try:
+        document = export_events(guild_id)
+        mimetype = 'application/json' if fmt == 'json' else 'application/x-yaml'
+        return Response(
+            dump_document(document, fmt),
+            mimetype=mimetype,
+            headers={"Content-Disposition": f"attachment; filename=events_{guild_id}.{fmt}"}
+        )
+    except Exception as e:
+        return jsonify({
+            "status": "error",
+            "message": str(e)
+        }), 500
+
+
+def parse_flag(value: Any, name: str, default: bool) -> bool:
+    """
+    Read a boolean request parameter given as a JSON boolean or a query string.
+
+    Args:
+        value: The parameter, or None if it was not given.
+        name (str): The parameter's name, for the error message.
+        default (bool): The value if the parameter was not given.
+
+    Returns:
+        bool: The parameter's value.
+
+    Raises:
+        ValueError: If the value is neither a boolean nor 'true' or 'false'.
+    """
+    if value is None:
+        return default
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str) and value.lower() in ('true', 'false'):
+        return value.lower() == 'true'
+    raise ValueError(f"{name} must be true or false")
+
+
+@api_blueprint.route('/events/import', methods=['POST'])
+def import_all_events() -> Dict[str, Any]:
+    """
+    Import a full event set for a guild.
+
+    Accepts either a JSON body with 'guild_id' and a 'document' (decoded object or
+    raw JSON/YAML string), or a raw JSON/YAML body with 'guild_id' as a query parameter.
+    Set 'dry_run' to get the diff preview without applying it, and 'replace' to false to
+    keep events missing from the document; both take a boolean or 'true'/'false'.
+    """
+    try:
+        params = (request.json or {}) if request.is_json else request.args
+        try:
+            replace = parse_flag(params.get('replace'), 'replace', True)
+            dry_run = parse_flag(params.get('dry_run'), 'dry_run', False)
+        except ValueError as e:
+            return jsonify({
+                "status": "error",
+                "message": str(e)
+            }), 400
+
+        guild_id = params.get('guild_id')
+        if request.is_json:
+            fmt = params.get('format', 'json').lower()
+            content = params.get('document')
+        else:
+            fmt = params.get('format', 'yaml').lower()
+            content = request.get_data()
+
+        if not guild_id or not content:
+            return jsonify({
+                "status": "error",
+                "message": "guild_id and document are required"
+            }), 400
+
+        document = parse_document(content, fmt)
+        result = import_events(guild_id, document, replace=replace, dry_run=dry_run)
+        return jsonify({
+            "status": "success",
+            "data": result
+        })
+    except EventValidationError as e:
+        return jsonify({
+            "status": "error",
+            "message": "Invalid event document",
+            "errors": e.errors
+        }), 400
+    except Exception as e:
+        return jsonify({
+            "status": "error",
+            "message": str(e)
+        }), 500
+
+
+@api_blueprint.route('/batch', methods=['POST'])
+def apply_batch_operations() -> Dict[str, Any]:
+    """
+    Apply several event and settings changes for a guild in one transaction.
+
+    Expects 'guild_id' and an 'operations' list. If any operation is invalid,
+    nothing is written and the per-operation results explain why.
+    """
+    data = request.json or {}
     try:
-        settings = get_settings(guild_id)
+        guild_id = data.get('guild_id')
+        operations = data.get('operations')
+
+        if not guild_id or not isinstance(operations, list) or not operations:
+            return jsonify({
+                "status": "error",
+                "message": "guild_id and a non-empty operations list are required"
+            }), 400
+
+        result = apply_batch(guild_id, operations)
+        if not result["applied"]:
+            return jsonify({
+                "status": "error",
+                "message": "Batch rejected; no changes were applied",
+                "data": result
+            }), 400
         return jsonify({
             "status": "success",
-            "data": settings
+            "data": result
         })
     except Exception as e:
         return jsonify({
@@ -289,6 +586,29 @@ def get_all_settings() -> Dict[str, Any]:
         }), 500
 
 
+# Settings endpoints
+@api_blueprint.route('/settings', methods=['GET'])
+def get_all_settings() -> Dict[str, Any]:
+    """Get all settings for a guild. Answered with 304 if the client's copy is current."""
+    guild_id = request.args.get('guild_id')
+
+    if not guild_id:
+        return jsonify({
+            "status": "error",
+            "message": "guild_id is required"
+        }), 400
+
+    try:
+        version, updated_at = get_data_version(guild_id, 'settings')
+        return conditional_json(('settings', str(guild_id)), version, updated_at,
+                                lambda: get_settings(guild_id), response_cache)
+    except Exception as e:
+        return jsonify({
+            "status": "error",
+            "message": str(e)
+        }), 500
+
+
 @api_blueprint.route('/settings', methods=['PUT'])
 def update_all_settings() -> Dict[str, Any]:
     """Update settings for a guild."""
@@ -337,19 +657,21 @@ def roshan_command() -> Dict[str, Any]:
             }), 400
 
         if action == 'start':
-            result = bot_connector.start_roshan_timer(guild_id)
+            result = bot_connector.start_child_timer(guild_id, 'roshan')
         elif action == 'cancel':
-            result = bot_connector.cancel_roshan_timer(guild_id)
+            result = bot_connector.cancel_child_timer(guild_id, 'roshan')
         else:
             return jsonify({
                 "status": "error",
                 "message": "Invalid action"
             }), 400
 
+        return control_response(result)
+    except IPCConnectionError as e:
         return jsonify({
-            "status": "success",
-            "data": result
-        })
+            "status": "error",
+            "message": str(e)
+        }), 503
     except Exception as e:
         return jsonify({
             "status": "error",
@@ -372,19 +694,21 @@ def glyph_command() -> Dict[str, Any]:
             }), 400
 
         if action == 'start':
-            result = bot_connector.start_glyph_timer(guild_id)
+            result = bot_connector.start_child_timer(guild_id, 'glyph')
         elif action == 'cancel':
-            result = bot_connector.cancel_glyph_timer(guild_id)
+            result = bot_connector.cancel_child_timer(guild_id, 'glyph')
         else:
             return jsonify({
                 "status": "error",
                 "message": "Invalid action"
             }), 400
 
+        return control_response(result)
+    except IPCConnectionError as e:
         return jsonify({
-            "status": "success",
-            "data": result
-        })
+            "status": "error",
+            "message": str(e)
+        }), 503
     except Exception as e:
         return jsonify({
             "status": "error",
@@ -407,19 +731,21 @@ def tormentor_command() -> Dict[str, Any]:
             }), 400
 
         if action == 'start':
-            result = bot_connector.start_tormentor_timer(guild_id)
+            result = bot_connector.start_child_timer(guild_id, 'tormentor')
         elif action == 'cancel':
-            result = bot_connector.cancel_tormentor_timer(guild_id)
+            result = bot_connector.cancel_child_timer(guild_id, 'tormentor')
         else:
             return jsonify({
                 "status": "error",
                 "message": "Invalid action"
             }), 400
 
+        return control_response(result)
+    except IPCConnectionError as e:
         return jsonify({
-            "status": "success",
-            "data": result
-        })
+            "status": "error",
+            "message": str(e)
+        }), 503
     except Exception as e:
         return jsonify({
             "status": "error",
@@ -428,14 +754,37 @@ def tormentor_command() -> Dict[str, Any]:
 
 
 # Logs endpoint
+def log_filter_from_request() -> LogFilter:
+    """
+    Build a log filter from the level, logger and guild_id query parameters.
+
+    Raises:
+        ValueError: If the level is unknown or guild_id is not a number.
+    """
+    guild_id = request.args.get('guild_id')
+    return LogFilter(
+        level=request.args.get('level'),
+        logger_name=request.args.get('logger'),
+        guild_id=int(guild_id) if guild_id else None
+    )
+
+
 @api_blueprint.route('/logs', methods=['GET'])
 def get_logs() -> Dict[str, Any]:
-    """Get bot logs."""
+    """Get the latest bot logs, optionally filtered by level, logger and guild_id."""
     limit = request.args.get('limit', 100, type=int)
     offset = request.args.get('offset', 0, type=int)
 
     try:
-        logs = bot_connector.get_logs(limit, offset)
+        log_filter = log_filter_from_request()
+    except ValueError as e:
+        return jsonify({
+            "status": "error",
+            "message": str(e)
+        }), 400
+
+    try:
+        logs = bot_connector.get_logs(limit, offset, log_filter)
         return jsonify({
             "status": "success",
             "data": logs
@@ -446,11 +795,40 @@ def get_logs() -> Dict[str, Any]:
             "message": str(e)
         }), 500
 
+
+@api_blueprint.route('/logs/stream', methods=['GET'])
+def stream_logs():
+    """Stream new bot log entries as server-sent "log" events, with the same filters as /logs."""
+    try:
+        log_filter = log_filter_from_request()
+    except ValueError as e:
+        return jsonify({
+            "status": "error",
+            "message": str(e)
+        }), 400
+
+    def events():
+        quiet_since = time.monotonic()
+        for entries in bot_connector.log_reader.follow(log_filter):
+            for entry in entries:
+                yield format_event("log", entry)
+            if entries:
+                quiet_since = time.monotonic()
+            elif time.monotonic() - quiet_since >= guild_stream.heartbeat_interval:
+                # Reveals disconnected clients, which end the generator
+                yield format_event("heartbeat", {})
+                quiet_since = time.monotonic()
+
+    return Response(events(), mimetype='text/event-stream', headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no",
+    })
+
 # GSI-related commands
 @api_blueprint.route('/commands/gsi-sync', methods=['POST'])
 def toggle_gsi_sync():
-    """Toggle GSI auto-sync for a guild."""
-    data = request.json
+    """Toggle GSI auto-sync for a guild in the bot."""
+    data = request.json or {}
     try:
         guild_id = data.get('guild_id')
 
@@ -460,39 +838,17 @@ def toggle_gsi_sync():
                 "message": "guild_id is required"
             }), 400
 
-        # Mock the context for the command
-        class MockContext:
-            def __init__(self, guild_id):
-                self.guild = type('obj', (object,), {
-                    'id': guild_id,
-                })
-                self.channel = type('obj', (object,), {
-                    'id': None,
-                    'send': lambda *args, **kwargs: None
-                })
-                self.author = type('obj', (object,), {
-                    'name': 'WebApp'
-                })
-
-        ctx = MockContext(guild_id)
-
-        # Find the GSI cog and execute the command
-        from discord.ext.commands import Bot
-        gsi_cog = bot.get_cog('GSICog')
-        if gsi_cog:
-            asyncio.create_task(gsi_cog.gsi_sync(ctx))
-            return jsonify({
-                "status": "success",
-                "data": {"message": "GSI sync toggled"}
-            })
-        else:
-            return jsonify({
-                "status": "error",
-                "message": "GSI cog not found"
-            }), 500
-
+        return jsonify({
+            "status": "success",
+            "data": bot_connector.set_gsi_sync(int(guild_id))
+        })
+    except IPCConnectionError as e:
+        return jsonify({
+            "status": "error",
+            "message": str(e)
+        }), 503
     except Exception as e:
         return jsonify({
             "status": "error",
             "message": str(e)
-        }), 500
\ No newline at end of file
+        }), 500
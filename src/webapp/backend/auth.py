@@ -3,14 +3,20 @@ Module for the Dota Discord Bot Dashboard.
 """
 import os
 import time
-import uuid
+import hmac
+import json
+import base64
 import hashlib
 import logging
-from datetime import datetime, timedelta
+import secrets
+import tempfile
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
 from functools import wraps
 from typing import Dict, Any, Optional, Tuple
 
-from flask import Blueprint, request, jsonify, g, current_app
+from flask import Blueprint, request, jsonify, g
 from dotenv import load_dotenv
 
 auth_blueprint = Blueprint('auth', __name__)
@@ -23,98 +29,186 @@ load_dotenv()
 ENV_ADMIN_USER = os.getenv('ADMIN_USERNAME', 'admin')
 ENV_ADMIN_PASS = os.getenv('ADMIN_PASSWORD', 'admin')
 
-# Token storage with improved structure
-class TokenStorage:
-    def __init__(self):
-        self.tokens: Dict[str, Dict[str, Any]] = {}
-        self.failed_attempts: Dict[str, Dict[str, Any]] = {}
-
-    def add_token(self, username: str, role: str, expiry_hours: int = 12) -> Tuple[str, datetime]:
-        """Add a new token for a user."""
-        token = str(uuid.uuid4())
-        expiry = datetime.utcnow() + timedelta(hours=expiry_hours)
-
-        self.tokens[token] = {
-            'username': username,
-            'role': role,
-            'expiry': expiry,
-            'created_at': datetime.utcnow(),
-            'last_used': datetime.utcnow()
-        }
+# Key that signs session tokens, generated on first start unless DASHBOARD_SECRET_KEY
+# is set. It lives in the data directory shared by every worker and container.
+SECRET_KEY_FILE = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..',
+                                               'data', 'dashboard_secret.key'))
+SECRET_KEY_BYTES = 32
 
-        return token, expiry
+TOKEN_EXPIRY_HOURS = 12
 
-    def validate_token(self, token: str) -> Optional[Dict[str, Any]]:
-        """Validate a token and return user info if valid."""
-        if token not in self.tokens:
-            return None
+# Failed logins allowed per client address within the window
+LOGIN_ATTEMPT_LIMIT = 5
+LOGIN_ATTEMPT_WINDOW = 3600
+# Client addresses tracked at most; the least recently seen are forgotten first
+LOGIN_TRACKED_CLIENTS = 10000
 
-        token_data = self.tokens[token]
-        now = datetime.utcnow()
 
-        # Check expiration
-        if now > token_data['expiry']:
-            del self.tokens[token]
-            return None
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode()
 
-        # Update last used time
-        token_data['last_used'] = now
 
-        return token_data
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + '=' * (-len(data) % 4))
 
-    def remove_token(self, token: str) -> bool:
-        """Remove a token (logout)."""
-        if token in self.tokens:
-            del self.tokens[token]
-            return True
-        return False
 
-    def record_failed_attempt(self, ip_address: str) -> int:
-        """Record a failed login attempt and return the total attempts."""
-        now = datetime.utcnow()
+def load_secret_key(path: str = SECRET_KEY_FILE) -> bytes:
+    """
+    Get the key that signs session tokens.
 
-        if ip_address not in self.failed_attempts:
-            self.failed_attempts[ip_address] = {
-                'attempts': 1,
-                'first_attempt': now,
-                'last_attempt': now
-            }
-        else:
-            # Reset attempts if last attempt was more than 1 hour ago
-            if now - self.failed_attempts[ip_address]['last_attempt'] > timedelta(hours=1):
-                self.failed_attempts[ip_address] = {
-                    'attempts': 1,
-                    'first_attempt': now,
-                    'last_attempt': now
-                }
-            else:
-                self.failed_attempts[ip_address]['attempts'] += 1
-                self.failed_attempts[ip_address]['last_attempt'] = now
-
-        return self.failed_attempts[ip_address]['attempts']
-
-    def cleanup_expired(self):
-        """Clean up expired tokens and old failed attempts."""
-        now = datetime.utcnow()
-
-        # Clean expired tokens
-        expired_tokens = [
-            token for token, data in self.tokens.items()
-            if now > data['expiry']
-        ]
-        for token in expired_tokens:
-            del self.tokens[token]
-
-        # Clean old failed attempts (older than 24 hours)
-        old_attempts = [
-            ip for ip, data in self.failed_attempts.items()
-            if now - data['last_attempt'] > timedelta(hours=24)
-        ]
-        for ip in old_attempts:
-            del self.failed_attempts[ip]
-
-# Initialize token storage
-token_storage = TokenStorage()
+    DASHBOARD_SECRET_KEY takes precedence. Otherwise the key is read from the key file,
+    which is created with a random key on first use; workers starting at the same time
+    agree on whichever key was written first.
+
+    Args:
+        path (str, optional): The key file.
+
+    Returns:
+        bytes: The key.
+    """
+    key = os.getenv('DASHBOARD_SECRET_KEY')
+    if key:
+        return key.encode()
+    try:
+        with open(path, 'rb') as f:
+            return f.read()
+    except FileNotFoundError:
+        pass
+
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    # mkstemp creates the file readable by its owner only; linking it into place fails if
+    # another worker got there first, so a partially written key is never read
+    fd, temp_path = tempfile.mkstemp(dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(secrets.token_bytes(SECRET_KEY_BYTES))
+        os.link(temp_path, path)
+        logger.info(f"Generated a new dashboard secret key in {path}")
+    except FileExistsError:
+        pass
+    finally:
+        os.unlink(temp_path)
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+class TokenSigner:
+    """
+    Issues and checks self-contained session tokens.
+
+    A token is "<payload>.<signature>": the base64 encoded username, role and expiry,
+    and their HMAC-SHA256. Checking a token needs only the key, so any worker can
+    check tokens issued by another without a shared store. Tokens cannot be revoked
+    before they expire; logging out discards the token on the client.
+    """
+
+    def __init__(self, key: Optional[bytes] = None):
+        """
+        Initialize the signer.
+
+        Args:
+            key (bytes, optional): The signing key; loaded with load_secret_key on first use
+                if None.
+        """
+        self._key = key
+
+    @property
+    def key(self) -> bytes:
+        if self._key is None:
+            self._key = load_secret_key()
+        return self._key
+
+    def _sign(self, payload: str) -> str:
+        return _b64encode(hmac.new(self.key, payload.encode(), hashlib.sha256).digest())
+
+    def issue(self, username: str, role: str, expiry_hours: int = TOKEN_EXPIRY_HOURS) -> Tuple[str, datetime]:
+        """Issue a token for a user."""
+        expiry = datetime.now(timezone.utc).replace(microsecond=0) + timedelta(hours=expiry_hours)
+        claims = {'u': username, 'r': role, 'exp': int(expiry.timestamp())}
+        payload = _b64encode(json.dumps(claims, separators=(',', ':')).encode())
+        return f"{payload}.{self._sign(payload)}", expiry
+
+    def validate(self, token: str) -> Optional[Dict[str, Any]]:
+        """Validate a token and return user info if it is genuine and not expired."""
+        payload, _, signature = token.partition('.')
+        # compare_digest only takes ASCII strings; a forged header may contain any character
+        if not signature or not hmac.compare_digest(signature.encode(), self._sign(payload).encode()):
+            return None
+        try:
+            claims = json.loads(_b64decode(payload))
+        except ValueError:
+            return None
+        if time.time() >= claims['exp']:
+            return None
+        return {
+            'username': claims['u'],
+            'role': claims['r'],
+            'expiry': datetime.fromtimestamp(claims['exp'], timezone.utc)
+        }
+
+
+class SlidingWindowLimiter:
+    """
+    Counts events per key over a sliding window, e.g. failed logins per address.
+
+    Each key keeps only the counts of the current and the previous fixed window; the
+    count over the sliding window is estimated by weighting the previous window's count
+    by how much of it still overlaps. At most max_keys keys are kept.
+    """
+
+    def __init__(self, limit: int = LOGIN_ATTEMPT_LIMIT, window: float = LOGIN_ATTEMPT_WINDOW,
+                 max_keys: int = LOGIN_TRACKED_CLIENTS):
+        self.limit = limit
+        self.window = window
+        self.max_keys = max_keys
+        # key -> [window index, count in the previous window, count in the current window]
+        self._counts: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _current(self, key: str, now: float) -> Tuple[list, float]:
+        """Get the key's counts moved to the window containing now, and how far into it now is."""
+        index, offset = divmod(now, self.window)
+        counts = self._counts.get(key)
+        if counts is None:
+            return [index, 0, 0], offset / self.window
+        if counts[0] != index:
+            previous = counts[2] if counts[0] == index - 1 else 0
+            counts[:] = [index, previous, 0]
+        return counts, offset / self.window
+
+    def count(self, key: str, now: Optional[float] = None) -> float:
+        """Estimate the events of a key within the last window."""
+        with self._lock:
+            counts, progress = self._current(key, time.time() if now is None else now)
+            return counts[1] * (1 - progress) + counts[2]
+
+    def is_limited(self, key: str, now: Optional[float] = None) -> bool:
+        """Check whether a key has reached the limit."""
+        return self.count(key, now) >= self.limit
+
+    def hit(self, key: str, now: Optional[float] = None) -> float:
+        """Record an event for a key and return its estimated count."""
+        with self._lock:
+            counts, progress = self._current(key, time.time() if now is None else now)
+            counts[2] += 1
+            self._counts[key] = counts
+            self._counts.move_to_end(key)
+            while len(self._counts) > self.max_keys:
+                self._counts.popitem(last=False)
+            return counts[1] * (1 - progress) + counts[2]
+
+    def reset(self, key: str) -> None:
+        """Forget a key's events."""
+        with self._lock:
+            self._counts.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+
+token_signer = TokenSigner()
+login_limiter = SlidingWindowLimiter()
 
 def require_auth(func):
     """Decorator to require a valid token."""
@@ -125,7 +219,7 @@ def require_auth(func):
             return jsonify({'status': 'error', 'message': 'Missing or invalid token'}), 401
 
         token = auth_header.split(' ')[1]
-        token_data = token_storage.validate_token(token)
+        token_data = token_signer.validate(token)
 
         if not token_data:
             return jsonify({'status': 'error', 'message': 'Invalid or expired token'}), 401
@@ -133,6 +227,7 @@ def require_auth(func):
         # Put user info in flask.g
         g.user = token_data['username']
         g.role = token_data['role']
+        g.expiry = token_data['expiry']
         return func(*args, **kwargs)
     return wrapper
 
@@ -148,17 +243,12 @@ def require_admin(func):
     return wrapper
 
 
-@auth_blueprint.before_app_request
-def before_request():
-    """Run before each request to clean up expired tokens."""
-    token_storage.cleanup_expired()
-
-
 @auth_blueprint.route('/login', methods=['POST'])
 def login():
     """
     Log in a user by checking the .env credentials only.
-    Returns a JWT-like token in JSON if successful, else 401.
+    Returns a signed token in JSON if successful, else 401.
+    Returns 429 while the client has too many recent failed attempts.
     """
     data = request.json or {}
     username = data.get('username')
@@ -174,8 +264,7 @@ def login():
     client_ip = request.headers.get('X-Forwarded-For', request.remote_addr)
 
     # Check for too many failed attempts
-    attempts = token_storage.record_failed_attempt(client_ip)
-    if attempts > 5:
+    if login_limiter.is_limited(client_ip):
         logger.warning(f"Too many failed login attempts from IP: {client_ip}")
         return jsonify({
             'status': 'error',
@@ -191,7 +280,8 @@ def login():
     # Compare with environment-based admin
     if username == ENV_ADMIN_USER and valid_password:
         # Generate token with 12 hour expiry
-        token, expiry = token_storage.add_token(username, 'admin', 12)
+        token, expiry = token_signer.issue(username, 'admin', TOKEN_EXPIRY_HOURS)
+        login_limiter.reset(client_ip)
 
         logger.info(f"Successful login for user '{username}' from IP '{client_ip}'")
 
@@ -205,6 +295,7 @@ def login():
             }
         })
     else:
+        login_limiter.hit(client_ip)
         logger.warning(f"Failed login attempt for user '{username}' from IP '{client_ip}'")
 
         return jsonify({
@@ -216,33 +307,27 @@ def login():
 @auth_blueprint.route('/logout', methods=['POST'])
 @require_auth
 def logout():
-    """Log out by removing the token from active_tokens."""
-    token = request.headers['Authorization'].split(' ')[1]
-    if token_storage.remove_token(token):
-        return jsonify({'status': 'success', 'message': 'Logged out successfully'})
-    return jsonify({'status': 'error', 'message': 'Invalid token'}), 400
+    """
+    Log out. Tokens are not stored on the server, so the client discards its token;
+    it stays valid until it expires.
+    """
+    logger.info(f"User '{g.user}' logged out")
+    return jsonify({'status': 'success', 'message': 'Logged out successfully'})
 
 
 @auth_blueprint.route('/status', methods=['GET'])
 @require_auth
 def status():
     """Check authentication status."""
-    auth_header = request.headers.get('Authorization', '')
-    token = auth_header.split(' ')[1]
-    token_data = token_storage.validate_token(token)
-
-    if not token_data:
-        return jsonify({'status': 'error', 'message': 'Token expired'}), 401
-
     # Calculate remaining time
-    expiry = token_data['expiry']
-    remaining_seconds = int((expiry - datetime.utcnow()).total_seconds())
+    expiry = g.expiry
+    remaining_seconds = int((expiry - datetime.now(timezone.utc)).total_seconds())
 
     return jsonify({
         'status': 'success',
         'data': {
-            'username': token_data['username'],
-            'role': token_data['role'],
+            'username': g.user,
+            'role': g.role,
             'expiry': expiry.isoformat(),
             'remaining_seconds': remaining_seconds
         }
@@ -253,24 +338,14 @@ def status():
 @require_auth
 def refresh_token():
     """Refresh the authentication token."""
-    old_token = request.headers['Authorization'].split(' ')[1]
-    token_data = token_storage.validate_token(old_token)
-
-    if not token_data:
-        return jsonify({'status': 'error', 'message': 'Invalid token'}), 401
-
-    # Remove old token
-    token_storage.remove_token(old_token)
-
-    # Generate new token
-    new_token, expiry = token_storage.add_token(token_data['username'], token_data['role'])
+    new_token, expiry = token_signer.issue(g.user, g.role)
 
     return jsonify({
         'status': 'success',
         'data': {
             'token': new_token,
-            'username': token_data['username'],
-            'role': token_data['role'],
+            'username': g.user,
+            'role': g.role,
             'expiry': expiry.isoformat()
         }
     })
@@ -1,21 +1,26 @@
 """
 Connector for interacting with the Discord bot.
+
+The bot runs in another process; timer state and control go through its IPC socket.
 """
 
 import os
 import sys
 import logging
+from dataclasses import asdict
 from typing import Dict, List, Any, Optional, Union
-import asyncio
-from concurrent.futures import ThreadPoolExecutor
 
 # Add the parent directory to the path to import bot modules
 parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
 sys.path.append(parent_dir)
 
-from src.bot import game_timers
-from src.managers.event_manager import EventsManager
-from src.utils.config import logger
+from src.ipc.client import IPCClient, IPCConnectionError
+from src.managers.event_manager import EventChange, EventsManager
+from src.utils.log_reader import LogFilter, LogReader
+
+# Logged as the requester of timer operations made from the dashboard
+WEBAPP_ACTOR = "WebApp"
+
 
 class BotConnector:
     """
@@ -26,31 +31,34 @@ class BotConnector:
     def __init__(self):
         """Initialize the bot connector."""
         self.events_manager = EventsManager()
-        self.executor = ThreadPoolExecutor(max_workers=5)
+        self.ipc = IPCClient()
+        self.log_reader = LogReader()
         self.logger = logging.getLogger('DotaDiscordBot.WebApp')
 
-    def get_status(self) -> Dict[str, Any]:
+    def get_status(self, gsi: bool = False, guild_ids: Optional[List[int]] = None) -> Dict[str, Any]:
         """
         Get the current status of the bot.
 
+        Args:
+            gsi (bool, optional): Also get the GSI status of some guilds, keyed by guild ID
+                under "gsi". Defaults to False.
+            guild_ids (List[int], optional): The guilds whose GSI status to get; defaults
+                to the guilds with an active timer.
+
         Returns:
             Dict: The status information including active timers and bot state.
+            bot_running is False if the bot process cannot be reached.
         """
         try:
-            active_timers = {guild_id: {
-                "guild_id": guild_id,
-                "mode": timer.mode,
-                "elapsed_time": timer.time_elapsed,
-                "paused": timer.paused,
-                "roshan_active": timer.roshan_timer.is_running,
-                "glyph_active": timer.glyph_timer.is_running,
-                "tormentor_active": timer.tormentor_timer.is_running
-            } for guild_id, timer in game_timers.items()}
-
+            if gsi:
+                return self.ipc.request("status", gsi=True, guild_ids=guild_ids)
+            return self.ipc.request("status")
+        except IPCConnectionError as e:
+            self.logger.warning(f"Bot status unavailable: {e}")
             return {
-                "active_timers_count": len(active_timers),
-                "active_timers": active_timers,
-                "bot_running": True  # Assuming the bot is running if this code is executed
+                "active_timers_count": 0,
+                "active_timers": {},
+                "bot_running": False
             }
         except Exception as e:
             self.logger.error(f"Error getting bot status: {e}", exc_info=True)
@@ -64,35 +72,27 @@ class BotConnector:
             Dict: A dictionary of active timers keyed by guild_id.
         """
         try:
-            return {guild_id: {
-                "guild_id": guild_id,
-                "mode": timer.mode,
-                "elapsed_time": timer.time_elapsed,
-                "paused": timer.paused,
-                "roshan_active": timer.roshan_timer.is_running,
-                "glyph_active": timer.glyph_timer.is_running,
-                "tormentor_active": timer.tormentor_timer.is_running,
-                "recent_events": timer.recent_events
-            } for guild_id, timer in game_timers.items()}
+            return self.ipc.request("timers.list")
         except Exception as e:
             self.logger.error(f"Error getting active timers: {e}", exc_info=True)
             raise
 
-    def _run_async(self, coro):
+    def _control(self, op: str, **args: Any) -> Dict[str, Any]:
         """
-        Run an asynchronous coroutine in a synchronous context.
+        Run a timer operation in the bot process.
 
         Args:
-            coro: The coroutine to execute.
+            op (str): The IPC operation, e.g. "timers.pause".
+            **args: Arguments of the operation.
 
         Returns:
-            The result of the coroutine.
+            Dict: The operation's TimerResult as a dict.
         """
-        loop = asyncio.new_event_loop()
         try:
-            return loop.run_until_complete(coro)
-        finally:
-            loop.close()
+            return self.ipc.request(op, actor=WEBAPP_ACTOR, **args)
+        except Exception as e:
+            self.logger.error(f"Error in timer operation '{op}': {e}", exc_info=True)
+            raise
 
     def start_timer(self, guild_id: int, countdown: str, mode: str = 'regular') -> Dict[str, Any]:
         """
@@ -106,35 +106,7 @@ class BotConnector:
         Returns:
             Dict: The result of the operation.
         """
-        try:
-            from src.bot import start_game
-
-            # Since start_game is a command, we need to mock a context
-            class MockContext:
-                def __init__(self, guild_id):
-                    self.guild = type('obj', (object,), {
-                        'id': guild_id,
-                        'text_channels': [],
-                        'voice_channels': []
-                    })
-                    self.author = type('obj', (object,), {
-                        'name': 'WebApp'
-                    })
-                    self.send = self._mock_send
-
-                async def _mock_send(self, message):
-                    logger.info(f"[WebApp] {message}")
-                    return None
-
-            ctx = MockContext(guild_id)
-
-            # Run the start_game command
-            self._run_async(start_game(ctx, countdown, mode))
-
-            return {"message": f"Game timer started with countdown '{countdown}' in mode '{mode}'"}
-        except Exception as e:
-            self.logger.error(f"Error starting timer: {e}", exc_info=True)
-            raise
+        return self._control("timers.start", guild_id=int(guild_id), countdown=countdown, mode=mode)
 
     def stop_timer(self, guild_id: int) -> Dict[str, Any]:
         """
@@ -146,35 +118,7 @@ class BotConnector:
         Returns:
             Dict: The result of the operation.
         """
-        try:
-            from src.bot import stop_game
-
-            # Since stop_game is a command, we need to mock a context
-            class MockContext:
-                def __init__(self, guild_id):
-                    self.guild = type('obj', (object,), {
-                        'id': guild_id,
-                        'text_channels': [],
-                        'voice_channels': []
-                    })
-                    self.author = type('obj', (object,), {
-                        'name': 'WebApp'
-                    })
-                    self.send = self._mock_send
-
-                async def _mock_send(self, message):
-                    logger.info(f"[WebApp] {message}")
-                    return None
-
-            ctx = MockContext(guild_id)
-
-            # Run the stop_game command
-            self._run_async(stop_game(ctx))
-
-            return {"message": "Game timer stopped"}
-        except Exception as e:
-            self.logger.error(f"Error stopping timer: {e}", exc_info=True)
-            raise
+        return self._control("timers.stop", guild_id=int(guild_id))
 
     def pause_timer(self, guild_id: int) -> Dict[str, Any]:
         """
@@ -186,35 +130,7 @@ class BotConnector:
         Returns:
             Dict: The result of the operation.
         """
-        try:
-            from src.bot import pause_game
-
-            # Since pause_game is a command, we need to mock a context
-            class MockContext:
-                def __init__(self, guild_id):
-                    self.guild = type('obj', (object,), {
-                        'id': guild_id,
-                        'text_channels': [],
-                        'voice_channels': []
-                    })
-                    self.author = type('obj', (object,), {
-                        'name': 'WebApp'
-                    })
-                    self.send = self._mock_send
-
-                async def _mock_send(self, message):
-                    logger.info(f"[WebApp] {message}")
-                    return None
-
-            ctx = MockContext(guild_id)
-
-            # Run the pause_game command
-            self._run_async(pause_game(ctx))
-
-            return {"message": "Game timer paused"}
-        except Exception as e:
-            self.logger.error(f"Error pausing timer: {e}", exc_info=True)
-            raise
+        return self._control("timers.pause", guild_id=int(guild_id))
 
     def unpause_timer(self, guild_id: int) -> Dict[str, Any]:
         """
@@ -226,346 +142,166 @@ class BotConnector:
         Returns:
             Dict: The result of the operation.
         """
-        try:
-            from src.bot import unpause_game
-
-            # Since unpause_game is a command, we need to mock a context
-            class MockContext:
-                def __init__(self, guild_id):
-                    self.guild = type('obj', (object,), {
-                        'id': guild_id,
-                        'text_channels': [],
-                        'voice_channels': []
-                    })
-                    self.author = type('obj', (object,), {
-                        'name': 'WebApp'
-                    })
-                    self.send = self._mock_send
-
-                async def _mock_send(self, message):
-                    logger.info(f"[WebApp] {message}")
-                    return None
-
-            ctx = MockContext(guild_id)
-
-            # Run the unpause_game command
-            self._run_async(unpause_game(ctx))
-
-            return {"message": "Game timer unpaused"}
-        except Exception as e:
-            self.logger.error(f"Error unpausing timer: {e}", exc_info=True)
-            raise
+        return self._control("timers.resume", guild_id=int(guild_id))
 
-    def start_roshan_timer(self, guild_id: int) -> Dict[str, Any]:
+    def sync_timer(self, guild_id: int, game_time: str, replay: bool = False) -> Dict[str, Any]:
         """
-        Start the Roshan timer.
+        Correct the clock of an active game timer.
 
         Args:
             guild_id (int): The Discord guild ID.
+            game_time (str): The in-game time (e.g., "25:30" or "-00:45").
+            replay (bool, optional): Repeat events after a backward jump. Defaults to False.
 
         Returns:
             Dict: The result of the operation.
         """
-        try:
-            from src.bot import rosh_timer_command
-
-            # Since rosh_timer_command is a command, we need to mock a context
-            class MockContext:
-                def __init__(self, guild_id):
-                    self.guild = type('obj', (object,), {
-                        'id': guild_id,
-                        'text_channels': [],
-                        'voice_channels': []
-                    })
-                    self.author = type('obj', (object,), {
-                        'name': 'WebApp'
-                    })
-                    self.send = self._mock_send
-
-                async def _mock_send(self, message):
-                    logger.info(f"[WebApp] {message}")
-                    return None
-
-            ctx = MockContext(guild_id)
-
-            # Run the rosh_timer_command
-            self._run_async(rosh_timer_command(ctx))
-
-            return {"message": "Roshan timer started"}
-        except Exception as e:
-            self.logger.error(f"Error starting Roshan timer: {e}", exc_info=True)
-            raise
+        return self._control("timers.sync", guild_id=int(guild_id), game_time=game_time, replay=replay)
 
-    def cancel_roshan_timer(self, guild_id: int) -> Dict[str, Any]:
+    def start_child_timer(self, guild_id: int, name: str) -> Dict[str, Any]:
         """
-        Cancel the Roshan timer.
+        Start a Roshan, Glyph or Tormentor timer.
 
         Args:
             guild_id (int): The Discord guild ID.
+            name (str): 'roshan', 'glyph' or 'tormentor'.
 
         Returns:
             Dict: The result of the operation.
         """
-        try:
-            from src.bot import cancel_rosh_command
-
-            # Since cancel_rosh_command is a command, we need to mock a context
-            class MockContext:
-                def __init__(self, guild_id):
-                    self.guild = type('obj', (object,), {
-                        'id': guild_id,
-                        'text_channels': [],
-                        'voice_channels': []
-                    })
-                    self.author = type('obj', (object,), {
-                        'name': 'WebApp'
-                    })
-                    self.send = self._mock_send
-
-                async def _mock_send(self, message):
-                    logger.info(f"[WebApp] {message}")
-                    return None
-
-            ctx = MockContext(guild_id)
-
-            # Run the cancel_rosh_command
-            self._run_async(cancel_rosh_command(ctx))
-
-            return {"message": "Roshan timer cancelled"}
-        except Exception as e:
-            self.logger.error(f"Error cancelling Roshan timer: {e}", exc_info=True)
-            raise
+        return self._control("timers.start_child", guild_id=int(guild_id), name=name)
 
-    def start_glyph_timer(self, guild_id: int) -> Dict[str, Any]:
+    def cancel_child_timer(self, guild_id: int, name: str) -> Dict[str, Any]:
         """
-        Start the Glyph timer.
+        Cancel a Roshan, Glyph or Tormentor timer.
 
         Args:
             guild_id (int): The Discord guild ID.
+            name (str): 'roshan', 'glyph' or 'tormentor'.
 
         Returns:
             Dict: The result of the operation.
         """
-        try:
-            from src.bot import glyph_timer_command
-
-            # Since glyph_timer_command is a command, we need to mock a context
-            class MockContext:
-                def __init__(self, guild_id):
-                    self.guild = type('obj', (object,), {
-                        'id': guild_id,
-                        'text_channels': [],
-                        'voice_channels': []
-                    })
-                    self.author = type('obj', (object,), {
-                        'name': 'WebApp'
-                    })
-                    self.send = self._mock_send
-
-                async def _mock_send(self, message):
-                    logger.info(f"[WebApp] {message}")
-                    return None
-
-            ctx = MockContext(guild_id)
-
-            # Run the glyph_timer_command
-            self._run_async(glyph_timer_command(ctx))
-
-            return {"message": "Glyph timer started"}
-        except Exception as e:
-            self.logger.error(f"Error starting Glyph timer: {e}", exc_info=True)
-            raise
+        return self._control("timers.cancel_child", guild_id=int(guild_id), name=name)
 
-    def cancel_glyph_timer(self, guild_id: int) -> Dict[str, Any]:
+    def notify(self, op: str, **args: Any) -> bool:
         """
-        Cancel the Glyph timer.
+        Tell the bot about a change the webapp saved, e.g. to a guild's events.
+
+        The change is already in the database, so an unreachable bot is logged rather
+        than raised; it reads the current data when it starts.
 
         Args:
-            guild_id (int): The Discord guild ID.
+            op (str): The IPC operation, e.g. "settings.invalidate".
+            **args: Arguments of the operation.
 
         Returns:
-            Dict: The result of the operation.
+            bool: True if the bot received the notification.
         """
         try:
-            from src.bot import cancel_glyph_command
-
-            # Since cancel_glyph_command is a command, we need to mock a context
-            class MockContext:
-                def __init__(self, guild_id):
-                    self.guild = type('obj', (object,), {
-                        'id': guild_id,
-                        'text_channels': [],
-                        'voice_channels': []
-                    })
-                    self.author = type('obj', (object,), {
-                        'name': 'WebApp'
-                    })
-                    self.send = self._mock_send
-
-                async def _mock_send(self, message):
-                    logger.info(f"[WebApp] {message}")
-                    return None
-
-            ctx = MockContext(guild_id)
-
-            # Run the cancel_glyph_command
-            self._run_async(cancel_glyph_command(ctx))
-
-            return {"message": "Glyph timer cancelled"}
+            self.ipc.request(op, **args)
+            return True
         except Exception as e:
-            self.logger.error(f"Error cancelling Glyph timer: {e}", exc_info=True)
-            raise
+            self.logger.warning(f"Could not notify the bot of '{op}': {e}")
+            return False
+
+    def publish_event_changes(self, changes: List[EventChange]) -> bool:
+        """
+        Send event changes to the bot's running game timers.
+
+        Args:
+            changes (List[EventChange]): The changes, in the order they were made.
+
+        Returns:
+            bool: True if the bot received them.
+        """
+        if not changes:
+            return True
+        return self.notify("events.changed", changes=[asdict(change) for change in changes])
 
-    def start_tormentor_timer(self, guild_id: int) -> Dict[str, Any]:
+    def invalidate_settings(self, guild_id: int) -> bool:
         """
-        Start the Tormentor timer.
+        Make the bot reload a guild's settings.
 
         Args:
             guild_id (int): The Discord guild ID.
 
         Returns:
-            Dict: The result of the operation.
+            bool: True if the bot received the invalidation.
         """
-        try:
-            from src.bot import tormentor_timer_command
-
-            # Since tormentor_timer_command is a command, we need to mock a context
-            class MockContext:
-                def __init__(self, guild_id):
-                    self.guild = type('obj', (object,), {
-                        'id': guild_id,
-                        'text_channels': [],
-                        'voice_channels': []
-                    })
-                    self.author = type('obj', (object,), {
-                        'name': 'WebApp'
-                    })
-                    self.send = self._mock_send
-
-                async def _mock_send(self, message):
-                    logger.info(f"[WebApp] {message}")
-                    return None
-
-            ctx = MockContext(guild_id)
-
-            # Run the tormentor_timer_command
-            self._run_async(tormentor_timer_command(ctx))
-
-            return {"message": "Tormentor timer started"}
-        except Exception as e:
-            self.logger.error(f"Error starting Tormentor timer: {e}", exc_info=True)
-            raise
+        return self.notify("settings.invalidate", guild_id=int(guild_id))
 
-    def cancel_tormentor_timer(self, guild_id: int) -> Dict[str, Any]:
+    def set_gsi_sync(self, guild_id: int, enabled: Optional[bool] = None) -> Dict[str, Any]:
         """
-        Cancel the Tormentor timer.
+        Toggle or set GSI sync for a guild in the bot.
 
         Args:
             guild_id (int): The Discord guild ID.
+            enabled (bool, optional): The new state; toggles the current one if None.
 
         Returns:
-            Dict: The result of the operation.
+            Dict: guild_id and sync_enabled.
         """
         try:
-            from src.bot import cancel_tormentor_command
-
-            # Since cancel_tormentor_command is a command, we need to mock a context
-            class MockContext:
-                def __init__(self, guild_id):
-                    self.guild = type('obj', (object,), {
-                        'id': guild_id,
-                        'text_channels': [],
-                        'voice_channels': []
-                    })
-                    self.author = type('obj', (object,), {
-                        'name': 'WebApp'
-                    })
-                    self.send = self._mock_send
-
-                async def _mock_send(self, message):
-                    logger.info(f"[WebApp] {message}")
-                    return None
-
-            ctx = MockContext(guild_id)
-
-            # Run the cancel_tormentor_command
-            self._run_async(cancel_tormentor_command(ctx))
-
-            return {"message": "Tormentor timer cancelled"}
+            return self.ipc.request("gsi.sync", guild_id=int(guild_id), enabled=enabled)
         except Exception as e:
-            self.logger.error(f"Error cancelling Tormentor timer: {e}", exc_info=True)
+            self.logger.error(f"Error setting GSI sync: {e}", exc_info=True)
             raise
 
-    def get_logs(self, limit: int = 100, offset: int = 0) -> List[Dict[str, Any]]:
+    def get_gsi_status(self, guild_id: Optional[int] = None) -> Dict[str, Any]:
         """
-        Get bot logs.
+        Get the GSI connection and game state from the bot, which receives the packets.
 
         Args:
-            limit (int, optional): The maximum number of logs to retrieve. Defaults to 100.
-            offset (int, optional): The offset for pagination. Defaults to 0.
+            guild_id (int, optional): Describe the session driving this guild.
 
         Returns:
-            List[Dict]: The list of log entries.
+            Dict: Connection state, the time of the last update and the current game.
         """
         try:
-            from src.utils.config import LOG_FILE_PATH
+            return self.ipc.request("gsi.status", guild_id=guild_id)
+        except Exception as e:
+            self.logger.error(f"Error getting GSI status: {e}", exc_info=True)
+            raise
 
-            logs = []
-            if os.path.exists(LOG_FILE_PATH):
-                with open(LOG_FILE_PATH, 'r') as f:
-                    lines = f.readlines()
+    def get_gsi_history(self, guild_id: Optional[int] = None, game_time: Optional[int] = None,
+                        path: Optional[str] = None, since: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Query the GSI history of the current match in the bot.
 
-                # Apply offset and limit
-                logs = [self._parse_log_line(line) for line in lines[-limit-offset:len(lines)-offset]]
+        Args:
+            guild_id (int, optional): Query the session driving this guild.
+            game_time (int, optional): Include the state as of this game time.
+            path (str, optional): Dotted key path whose changes are listed.
+            since (int, optional): Only list changes after this game time.
 
-            return logs
+        Returns:
+            Dict: time_range and packets, plus state and changes if requested.
+        """
+        try:
+            return self.ipc.request("gsi.history", guild_id=guild_id, game_time=game_time, path=path, since=since)
         except Exception as e:
-            self.logger.error(f"Error getting logs: {e}", exc_info=True)
+            self.logger.error(f"Error querying GSI history: {e}", exc_info=True)
             raise
 
-    def _parse_log_line(self, line: str) -> Dict[str, Any]:
+    def get_logs(self, limit: int = 100, offset: int = 0, log_filter: Optional[LogFilter] = None) -> List[Dict[str, Any]]:
         """
-        Parse a log line into a structured format.
+        Get bot logs, including rotated log files.
 
         Args:
-            line (str): The log line to parse.
+            limit (int, optional): The maximum number of logs to retrieve. Defaults to 100.
+            offset (int, optional): The offset for pagination. Defaults to 0.
+            log_filter (LogFilter, optional): Only return matching entries.
 
         Returns:
-            Dict: The parsed log entry.
+            List[Dict]: The list of log entries, oldest first.
         """
         try:
-            parts = line.split(' - ', 4)
-            if len(parts) >= 5:
-                timestamp, level, logger_name, func_name_with_line, message = parts
-                func_parts = func_name_with_line.split(' - ')
-                if len(func_parts) == 2:
-                    func_name, line_num = func_parts
-                else:
-                    func_name, line_num = func_name_with_line, ""
-
-                return {
-                    "timestamp": timestamp.strip(),
-                    "level": level.strip(),
-                    "logger": logger_name.strip(),
-                    "function": func_name.strip(),
-                    "line": line_num.strip(),
-                    "message": message.strip()
-                }
-            else:
-                return {
-                    "timestamp": "",
-                    "level": "",
-                    "logger": "",
-                    "function": "",
-                    "line": "",
-                    "message": line.strip()
-                }
-        except Exception:
-            return {
-                "timestamp": "",
-                "level": "",
-                "logger": "",
-                "function": "",
-                "line": "",
-                "message": line.strip()
-            }
\ No newline at end of file
+            return self.log_reader.query(limit, offset, log_filter)
+        except Exception as e:
+            self.logger.error(f"Error getting logs: {e}", exc_info=True)
+            raise
+
+
+# Shared instance used by the API endpoints
+bot_connector = BotConnector()
@@ -5,16 +5,80 @@ Database connector for the Dota Discord Bot Dashboard.
 import os
 import sys
 import logging
-from typing import Dict, List, Any, Optional, Union
+from typing import Dict, List, Any, Optional, Tuple, Union
 
 # Add the parent directory to the path to import bot modules
 parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
 sys.path.append(parent_dir)
 
-from src.database import StaticEvent, PeriodicEvent, ServerSettings, SessionLocal
+from sqlalchemy import delete
+
+from src.database import StaticEvent, PeriodicEvent, ServerSettings, SessionLocal, get_guild_version
+from src.managers import event_transfer
+from src.managers.event_manager import EventChange, event_change_from_row
+from .bot_connector import bot_connector
 
 logger = logging.getLogger('DotaDiscordBot.WebApp')
 
+def get_data_version(guild_id: int, kind: str) -> Tuple[int, float]:
+    """
+    Get the version of a guild's events or settings, changed by every write from any process.
+
+    Args:
+        guild_id (int): The Discord guild ID.
+        kind (str): 'events' or 'settings'.
+
+    Returns:
+        Tuple[int, float]: The version and the Unix time of the latest change.
+    """
+    try:
+        with SessionLocal() as session:
+            return get_guild_version(session, guild_id, kind)
+    except Exception as e:
+        logger.error(f"Error getting data version: {e}", exc_info=True)
+        raise
+
+def _static_event_data(event: StaticEvent) -> Dict[str, Any]:
+    """Format a static event for API responses."""
+    return {
+        "id": event.id,
+        "type": "static",
+        "time": event.time,
+        "message": event.message,
+        "mode": event.mode
+    }
+
+def _periodic_event_data(event: PeriodicEvent) -> Dict[str, Any]:
+    """Format a periodic event for API responses."""
+    return {
+        "id": event.id,
+        "type": "periodic",
+        "start_time": event.start_time,
+        "interval": event.interval,
+        "end_time": event.end_time,
+        "message": event.message,
+        "mode": event.mode
+    }
+
+def _settings_data(settings: Optional[ServerSettings]) -> Dict[str, Any]:
+    """Format a guild's settings for API responses, or the defaults if it has none."""
+    if settings:
+        return {
+            "prefix": settings.prefix,
+            "timer_channel": settings.timer_channel,
+            "voice_channel": settings.voice_channel,
+            "tts_language": settings.tts_language,
+            "mindful_messages_enabled": bool(settings.mindful_messages_enabled)
+        }
+    # Return default settings if none exist
+    return {
+        "prefix": "!",
+        "timer_channel": "timer-bot",
+        "voice_channel": "DOTA",
+        "tts_language": "en-US-AriaNeural",
+        "mindful_messages_enabled": False
+    }
+
 def get_events(guild_id: int, mode: str = 'regular') -> Dict[str, Any]:
     """
     Get all events for a guild.
@@ -36,32 +100,9 @@ def get_events(guild_id: int, mode: str = 'regular') -> Dict[str, Any]:
             periodic_events = session.query(PeriodicEvent).filter_by(
                 guild_id=str(guild_id), mode=mode).all()
 
-            # Format events for API response
-            static_events_dict = {
-                event.id: {
-                    "id": event.id,
-                    "type": "static",
-                    "time": event.time,
-                    "message": event.message,
-                    "mode": event.mode
-                } for event in static_events
-            }
-
-            periodic_events_dict = {
-                event.id: {
-                    "id": event.id,
-                    "type": "periodic",
-                    "start_time": event.start_time,
-                    "interval": event.interval,
-                    "end_time": event.end_time,
-                    "message": event.message,
-                    "mode": event.mode
-                } for event in periodic_events
-            }
-
             return {
-                "static_events": static_events_dict,
-                "periodic_events": periodic_events_dict
+                "static_events": {event.id: _static_event_data(event) for event in static_events},
+                "periodic_events": {event.id: _periodic_event_data(event) for event in periodic_events}
             }
     except Exception as e:
         logger.error(f"Error getting events: {e}", exc_info=True)
@@ -102,6 +143,7 @@ def add_event(
                 )
                 session.add(event)
                 session.commit()
+                bot_connector.publish_event_changes([event_change_from_row('added', event)])
                 return event.id
 
             elif event_type == 'periodic':
@@ -120,6 +162,7 @@ def add_event(
                 )
                 session.add(event)
                 session.commit()
+                bot_connector.publish_event_changes([event_change_from_row('added', event)])
                 return event.id
 
             else:
@@ -151,8 +194,10 @@ def remove_event(guild_id: int, event_id: int) -> bool:
                     guild_id=str(guild_id), id=event_id).first()
 
             if event:
+                change = event_change_from_row('removed', event)
                 session.delete(event)
                 session.commit()
+                bot_connector.publish_event_changes([change])
                 return True
 
             return False
@@ -160,6 +205,57 @@ def remove_event(guild_id: int, event_id: int) -> bool:
         logger.error(f"Error removing event: {e}", exc_info=True)
         raise
 
+def export_events(guild_id: int) -> Dict[str, Any]:
+    """
+    Export the full event set of a guild.
+
+    Args:
+        guild_id (int): The Discord guild ID.
+
+    Returns:
+        Dict: The export document with static and periodic events for all modes.
+    """
+    try:
+        with SessionLocal() as session:
+            current = event_transfer.load_guild_events(session, guild_id)
+            return event_transfer.build_export_document(current)
+    except Exception as e:
+        logger.error(f"Error exporting events: {e}", exc_info=True)
+        raise
+
+def import_events(
+    guild_id: int,
+    document: Dict[str, Any],
+    replace: bool = True,
+    dry_run: bool = False
+) -> Dict[str, Any]:
+    """
+    Import a full event set for a guild in one transaction.
+
+    Args:
+        guild_id (int): The Discord guild ID.
+        document (Dict): The decoded import document.
+        replace (bool, optional): Remove events missing from the document. Defaults to True.
+        dry_run (bool, optional): Only return the diff preview. Defaults to False.
+
+    Returns:
+        Dict: The diff preview and whether it was applied.
+
+    Raises:
+        EventValidationError: If the document contains invalid records.
+    """
+    try:
+        with SessionLocal() as session:
+            result = event_transfer.import_events(session, guild_id, document, replace=replace, dry_run=dry_run)
+        if result['applied']:
+            bot_connector.publish_event_changes([EventChange(int(guild_id), 'reloaded')])
+        return result
+    except event_transfer.EventValidationError:
+        raise
+    except Exception as e:
+        logger.error(f"Error importing events: {e}", exc_info=True)
+        raise
+
 def get_settings(guild_id: int) -> Dict[str, Any]:
     """
     Get settings for a guild.
@@ -175,27 +271,53 @@ def get_settings(guild_id: int) -> Dict[str, Any]:
             settings = session.query(ServerSettings).filter_by(
                 server_id=str(guild_id)).first()
 
-            if settings:
-                return {
-                    "prefix": settings.prefix,
-                    "timer_channel": settings.timer_channel,
-                    "voice_channel": settings.voice_channel,
-                    "tts_language": settings.tts_language,
-                    "mindful_messages_enabled": bool(settings.mindful_messages_enabled)
-                }
-            else:
-                # Return default settings if none exist
-                return {
-                    "prefix": "!",
-                    "timer_channel": "timer-bot",
-                    "voice_channel": "DOTA",
-                    "tts_language": "en-US-AriaNeural",
-                    "mindful_messages_enabled": False
-                }
+            return _settings_data(settings)
     except Exception as e:
         logger.error(f"Error getting settings: {e}", exc_info=True)
         raise
 
+def get_guild_data(guild_ids: List[int], mode: str = 'regular', events: bool = True,
+                   settings: bool = True) -> Dict[str, Dict[str, Any]]:
+    """
+    Get the events and settings of several guilds in one session.
+
+    Each kind of data is loaded with one query for all guilds.
+
+    Args:
+        guild_ids (List[int]): The Discord guild IDs.
+        mode (str, optional): The game mode of the events. Defaults to 'regular'.
+        events (bool, optional): Include the guilds' events. Defaults to True.
+        settings (bool, optional): Include the guilds' settings. Defaults to True.
+
+    Returns:
+        Dict: Keyed by guild ID as a string; each value may hold "events", formatted as
+        by get_events, and "settings", formatted as by get_settings.
+    """
+    keys = [str(guild_id) for guild_id in guild_ids]
+    data: Dict[str, Dict[str, Any]] = {key: {} for key in keys}
+    try:
+        with SessionLocal() as session:
+            if events:
+                for key in keys:
+                    data[key]["events"] = {"static_events": {}, "periodic_events": {}}
+                for event in session.query(StaticEvent).filter(
+                        StaticEvent.guild_id.in_(keys), StaticEvent.mode == mode):
+                    data[event.guild_id]["events"]["static_events"][event.id] = _static_event_data(event)
+                for event in session.query(PeriodicEvent).filter(
+                        PeriodicEvent.guild_id.in_(keys), PeriodicEvent.mode == mode):
+                    data[event.guild_id]["events"]["periodic_events"][event.id] = _periodic_event_data(event)
+
+            if settings:
+                found = {row.server_id: row for row in
+                         session.query(ServerSettings).filter(ServerSettings.server_id.in_(keys))}
+                for key in keys:
+                    data[key]["settings"] = _settings_data(found.get(key))
+        return data
+    except Exception as e:
+        logger.error(f"Error getting guild data: {e}", exc_info=True)
+        raise
+
+
 def update_settings(guild_id: int, settings_dict: Dict[str, Any]) -> bool:
     """
     Update settings for a guild.
@@ -217,20 +339,147 @@ def update_settings(guild_id: int, settings_dict: Dict[str, Any]) -> bool:
                 settings = ServerSettings(server_id=str(guild_id))
                 session.add(settings)
 
-            # Update settings
-            if "prefix" in settings_dict:
-                settings.prefix = settings_dict["prefix"]
-            if "timer_channel" in settings_dict:
-                settings.timer_channel = settings_dict["timer_channel"]
-            if "voice_channel" in settings_dict:
-                settings.voice_channel = settings_dict["voice_channel"]
-            if "tts_language" in settings_dict:
-                settings.tts_language = settings_dict["tts_language"]
-            if "mindful_messages_enabled" in settings_dict:
-                settings.mindful_messages_enabled = 1 if settings_dict["mindful_messages_enabled"] else 0
-
+            _apply_settings(settings, settings_dict)
             session.commit()
+            bot_connector.invalidate_settings(guild_id)
             return True
     except Exception as e:
         logger.error(f"Error updating settings: {e}", exc_info=True)
+        raise
+
+def _apply_settings(settings: ServerSettings, settings_dict: Dict[str, Any]) -> None:
+    """
+    Copy recognised keys from a settings patch onto a ServerSettings row.
+
+    Args:
+        settings (ServerSettings): The row to update.
+        settings_dict (Dict): The settings to update.
+    """
+    if "prefix" in settings_dict:
+        settings.prefix = settings_dict["prefix"]
+    if "timer_channel" in settings_dict:
+        settings.timer_channel = settings_dict["timer_channel"]
+    if "voice_channel" in settings_dict:
+        settings.voice_channel = settings_dict["voice_channel"]
+    if "tts_language" in settings_dict:
+        settings.tts_language = settings_dict["tts_language"]
+    if "mindful_messages_enabled" in settings_dict:
+        settings.mindful_messages_enabled = 1 if settings_dict["mindful_messages_enabled"] else 0
+
+# Operations accepted by apply_batch, mapped to the event type they touch
+BATCH_ADD_OPS = {"add_static": "static", "add_periodic": "periodic"}
+BATCH_REMOVE_OPS = {"remove_static": StaticEvent, "remove_periodic": PeriodicEvent}
+BATCH_SETTINGS_OP = "update_settings"
+
+def apply_batch(guild_id: int, operations: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Apply a list of event and settings operations atomically in one session.
+
+    Supported operations:
+        {"op": "add_static", "mode", "time", "message"}
+        {"op": "add_periodic", "mode", "start_time", "interval", "end_time", "message"}
+        {"op": "remove_static", "id"} / {"op": "remove_periodic", "id"}
+        {"op": "update_settings", "settings": {...}}
+
+    Every operation is validated first; if any of them fails nothing is written. Removing
+    the same event twice fails the repeated operation.
+
+    Args:
+        guild_id (int): The Discord guild ID.
+        operations (List[Dict]): The operations to apply, in order.
+
+    Returns:
+        Dict: 'applied' flag and per-operation 'results' in request order.
+    """
+    results = [{"index": index, "op": op.get("op") if isinstance(op, dict) else None}
+               for index, op in enumerate(operations)]
+    new_rows = []  # (result, model, row)
+    removals = {model: {} for model in BATCH_REMOVE_OPS.values()}  # model -> {event_id: result}
+    settings_patches = []
+
+    # Validate everything up front
+    for result, op in zip(results, operations):
+        try:
+            if not isinstance(op, dict):
+                raise ValueError("operation must be an object")
+            name = op.get("op")
+            if name in BATCH_ADD_OPS:
+                kind = BATCH_ADD_OPS[name]
+                row = event_transfer.validate_record(kind, op)
+                new_rows.append((result, StaticEvent if kind == "static" else PeriodicEvent, row))
+            elif name in BATCH_REMOVE_OPS:
+                event_id = op.get("id")
+                if not isinstance(event_id, int) or isinstance(event_id, bool):
+                    raise ValueError("id must be an integer")
+                targets = removals[BATCH_REMOVE_OPS[name]]
+                if event_id in targets:
+                    raise ValueError(f"event {event_id} is already removed by operation "
+                                     f"{targets[event_id]['index']}")
+                targets[event_id] = result
+            elif name == BATCH_SETTINGS_OP:
+                if not isinstance(op.get("settings"), dict):
+                    raise ValueError("settings must be an object")
+                settings_patches.append((result, op["settings"]))
+            else:
+                raise ValueError(f"unknown operation '{name}'")
+        except ValueError as e:
+            result.update(status="error", message=str(e))
+
+    try:
+        with SessionLocal() as session:
+            # Resolve removal targets with one query per table
+            for model, targets in removals.items():
+                if not targets:
+                    continue
+                found = {row.id for row in session.query(model.id).filter(
+                    model.guild_id == str(guild_id), model.id.in_(list(targets)))}
+                for event_id, result in targets.items():
+                    if event_id not in found:
+                        result.update(status="error", message=f"Event {event_id} not found")
+
+            if any(result.get("status") == "error" for result in results):
+                for result in results:
+                    result.setdefault("status", "skipped")
+                return {"applied": False, "results": results}
+
+            for model, targets in removals.items():
+                if targets:
+                    session.execute(delete(model).where(
+                        model.guild_id == str(guild_id), model.id.in_(list(targets))))
+                    for event_id, result in targets.items():
+                        result.update(status="ok", id=event_id)
+
+            new_events = [model(guild_id=str(guild_id), **row) for _, model, row in new_rows]
+            session.add_all(new_events)
+
+            if settings_patches:
+                settings = session.query(ServerSettings).filter_by(server_id=str(guild_id)).first()
+                if not settings:
+                    settings = ServerSettings(server_id=str(guild_id))
+                    session.add(settings)
+                for result, patch in settings_patches:
+                    _apply_settings(settings, patch)
+                    result.update(status="ok")
+
+            # Single flush assigns IDs to all new events, single commit persists the batch
+            session.flush()
+            for (result, _, _), event in zip(new_rows, new_events):
+                result.update(status="ok", id=event.id)
+
+            # Describe the changes while the new rows are loaded; commit expires them
+            kinds = {StaticEvent: 'static', PeriodicEvent: 'periodic'}
+            changes = [EventChange(int(guild_id), 'removed', kinds[model], event_id)
+                       for model, targets in removals.items() for event_id in targets]
+            changes += [event_change_from_row('added', event) for event in new_events]
+            session.commit()
+            if settings_patches:
+                bot_connector.invalidate_settings(guild_id)
+
+            # Send event changes to the bot's running game timers in one request
+            bot_connector.publish_event_changes(changes)
+
+            logger.info(f"Applied batch of {len(operations)} operations for guild {guild_id}")
+            return {"applied": True, "results": results}
+    except Exception as e:
+        logger.error(f"Error applying batch: {e}", exc_info=True)
         raise
\ No newline at end of file
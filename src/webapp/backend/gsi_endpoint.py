@@ -1,100 +1,102 @@
 """
-Flask endpoint to receive Dota 2 GSI updates.
+Flask endpoints for the GSI status of the bot.
+
+The bot receives the Dota 2 GSI packets; these endpoints read its sessions over IPC.
 """
 
 from flask import Blueprint, request, jsonify
-import time
-import json
-from typing import Dict, Any
 
-from src.gsi.gsi_manager import GSIManager
-from src.gsi.gsi_state import gsi_state
-from src.utils.config import logger
+from src.ipc.client import IPCConnectionError
+from src.utils.config import logger, GSI_PORT
+from .bot_connector import bot_connector
+from .response_cache import conditional_json
 
 # Initialize blueprint
 gsi_blueprint = Blueprint('gsi', __name__)
 
-# GSI Manager instance - access to this will be shared with the bot
-gsi_manager = GSIManager()
 
 @gsi_blueprint.route('/', methods=['POST'])
 def gsi_endpoint():
     """
-    Receive GSI updates from Dota 2.
+    Former GSI ingest path.
 
-    This endpoint processes Game State Integration updates from the Dota 2 client.
+    Packets are received by the bot's own GSI server (see src/gsi/server.py); packets
+    posted here never reached the bot's timers. Clients still posting here are told to
+    point their GSI config at the bot instead.
     """
-    try:
-        if not request.is_json:
-            logger.warning("Received non-JSON GSI request")
-            return jsonify({
-                "status": "error",
-                "message": "Request must be JSON"
-            }), 400
+    return jsonify({
+        "status": "error",
+        "message": f"GSI packets are received by the bot; set the uri in the GSI config to "
+                   f"http://<bot-host>:{GSI_PORT}/"
+    }), 410
 
-        # Get the GSI data
-        data = request.json
 
-        # Get the auth token from the request
-        auth_token = data.get("auth", {}).get("token", "")
+@gsi_blueprint.route('/status', methods=['GET'])
+def gsi_status():
+    """
+    Get the current GSI status.
 
-        # Process the request
-        success = gsi_manager.process_request(auth_token, data)
+    Returns information about the GSI connection and game state. An optional
+    guild_id query parameter selects the session driving that guild.
+    """
+    try:
+        guild_id = request.args.get('guild_id', type=int)
+        status = bot_connector.get_gsi_status(guild_id)
 
-        if success:
-            return jsonify({
-                "status": "success",
-                "timestamp": time.time()
-            })
-        else:
-            return jsonify({
-                "status": "error",
-                "message": "Invalid authentication"
-            }), 401
+        # Only a packet or the connection timing out changes the status; clients derive the
+        # age of the last update from last_update
+        version = (status["last_update"], status["connected"], status["in_game"], status["sessions"])
+        return conditional_json(('gsi-status', guild_id), version, status["last_update"], lambda: status)
 
+    except IPCConnectionError as e:
+        return jsonify({
+            "status": "error",
+            "message": str(e)
+        }), 503
     except Exception as e:
-        logger.error(f"Error processing GSI request: {e}", exc_info=True)
+        logger.error(f"Error getting GSI status: {e}", exc_info=True)
         return jsonify({
             "status": "error",
-            "message": f"Error processing request: {str(e)}"
+            "message": f"Error getting status: {str(e)}"
         }), 500
 
 
-@gsi_blueprint.route('/status', methods=['GET'])
-def gsi_status():
+@gsi_blueprint.route('/history', methods=['GET'])
+def gsi_history():
     """
-    Get the current GSI status.
-
-    Returns information about the GSI connection and game state.
+    Query the GSI history of the current match.
+
+    Query parameters:
+        guild_id: Select the session driving this guild; defaults to the shared token.
+        game_time: Return the state as of this game time.
+        path: Dotted key path (e.g. "roshan.alive") whose changes are listed. Only fields
+            kept at ingest (see gsi_ingest_fields in config.yaml) are recorded.
+        since: Only list changes after this game time.
     """
     try:
-        last_update = gsi_manager.get_last_update_time()
-        in_game = gsi_manager.is_in_game()
-
-        # Calculate how long since the last update
-        last_update_seconds_ago = time.time() - last_update if last_update > 0 else None
-
-        status = {
-            "connected": last_update > 0 and last_update_seconds_ago < 60 if last_update_seconds_ago is not None else False,
-            "last_update": last_update,
-            "last_update_seconds_ago": last_update_seconds_ago,
-            "in_game": in_game,
-            "game_mode": gsi_manager.get_game_mode() if in_game else None,
-            "match_id": gsi_manager.get_match_id() if in_game else None,
-            "game_time": gsi_manager.get_game_time() if in_game else None,
-            "player_team": gsi_manager.get_player_team() if in_game else None
-        }
+        path = request.args.get('path')
+        data = bot_connector.get_gsi_history(
+            request.args.get('guild_id', type=int),
+            game_time=request.args.get('game_time', type=int),
+            path=path or None,
+            since=request.args.get('since', type=int) if path else None
+        )
 
         return jsonify({
             "status": "success",
-            "data": status
+            "data": data
         })
 
+    except IPCConnectionError as e:
+        return jsonify({
+            "status": "error",
+            "message": str(e)
+        }), 503
     except Exception as e:
-        logger.error(f"Error getting GSI status: {e}", exc_info=True)
+        logger.error(f"Error querying GSI history: {e}", exc_info=True)
         return jsonify({
             "status": "error",
-            "message": f"Error getting status: {str(e)}"
+            "message": f"Error querying history: {str(e)}"
         }), 500
 
 
@@ -122,15 +124,10 @@ def toggle_gsi_sync():
                 "message": "guild_id is required"
             }), 400
 
-        # Toggle sync for this guild
-        is_enabled = gsi_state.toggle_guild_sync(int(guild_id))
-
+        # Sync is driven by the bot, which receives the GSI packets
         return jsonify({
             "status": "success",
-            "data": {
-                "guild_id": guild_id,
-                "sync_enabled": is_enabled
-            }
+            "data": bot_connector.set_gsi_sync(int(guild_id))
         })
 
     except Exception as e:
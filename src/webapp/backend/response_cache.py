@@ -0,0 +1,105 @@
+"""
+Conditional GET and response caching for the dashboard's read endpoints.
+
+A cached response is keyed by its endpoint, parameters and the version of the data it
+was built from. While the version stays the same, requests are answered from the cache,
+and clients that already have the response get 304 Not Modified without a body.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Callable, Hashable, Optional, Tuple
+
+from flask import Response, jsonify, request
+
+from src.utils.config import RESPONSE_CACHE_SIZE
+
+
+class ResponseCache:
+    """
+    Least recently used cache of serialized responses. Safe to use from several threads.
+    """
+
+    def __init__(self, max_entries: int = RESPONSE_CACHE_SIZE):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries (int, optional): Responses kept at most.
+        """
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[bytes]:
+        with self._lock:
+            body = self._entries.get(key)
+            if body is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return body
+
+    def put(self, key: Hashable, body: bytes) -> None:
+        with self._lock:
+            self._entries[key] = body
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def _not_modified(etag: str, last_modified: Optional[datetime]) -> bool:
+    """Check the request's validators; If-None-Match takes precedence over If-Modified-Since."""
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    if last_modified is not None and request.if_modified_since is not None:
+        return last_modified.replace(microsecond=0) <= request.if_modified_since
+    return False
+
+
+def conditional_json(key: Tuple, version: Any, updated_at: float, build: Callable[[], Any],
+                     cache: Optional[ResponseCache] = None) -> Response:
+    """
+    Answer a GET request with data that only changes with its version.
+
+    Args:
+        key (tuple): Identifies the response apart from the version, e.g. (endpoint, guild_id, mode).
+        version: Version of the data; any change to the data must change it.
+        updated_at (float): Unix time of the data's latest change, 0 if unknown.
+        build (Callable): Returns the data; only called if neither the client nor the cache has it.
+        cache (ResponseCache, optional): Cache for the serialized response.
+
+    Returns:
+        Response: 304 if the client's copy is current, otherwise the data as
+        {"status": "success", "data": ...} with ETag and Last-Modified headers.
+    """
+    etag = hashlib.blake2b(repr((key, version, updated_at)).encode(), digest_size=8).hexdigest()
+    last_modified = datetime.fromtimestamp(updated_at, timezone.utc) if updated_at else None
+
+    if _not_modified(etag, last_modified):
+        response = Response(status=304)
+    else:
+        cache_key = key + (version,)
+        body = cache.get(cache_key) if cache is not None else None
+        if body is None:
+            body = jsonify({
+                "status": "success",
+                "data": build()
+            }).get_data()
+            if cache is not None:
+                cache.put(cache_key, body)
+        response = Response(body, mimetype="application/json")
+
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    # Clients may keep the response but must check it is current before using it
+    response.headers["Cache-Control"] = "no-cache"
+    return response
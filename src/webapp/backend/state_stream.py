@@ -0,0 +1,216 @@
+"""
+Live guild state for dashboard clients, streamed as server-sent events.
+
+All open streams share one subscription to the bot's "guilds" IPC topic. The bot's work
+therefore does not grow with the number of viewers. A stream first receives the state
+of its guilds, then only the guilds whose state changed.
+
+A stream that falls behind does not build a backlog. Its pending changes are merged per
+guild, so a slow client skips intermediate states and receives the latest one.
+
+Events:
+    snapshot:  {"connected": bool, "guilds": {guild_id: state}} when the stream opens
+    guild:     {"guild_id": str, "state": state} when a guild's state changed
+    removed:   {"guild_id": str} when a guild no longer has a timer or GSI sync
+    bot:       {"connected": bool} when the bot went away or came back
+    heartbeat: {"coalesced": int} after a quiet period, with the number of skipped states
+"""
+import json
+import logging
+import threading
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set
+
+from src.ipc.client import IPCClient, IPCError
+from src.utils.config import STREAM_HEARTBEAT_INTERVAL, STREAM_MAX_CLIENTS
+
+GUILDS_TOPIC = "guilds"
+
+# Seconds between attempts to reach the bot while it is down
+RECONNECT_INTERVAL = 3.0
+
+# How long browsers wait before reopening a dropped stream, in milliseconds
+CLIENT_RETRY_MS = 3000
+
+logger = logging.getLogger('DotaDiscordBot.WebApp')
+
+
+class StreamLimitError(Exception):
+    """Too many streams are open."""
+
+
+def format_event(event: str, data: Any) -> str:
+    """
+    Format a server-sent event.
+
+    Args:
+        event (str): The event name.
+        data: The event data; encoded as JSON.
+
+    Returns:
+        str: The event as sent on the stream.
+    """
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+class _Listener:
+    """An open stream and the changes it has not been sent yet."""
+
+    def __init__(self, guild_ids: Optional[Set[int]]):
+        self.guild_ids = guild_ids  # None for all guilds
+        self.pending: Dict[int, Optional[Dict[str, Any]]] = {}  # None for removed guilds
+        self.connected: Optional[bool] = None  # Set if the bot's status changed
+        self.coalesced = 0
+        self.wakeup = threading.Event()
+
+    def wants(self, guild_id: int) -> bool:
+        return self.guild_ids is None or guild_id in self.guild_ids
+
+    def offer(self, changed: Dict[int, Dict[str, Any]], removed: List[int], connected: Optional[bool]) -> None:
+        """Merge changes into the pending ones. Called with the stream's lock held."""
+        updates = [(guild_id, state) for guild_id, state in changed.items() if self.wants(guild_id)]
+        updates += [(guild_id, None) for guild_id in removed if self.wants(guild_id)]
+        for guild_id, state in updates:
+            if guild_id in self.pending:
+                self.coalesced += 1
+            self.pending[guild_id] = state
+        if connected is not None:
+            self.connected = connected
+        if updates or connected is not None:
+            self.wakeup.set()
+
+    def take(self):
+        """Take the pending changes. Called with the stream's lock held."""
+        pending, connected = self.pending, self.connected
+        self.pending, self.connected = {}, None
+        self.wakeup.clear()
+        return pending, connected
+
+
+class GuildStateStream:
+    """
+    Fans the bot's guild state out to dashboard streams.
+
+    The IPC subscription is opened with the first stream and closed after the last one.
+    """
+
+    def __init__(self, client: IPCClient, heartbeat_interval: float = STREAM_HEARTBEAT_INTERVAL,
+                 max_clients: int = STREAM_MAX_CLIENTS):
+        """
+        Initialize the stream.
+
+        Args:
+            client (IPCClient): Client for the bot's IPC socket.
+            heartbeat_interval (float, optional): Seconds after which a quiet stream gets a heartbeat.
+            max_clients (int, optional): Streams open at once at most.
+        """
+        self.client = client
+        self.heartbeat_interval = heartbeat_interval
+        self.max_clients = max_clients
+        self._lock = threading.Lock()
+        self._listeners: Set[_Listener] = set()
+        self._states: Dict[int, Dict[str, Any]] = {}
+        self._connected = False
+        self._settled = threading.Event()  # Set once the bot answered or could not be reached
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+    @property
+    def client_count(self) -> int:
+        return len(self._listeners)
+
+    def open(self, guild_ids: Optional[Iterable[int]] = None) -> Iterator[str]:
+        """
+        Open a stream.
+
+        Args:
+            guild_ids (iterable, optional): Guilds to receive; all guilds if None.
+
+        Returns:
+            Iterator[str]: The stream's server-sent events. Closing it closes the stream.
+
+        Raises:
+            StreamLimitError: If the maximum number of streams is open.
+        """
+        listener = _Listener(set(guild_ids) if guild_ids is not None else None)
+        with self._lock:
+            if len(self._listeners) >= self.max_clients:
+                raise StreamLimitError(f"Too many live streams are open ({self.max_clients})")
+            self._listeners.add(listener)
+            if self._thread is None:
+                self._settled.clear()
+                self._stopped.clear()
+                self._thread = threading.Thread(target=self._run, name="guild-state-stream", daemon=True)
+                self._thread.start()
+        return self._serve(listener)
+
+    def close(self) -> None:
+        """Stop following the bot; open streams stop receiving changes."""
+        self._stopped.set()
+
+    def _serve(self, listener: _Listener) -> Iterator[str]:
+        try:
+            yield f"retry: {CLIENT_RETRY_MS}\n\n"
+            self._settled.wait(self.client.timeout)
+            with self._lock:
+                listener.take()
+                guilds = {str(guild_id): state for guild_id, state in self._states.items()
+                          if listener.wants(guild_id)}
+                connected = self._connected
+            yield format_event("snapshot", {"connected": connected, "guilds": guilds})
+
+            while True:
+                # Heartbeats keep proxies from closing the stream and reveal disconnected clients
+                if not listener.wakeup.wait(self.heartbeat_interval):
+                    yield format_event("heartbeat", {"coalesced": listener.coalesced})
+                    continue
+                with self._lock:
+                    pending, connected = listener.take()
+                if connected is not None:
+                    yield format_event("bot", {"connected": connected})
+                for guild_id, state in pending.items():
+                    if state is None:
+                        yield format_event("removed", {"guild_id": str(guild_id)})
+                    else:
+                        yield format_event("guild", {"guild_id": str(guild_id), "state": state})
+        finally:
+            with self._lock:
+                self._listeners.discard(listener)
+
+    def _update(self, states: Dict[int, Dict[str, Any]], connected: bool) -> None:
+        """Record the bot's latest guild states and offer the changes to every stream."""
+        with self._lock:
+            changed = {guild_id: state for guild_id, state in states.items() if self._states.get(guild_id) != state}
+            removed = [guild_id for guild_id in self._states if guild_id not in states]
+            status = connected if connected != self._connected else None
+            self._states = states
+            self._connected = connected
+            for listener in self._listeners:
+                listener.offer(changed, removed, status)
+        self._settled.set()
+
+    def _has_listeners(self) -> bool:
+        with self._lock:
+            if self._listeners and not self._stopped.is_set():
+                return True
+            self._thread = None
+            return False
+
+    def _run(self) -> None:
+        """Follow the bot's guild states while streams are open."""
+        while self._has_listeners():
+            try:
+                pushes = self.client.subscribe([GUILDS_TOPIC])
+                try:
+                    for push in pushes:
+                        if push.get("topic") == GUILDS_TOPIC:
+                            self._update(push.get("data") or {}, connected=True)
+                        if not self._has_listeners():
+                            return
+                finally:
+                    pushes.close()
+            except IPCError as e:
+                logger.warning(f"Live guild state unavailable: {e}")
+            except Exception as e:
+                logger.error(f"Error following live guild state: {e}", exc_info=True)
+            self._update({}, connected=False)
+            self._stopped.wait(RECONNECT_INTERVAL)
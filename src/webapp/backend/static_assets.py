@@ -0,0 +1,155 @@
+"""
+Serves the dashboard's frontend build from memory.
+
+At startup every file of the build directory is read into a manifest with its MIME
+type, a strong ETag derived from its content and, for text files, gzip and brotli
+variants. Requests are then answered without touching the file system; a new build
+is picked up when the webapp restarts.
+
+Files with a content hash in their name, such as static/js/main.3f2a1b9c.js, never
+change, so browsers may cache them for a year. Other files, such as index.html, must
+be revalidated, which costs a 304 while they are unchanged.
+"""
+import gzip
+import hashlib
+import logging
+import mimetypes
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+from flask import Response, request
+
+try:
+    import brotli
+except ImportError:  # Serve gzip only
+    brotli = None
+
+logger = logging.getLogger('DotaDiscordBot.WebApp')
+
+# Names with a content hash, e.g. main.3f2a1b9c.js or 453.a1b2c3d4.chunk.css
+HASHED_NAME = re.compile(r"\.[0-9a-f]{8,}\.(chunk\.)?[a-z0-9]+$")
+
+# Files smaller than this are not worth compressing
+MIN_COMPRESS_SIZE = 512
+COMPRESSIBLE_TYPES = ("text/", "application/javascript", "application/json", "application/xml",
+                      "image/svg+xml", "application/manifest+json")
+# Brotli's highest quality takes seconds for large bundles; 9 compresses nearly as well
+BROTLI_QUALITY = 9
+
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+
+# Encodings in order of preference, with the suffix of precompressed files in the build
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+
+@dataclass(frozen=True)
+class StaticAsset:
+    """A file of the build, with its compressed variants keyed by content encoding."""
+    body: bytes
+    mimetype: str
+    etag: str
+    immutable: bool
+    encoded: Dict[str, bytes] = field(default_factory=dict)
+
+
+def _compress(body: bytes, encoding: str) -> Optional[bytes]:
+    """Compress a body, or return None if the encoding is unavailable."""
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=9, mtime=0)
+    if encoding == "br" and brotli is not None:
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return None
+
+
+class AssetManifest:
+    """
+    The files of a frontend build, read once and served from memory.
+    """
+
+    def __init__(self, root: str):
+        """
+        Read the build directory.
+
+        Args:
+            root (str): The build directory; if it does not exist, the manifest is empty.
+        """
+        self.root = root
+        self.assets: Dict[str, StaticAsset] = {}
+        self._load()
+
+    def _load(self) -> None:
+        if not os.path.isdir(self.root):
+            logger.warning(f"Frontend build not found at {self.root}")
+            return
+        total = 0
+        for directory, _, files in os.walk(self.root):
+            for name in files:
+                path = os.path.join(directory, name)
+                key = os.path.relpath(path, self.root).replace(os.sep, "/")
+                if any(key.endswith(suffix) and os.path.exists(path[:-len(suffix)]) for _, suffix in ENCODINGS):
+                    continue  # Precompressed variant of another file
+                with open(path, "rb") as f:
+                    body = f.read()
+                self.assets[key] = self._asset(path, key, body)
+                total += len(body)
+        logger.info(f"Loaded {len(self.assets)} frontend files ({total} bytes) from {self.root}")
+
+    @staticmethod
+    def _asset(path: str, key: str, body: bytes) -> StaticAsset:
+        mimetype = mimetypes.guess_type(key)[0] or "application/octet-stream"
+        encoded = {}
+        if len(body) >= MIN_COMPRESS_SIZE and mimetype.startswith(COMPRESSIBLE_TYPES):
+            for encoding, suffix in ENCODINGS:
+                if os.path.exists(path + suffix):
+                    with open(path + suffix, "rb") as f:
+                        variant = f.read()
+                else:
+                    variant = _compress(body, encoding)
+                # Keep only variants that save a meaningful amount
+                if variant is not None and len(variant) < len(body) * 0.9:
+                    encoded[encoding] = variant
+        return StaticAsset(
+            body=body,
+            mimetype=mimetype,
+            etag=hashlib.blake2b(body, digest_size=12).hexdigest(),
+            immutable=bool(HASHED_NAME.search(key)),
+            encoded=encoded
+        )
+
+    def get(self, path: str) -> Optional[StaticAsset]:
+        """Get the file at a path relative to the build directory."""
+        return self.assets.get(path)
+
+    def response(self, path: str) -> Optional[Response]:
+        """
+        Answer the current request with a file of the build.
+
+        Args:
+            path (str): Path relative to the build directory.
+
+        Returns:
+            Response: The file in the best encoding the client accepts, or 304 if the
+            client's copy is current. None if the build has no such file.
+        """
+        asset = self.assets.get(path)
+        if asset is None:
+            return None
+
+        body, etag, content_encoding = asset.body, asset.etag, None
+        for encoding, _ in ENCODINGS:
+            if encoding in asset.encoded and request.accept_encodings[encoding]:
+                body, content_encoding = asset.encoded[encoding], encoding
+                # Each representation needs its own strong ETag
+                etag = f"{asset.etag}-{encoding}"
+                break
+
+        response = Response(body, mimetype=asset.mimetype)
+        response.set_etag(etag)
+        if content_encoding:
+            response.headers["Content-Encoding"] = content_encoding
+        if asset.encoded:
+            response.vary.add("Accept-Encoding")
+        response.headers["Cache-Control"] = IMMUTABLE_CACHE if asset.immutable else "no-cache"
+        return response.make_conditional(request)
@@ -66,6 +66,38 @@ export const unpauseTimer = (guild_id) => {
   return api.post('/timers/unpause', { guild_id });
 };
 
+export const syncTimer = (guild_id, time, replay = false) => {
+  return api.post('/timers/sync', { guild_id, time, replay });
+};
+
+// Live timer and GSI state, pushed by the server as it changes.
+// handlers: { snapshot, guild, removed, bot } called with each event's data.
+// Returns a function that closes the stream; the browser reconnects dropped streams.
+export const openGuildStream = (guildIds = [], handlers = {}) => {
+  const query = guildIds.length ? `?guild_id=${guildIds.join(',')}` : '';
+  const source = new EventSource(`/api/stream${query}`);
+  ['snapshot', 'guild', 'removed', 'bot'].forEach((event) => {
+    if (handlers[event]) {
+      source.addEventListener(event, (e) => handlers[event](JSON.parse(e.data)));
+    }
+  });
+  if (handlers.error) {
+    source.onerror = handlers.error;
+  }
+  return () => source.close();
+};
+
+// Everything a view needs for some guilds in one request, e.g.
+// fetchSnapshot([guildId], ['events', 'gsi']). Guilds with an active timer if guildIds is empty;
+// mode selects the game mode of the events.
+export const fetchSnapshot = (guildIds = [], fields = [], mode = null) => {
+  const params = {};
+  if (guildIds.length) params.guild_id = guildIds.join(',');
+  if (fields.length) params.fields = fields.join(',');
+  if (mode) params.mode = mode;
+  return api.get('/snapshot', { params });
+};
+
 // Events endpoints
 export const fetchEvents = (guild_id, mode = 'regular') => {
   return api.get(`/events?guild_id=${guild_id}&mode=${mode}`);
@@ -79,6 +111,12 @@ export const removeEvent = (guild_id, event_id) => {
   return api.delete(`/events/${event_id}?guild_id=${guild_id}`);
 };
 
+// Apply several event/settings operations atomically, e.g.
+// [{ op: 'add_static', time: 90, message: '...' }, { op: 'remove_periodic', id: 3 }]
+export const batchUpdate = (guild_id, operations) => {
+  return api.post('/batch', { guild_id, operations });
+};
+
 // Settings endpoints
 export const fetchSettings = (guild_id) => {
   return api.get(`/settings?guild_id=${guild_id}`);
@@ -114,8 +152,9 @@ export const cancelTormentorTimer = (guild_id) => {
 };
 
 // Logs endpoint
-export const fetchLogs = (limit = 100, offset = 0) => {
-  return api.get(`/logs?limit=${limit}&offset=${offset}`);
+// filters: { level, logger, guild_id }; level is the minimum level, e.g. 'WARNING'
+export const fetchLogs = (limit = 100, offset = 0, filters = {}) => {
+  return api.get('/logs', { params: { limit, offset, ...filters } });
 };
 
 // GSI endpoints
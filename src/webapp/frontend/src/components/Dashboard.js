@@ -1,5 +1,5 @@
 import React, { useState, useEffect, useCallback } from 'react';
-import { fetchStatus, fetchLogs, fetchEvents, toggleGSISync } from '../api';
+import { fetchLogs, fetchSnapshot, toggleGSISync, openGuildStream } from '../api';
 import GSIStatus from './GSIStatus';
 import './Dashboard.css';
 
@@ -144,38 +144,14 @@ const Dashboard = () => {
     try {
       setRefreshing(true);
 
-      // Fetch bot status
+      // Fetch events of the selected guild; timer state arrives over the live stream
       try {
-        const statusData = await fetchStatus();
-        setStatus(statusData.data || { bot_running: false, active_timers_count: 0, active_timers: {} });
-
-        // Set active guild if there's at least one active timer
-        if (statusData.data.active_timers_count > 0) {
-          const guildIds = Object.keys(statusData.data.active_timers);
-          if (!activeGuild || !statusData.data.active_timers[activeGuild]) {
-            setActiveGuild(guildIds[0]);
-          }
-
-          // Only fetch events if we have a valid guild ID
-          const guildIdToUse = activeGuild || guildIds[0];
-          try {
-            const eventsData = await fetchEvents(guildIdToUse);
-            setEvents(eventsData.data || { static_events: {}, periodic_events: {} });
-          } catch (err) {
-            console.error("Error fetching events:", err);
-          }
-        } else if (!events.static_events || Object.keys(events.static_events).length === 0) {
-          // If no active timers, try to fetch events with default guild ID
-          try {
-            const eventsData = await fetchEvents(DEFAULT_GUILD_ID);
-            setEvents(eventsData.data || { static_events: {}, periodic_events: {} });
-          } catch (err) {
-            console.error("Error fetching events with default ID:", err);
-          }
-        }
+        const guildId = activeGuild || DEFAULT_GUILD_ID;
+        const response = await fetchSnapshot([guildId], ['events']);
+        const guild = response.data.data.guilds[guildId];
+        setEvents((guild && guild.events) || { static_events: {}, periodic_events: {} });
       } catch (err) {
-        console.error("Error fetching status:", err);
-        setStatus({ bot_running: false, active_timers_count: 0, active_timers: {} });
+        console.error("Error fetching events:", err);
       }
 
       // Fetch recent logs
@@ -195,7 +171,47 @@ const Dashboard = () => {
       setLoading(false);
       setRefreshing(false);
     }
-  }, [activeGuild, events.static_events]);
+  }, [activeGuild]);
+
+  // Follow live timer state; the server pushes each guild's state when it changes
+  useEffect(() => {
+    let guilds = {};
+    const publish = (connected) => {
+      const activeTimers = {};
+      Object.entries(guilds).forEach(([guildId, state]) => {
+        if (state.timer) activeTimers[guildId] = state.timer;
+      });
+      setStatus((previous) => ({
+        bot_running: connected === undefined ? previous.bot_running : connected,
+        active_timers_count: Object.keys(activeTimers).length,
+        active_timers: activeTimers,
+      }));
+    };
+
+    return openGuildStream([], {
+      snapshot: (data) => {
+        guilds = { ...data.guilds };
+        publish(data.connected);
+      },
+      guild: (data) => {
+        guilds[data.guild_id] = data.state;
+        publish();
+      },
+      removed: (data) => {
+        delete guilds[data.guild_id];
+        publish();
+      },
+      bot: (data) => publish(data.connected),
+    });
+  }, []);
+
+  // Select the first guild with a timer if the selected one has none
+  useEffect(() => {
+    const guildIds = Object.keys(status.active_timers || {});
+    if (guildIds.length > 0 && !status.active_timers[activeGuild]) {
+      setActiveGuild(guildIds[0]);
+    }
+  }, [status.active_timers, activeGuild]);
 
   // Toggle GSI sync function
   const handleToggleGsiSync = async () => {
@@ -1,7 +1,13 @@
 import React, { useState, useEffect } from 'react';
-import { fetchEvents, addEvent, removeEvent } from '../api';
+import { fetchSnapshot, batchUpdate } from '../api';
 import './EventsManager.css';
 
+// A guild's events of one game mode, from the dashboard snapshot
+const loadGuildEvents = async (guildId, mode) => {
+  const response = await fetchSnapshot([guildId], ['events'], mode);
+  return response.data.data.guilds[guildId].events;
+};
+
 const EventsManager = () => {
   const [events, setEvents] = useState({ static_events: {}, periodic_events: {} });
   const [loading, setLoading] = useState(true);
@@ -26,8 +32,7 @@ const EventsManager = () => {
 
       try {
         setLoading(true);
-        const data = await fetchEvents(guildId, mode);
-        setEvents(data.data);
+        setEvents(await loadGuildEvents(guildId, mode));
         setLoading(false);
       } catch (err) {
         console.error('Error loading events:', err);
@@ -64,8 +69,7 @@ const EventsManager = () => {
       setSubmitting(true);
 
       const payload = {
-        guild_id: guildId,
-        type: eventType,
+        op: `add_${eventType}`,
         mode: mode,
         message: formData.message
       };
@@ -88,11 +92,10 @@ const EventsManager = () => {
         payload.end_time = formData.end_time;
       }
 
-      const result = await addEvent(payload);
+      await batchUpdate(guildId, [payload]);
 
       // Reload events
-      const data = await fetchEvents(guildId, mode);
-      setEvents(data.data);
+      setEvents(await loadGuildEvents(guildId, mode));
 
       // Reset form
       setFormData({
@@ -118,11 +121,10 @@ const EventsManager = () => {
     }
 
     try {
-      await removeEvent(guildId, eventId);
+      await batchUpdate(guildId, [{ op: `remove_${eventType}`, id: Number(eventId) }]);
 
       // Reload events
-      const data = await fetchEvents(guildId, mode);
-      setEvents(data.data);
+      setEvents(await loadGuildEvents(guildId, mode));
     } catch (err) {
       console.error('Error deleting event:', err);
       setError('Failed to delete event: ' + (err.message || 'Unknown error'));
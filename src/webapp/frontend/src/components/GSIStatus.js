@@ -57,9 +57,10 @@ const GSIStatus = () => {
             {status?.connected ? 'Connected' : 'Disconnected'}
           </div>
 
-          {status?.last_update_seconds_ago !== null && (
+          {status?.last_update > 0 && (
             <div className="last-update">
-              Last update: {Math.round(status.last_update_seconds_ago)} seconds ago
+              {/* A 304 reuses the previous body, so count from last_update instead of last_update_seconds_ago */}
+              Last update: {Math.max(0, Math.round(Date.now() / 1000 - status.last_update))} seconds ago
             </div>
           )}
         </div>
@@ -127,7 +128,7 @@ const GSIStatus = () => {
               <pre>
 {`"dota_discord_bot"
 {
-    "uri"           "http://20.56.9.182:5000/api/gsi"
+    "uri"           "http://20.56.9.182:3000/"
     "timeout"       "5.0"
     "buffer"        "0.1"
     "throttle"      "0.1"
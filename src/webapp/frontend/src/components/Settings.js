@@ -1,5 +1,5 @@
 import React, { useState, useEffect } from 'react';
-import { fetchSettings, updateSettings } from '../api';
+import { fetchSnapshot, batchUpdate } from '../api';
 import './Settings.css';
 
 const Settings = () => {
@@ -39,8 +39,8 @@ const Settings = () => {
         setLoading(true);
         setError(null);
 
-        const response = await fetchSettings(guildId);
-        setSettings(response.data);
+        const response = await fetchSnapshot([guildId], ['settings']);
+        setSettings(response.data.data.guilds[guildId].settings);
         setIsLoaded(true);
 
         setLoading(false);
@@ -77,7 +77,7 @@ const Settings = () => {
       setLoading(true);
       setError(null);
 
-      await updateSettings(guildId, settings);
+      await batchUpdate(guildId, [{ op: 'update_settings', settings }]);
 
       setSuccess('Settings updated successfully');
       setLoading(false);
@@ -5,7 +5,7 @@ Serves the React frontend and provides API endpoints.
 """
 
 import os
-from flask import Flask, send_from_directory, jsonify
+from flask import Flask, jsonify
 from flask_cors import CORS
 from dotenv import load_dotenv
 
@@ -13,12 +13,15 @@ from dotenv import load_dotenv
 from backend.auth import auth_blueprint
 from backend.api import api_blueprint
 from backend.gsi_endpoint import gsi_blueprint
+from backend.static_assets import AssetManifest
 
 # Load environment variables from .env
 load_dotenv()
 
-app = Flask(__name__, static_folder='frontend/build')
+# The frontend build is served from memory by the catch-all route below
+app = Flask(__name__, static_folder=None)
 CORS(app)
+frontend_assets = AssetManifest(os.path.join(app.root_path, 'frontend', 'build'))
 
 # Register your routes
 app.register_blueprint(api_blueprint, url_prefix='/api')
@@ -29,10 +32,11 @@ app.register_blueprint(gsi_blueprint, url_prefix='/api/gsi')  # Register GSI blu
 @app.route('/', defaults={'path': ''})
 @app.route('/<path:path>')
 def serve(path):
-    """Serve the React frontend build files."""
-    if path != "" and os.path.exists(os.path.join(app.static_folder, path)):
-        return send_from_directory(app.static_folder, path)
-    return send_from_directory(app.static_folder, 'index.html')
+    """Serve the React frontend build files; unknown paths get index.html for client-side routing."""
+    response = frontend_assets.response(path) or frontend_assets.response('index.html')
+    if response is None:
+        return jsonify(error="Frontend build not found"), 404
+    return response
 
 @app.errorhandler(404)
 def not_found(e):
@@ -47,5 +51,6 @@ def server_error(e):
 if __name__ == '__main__':
     # Get port from environment variable or default to 5000
     port = int(os.environ.get('PORT', 5000))
-    # For local dev, debug=True. Set to False in production
-    app.run(host='0.0.0.0', port=port, debug=True)
\ No newline at end of file
+    # Debug mode reloads code and exposes an interactive debugger; only enable it locally
+    debug = os.environ.get('FLASK_DEBUG', '0').lower() in ('1', 'true')
+    app.run(host='0.0.0.0', port=port, debug=debug, threaded=True)
\ No newline at end of file
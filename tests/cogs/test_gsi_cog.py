@@ -0,0 +1,77 @@
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from src.cogs import gsi_cog
+from src.gsi.events import GSIEvent, GSIEventType
+from src.gsi.sessions import GSISession
+from src.gsi.snapshot import GSISnapshot
+from src.timer_service import TimerResult, TimerResultCode
+
+OK = TimerResult(TimerResultCode.OK, "")
+
+
+@pytest.fixture
+def cog():
+    """GSICog with a mock bot, a synced guild and no background task."""
+    bot = MagicMock()
+    with patch('discord.ext.tasks.Loop.start'), patch('discord.ext.tasks.Loop.cancel'):
+        cog = gsi_cog.GSICog(bot)
+        cog.active_games[1] = {'channel_id': 10, 'current_match_id': 'M1'}
+        channel = bot.get_guild.return_value.get_channel.return_value
+        channel.send = AsyncMock()
+        yield cog
+        cog.cog_unload()
+
+
+@pytest.fixture
+def session():
+    return GSISession("token", guild_id=1)
+
+
+@pytest.mark.asyncio
+async def test_roshan_event_starts_timer_once(cog, session):
+    event = GSIEvent(GSIEventType.ROSHAN_DIED, session, 900, 'M1')
+    with patch.object(gsi_cog.gsi_state.sessions, 'guilds_for', return_value=[1]), \
+            patch.object(gsi_cog.timer_service, 'start_child', new=AsyncMock(return_value=OK)) as rosh:
+        await cog.apply_gsi_event(event)
+        await cog.apply_gsi_event(event)
+
+    rosh.assert_awaited_once_with(1, 'roshan', actor=gsi_cog.GSI_ACTOR)
+    assert cog.active_games[1]['roshan_synced'] is True
+
+
+@pytest.mark.asyncio
+async def test_own_glyph_is_ignored(cog, session):
+    session.game_state = GSISnapshot({"player": {"team_number": 1}})
+    event = GSIEvent(GSIEventType.GLYPH_USED, session, 900, 'M1', {'team': 'dire'})
+    with patch.object(gsi_cog.gsi_state.sessions, 'guilds_for', return_value=[1]), \
+            patch.object(gsi_cog.timer_service, 'start_child', new=AsyncMock(return_value=OK)) as glyph:
+        await cog.apply_gsi_event(event)
+
+    glyph.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_game_end_event_stops_timer(cog, session):
+    event = GSIEvent(GSIEventType.GAME_ENDED, session, 2400, 'M1')
+    with patch.object(gsi_cog.gsi_state.sessions, 'guilds_for', return_value=[1]), \
+            patch.object(gsi_cog.timer_service, 'stop', new=AsyncMock(return_value=OK)) as stop:
+        await cog.apply_gsi_event(event)
+
+    stop.assert_awaited_once_with(1, actor=gsi_cog.GSI_ACTOR)
+    assert cog.active_games[1]['current_match_id'] is None
+
+
+@pytest.mark.asyncio
+async def test_failed_start_is_reported(cog, session):
+    event = GSIEvent(GSIEventType.GAME_STARTED, session, 0, 'M2', {'mode': 'regular'})
+    failed = TimerResult(TimerResultCode.CHANNEL_NOT_FOUND, "'DOTA' voice channel not found.")
+    with patch.object(gsi_cog.gsi_state.sessions, 'guilds_for', return_value=[1]), \
+            patch.object(gsi_cog.timer_service, 'stop', new=AsyncMock(return_value=OK)), \
+            patch.object(gsi_cog.timer_service, 'start', new=AsyncMock(return_value=failed)) as start:
+        await cog.apply_gsi_event(event)
+
+    start.assert_awaited_once_with(1, "30", 'regular', actor=gsi_cog.GSI_ACTOR)
+    channel = cog.bot.get_guild.return_value.get_channel.return_value
+    assert "voice channel not found" in channel.send.await_args.args[0]
@@ -20,7 +20,18 @@ def test_bot():
     return bot
 
 @pytest.fixture
-def ctx():
+def guilds():
+    """Attach a bot to the timer service that finds the guilds registered in the returned dict."""
+    from src.timer_service import timer_service
+    known = {}
+    service_bot = Mock(voice_clients=[])
+    service_bot.get_guild.side_effect = known.get
+    timer_service.attach(service_bot)
+    yield known
+    timer_service.attach(None)
+
+@pytest.fixture
+def ctx(guilds):
     """Create a mock context."""
     mock_ctx = Mock()
     mock_ctx.send = AsyncMock()
@@ -31,12 +42,13 @@ def ctx():
     mock_ctx.author.guild_permissions = Mock(administrator=True)
     mock_ctx.author.name = "TestUser"
     mock_ctx.channel = AsyncMock()  # Mock the channel
+    guilds[mock_ctx.guild.id] = mock_ctx.guild
     return mock_ctx
 
 @pytest.mark.asyncio
 async def test_start_command_success(test_bot, ctx):
     """Test the !start command with valid inputs."""
-    with patch('src.bot.GameTimer') as MockGameTimer, \
+    with patch('src.timer_service.GameTimer') as MockGameTimer, \
          patch('discord.utils.get') as mock_get, \
          patch('discord.ext.commands.Bot.load_extension', new=AsyncMock()):
 
@@ -82,13 +94,15 @@ async def test_start_command_invalid_countdown(test_bot, ctx):
 @pytest.mark.asyncio
 async def test_start_command_already_running(test_bot, ctx):
     """Test the !start command when a timer is already running."""
-    with patch('src.bot.GameTimer') as MockGameTimer, \
+    with patch('src.timer_service.GameTimer') as MockGameTimer, \
             patch('discord.utils.get', return_value=AsyncMock()) as mock_get, \
             patch('discord.ext.commands.Bot.load_extension', new=AsyncMock()):
         # Mock the Timer as already running
         mock_timer = Mock()
         mock_timer.is_running.return_value = True
         MockGameTimer.return_value = mock_timer
+        from src.bot import game_timers
+        game_timers[ctx.guild.id] = mock_timer
 
         # Mock return values for `get`
         mock_voice_channel = AsyncMock()
@@ -104,9 +118,10 @@ async def test_start_command_already_running(test_bot, ctx):
         ctx.send.assert_awaited_once_with("A game timer is already running in this server.")
 
 @pytest.mark.asyncio
-async def test_start_timers_in_different_servers():
+async def test_start_timers_in_different_servers(guilds):
     """Test starting timers in different servers."""
-    from src.bot import game_timers, start_game, VOICE_CHANNEL_NAME, TIMER_CHANNEL_NAME
+    from src.bot import game_timers, start_game
+    from src.utils.config import VOICE_CHANNEL_NAME, TIMER_CHANNEL_NAME
 
     # Reset game_timers before the test to ensure isolation
     game_timers.clear()
@@ -134,7 +149,10 @@ async def test_start_timers_in_different_servers():
     ctx_server_b.author = Mock()
     ctx_server_b.author.guild_permissions = Mock(administrator=True)
 
-    with patch('src.bot.GameTimer') as MockGameTimer, \
+    guilds[1] = ctx_server_a.guild
+    guilds[2] = ctx_server_b.guild
+
+    with patch('src.timer_service.GameTimer') as MockGameTimer, \
          patch('discord.utils.get') as mock_get, \
          patch('discord.ext.commands.Bot.load_extension', new=AsyncMock()):
 
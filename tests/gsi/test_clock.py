@@ -0,0 +1,85 @@
+import pytest
+
+from src.gsi.clock import GameClock
+
+
+class FakeTime:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def fake_time():
+    return FakeTime()
+
+
+@pytest.fixture
+def clock(fake_time):
+    return GameClock(time_source=fake_time)
+
+
+def test_clock_runs_between_packets(clock, fake_time):
+    assert clock.now() is None
+    clock.observe(100, match_id="1")
+    fake_time.now += 2.5
+
+    assert clock.now() == pytest.approx(102.5)
+    assert clock.until_next_second() == pytest.approx(0.5)
+
+
+def test_late_packets_within_the_second_are_ignored(clock, fake_time):
+    clock.observe(100, match_id="1")
+    fake_time.now += 0.2
+    clock.observe(100, match_id="1")  # Non-edge packet still inside second 100
+    fake_time.now += 0.8
+    clock.observe(101, match_id="1", at=fake_time.now + 0.3)  # Second began, packet delayed
+
+    assert clock.now() == pytest.approx(101 - 0.25 * 0.3)
+    assert clock.steps == 0
+
+
+def test_edges_converge_on_the_client_clock(clock, fake_time):
+    start = fake_time.now - 0.6  # Second 0 began before the first packet arrived
+    clock.observe(0, match_id="1")
+    for second in range(1, 30):
+        clock.observe(second, match_id="1", at=start + second)
+
+    assert clock.now(at=start + 30) == pytest.approx(30, abs=0.01)
+    assert abs(clock.error) < 0.01
+
+
+def test_large_error_steps(clock, fake_time):
+    clock.observe(100, match_id="1")
+    fake_time.now += 1
+    clock.observe(140, match_id="1")
+
+    assert clock.now() == 140
+    assert clock.steps == 1
+
+
+def test_pause_freezes_the_clock(clock, fake_time):
+    clock.observe(100, match_id="1")
+    fake_time.now += 0.5
+    clock.observe(100, paused=True, match_id="1")
+    fake_time.now += 30
+
+    assert clock.paused
+    assert clock.now() == 100
+    assert clock.until_next_second() == 1.0
+
+    clock.observe(100, match_id="1")
+    fake_time.now += 1
+    assert not clock.paused
+    assert clock.now() == pytest.approx(101)
+
+
+def test_new_match_restarts_the_clock(clock, fake_time):
+    clock.observe(1500, match_id="1")
+    clock.observe(-90, match_id="2")
+
+    assert clock.now() == -90
+    assert clock.match_id == "2"
+    assert clock.steps == 0
@@ -0,0 +1,74 @@
+import pytest
+
+from src.gsi.derived import DerivedState
+from src.gsi.gsi_manager import GSIManager
+from src.gsi.gsi_state import gsi_state
+from src.gsi.sessions import SessionRegistry
+from src.gsi.snapshot import GSISnapshot
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    sessions = SessionRegistry()
+    sessions.set_default_token("secret")
+    monkeypatch.setattr(gsi_state, "sessions", sessions)
+    return GSIManager()
+
+
+def test_roshan_from_respawn_timer_in_turbo():
+    derived = DerivedState(GSISnapshot({
+        "map": {"game_time": 1000, "game_mode": 22},
+        "roshan": {"alive": False, "respawn_timer": 100},
+    }))
+
+    assert derived.game_mode == "turbo"
+    assert derived.roshan["death_time"] == 900
+    assert derived.roshan["min_respawn_time"] == 1140
+    assert derived.roshan["max_respawn_time"] == 1230
+
+
+def test_glyphs_inferred_from_latest_events():
+    derived = DerivedState(GSISnapshot({
+        "map": {"game_time": 700, "game_mode": 1},
+        "events": [
+            {"event_type": "glyph_used", "team": "radiant", "game_time": 100},
+            {"event_type": "glyph_used", "team": "radiant", "game_time": 500},
+            {"event_type": "glyph_used", "team": "dire", "game_time": 350},
+        ],
+    }))
+
+    assert derived.glyphs == {"radiant": False, "dire": True}
+    assert derived.roshan["alive"] is True
+
+
+def test_roshan_inferred_from_kill_event():
+    derived = DerivedState(GSISnapshot({
+        "map": {"game_time": 1000, "game_mode": 1},
+        "events": [{"event_type": "aegis_picked_up", "game_time": 905},
+                   {"event_type": "roshan_killed", "game_time": 900}],
+    }))
+
+    assert derived.roshan["alive"] is False and derived.roshan["death_time"] == 900
+
+
+def test_values_are_computed_once_per_packet(manager):
+    gsi_state.game_state = {"map": {"game_time": 10, "game_mode": 1}, "player": {"team_number": 1}}
+
+    first = manager.derived
+    assert manager.get_player_team() == "dire"
+    first.__dict__["player_team"] = "cached"
+    assert manager.get_player_team() == "cached"
+    assert manager.derived is first
+
+    gsi_state.game_state = {"map": {"game_time": 11, "game_mode": 22}}
+    assert manager.derived is not first
+    assert manager.derived.sequence == first.sequence + 1
+    assert manager.get_game_mode() == "turbo"
+
+
+def test_accessors_return_copies(manager):
+    gsi_state.game_state = {"roshan": {"alive": True}}
+
+    manager.get_roshan_state()["alive"] = False
+
+    assert manager.get_roshan_state()["alive"] is True
@@ -0,0 +1,124 @@
+import threading
+import time
+
+import pytest
+
+from src.gsi.dispatch import DROP_OLDEST, LATEST_WINS, GSIDispatcher
+from src.gsi.events import GSIEvent, GSIEventType
+
+
+@pytest.fixture
+def blocked():
+    """A callback that blocks until released, recording what it received."""
+    release = threading.Event()
+    received = []
+
+    def slow_callback(snapshot):
+        release.wait(timeout=5)
+        received.append(snapshot)
+
+    slow_callback.release = release
+    slow_callback.received = received
+    return slow_callback
+
+
+def make_dispatcher(overflow, callback, max_pending=2):
+    dispatcher = GSIDispatcher(max_pending=max_pending, overflow=overflow, workers=1)
+    dispatcher.subscribe(callback)
+    return dispatcher
+
+
+def wait_until_picked_up(dispatcher):
+    # Workers do not notify when they pick up a packet, so poll
+    deadline = time.monotonic() + 5
+    while dispatcher._busy != 1:
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+
+
+def test_drop_oldest_keeps_newest_packets(blocked):
+    dispatcher = make_dispatcher(DROP_OLDEST, blocked)
+    dispatcher.submit("a", 0)
+    wait_until_picked_up(dispatcher)
+    for packet in (1, 2, 3):
+        dispatcher.submit("a", packet)
+
+    blocked.release.set()
+    assert dispatcher.join(timeout=5)
+    dispatcher.stop()
+
+    assert blocked.received == [0, 2, 3]
+    stats = dispatcher.stats()
+    assert stats["dropped"] == 1
+    assert stats["max_depth"] == 2
+    assert stats["callbacks"]["slow_callback"]["calls"] == 3
+
+
+def test_latest_wins_per_session_keeps_events(blocked):
+    events = []
+    dispatcher = make_dispatcher(LATEST_WINS, blocked)
+    dispatcher.subscribe(events.append, frozenset([GSIEventType.ROSHAN_DIED]))
+    dispatcher.submit("a", 0)
+    wait_until_picked_up(dispatcher)
+    dispatcher.submit("a", 1, [GSIEvent(GSIEventType.ROSHAN_DIED, None, 1)])
+    dispatcher.submit("b", 2)
+    dispatcher.submit("a", 3, [GSIEvent(GSIEventType.GLYPH_USED, None, 3)])
+
+    blocked.release.set()
+    assert dispatcher.join(timeout=5)
+    dispatcher.stop()
+
+    assert blocked.received == [0, 3, 2]
+    assert [event.game_time for event in events] == [1]
+    assert dispatcher.stats()["dropped"] == 1
+
+
+def test_drop_oldest_keeps_the_events_of_dropped_packets(blocked):
+    events = []
+    dispatcher = make_dispatcher(DROP_OLDEST, blocked)
+    dispatcher.subscribe(events.append, frozenset([GSIEventType.ROSHAN_DIED, GSIEventType.GAME_STARTED]))
+    dispatcher.submit("a", 0)
+    wait_until_picked_up(dispatcher)
+    dispatcher.submit("a", 1, [GSIEvent(GSIEventType.GAME_STARTED, None, 1)])
+    dispatcher.submit("b", 2, [GSIEvent(GSIEventType.ROSHAN_DIED, None, 2)])
+    dispatcher.submit("a", 3)  # Drops packet 1; its event moves to packet 3
+    dispatcher.submit("a", 4)  # Drops packet 2; its event waits for session b's next packet
+    dispatcher.submit("b", 5)  # Drops packet 3
+
+    blocked.release.set()
+    assert dispatcher.join(timeout=5)
+    dispatcher.stop()
+
+    assert blocked.received == [0, 4, 5]
+    assert [event.game_time for event in events] == [1, 2]
+    assert dispatcher.stats()["dropped"] == 3
+
+
+def test_sessions_keep_their_order_across_workers():
+    received = {}
+    dispatcher = GSIDispatcher(max_pending=10000, workers=4)
+    dispatcher.subscribe(lambda packet: received.setdefault(packet[0], []).append(packet[1]))
+    for index in range(200):
+        for key in "abcdef":
+            dispatcher.submit(key, (key, index))
+    assert dispatcher.join(timeout=5)
+    dispatcher.stop()
+
+    assert received == {key: list(range(200)) for key in "abcdef"}
+
+
+def test_failing_callback_is_counted():
+    def broken(_):
+        raise RuntimeError("boom")
+
+    dispatcher = make_dispatcher(DROP_OLDEST, broken)
+    dispatcher.submit("a", 0)
+    assert dispatcher.join(timeout=5)
+    dispatcher.stop()
+
+    assert dispatcher.stats()["callbacks"]["broken"]["errors"] == 1
+
+
+def test_unknown_overflow_policy_is_rejected():
+    with pytest.raises(ValueError):
+        GSIDispatcher(overflow="drop-newest")
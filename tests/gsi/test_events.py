@@ -0,0 +1,127 @@
+
+from src.gsi.derived import DerivedState
+from src.gsi.events import GSIEventType, detect_events
+from src.gsi.gsi_manager import GSIManager
+from src.gsi.gsi_state import gsi_state
+from src.gsi.sessions import SessionRegistry
+from src.gsi.snapshot import EMPTY_SNAPSHOT, GSISnapshot
+
+IN_PROGRESS = "DOTA_GAMERULES_STATE_GAME_IN_PROGRESS"
+
+
+def state(match_id="1", game_state=IN_PROGRESS, roshan_alive=True, dire_glyph=0, game_time=600):
+    return DerivedState(GSISnapshot({
+        "map": {"matchid": match_id, "game_state": game_state, "game_time": game_time, "game_mode": 22},
+        "roshan": {"alive": roshan_alive},
+        "buildings": {"radiant": {"glyph": {"cooldown": 0}}, "dire": {"glyph": {"cooldown": dire_glyph}}},
+    }))
+
+
+def types(events):
+    return [event.type for event in events]
+
+
+def test_game_start_and_end():
+    started = detect_events(DerivedState(EMPTY_SNAPSHOT), state())
+    assert types(started) == [GSIEventType.GAME_STARTED]
+    assert started[0].data == {"mode": "turbo"}
+    assert started[0].match_id == "1"
+
+    assert types(detect_events(state(), state(game_state="DOTA_GAMERULES_STATE_POST_GAME"))) == [
+        GSIEventType.GAME_ENDED]
+    assert types(detect_events(state(match_id="1"), state(match_id="2"))) == [GSIEventType.GAME_STARTED]
+
+
+def test_roshan_and_glyph_changes():
+    assert types(detect_events(state(), state(roshan_alive=False))) == [GSIEventType.ROSHAN_DIED]
+    assert types(detect_events(state(roshan_alive=False), state())) == [GSIEventType.ROSHAN_RESPAWNED]
+
+    events = detect_events(state(), state(dire_glyph=300))
+    assert types(events) == [GSIEventType.GLYPH_USED]
+    assert events[0].data == {"team": "dire"}
+
+
+def test_unchanged_packets_emit_nothing():
+    assert detect_events(state(), state(game_time=601)) == []
+    assert detect_events(state(roshan_alive=False), state(roshan_alive=False)) == []
+
+
+def test_typed_callbacks_receive_matching_events(monkeypatch):
+    sessions = SessionRegistry()
+    sessions.set_default_token("secret")
+    monkeypatch.setattr(gsi_state, "sessions", sessions)
+    manager = GSIManager()
+    received, snapshots = [], []
+    manager.register_callback(received.append, event_types=[GSIEventType.ROSHAN_DIED])
+    manager.register_callback(snapshots.append)
+
+    manager.process_request("secret", state().snapshot)
+    manager.process_request("secret", state(roshan_alive=False).snapshot)
+    assert manager.dispatcher.join(timeout=5)
+
+    assert types(received) == [GSIEventType.ROSHAN_DIED]
+    assert received[0].session is sessions.get("secret")
+    assert len(snapshots) == 2
+
+    assert manager.unregister_callback(received.append)
+    assert not manager.unregister_callback(received.append)
+    manager.dispatcher.stop()
+
+
+def packet(**sections):
+    data = {"map": {"matchid": "1", "game_state": IN_PROGRESS, "game_time": 600, "game_mode": 22}}
+    for key, value in sections.items():
+        if key == "map":
+            data["map"] = {**data["map"], **value}
+        else:
+            data[key] = value
+    return DerivedState(GSISnapshot(data))
+
+
+def test_pause_and_day_night():
+    assert types(detect_events(packet(map={"paused": False}), packet(map={"paused": True}))) == [
+        GSIEventType.GAME_PAUSED]
+    assert types(detect_events(packet(map={"paused": True}), packet(map={"paused": False}))) == [
+        GSIEventType.GAME_UNPAUSED]
+    assert types(detect_events(packet(map={"daytime": True}), packet(map={"daytime": False}))) == [
+        GSIEventType.NIGHT_STARTED]
+
+
+def test_building_kills():
+    before = {"radiant": {"tower1_top": {"health": 100}, "tower2_top": {"health": 1800}},
+              "dire": {"glyph": {"cooldown": 0}, "rax_melee_mid": {"health": 50}}}
+    after = {"radiant": {"tower1_top": {"health": 0}, "tower2_top": {"health": 1700}},
+             "dire": {"glyph": {"cooldown": 0}}}
+
+    events = detect_events(packet(buildings=before), packet(buildings=after))
+    assert [(event.type, event.data) for event in events] == [
+        (GSIEventType.BUILDING_DESTROYED, {"team": "radiant", "building": "tower1_top"}),
+        (GSIEventType.BUILDING_DESTROYED, {"team": "dire", "building": "rax_melee_mid"}),
+    ]
+
+
+def test_hero_death_and_buyback():
+    alive = {"name": "npc_dota_hero_axe", "alive": True, "buyback_cooldown": 0}
+    dead = {**alive, "alive": False, "respawn_seconds": 40}
+    bought_back = {**alive, "buyback_cooldown": 480}
+
+    died = detect_events(packet(hero=alive), packet(hero=dead))
+    assert types(died) == [GSIEventType.HERO_DIED]
+    assert died[0].data == {"hero": "axe", "respawn_seconds": 40}
+    assert died[0].game_time == 600
+    assert types(detect_events(packet(hero=dead), packet(hero=bought_back))) == [GSIEventType.BUYBACK_USED]
+
+
+def test_tormentor_kill_is_reported_once():
+    kill = {"event_type": "tormentor_killed", "game_time": 1300, "team": "dire"}
+    first = detect_events(packet(events=[]), packet(events=[kill]))
+    assert [(event.type, event.data) for event in first] == [
+        (GSIEventType.TORMENTOR_KILLED, {"team": "dire", "death_time": 1300})]
+    assert detect_events(packet(events=[kill]), packet(events=[kill], map={"game_time": 601})) == []
+
+
+def test_first_packet_of_a_match_is_compared_to_an_empty_packet():
+    hero = {"name": "npc_dota_hero_axe", "alive": False}
+    buildings = {"radiant": {"glyph": {"cooldown": 100}}}
+    events = detect_events(state(match_id="0"), packet(hero=hero, buildings=buildings, map={"paused": True}))
+    assert types(events) == [GSIEventType.GAME_STARTED, GSIEventType.GAME_PAUSED]
@@ -0,0 +1,109 @@
+import pytest
+
+from src.gsi.history import REMOVED, Delta, GSIHistory, apply_delta, compute_delta
+from src.gsi.snapshot import GSISnapshot
+
+
+def packet(game_time, roshan_alive=True, match_id="1", **extra):
+    data = {
+        "map": {"matchid": match_id, "game_time": game_time},
+        "roshan": {"alive": roshan_alive, "health": 5000},
+    }
+    data.update(extra)
+    return GSISnapshot(data)
+
+
+def test_compute_and_apply_delta_round_trip():
+    old = {"a": 1, "b": {"c": 2, "d": 3}, "e": [1], "gone": True}
+    new = {"a": 1, "b": {"c": 4, "d": 3}, "e": [1, 2], "f": {"g": 5}}
+
+    delta = compute_delta(old, new)
+
+    assert delta == {"b": {"c": 4}, "e": [1, 2], "f": {"g": 5}, "gone": REMOVED}
+    assert isinstance(delta["b"], Delta)
+    assert not isinstance(delta["f"], Delta)
+    assert apply_delta(old, delta) == new
+    assert old["b"]["c"] == 2
+
+
+def test_unchanged_packets_are_not_stored():
+    history = GSIHistory()
+    assert history.record(packet(10))
+    assert not history.record(packet(10))
+    assert not history.record(GSISnapshot({"provider": {}}))
+    assert len(history) == 1
+
+
+def test_state_at_rebuilds_packets_across_segments():
+    history = GSIHistory(keyframe_interval=4)
+    for game_time in range(0, 20):
+        history.record(packet(game_time, roshan_alive=game_time < 13))
+
+    assert history.time_range == (0, 19)
+    assert history.state_at(-1) is None
+    assert history.state_at(12)["roshan"]["alive"] is True
+    assert history.state_at(13)["roshan"]["alive"] is False
+    assert history.state_at(100)["map"]["game_time"] == 19
+
+
+def test_first_change_finds_flip():
+    history = GSIHistory(keyframe_interval=4)
+    for game_time in range(0, 30):
+        history.record(packet(game_time, roshan_alive=not 13 <= game_time < 25))
+
+    assert history.first_change(("roshan", "alive")) == (13, True, False)
+    assert history.first_change(("roshan", "alive"), since=13) == (25, False, True)
+    assert history.first_change(("roshan", "health")) is None
+
+
+def test_changes_follow_replaced_and_removed_parents():
+    history = GSIHistory()
+    history.record(packet(1, buildings={"radiant": {"glyph": {"cooldown": 0}}}))
+    history.record(packet(2, buildings={"radiant": {"glyph": {"cooldown": 300}}}))
+    history.record(packet(3))
+
+    assert list(history.changes(("buildings", "radiant", "glyph", "cooldown"))) == [
+        (2, 0, 300),
+        (3, 300, None),
+    ]
+
+
+def test_byte_budget_evicts_whole_segments():
+    reference = GSIHistory(keyframe_interval=4)
+    for game_time in range(10, 18):
+        reference.record(packet(game_time))
+    budget = reference.size  # Two segments of small packets
+
+    history = GSIHistory(max_bytes=budget, keyframe_interval=4)
+    for game_time in range(10, 30):
+        history.record(packet(game_time))
+
+    assert len(history) == 8 and history.size <= budget
+    assert history.time_range == (22, 29)
+    assert history.state_at(21) is None
+    assert history.state_at(22)["map"]["game_time"] == 22
+
+    # Larger packets use up the budget sooner; the current segment is always kept
+    history = GSIHistory(max_bytes=budget, keyframe_interval=4)
+    for game_time in range(10, 30):
+        history.record(packet(game_time, hero={"name": "x" * 1000}))
+    assert history.time_range == (26, 29)
+
+
+@pytest.mark.parametrize("second", [packet(5, match_id="2"), packet(3)])
+def test_new_match_resets_history(second):
+    history = GSIHistory()
+    history.record(packet(10))
+    history.record(second)
+
+    assert len(history) == 1
+    assert history.time_range == (second["map"]["game_time"],) * 2
+
+
+def test_diff_between_game_times():
+    history = GSIHistory()
+    history.record(packet(1))
+    history.record(packet(2, roshan_alive=False))
+
+    assert history.diff(1, 2) == {"map": {"game_time": 2}, "roshan": {"alive": False}}
+    assert history.diff(0, 2) is None
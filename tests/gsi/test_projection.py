@@ -0,0 +1,64 @@
+from src.gsi.derived import DERIVED_FIELDS
+from src.gsi.projection import FieldProjection
+from src.gsi.snapshot import GSISnapshot, unwrap
+
+PACKET = {
+    "map": {"matchid": "1", "game_time": 600},
+    "buildings": {
+        "radiant": {"glyph": {"cooldown": 0}, "tower1_top": {"health": 1800}},
+        "dire": {"glyph": {"cooldown": 120}, "tower1_top": {"health": 900}},
+    },
+    "player": {"team_number": 0, "gold": 2000},
+    "hero": {"name": "npc_dota_hero_axe", "level": 12, "abilities": [{"name": "berserkers_call"}]},
+    "items": {"slot0": {"name": "item_blink"}},
+    "events": [{"event_type": "roshan_killed", "game_time": 590, "killer": "axe"}],
+    "auth": {"token": "secret"},
+}
+
+
+def test_only_registered_fields_are_kept():
+    projection = FieldProjection(["map", "buildings.*.glyph", "player.team_number", "events.game_time"])
+
+    assert projection.apply(PACKET) == {
+        "map": {"matchid": "1", "game_time": 600},
+        "buildings": {"radiant": {"glyph": {"cooldown": 0}}, "dire": {"glyph": {"cooldown": 120}}},
+        "player": {"team_number": 0},
+        "events": [{"game_time": 590}],
+    }
+
+
+def test_wildcard_and_explicit_keys_combine():
+    projection = FieldProjection(["buildings.*.glyph", "buildings.dire.tower1_top.health"])
+
+    assert projection.apply(PACKET)["buildings"] == {
+        "radiant": {"glyph": {"cooldown": 0}},
+        "dire": {"glyph": {"cooldown": 120}, "tower1_top": {"health": 900}},
+    }
+
+
+def test_shorter_paths_keep_whole_subtrees():
+    projection = FieldProjection(["hero.name"])
+    projection.require("hero", "hero.level")
+
+    assert projection.apply(PACKET)["hero"] is PACKET["hero"]
+
+
+def test_star_keeps_packets_whole():
+    projection = FieldProjection(["map"])
+    snapshot = GSISnapshot(PACKET, received_at=5.0)
+    projection.require("*")
+
+    assert projection.keeps_everything
+    assert projection.project(snapshot) is snapshot
+
+
+def test_project_keeps_reception_time_and_shares_subtrees():
+    projection = FieldProjection(DERIVED_FIELDS)
+    snapshot = GSISnapshot(PACKET, received_at=5.0, size=100)
+
+    projected = projection.project(snapshot)
+    assert projected.received_at == 5.0
+    assert projected.size == 100
+    assert unwrap(projected["map"]) is PACKET["map"]
+    assert "items" not in projected and "auth" not in projected
+    assert projected["hero"] == {"name": "npc_dota_hero_axe", "level": 12}
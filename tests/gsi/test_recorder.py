@@ -0,0 +1,72 @@
+import os
+import threading
+
+import pytest
+
+from src.gsi.recorder import GSIRecorder, read_recording
+from src.gsi.snapshot import GSISnapshot
+
+
+def packet(match_id, game_time, token="secret"):
+    return GSISnapshot({"auth": {"token": token}, "map": {"matchid": match_id, "game_time": game_time}},
+                       received_at=1700000000.0 + game_time)
+
+
+def test_recording_round_trip(tmp_path):
+    recorder = GSIRecorder(str(tmp_path))
+    recorder.record(GSISnapshot({"auth": {"token": "secret"}, "provider": {}}))  # In menus, skipped
+    for game_time in range(3):
+        recorder.record(packet("1", game_time))
+    recorder.record(packet("2", 0))
+    recorder.close()
+
+    files = sorted(os.listdir(tmp_path))
+    assert len(files) == 2
+    entries = list(read_recording(str(tmp_path / files[0])))
+    assert [received_at for received_at, _ in entries] == [1700000000.0, 1700000001.0, 1700000002.0]
+    assert entries[0][1] == {"map": {"matchid": "1", "game_time": 0}}
+    assert all("secret" not in name for name in files)
+
+
+def test_packets_are_written_off_the_calling_thread(tmp_path):
+    recorder = GSIRecorder(str(tmp_path), queue_size=2)
+    writers = []
+    release = threading.Event()
+
+    def write(client, packet, received_at):
+        writers.append((threading.current_thread(), packet["map"]["game_time"]))
+        release.wait(2)
+
+    recorder.write = write
+    for game_time in range(4):
+        recorder.record(packet("1", game_time))
+    # At most one packet is being written and two are queued; the rest are dropped
+    assert recorder.dropped >= 1
+    release.set()
+    recorder.close()
+
+    assert all(thread is not threading.current_thread() for thread, _ in writers)
+    assert [game_time for _, game_time in writers] == sorted(game_time for _, game_time in writers)
+
+
+def test_truncated_recording_is_read_up_to_the_damage(tmp_path):
+    recorder = GSIRecorder(str(tmp_path))
+    for game_time in range(40):
+        recorder.record(packet("1", game_time))
+    recorder.close()
+    path = str(tmp_path / os.listdir(tmp_path)[0])
+    with open(path, "rb") as file:
+        data = file.read()
+    with open(path, "wb") as file:
+        file.write(data[:-20])
+
+    entries = list(read_recording(path))
+    assert 0 < len(entries) < 40
+    assert [entry[1]["map"]["game_time"] for entry in entries] == list(range(len(entries)))
+
+
+def test_uncompressed_recordings_are_read(tmp_path):
+    path = tmp_path / "match.jsonl"
+    path.write_text('{"t": 1.5, "packet": {"map": {}}}\n\nnot json\n')
+
+    assert list(read_recording(str(path))) == [(1.5, {"map": {}})]
@@ -0,0 +1,99 @@
+import json
+import os
+import threading
+
+import pytest
+import pytest_asyncio
+from aiohttp.test_utils import TestClient, TestServer
+
+from src.gsi.gsi_manager import GSIManager
+from src.gsi.gsi_state import gsi_state
+from src.gsi.projection import FieldProjection
+from src.gsi.recorder import GSIRecorder, read_recording
+from src.gsi.server import GSIServer
+from src.gsi.sessions import SessionRegistry
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    sessions = SessionRegistry()
+    sessions.set_default_token("secret")
+    monkeypatch.setattr(gsi_state, "sessions", sessions)
+    return GSIManager()
+
+
+@pytest_asyncio.fixture
+async def client(manager):
+    client = TestClient(TestServer(GSIServer(manager).app))
+    await client.start_server()
+    yield client
+    await client.close()
+
+
+def packet(token="secret", match_id="1"):
+    return json.dumps({"auth": {"token": token}, "map": {"matchid": match_id, "game_time": 10}})
+
+
+@pytest.mark.asyncio
+async def test_packet_reaches_manager(client, manager):
+    response = await client.post("/", data=packet())
+
+    assert response.status == 200
+    assert await response.read() == b""
+    assert manager.get_match_id() == "1"
+
+
+@pytest.mark.asyncio
+async def test_dashboard_path_is_accepted(client, manager):
+    response = await client.post("/api/gsi/", data=packet(match_id="2"))
+
+    assert response.status == 200
+    assert manager.get_match_id() == "2"
+
+
+@pytest.mark.asyncio
+async def test_rejected_packets(client, manager):
+    assert (await client.post("/", data=packet(token="wrong"))).status == 401
+    assert (await client.post("/", data=b"[1, 2]")).status == 400
+    assert manager.get_match_id() is None
+
+
+@pytest.mark.asyncio
+async def test_unknown_tokens_are_reloaded_off_the_loop(client, manager, monkeypatch):
+    sessions = gsi_state.sessions
+    threads = []
+
+    def load_tokens():
+        threads.append(threading.current_thread())
+        with sessions._lock:
+            sessions._tokens["issued"] = 5
+
+    monkeypatch.setattr(sessions, "load_tokens", load_tokens)
+    assert (await client.post("/", data=packet(token="issued"))).status == 200
+    # Reloads are rate limited, so the next unknown token is rejected without a query
+    assert (await client.post("/", data=packet(token="unknown"))).status == 401
+    assert len(threads) == 1 and threads[0] is not threading.main_thread()
+
+
+@pytest.mark.asyncio
+async def test_recorded_packets_are_whole_and_in_order(manager, tmp_path, monkeypatch):
+    projection = FieldProjection(["map"])
+    monkeypatch.setattr("src.gsi.gsi_manager.ingest_fields", projection)
+    recorder = GSIRecorder(str(tmp_path))
+    client = TestClient(TestServer(GSIServer(manager, recorder=recorder).app))
+    await client.start_server()
+    try:
+        for game_time in range(20):
+            body = {"auth": {"token": "secret"}, "map": {"matchid": "1", "game_time": game_time},
+                    "hero": {"name": "npc_dota_hero_axe"}}
+            assert (await client.post("/", data=json.dumps(body))).status == 200
+        assert (await client.post("/", data=packet(token="wrong"))).status == 401
+    finally:
+        await client.close()
+        recorder.close()
+
+    # Recording leaves the ingest projection alone; the session keeps only the map
+    assert not projection.keeps_everything and "hero" not in manager.get_full_state()
+    entries = list(read_recording(str(tmp_path / os.listdir(tmp_path)[0])))
+    assert [packet["map"]["game_time"] for _, packet in entries] == list(range(20))
+    assert all(packet["hero"] == {"name": "npc_dota_hero_axe"} for _, packet in entries)
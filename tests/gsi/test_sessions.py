@@ -0,0 +1,121 @@
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.database import Base, GSIToken
+from src.gsi import sessions as sessions_module
+from src.gsi.gsi_manager import GSIManager
+from src.gsi.gsi_state import gsi_state
+from src.gsi.sessions import SessionRegistry
+from src.gsi.snapshot import GSISnapshot
+
+
+@pytest.fixture
+def session_factory():
+    """Session factory bound to a fresh in-memory database."""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(bind=engine)
+    with patch.object(sessions_module, 'SessionLocal', factory):
+        yield factory
+
+
+@pytest.fixture
+def registry(session_factory, monkeypatch):
+    registry = SessionRegistry()
+    registry.set_default_token("shared")
+    monkeypatch.setattr(gsi_state, "sessions", registry)
+    return registry
+
+
+def packet(match_id, game_time=100):
+    return GSISnapshot({"map": {"matchid": match_id, "game_time": game_time,
+                                "game_state": "DOTA_GAMERULES_STATE_GAME_IN_PROGRESS"}})
+
+
+def test_unknown_token_is_rejected(registry):
+    assert registry.resolve("nope") is None
+    assert not GSIManager().process_request("nope", packet("1"))
+
+
+def test_guilds_follow_their_own_clients(registry):
+    token_a = registry.issue_token(1)
+    token_b = registry.issue_token(2)
+    registry.enable_sync(1)
+    registry.enable_sync(2)
+    registry.enable_sync(3)
+    manager = GSIManager()
+
+    assert manager.process_request(token_a, packet("A"))
+    assert manager.process_request(token_b, packet("B"))
+    assert manager.process_request("shared", packet("S"))
+
+    assert manager.get_match_id(1) == "A"
+    assert manager.get_match_id(2) == "B"
+    assert manager.get_match_id(3) == "S"
+    assert manager.get_match_id() == "S"
+    assert manager.is_in_game(1)
+    assert registry.guilds_for(registry.get(token_a)) == [1]
+
+
+def test_unsynced_guild_without_packets_reads_empty_state(registry):
+    registry.issue_token(1)
+
+    assert GSIManager().get_match_id(1) is None
+    assert not GSIManager().is_in_game(1)
+
+
+def test_in_game_check_does_not_change_sessions(registry):
+    token = registry.issue_token(1)
+    registry.enable_sync(1)
+    manager = GSIManager()
+    manager.process_request(token, packet("A"))
+    session = registry.get(token)
+    session.last_update -= 3600  # The client stopped sending packets
+
+    assert not manager.is_in_game(1) and not manager.is_in_game(2)
+    # The session keeps the last reported state until its next packet
+    assert session.is_in_game
+    assert manager.get_session(2) is manager.get_session(3) and not manager.get_session(2).is_in_game
+
+
+def test_reissuing_token_revokes_previous(registry, session_factory):
+    old_token = registry.issue_token(1)
+    registry.enable_sync(1)
+    new_token = registry.issue_token(1)
+
+    assert registry.resolve(old_token) is None
+    assert registry.resolve(new_token).guild_id == 1
+    assert registry.session_for_guild(1).token == new_token
+    with session_factory() as db:
+        assert [row.token for row in db.query(GSIToken)] == [new_token]
+
+
+def test_tokens_issued_elsewhere_are_picked_up(registry, session_factory):
+    with session_factory() as db:
+        db.add(GSIToken(token="from-webapp", guild_id="5"))
+        db.commit()
+
+    assert registry.resolve("from-webapp").guild_id == 5
+
+
+def test_least_recently_active_session_is_dropped(registry):
+    registry.max_sessions = 2
+    tokens = [registry.issue_token(guild_id) for guild_id in (1, 2, 3)]
+    for token in tokens:
+        registry.resolve(token)
+
+    assert len(registry) == 2
+    assert registry.get(tokens[0]) is None
+
+
+def test_idle_sessions_are_evicted(registry):
+    session = registry.resolve("shared")
+    session.publish(packet("1"))
+
+    assert registry.evict_idle(now=session.last_update + 10) == []
+    assert registry.evict_idle(now=session.last_update + registry.idle_timeout) == ["shared"]
+    assert registry.get("shared") is None
+    assert registry.resolve("shared").game_state == {}
@@ -0,0 +1,83 @@
+import json
+
+import pytest
+
+from src.gsi.gsi_manager import GSIManager
+from src.gsi.gsi_state import gsi_state
+from src.gsi.sessions import SessionRegistry
+from src.gsi.snapshot import FrozenList, FrozenView, GSISnapshot, unwrap
+
+PACKET = {
+    "map": {"game_time": 600, "clock_time": 540, "game_state": "DOTA_GAMERULES_STATE_GAME_IN_PROGRESS"},
+    "events": [{"event_type": "roshan_killed", "game_time": 590}],
+    "auth": {"token": "secret"},
+}
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    sessions = SessionRegistry()
+    sessions.set_default_token("secret")
+    monkeypatch.setattr(gsi_state, "sessions", sessions)
+    return GSIManager()
+
+
+@pytest.fixture
+def snapshot():
+    return GSISnapshot.from_bytes(json.dumps(PACKET).encode(), received_at=1.0)
+
+
+def test_from_bytes_parses_packet(snapshot):
+    assert snapshot["map"]["game_time"] == 600
+    assert snapshot.get("map").get("clock_time") == 540
+    assert snapshot.auth_token == "secret"
+    assert snapshot.received_at == 1.0
+    assert snapshot.size > 0
+    assert snapshot == PACKET
+
+
+def test_from_bytes_rejects_non_object():
+    with pytest.raises(ValueError):
+        GSISnapshot.from_bytes(b"[1, 2]")
+    with pytest.raises(ValueError):
+        GSISnapshot.from_bytes(b"not json")
+
+
+def test_nested_values_are_read_only(snapshot):
+    assert isinstance(snapshot["map"], FrozenView)
+    assert isinstance(snapshot["events"], FrozenList)
+    assert isinstance(snapshot["events"][0], FrozenView)
+    with pytest.raises(TypeError):
+        snapshot["map"]["game_time"] = 0
+    with pytest.raises(TypeError):
+        snapshot["events"][0] = {}
+    assert not hasattr(snapshot["events"], "append")
+
+
+def test_get_returns_default_unwrapped(snapshot):
+    default = {}
+    assert snapshot.get("missing", default) is default
+    assert snapshot.get("missing") is None
+
+
+def test_to_dict_returns_independent_copy(snapshot):
+    copy = snapshot.to_dict()
+    copy["map"]["game_time"] = 0
+    copy["events"].append({})
+    assert snapshot["map"]["game_time"] == 600
+    assert len(snapshot["events"]) == 1
+    assert type(copy["events"][0]) is dict
+
+
+def test_process_request_publishes_projected_snapshot(manager, snapshot):
+    assert manager.process_request(snapshot.auth_token, snapshot)
+    assert gsi_state.game_state.received_at == snapshot.received_at
+    assert unwrap(gsi_state.game_state["map"]) is unwrap(snapshot["map"])
+    assert manager.get_game_time() == 600
+    assert manager.get_full_state() == {key: value for key, value in PACKET.items() if key != "auth"}
+
+
+def test_process_request_wraps_dict(manager):
+    assert manager.process_request("secret", dict(PACKET))
+    assert isinstance(gsi_state.game_state, GSISnapshot)
+    assert manager.get_clock_time() == 540
@@ -0,0 +1,236 @@
+import asyncio
+import socket
+import time
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
+
+import pytest
+import pytest_asyncio
+
+from src.ipc.client import IPCClient, IPCConnectionError, IPCError
+from src.ipc.handlers import register_handlers
+from src.ipc.protocol import ProtocolError, decode, encode, recv_message
+from src.ipc.server import IPCServer
+from src.timer_service import TimerService
+
+
+@pytest_asyncio.fixture
+async def server(tmp_path):
+    server = IPCServer(str(tmp_path / "bot.sock"), queue_size=4, heartbeat_interval=0.2)
+
+    async def add(a, b):
+        return a + b
+
+    async def fail():
+        raise RuntimeError("broken")
+
+    server.register("add", add)
+    server.register("fail", fail)
+    state = {"count": 0}
+    server.register_topic("counter", lambda: dict(state))
+    server.state = state
+    await server.start()
+    yield server
+    await server.stop()
+
+
+def test_frames_round_trip():
+    frame = encode({"id": 1, "result": {123456789012345678: "guild"}})
+    assert decode(frame[4:]) == {"id": 1, "result": {123456789012345678: "guild"}}
+    with pytest.raises(ProtocolError):
+        decode(b"\x01")
+
+
+@pytest.mark.asyncio
+async def test_request_response_reuses_connection(server):
+    client = IPCClient(server.path, timeout=2)
+    try:
+        assert await asyncio.to_thread(client.request, "add", a=2, b=3) == 5
+        assert await asyncio.to_thread(client.request, "add", a=1, b=1) == 2
+        assert len(client._idle) == 1
+
+        with pytest.raises(IPCError, match="broken"):
+            await asyncio.to_thread(client.request, "fail")
+        with pytest.raises(IPCError, match="Unknown operation"):
+            await asyncio.to_thread(client.request, "missing")
+        with pytest.raises(IPCError, match="Invalid arguments"):
+            await asyncio.to_thread(client.request, "add", a=1)
+    finally:
+        client.close()
+
+
+@pytest.mark.asyncio
+async def test_stale_connection_is_replaced(server, tmp_path):
+    client = IPCClient(server.path, timeout=2)
+    try:
+        assert await asyncio.to_thread(client.request, "add", a=1, b=2) == 3
+        # The bot restarts; the pooled connection is dead
+        await server.stop()
+        await server.start()
+        assert await asyncio.to_thread(client.request, "add", a=2, b=2) == 4
+    finally:
+        client.close()
+
+
+def test_unreachable_bot(tmp_path):
+    client = IPCClient(str(tmp_path / "missing.sock"), timeout=0.2)
+    with pytest.raises(IPCConnectionError):
+        client.request("ping")
+
+
+@pytest.mark.asyncio
+async def test_subscription_receives_state_changes_and_heartbeats(server):
+    client = IPCClient(server.path, timeout=2)
+    stream = client.subscribe(["counter"], timeout=2)
+
+    first = await asyncio.to_thread(next, stream)
+    assert first == {"topic": "counter", "data": {"count": 0}}
+
+    server.publish("counter", {"count": 1})
+    assert await asyncio.to_thread(next, stream) == {"topic": "counter", "data": {"count": 1}}
+    assert (await asyncio.to_thread(next, stream))["topic"] == "heartbeat"
+
+    stream.close()
+    await asyncio.sleep(0.3)
+    assert server.subscriber_count == 0
+
+    with pytest.raises(IPCError, match="Unknown topics"):
+        await asyncio.to_thread(next, client.subscribe(["nothing"]))
+
+
+@pytest.mark.asyncio
+async def test_slow_subscriber_drops_oldest(server):
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(2)
+    await asyncio.to_thread(sock.connect, server.path)
+    try:
+        sock.sendall(encode({"id": 1, "op": "subscribe", "args": {"topics": ["counter"]}}))
+        assert (await asyncio.to_thread(recv_message, sock))["ok"]
+        while server.subscriber_count == 0:
+            await asyncio.sleep(0.01)
+
+        # Published in one go, faster than the subscriber is served
+        for count in range(10):
+            server._publish("counter", {"count": count})
+        received = []
+        while not received or received[-1]["data"].get("count") != 9:
+            received.append(await asyncio.to_thread(recv_message, sock))
+        counts = [push["data"]["count"] for push in received if push["topic"] == "counter"]
+        assert counts[-1] == 9 and len(counts) < 11
+    finally:
+        sock.close()
+
+
+@pytest.mark.asyncio
+async def test_timer_operations_reach_the_service(tmp_path):
+    service = TimerService()
+    bot = Mock(guilds=[1, 2])
+    bot.is_ready.return_value = True
+    service.attach(bot)
+    server = IPCServer(str(tmp_path / "bot.sock"))
+    register_handlers(server, bot, service)
+    await server.start()
+    client = IPCClient(server.path, timeout=2)
+    try:
+        status = await asyncio.to_thread(client.request, "status")
+        assert status == {"bot_running": True, "guilds": 2, "active_timers_count": 0, "active_timers": {}}
+        status = await asyncio.to_thread(client.request, "status", gsi=True, guild_ids=[2])
+        assert list(status["gsi"]) == [2] and status["gsi"][2]["connected"] is False
+
+        result = await asyncio.to_thread(client.request, "timers.pause", guild_id=1, actor="WebApp")
+        assert result["code"] == "not_running" and not result["ok"]
+
+        stream = client.subscribe(["guilds"], timeout=2)
+        assert await asyncio.to_thread(next, stream) == {"topic": "guilds", "data": {}}
+        stream.close()
+
+        # Sub-millisecond overhead is the goal; allow plenty of room on slow machines
+        started = time.perf_counter()
+        for _ in range(100):
+            await asyncio.to_thread(client.request, "ping")
+        assert (time.perf_counter() - started) / 100 < 0.05
+    finally:
+        client.close()
+        await server.stop()
+
+
+@pytest.mark.asyncio
+async def test_dashboard_changes_reach_the_bot(tmp_path):
+    from src.gsi.gsi_state import gsi_state
+    from src.managers.event_manager import EventChange, add_event_listener, remove_event_listener
+    from src.managers.settings_manager import settings_manager
+    from src.webapp.backend.bot_connector import BotConnector
+
+    bot = Mock(guilds=[])
+    bot.get_cog.return_value = None
+    server = IPCServer(str(tmp_path / "bot.sock"))
+    register_handlers(server, bot, TimerService())
+    await server.start()
+    connector = BotConnector()
+    connector.ipc = IPCClient(server.path, timeout=2)
+    received = []
+    add_event_listener(received.append)
+    try:
+        change = EventChange(7, 'added', 'static', 3, 'regular', {"time": 60, "message": "Stack"})
+        assert await asyncio.to_thread(connector.publish_event_changes, [change, EventChange(7, 'reloaded')])
+        assert received == [change, EventChange(7, 'reloaded')]
+
+        cached = settings_manager.get(7)
+        assert await asyncio.to_thread(connector.invalidate_settings, 7)
+        assert settings_manager._cache[7] is not cached
+
+        assert await asyncio.to_thread(connector.set_gsi_sync, 7, True) == {"guild_id": 7, "sync_enabled": True}
+        assert 7 in gsi_state.synced_guilds
+        assert (await asyncio.to_thread(connector.set_gsi_sync, 7))["sync_enabled"] is False
+
+        # The dashboard reads GSI state from the bot, which receives the packets
+        status = await asyncio.to_thread(connector.get_gsi_status, 7)
+        assert status["sessions"] == len(gsi_state.sessions) and "dispatch" in status
+        history = await asyncio.to_thread(connector.get_gsi_history, 7, path="map.game_time")
+        assert set(history) == {"time_range", "packets", "changes"}
+    finally:
+        remove_event_listener(received.append)
+        connector.ipc.close()
+        await server.stop()
+
+    # A stopped bot does not fail the dashboard's write
+    assert not connector.invalidate_settings(7)
+
+
+@pytest.mark.asyncio
+async def test_dashboard_sync_drives_timers(tmp_path):
+    from src.cogs import gsi_cog
+    from src.gsi.events import GSIEvent, GSIEventType
+    from src.gsi.sessions import GSISession
+    from src.timer_service import TimerResult, TimerResultCode
+    from src.webapp.backend.bot_connector import BotConnector
+
+    bot = MagicMock()
+    with patch('discord.ext.tasks.Loop.start'), patch('discord.ext.tasks.Loop.cancel'):
+        cog = gsi_cog.GSICog(bot)
+    bot.get_cog.return_value = cog
+    channel = Mock(id=10, send=AsyncMock())
+    server = IPCServer(str(tmp_path / "bot.sock"))
+    register_handlers(server, bot, TimerService())
+    await server.start()
+    connector = BotConnector()
+    connector.ipc = IPCClient(server.path, timeout=2)
+    try:
+        with patch.object(gsi_cog.settings_manager, 'fetch', new=AsyncMock()), \
+                patch.object(gsi_cog.settings_manager, 'get_timer_channel', return_value=channel):
+            assert (await asyncio.to_thread(connector.set_gsi_sync, 8, True))["sync_enabled"] is True
+        assert cog.active_games[8]['channel_id'] == 10
+
+        # Sync enabled from the dashboard starts the timer when a game starts
+        event = GSIEvent(GSIEventType.GAME_STARTED, GSISession("token", guild_id=8), 0, 'M1', {'mode': 'regular'})
+        ok = TimerResult(TimerResultCode.OK, "")
+        with patch.object(gsi_cog.gsi_state.sessions, 'guilds_for', return_value=[8]), \
+                patch.object(gsi_cog.timer_service, 'start', new=AsyncMock(return_value=ok)) as start:
+            await cog.apply_gsi_event(event)
+        start.assert_awaited_once_with(8, "30", 'regular', actor=gsi_cog.GSI_ACTOR)
+
+        assert (await asyncio.to_thread(connector.set_gsi_sync, 8, False))["sync_enabled"] is False
+        assert 8 not in cog.active_games
+    finally:
+        connector.ipc.close()
+        await server.stop()
+        cog.cog_unload()
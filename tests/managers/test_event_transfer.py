@@ -0,0 +1,145 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.managers.event_transfer import (
+    EventValidationError,
+    build_export_document,
+    diff_event_sets,
+    import_events,
+    iter_validated_events,
+    parse_document,
+)
+
+
+@pytest.fixture
+def current_events():
+    """Event rows as loaded from the database."""
+    return {
+        "static": [
+            {"id": 1, "mode": "regular", "time": 60, "message": "One minute"},
+            {"id": 2, "mode": "turbo", "time": 30, "message": "Half a minute"},
+        ],
+        "periodic": [
+            {"id": 1, "mode": "regular", "start_time": 120, "interval": 120, "end_time": 600, "message": "Runes"},
+        ],
+    }
+
+
+def test_parse_document_yaml():
+    """YAML documents are decoded into the same structure as JSON."""
+    document = parse_document(b"static_events:\n  - time: '01:00'\n    message: Hello\n", 'yaml')
+    assert document == {"static_events": [{"time": "01:00", "message": "Hello"}]}
+
+
+def test_parse_document_rejects_non_mapping():
+    """A document root that is not a mapping is rejected."""
+    with pytest.raises(EventValidationError):
+        parse_document("[1, 2, 3]", 'json')
+
+
+def test_iter_validated_events_normalizes_times():
+    """MM:SS strings are converted to seconds and the document mode is applied."""
+    errors = []
+    document = {
+        "mode": "turbo",
+        "static_events": [{"time": "02:30", "message": "Lotus"}],
+        "periodic_events": [{"start_time": 0, "interval": "01:00", "end_time": "10:00", "message": "Ward"}],
+    }
+
+    rows = list(iter_validated_events(document, errors))
+
+    assert errors == []
+    assert rows == [
+        ("static", {"mode": "turbo", "time": 150, "message": "Lotus"}),
+        ("periodic", {"mode": "turbo", "start_time": 0, "interval": 60, "end_time": 600, "message": "Ward"}),
+    ]
+
+
+@pytest.mark.parametrize("record", [
+    {"time": "xx", "message": "bad time"},
+    {"time": -5, "message": "negative"},
+    {"time": 10, "message": ""},
+    {"time": 10, "message": "bad mode", "mode": "ranked"},
+])
+def test_iter_validated_events_collects_errors(record):
+    """Invalid records are skipped and reported."""
+    errors = []
+    rows = list(iter_validated_events({"static_events": [record]}, errors))
+    assert rows == []
+    assert len(errors) == 1
+    assert errors[0].startswith("static_events[0]")
+
+
+def test_diff_event_sets_replace(current_events):
+    """Replacing computes additions, removals and unchanged events by content."""
+    incoming = [
+        ("static", {"mode": "regular", "time": 60, "message": "One minute"}),
+        ("static", {"mode": "regular", "time": 90, "message": "New"}),
+    ]
+
+    diff = diff_event_sets(current_events, incoming, replace=True)
+
+    assert diff["unchanged"] == 1
+    assert diff["added"] == [{"mode": "regular", "time": 90, "message": "New", "type": "static"}]
+    assert sorted((row["type"], row["id"]) for row in diff["removed"]) == [("periodic", 1), ("static", 2)]
+
+
+def test_diff_event_sets_merge_keeps_existing(current_events):
+    """Merging never removes events."""
+    incoming = [("static", {"mode": "regular", "time": 90, "message": "New"})]
+
+    diff = diff_event_sets(current_events, incoming, replace=False)
+
+    assert diff["removed"] == []
+    assert diff["unchanged"] == 3
+    assert len(diff["added"]) == 1
+
+
+def test_export_round_trip(current_events):
+    """An exported document imports back without changes."""
+    errors = []
+    document = build_export_document(current_events)
+
+    diff = diff_event_sets(current_events, iter_validated_events(document, errors))
+
+    assert errors == []
+    assert diff["added"] == [] and diff["removed"] == []
+    assert diff["unchanged"] == 3
+
+
+def test_import_events_dry_run_does_not_write(current_events):
+    """A dry run returns the preview without touching the session."""
+    session = MagicMock()
+    document = {"static_events": [{"time": 90, "message": "New"}]}
+
+    with patch('src.managers.event_transfer.load_guild_events', return_value=current_events):
+        result = import_events(session, 123, document, dry_run=True)
+
+    assert result["applied"] is False
+    assert len(result["added"]) == 1
+    session.execute.assert_not_called()
+    session.commit.assert_not_called()
+
+
+def test_import_events_applies_in_one_commit(current_events):
+    """Applying an import issues bulk statements and commits once."""
+    session = MagicMock()
+    document = {"static_events": [{"time": 90, "message": "New"}]}
+
+    with patch('src.managers.event_transfer.load_guild_events', return_value=current_events):
+        result = import_events(session, 123, document)
+
+    assert result["applied"] is True
+    session.commit.assert_called_once()
+
+
+def test_import_events_invalid_document_raises(current_events):
+    """Validation errors abort the import before any write."""
+    session = MagicMock()
+
+    with patch('src.managers.event_transfer.load_guild_events', return_value=current_events):
+        with pytest.raises(EventValidationError):
+            import_events(session, 123, {"static_events": [{"time": "bad", "message": "x"}]})
+
+    session.commit.assert_not_called()
@@ -0,0 +1,99 @@
+import threading
+from unittest.mock import Mock, patch
+
+import pytest
+
+from src.managers.settings_manager import GuildSettings, SettingsManager
+
+
+@pytest.fixture
+def manager():
+    """SettingsManager whose database load returns fixed channel names."""
+    manager = SettingsManager()
+    with patch.object(manager, '_load', side_effect=lambda guild_id: GuildSettings(
+            guild_id=guild_id, channel_names={'timer': 'timer-bot', 'voice': 'DOTA'}, loaded_at=1e18)):
+        yield manager
+
+
+@pytest.fixture
+def guild():
+    guild = Mock()
+    guild.id = 42
+    channel = Mock(id=7)
+    channel.name = 'timer-bot'
+    channel.guild = guild
+    guild.text_channels = [channel]
+    guild.get_channel.return_value = channel
+    return guild
+
+
+def test_channel_is_scanned_once_then_fetched_by_id(manager, guild):
+    """The channel list is only scanned on the first lookup."""
+    with patch('discord.utils.get', return_value=guild.text_channels[0]) as mock_get:
+        first = manager.get_timer_channel(guild)
+        second = manager.get_timer_channel(guild)
+
+    assert first is second is guild.text_channels[0]
+    mock_get.assert_called_once_with(guild.text_channels, name='timer-bot')
+    guild.get_channel.assert_called_once_with(7)
+
+
+def test_channel_delete_forces_rescan(manager, guild):
+    """Deleting the resolved channel drops the cached ID."""
+    channel = guild.text_channels[0]
+    with patch('discord.utils.get', return_value=channel) as mock_get:
+        manager.get_timer_channel(guild)
+        manager.handle_channel_delete(channel)
+        manager.get_timer_channel(guild)
+
+    assert mock_get.call_count == 2
+
+
+def test_missing_channel_is_cached_until_created(manager, guild):
+    """A missing channel is not rescanned until a matching channel appears."""
+    with patch('discord.utils.get', return_value=None) as mock_get:
+        assert manager.get_timer_channel(guild) is None
+        assert manager.get_timer_channel(guild) is None
+        assert mock_get.call_count == 1
+
+        manager.handle_channel_create(guild.text_channels[0])
+        manager.get_timer_channel(guild)
+        assert mock_get.call_count == 2
+
+
+def test_invalidate_reloads_settings(manager):
+    """Invalidation drops the cached settings."""
+    first = manager.get(42)
+    manager.invalidate(42)
+    assert manager.get(42) is not first
+
+
+@pytest.mark.asyncio
+async def test_settings_load_off_the_event_loop():
+    """fetch and preload query the database on a worker thread; preload uses one query."""
+    from sqlalchemy import create_engine, event
+    from sqlalchemy.orm import sessionmaker
+    from sqlalchemy.pool import StaticPool
+
+    from src.database import Base, ServerSettings
+    from src.utils.config import TIMER_CHANNEL_NAME
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(bind=engine)
+    with factory() as session:
+        session.add(ServerSettings(server_id="1", timer_channel="timers", voice_channel="voice"))
+        session.commit()
+    threads = []
+    event.listen(engine, "before_cursor_execute", lambda *args: threads.append(threading.get_ident()))
+
+    manager = SettingsManager()
+    with patch('src.managers.settings_manager.SessionLocal', factory):
+        await manager.preload([1, 2])
+        assert manager.get(1).timer_channel_name == "timers"
+        assert manager.get(2).timer_channel_name == TIMER_CHANNEL_NAME
+        assert len(threads) == 1
+
+        manager.invalidate(1)
+        assert (await manager.fetch(1)).voice_channel_name == "voice"
+    assert len(threads) == 2 and threading.get_ident() not in threads
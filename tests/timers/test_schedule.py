@@ -0,0 +1,160 @@
+import asyncio
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from src.managers.event_manager import EventChange
+from src.schedule import EventSchedule
+
+
+@pytest.fixture
+def schedule():
+    schedule = EventSchedule()
+    schedule.load(
+        {1: {"time": 30, "message": "Static"}},
+        {1: {"start_time": 10, "interval": 20, "end_time": 50, "message": "Periodic"}},
+        position=0
+    )
+    return schedule
+
+
+def test_due_returns_occurrences_in_order(schedule):
+    """Occurrences are returned once, in time order, as the clock advances."""
+    assert [entry[:2] for entry in schedule.due(30)] == [(10, 'periodic'), (30, 'periodic'), (30, 'static')]
+    assert schedule.due(30) == []
+    assert [entry[0] for entry in schedule.due(100)] == [50]
+
+
+def test_add_future_and_past_events(schedule):
+    """Events added mid-game only announce their future occurrences."""
+    schedule.due(20)
+    schedule.add('static', 2, {"time": 15, "message": "Missed"})
+    schedule.add('static', 3, {"time": 25, "message": "Upcoming"})
+
+    assert [entry[3] for entry in schedule.due(25)] == ["Upcoming"]
+
+
+def test_remove_event(schedule):
+    """Removed events are no longer announced."""
+    schedule.due(10)
+    assert schedule.remove('periodic', 1)
+    assert not schedule.remove('periodic', 1)
+
+    assert [entry[3] for entry in schedule.due(60)] == ["Static"]
+    assert len(schedule) == 1
+
+
+@pytest.mark.asyncio
+async def test_game_timer_applies_published_changes():
+    """A running GameTimer applies changes for its guild and mode only."""
+    with patch('src.timer.EventsManager'), patch('src.timer.Announcement'), \
+            patch('src.timer.GameStatusMessageManager'):
+        from src.timer import GameTimer
+        timer = GameTimer(1, 'regular')
+        timer._loop = asyncio.get_running_loop()
+
+        timer.on_event_change(EventChange(1, 'added', 'static', 5, 'regular', {"time": 60, "message": "Hi"}))
+        timer.on_event_change(EventChange(1, 'added', 'static', 6, 'turbo', {"time": 60, "message": "Turbo"}))
+        timer.on_event_change(EventChange(2, 'added', 'static', 7, 'regular', {"time": 60, "message": "Other"}))
+
+        assert [entry[3] for entry in timer.schedule.due(60)] == ["Hi"]
+        assert 5 in timer.static_events
+
+        timer.on_event_change(EventChange(1, 'removed', 'static', 5))
+        assert ('static', 5) not in timer.schedule
+
+
+@pytest.mark.asyncio
+async def test_game_timer_stops_listening_when_its_loop_ends():
+    """The event listener is removed when the main loop ends, not only on stop()."""
+    from src.managers import event_manager
+
+    with patch('src.timer.EventsManager'), patch('src.timer.Announcement'), \
+            patch('src.timer.GameStatusMessageManager') as status:
+        status.return_value.create_status_message = AsyncMock()
+        status.return_value.update_status_message = AsyncMock()
+        from src.timer import GameTimer
+        timer = GameTimer(1, 'regular')
+        timer.mindful_timer.start = AsyncMock()
+
+        await timer.start(Mock(), "00:00")
+        assert timer.on_event_change in event_manager._event_listeners
+
+        # Let the loop run its first tick, then end it without stop()
+        task = timer.timer_task.get_task()
+        await asyncio.sleep(0.05)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        assert timer.on_event_change not in event_manager._event_listeners
+
+
+def test_seek_forward_skips_and_catches_up(schedule):
+    """A forward jump skips old occurrences but returns those within the catch-up window."""
+    due, skipped = schedule.seek(32, catch_up=5)
+
+    assert [entry[:2] for entry in due] == [(30, 'periodic'), (30, 'static')]
+    assert skipped == 1
+    assert [entry[0] for entry in schedule.due(50)] == [50]
+
+
+def test_seek_backward_does_not_repeat_unless_replayed(schedule):
+    """A backward jump only repeats announced occurrences when replay is requested."""
+    schedule.due(30)
+
+    assert schedule.seek(5) == ([], 0)
+    assert schedule.due(30) == []
+
+    schedule.seek(5, replay=True)
+    assert [entry[0] for entry in schedule.due(30)] == [10, 30, 30]
+
+
+def test_events_added_after_a_backward_jump_are_announced(schedule):
+    """Only occurrences announced before the jump are kept from repeating."""
+    schedule.due(30)
+    schedule.seek(5)
+    assert schedule.position == 5 and schedule.announced_until == 30
+
+    schedule.add('static', 2, {"time": 20, "message": "Late"})
+    assert [entry[3] for entry in schedule.due(30)] == ["Late"]
+
+    # Reloading the events keeps the announced window
+    schedule.seek(5)
+    schedule.load({1: {"time": 30, "message": "Static"}, 3: {"time": 25, "message": "Reloaded"}}, {},
+                  schedule.position, schedule.announced_until)
+    assert schedule.due(60) == []
+
+
+@pytest.mark.asyncio
+async def test_game_timer_follows_gsi_clock():
+    """A timer driven by a GSI clock moves to the clock's second and follows its pauses."""
+    from src.gsi.clock import GameClock
+
+    now = [1000.0]
+    clock = GameClock(time_source=lambda: now[0])
+    with patch('src.timer.EventsManager'), patch('src.timer.Announcement'), \
+            patch('src.timer.GameStatusMessageManager') as status, \
+            patch('src.timer.asyncio.sleep', new=AsyncMock()):
+        status.return_value.update_status_message = AsyncMock()
+        from src.timer import GameTimer
+        timer = GameTimer(1, 'regular')
+        timer.schedule.load({1: {"time": 12, "message": "Late"}}, {}, position=0)
+        timer.time_elapsed = 9
+        timer.follow_clock(clock)
+        timer._announce = AsyncMock()
+
+        # The loop stalled: the clock is already at 13 when the tick runs
+        clock.observe(12, match_id="1")
+        now[0] += 1.2
+        await timer._follow_clock_tick()
+        assert timer.time_elapsed == 13
+        assert [entry[3] for entry in timer._announce.await_args.args[0]] == ["Late"]
+
+        clock.observe(13, paused=True, match_id="1")
+        with patch.object(timer, '_pause_all_child_timers', new=AsyncMock()), \
+                patch.object(timer, '_resume_all_child_timers', new=AsyncMock()):
+            await timer._follow_clock_tick()
+            assert timer.is_paused()
+
+            clock.observe(13, match_id="1")
+            await timer._follow_clock_tick()
+            assert not timer.is_paused()
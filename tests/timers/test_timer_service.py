@@ -0,0 +1,124 @@
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
+
+import pytest
+
+from src.managers.settings_manager import GuildSettings
+from src.timer_service import TimerResultCode, TimerService
+
+
+@pytest.fixture
+def service():
+    """TimerService attached to a mock bot that knows guild 1."""
+    bot = Mock(voice_clients=[])
+    guild = Mock(id=1)
+    bot.get_guild.side_effect = {1: guild}.get
+    service = TimerService()
+    service.attach(bot)
+    return service
+
+
+def running_timer(paused=False):
+    timer = MagicMock()
+    timer.is_running.return_value = True
+    timer.is_paused.return_value = paused
+    timer.pause = AsyncMock()
+    timer.unpause = AsyncMock()
+    timer.stop = AsyncMock()
+    timer.sync = AsyncMock(return_value={"previous": 600, "current": 630, "skipped": 2, "announced": 0})
+    timer.roshan_timer.is_running = False
+    timer.roshan_timer.start = AsyncMock()
+    timer.roshan_timer.stop = AsyncMock()
+    return timer
+
+
+@pytest.mark.asyncio
+async def test_operations_without_timer(service):
+    for result in (await service.pause(1), await service.resume(1), await service.sync(1, "10:00"),
+                   await service.start_child(1, 'roshan'), await service.cancel_child(1, 'glyph')):
+        assert result.code == TimerResultCode.NOT_RUNNING
+        assert not result.ok and not result.announced
+
+
+@pytest.mark.asyncio
+async def test_start_validates_before_touching_discord(service):
+    result = await service.start(1, "soon")
+    assert result.code == TimerResultCode.INVALID_ARGUMENT
+    service.bot.get_guild.assert_not_called()
+
+    result = await service.start(2, "10:00")
+    assert result.code == TimerResultCode.GUILD_NOT_FOUND
+    assert 2 not in service.timers
+
+
+@pytest.mark.asyncio
+async def test_pause_and_resume(service):
+    timer = service.timers[1] = running_timer()
+    assert (await service.pause(1)).ok
+    timer.pause.assert_awaited_once()
+
+    timer.is_paused.return_value = True
+    assert (await service.pause(1)).code == TimerResultCode.ALREADY_PAUSED
+    result = await service.resume(1)
+    assert result.ok and result.message == "Game timer resumed."
+    timer.unpause.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_sync_returns_details(service):
+    service.timers[1] = running_timer()
+    result = await service.sync(1, "10:30", replay=True)
+
+    service.timers[1].sync.assert_awaited_once_with(630, replay=True)
+    assert result.data["skipped"] == 2
+    assert result.to_dict() == {
+        "ok": True, "code": "ok", "announced": False, "data": result.data,
+        "message": "Game clock synced to 10:30 (was 10:00). Skipped 2 event(s).",
+    }
+
+
+@pytest.mark.asyncio
+async def test_child_timer_start_is_announced(service):
+    timer = service.timers[1] = running_timer()
+    channel = AsyncMock()
+    with patch('src.timer_service.settings_manager.get_timer_channel', return_value=channel):
+        result = await service.start_child(1, 'roshan')
+        assert result.ok and result.announced
+        timer.roshan_timer.start.assert_awaited_once_with(channel)
+        channel.send.assert_awaited_once_with("Roshan timer started.")
+
+        timer.roshan_timer.is_running = True
+        assert (await service.start_child(1, 'roshan')).code == TimerResultCode.ALREADY_RUNNING
+        assert (await service.cancel_child(1, 'roshan')).ok
+        timer.roshan_timer.stop.assert_awaited_once()
+
+    assert (await service.start_child(1, 'courier')).code == TimerResultCode.INVALID_ARGUMENT
+
+
+@pytest.mark.asyncio
+async def test_stop_removes_timer(service):
+    timer = service.timers[1] = running_timer()
+    channel = AsyncMock()
+    with patch('src.timer_service.settings_manager.get_timer_channel', return_value=channel):
+        result = await service.stop(1, actor="tester")
+
+    assert result.ok and result.announced
+    timer.stop.assert_awaited_once()
+    channel.send.assert_awaited_once_with("Game timer stopped.")
+    assert 1 not in service.timers
+    assert (await service.stop(1)).code == TimerResultCode.NOT_RUNNING
+
+
+@pytest.mark.asyncio
+async def test_settings_are_fetched_off_the_loop(service):
+    """Operations load the guild's settings with fetch, never with the blocking get."""
+    settings = GuildSettings(1, {'timer': 'dota-timer', 'voice': 'Dota Voice'})
+    service.timers[1] = running_timer()
+    with patch('src.timer_service.settings_manager.get', side_effect=AssertionError("blocking load")), \
+            patch('src.timer_service.settings_manager.fetch', new=AsyncMock(return_value=settings)) as fetch, \
+            patch('src.timer_service.settings_manager.get_timer_channel', return_value=None) as get_channel:
+        result = await service.start_child(1, 'roshan')
+
+    assert result.code == TimerResultCode.CHANNEL_NOT_FOUND
+    assert result.message == "Channel 'dota-timer' not found. Please create one and try again."
+    fetch.assert_awaited_once_with(1)
+    assert get_channel.call_args.args[1] is settings
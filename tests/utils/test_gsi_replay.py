@@ -0,0 +1,42 @@
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from src.gsi.recorder import GSIRecorder
+from src.gsi.snapshot import loads
+from src.utils.gsi_replay import ReplayStats, load_recording, percentile, play
+
+
+def test_percentile():
+    values = [1.0, 2.0, 3.0, 4.0]
+    assert percentile(values, 0.5) == 2.0
+    assert percentile(values, 1.0) == 4.0
+    assert percentile([], 0.9) == 0.0
+
+
+@pytest.mark.asyncio
+async def test_replay_sends_packets_with_its_token(tmp_path):
+    recorder = GSIRecorder(str(tmp_path))
+    for game_time in range(5):
+        recorder.write("client", {"map": {"matchid": "1", "game_time": game_time}}, 100.0 + game_time)
+    recorder.close()
+    packets = load_recording(str(next(tmp_path.iterdir())), "replay-token")
+
+    received = []
+
+    async def handler(request):
+        body = loads(await request.read())
+        received.append(body)
+        return web.Response(status=200 if len(received) < 5 else 401)
+
+    app = web.Application()
+    app.router.add_post("/", handler)
+    async with TestServer(app) as server:
+        stats = ReplayStats()
+        await play(str(server.make_url("/")), packets, speed=1000, delay=0, timeout=5, stats=stats)
+
+    assert [packet["map"]["game_time"] for packet in received] == [0, 1, 2, 3, 4]
+    assert received[0]["auth"] == {"token": "replay-token"}
+    assert stats.sent == 5
+    assert stats.failed == 1
+    assert stats.statuses == {200: 4, 401: 1}
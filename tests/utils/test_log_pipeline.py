@@ -0,0 +1,96 @@
+import asyncio
+import json
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
+import pytest
+
+from src.utils.log_pipeline import ContextFilter, JsonFormatter, SamplingFilter, guild_context, match_context
+from src.utils.log_reader import LogFilter, parse_log_line
+
+
+class Collect(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+@pytest.fixture
+def pipeline():
+    """A logger wired like the bot's: filters on the queueing handler, output behind the queue."""
+    log_queue = queue.SimpleQueue()
+    handler = QueueHandler(log_queue)
+    handler.addFilter(ContextFilter())
+    handler.addFilter(SamplingFilter({"test.pipeline.ticks": 0.25, "test.pipeline.off": 0}))
+    output = Collect()
+    listener = QueueListener(log_queue, output)
+    listener.start()
+
+    test_logger = logging.getLogger("test.pipeline")
+    test_logger.setLevel(logging.DEBUG)
+    test_logger.propagate = False
+    test_logger.addHandler(handler)
+    yield test_logger, output, listener
+    test_logger.removeHandler(handler)
+    if listener._thread is not None:
+        listener.stop()
+
+
+@pytest.mark.asyncio
+async def test_records_carry_the_task_context(pipeline):
+    test_logger, output, listener = pipeline
+
+    async def work(guild_id):
+        guild_context.set(guild_id)
+        match_context.set("7000")
+        test_logger.info("Working for guild %s", guild_id)
+
+    await asyncio.gather(work(1), work(2))
+    test_logger.info("No guild")
+    listener.stop()
+
+    tagged = {record.getMessage(): (record.guild_id, record.match_id) for record in output.records}
+    assert tagged == {"Working for guild 1": (1, "7000"), "Working for guild 2": (2, "7000"),
+                      "No guild": (None, None)}
+
+
+def test_hot_path_debug_records_are_sampled_per_guild(pipeline):
+    test_logger, output, listener = pipeline
+    ticks = test_logger.getChild("ticks")
+    for second in range(8):
+        for guild_id in (1, 2):
+            ticks.debug("Time elapsed: %s seconds (guild_id=%s)", second, guild_id, extra={"guild_id": guild_id})
+    ticks.warning("Not sampled")
+    test_logger.getChild("off").debug("Dropped")
+    test_logger.getChild("off").info("Kept")
+    listener.stop()
+
+    kept = [record.getMessage() for record in output.records]
+    assert kept == [
+        "Time elapsed: 0 seconds (guild_id=1)", "Time elapsed: 0 seconds (guild_id=2)",
+        "Time elapsed: 4 seconds (guild_id=1)", "Time elapsed: 4 seconds (guild_id=2)",
+        "Not sampled", "Kept",
+    ]
+    assert output.records[0].sampled == 4
+
+
+def test_json_records_are_read_back(pipeline):
+    formatter = JsonFormatter()
+    try:
+        raise ValueError("bad")
+    except ValueError:
+        record = logging.LogRecord("DotaDiscordBot", logging.ERROR, "timer.py", 12, "Failed for %s",
+                                   ("guild",), exc_info=__import__("sys").exc_info(), func="tick")
+    record.guild_id = 5
+    line = formatter.format(record)
+    assert "\n" not in line and json.loads(line)["guild_id"] == 5
+
+    entry = parse_log_line(line)
+    assert entry["level"] == "ERROR" and entry["function"] == "tick" and entry["line"] == "12"
+    assert entry["message"].startswith("Failed for guild\nTraceback") and entry["guild_id"] == 5
+    assert LogFilter(level="ERROR", guild_id=5)(entry)
+    assert not LogFilter(guild_id=6)(entry)
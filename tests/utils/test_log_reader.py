@@ -0,0 +1,96 @@
+import os
+
+import pytest
+
+from src.utils import log_reader
+from src.utils.log_reader import LogFilter, LogReader, parse_log_line
+
+
+def line(n, level="DEBUG", logger="DotaDiscordBot", message=None):
+    return f"2025-03-01 18:00:{n:02d},000 - {level} - {logger} - tick - 42 - {message or f'entry {n}'}\n"
+
+
+@pytest.fixture
+def logs(tmp_path, monkeypatch):
+    """bot.log with entries 20-29, bot.log.1 with 10-19 and bot.log.2 with 0-9."""
+    monkeypatch.setattr(log_reader, "CHUNK_SIZE", 64)  # Lines span chunk boundaries
+    path = tmp_path / "bot.log"
+    for suffix, first in (("", 20), (".1", 10), (".2", 0)):
+        with open(f"{path}{suffix}", "w") as f:
+            f.writelines(line(n) for n in range(first, first + 10))
+    return LogReader(str(path), backup_count=3)
+
+
+def messages(entries):
+    return [entry["message"] for entry in entries]
+
+
+def test_parse_log_line():
+    assert parse_log_line(line(5, message="Timer - paused")) == {
+        "timestamp": "2025-03-01 18:00:05,000", "level": "DEBUG", "logger": "DotaDiscordBot",
+        "function": "tick", "line": "42", "message": "Timer - paused",
+    }
+    assert parse_log_line("Traceback (most recent call last):")["message"] == "Traceback (most recent call last):"
+
+
+def test_query_pages_backward_across_rotated_files(logs):
+    assert messages(logs.query(limit=3)) == ["entry 27", "entry 28", "entry 29"]
+    assert messages(logs.query(limit=4, offset=8)) == ["entry 18", "entry 19", "entry 20", "entry 21"]
+    assert len(logs.query(limit=100)) == 30
+
+
+def test_query_stops_reading_when_the_page_is_full(logs, monkeypatch):
+    opened = []
+    reverse_lines = log_reader._reverse_lines
+    monkeypatch.setattr(log_reader, "_reverse_lines", lambda path: opened.append(path) or reverse_lines(path))
+    logs.query(limit=5)
+    assert opened == [logs.path]
+
+
+def test_traceback_lines_belong_to_their_entry(tmp_path):
+    path = tmp_path / "bot.log"
+    path.write_text(line(1) + line(2, level="ERROR", message="Failed") +
+                    "Traceback (most recent call last):\n  File \"x.py\"\nValueError: bad\n" + line(3))
+    entries = LogReader(str(path)).query(limit=2)
+    assert entries[0]["message"] == 'Failed\nTraceback (most recent call last):\n  File "x.py"\nValueError: bad'
+    assert entries[1]["message"] == "entry 3"
+
+
+def test_filters(tmp_path):
+    path = tmp_path / "bot.log"
+    path.write_text(
+        line(1, level="INFO", message="Game timer started for guild ID 123.") +
+        line(2, level="WARNING", logger="DotaDiscordBot.WebApp", message="Bot status unavailable") +
+        line(3, level="ERROR", message="Failed for guild 1234") +
+        line(4, level="DEBUG", message="Tick for guild ID 123")
+    )
+    reader = LogReader(str(path))
+    assert messages(reader.query(log_filter=LogFilter(level="warning"))) == [
+        "Bot status unavailable", "Failed for guild 1234"]
+    assert messages(reader.query(log_filter=LogFilter(logger_name="DotaDiscordBot.WebApp"))) == [
+        "Bot status unavailable"]
+    assert messages(reader.query(log_filter=LogFilter(level="INFO", guild_id=123))) == [
+        "Game timer started for guild ID 123."]
+    with pytest.raises(ValueError):
+        LogFilter(level="LOUD")
+
+
+def test_follow_continues_across_rotation(tmp_path):
+    path = tmp_path / "bot.log"
+    path.write_text(line(1))
+    follow = LogReader(str(path)).follow(interval=0)
+    assert next(follow) == []
+
+    with open(path, "a") as f:
+        f.write(line(2) + "Traceback line\n")
+    assert next(follow) == []  # More traceback lines may follow
+    assert messages(next(follow)) == ["entry 2\nTraceback line"]
+
+    with open(path, "a") as f:
+        f.write(line(3))
+    os.rename(path, f"{path}.1")
+    path.write_text(line(4))
+    assert messages(next(follow)) == ["entry 3"]
+    assert next(follow) == []
+    assert messages(next(follow)) == ["entry 4"]
+    follow.close()
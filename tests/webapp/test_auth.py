@@ -0,0 +1,79 @@
+import os
+
+import pytest
+from flask import Flask
+
+from src.webapp.backend import auth
+from src.webapp.backend.auth import SlidingWindowLimiter, TokenSigner, load_secret_key
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(auth, "ENV_ADMIN_USER", "admin")
+    monkeypatch.setattr(auth, "ENV_ADMIN_PASS", "hunter2")
+    monkeypatch.setattr(auth, "slow_compare", lambda a, b: a == b)
+    monkeypatch.setattr(auth, "login_limiter", SlidingWindowLimiter(limit=2, window=60))
+    monkeypatch.setattr(auth, "token_signer", TokenSigner(b"test key"))
+    app = Flask(__name__)
+    app.register_blueprint(auth.auth_blueprint, url_prefix='/auth')
+    return app.test_client()
+
+
+def test_tokens_are_checked_without_stored_state():
+    token, expiry = TokenSigner(b"key").issue("admin", "admin")
+    # Another worker only needs the same key
+    assert TokenSigner(b"key").validate(token) == {"username": "admin", "role": "admin", "expiry": expiry}
+    assert TokenSigner(b"other key").validate(token) is None
+
+    payload, signature = token.split(".")
+    forged = TokenSigner(b"other key").issue("admin", "superuser")[0].split(".")[0]
+    assert TokenSigner(b"key").validate(f"{forged}.{signature}") is None
+    assert TokenSigner(b"key").validate(payload) is None
+    assert TokenSigner(b"key").validate(TokenSigner(b"key").issue("admin", "admin", expiry_hours=0)[0]) is None
+    assert TokenSigner(b"key").validate(f"{payload}.{signature[:-1]}\u00e9") is None
+
+
+def test_secret_key_is_generated_once(tmp_path, monkeypatch):
+    monkeypatch.delenv("DASHBOARD_SECRET_KEY", raising=False)
+    path = str(tmp_path / "data" / "dashboard_secret.key")
+    key = load_secret_key(path)
+    assert len(key) == auth.SECRET_KEY_BYTES and load_secret_key(path) == key
+    assert os.stat(path).st_mode & 0o777 == 0o600 and os.listdir(tmp_path / "data") == ["dashboard_secret.key"]
+
+    monkeypatch.setenv("DASHBOARD_SECRET_KEY", "configured")
+    assert load_secret_key(path) == b"configured"
+
+
+def test_limiter_slides_and_stays_bounded():
+    limiter = SlidingWindowLimiter(limit=3, window=100, max_keys=2)
+    for now in (10, 20, 90):
+        limiter.hit("a", now)
+    assert limiter.is_limited("a", 99)
+    # Halfway through the next window, half of the previous window's hits still count
+    assert limiter.count("a", 150) == pytest.approx(1.5)
+    assert not limiter.is_limited("a", 150)
+    assert limiter.count("a", 250) == 0
+
+    limiter.hit("b", 0)
+    limiter.hit("c", 0)
+    assert len(limiter) == 2 and limiter.count("a", 250) == 0
+
+
+def test_login_flow(client):
+    assert client.post('/auth/login', json={"username": "admin", "password": "wrong"}).status_code == 401
+    response = client.post('/auth/login', json={"username": "admin", "password": "hunter2"})
+    assert response.status_code == 200
+    token = response.get_json()["data"]["token"]
+
+    headers = {"Authorization": f"Bearer {token}"}
+    status = client.get('/auth/status', headers=headers).get_json()["data"]
+    assert status["username"] == "admin" and 0 < status["remaining_seconds"] <= 12 * 3600
+    refreshed = client.post('/auth/refresh', headers=headers).get_json()["data"]["token"]
+    assert client.get('/auth/status', headers={"Authorization": f"Bearer {refreshed}"}).status_code == 200
+    assert client.get('/auth/status', headers={"Authorization": f"Bearer {token}x"}).status_code == 401
+    assert client.get('/auth/status', headers={"Authorization": f"Bearer {token}\u00e9"}).status_code == 401
+
+    # A successful login clears the failures; two new ones lock the client out
+    for _ in range(2):
+        client.post('/auth/login', json={"username": "admin", "password": "wrong"})
+    assert client.post('/auth/login', json={"username": "admin", "password": "hunter2"}).status_code == 429
@@ -0,0 +1,96 @@
+from unittest.mock import patch
+
+import msgpack
+import pytest
+from flask import Flask
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from src.database import Base, PeriodicEvent, ServerSettings, StaticEvent
+from src.webapp.backend import api, db_connector
+
+
+@pytest.fixture
+def client():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(bind=engine)
+    with factory() as session:
+        session.add_all([
+            StaticEvent(guild_id="1", mode="regular", time=60, message="Stack"),
+            StaticEvent(guild_id="2", mode="regular", time=90, message="Rune"),
+            PeriodicEvent(guild_id="1", mode="regular", start_time=0, interval=120, end_time=600, message="Wards"),
+            ServerSettings(server_id="2", prefix="?", timer_channel="t", voice_channel="v",
+                           tts_language="en-GB", mindful_messages_enabled=1),
+        ])
+        session.commit()
+
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    status = {"bot_running": True, "guilds": 2, "active_timers_count": 1,
+              "active_timers": {1: {"guild_id": 1, "elapsed_time": 300}}}
+
+    def get_status(gsi=False, guild_ids=None):
+        if not gsi:
+            return {**status}
+        return {**status, "gsi": {guild_id: {"connected": guild_id == 1} for guild_id in guild_ids or [1]}}
+
+    app = Flask(__name__)
+    app.register_blueprint(api.api_blueprint, url_prefix='/api')
+    with patch.object(db_connector, 'SessionLocal', factory), \
+            patch.object(api.bot_connector, 'get_status', side_effect=get_status) as get_status:
+        yield app.test_client(), statements, get_status
+
+
+def test_snapshot_assembles_guilds_in_one_pass(client):
+    test_client, statements, get_status = client
+    response = test_client.get('/api/snapshot?guild_id=1,2')
+    assert response.status_code == 200
+    data = response.get_json()["data"]
+
+    assert data["status"] == {"bot_running": True, "guilds": 2, "active_timers_count": 1}
+    assert data["guilds"]["1"]["timer"]["elapsed_time"] == 300 and data["guilds"]["2"]["timer"] is None
+    assert [e["message"] for e in data["guilds"]["1"]["events"]["static_events"].values()] == ["Stack"]
+    assert len(data["guilds"]["1"]["events"]["periodic_events"]) == 1
+    assert data["guilds"]["1"]["settings"]["prefix"] == "!" and data["guilds"]["2"]["settings"]["prefix"] == "?"
+    # The bot receives the GSI packets; its status request carries their state too
+    assert data["guilds"]["1"]["gsi"]["connected"] is True and data["guilds"]["2"]["gsi"]["connected"] is False
+    assert get_status.call_args.kwargs == {"gsi": True, "guild_ids": [1, 2]}
+    # One IPC request and one query per kind of data, whatever the number of guilds
+    assert get_status.call_count == 1 and len(statements) == 3
+
+    assert test_client.get('/api/snapshot?guild_id=1,2',
+                           headers={"If-None-Match": response.headers["ETag"]}).status_code == 304
+
+
+def test_snapshot_fields_and_msgpack(client):
+    test_client, statements, get_status = client
+    response = test_client.get('/api/snapshot?fields=timer,settings', headers={"Accept": "application/msgpack"})
+    assert response.mimetype == 'application/msgpack'
+    data = msgpack.unpackb(response.data)["data"]
+    # Without guild IDs, the guilds with an active timer
+    assert data == {"guilds": {"1": {"timer": {"guild_id": 1, "elapsed_time": 300},
+                                     "settings": db_connector.get_settings(1)}}}
+
+    statements.clear()
+    get_status.reset_mock()
+    data = test_client.get('/api/snapshot?guild_id=2&fields=events').get_json()["data"]
+    assert list(data["guilds"]["2"]) == ["events"]
+    assert get_status.call_count == 0 and len(statements) == 2
+
+    assert test_client.get('/api/snapshot?fields=score').status_code == 400
+    assert test_client.get('/api/snapshot?guild_id=abc').status_code == 400
+
+
+def test_import_flags_must_be_booleans(client):
+    test_client, _, _ = client
+    document = db_connector.export_events(1)
+    response = test_client.post('/api/events/import', json={"guild_id": 2, "document": document, "replace": "no"})
+    assert response.status_code == 400 and response.get_json()["message"] == "replace must be true or false"
+
+    # JSON booleans and the query-string spelling mean the same
+    for replace in (False, "false"):
+        response = test_client.post('/api/events/import',
+                                    json={"guild_id": 2, "document": document, "replace": replace, "dry_run": True})
+        assert response.status_code == 200
+        assert response.get_json()["data"] == db_connector.import_events(2, document, replace=False, dry_run=True)
@@ -0,0 +1,139 @@
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from src import database
+from src.database import Base, StaticEvent, PeriodicEvent, ServerSettings
+from src.webapp.backend import db_connector
+
+
+@pytest.fixture
+def session_factory():
+    """Session factory bound to a fresh in-memory database."""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(bind=engine)
+    with patch.object(db_connector, 'SessionLocal', factory):
+        yield factory
+
+
+def test_apply_batch_applies_all_operations(session_factory):
+    """A valid batch adds, removes and updates settings in one go."""
+    with session_factory() as session:
+        session.add(StaticEvent(guild_id="1", mode="regular", time=60, message="Old"))
+        session.commit()
+
+    result = db_connector.apply_batch(1, [
+        {"op": "add_static", "time": "01:30", "message": "New"},
+        {"op": "add_periodic", "start_time": 0, "interval": 60, "end_time": 600, "message": "Tick"},
+        {"op": "remove_static", "id": 1},
+        {"op": "update_settings", "settings": {"tts_language": "en-GB"}},
+    ])
+
+    assert result["applied"] is True
+    assert [r["status"] for r in result["results"]] == ["ok"] * 4
+    with session_factory() as session:
+        assert [e.message for e in session.query(StaticEvent)] == ["New"]
+        assert session.query(PeriodicEvent).count() == 1
+        assert session.query(ServerSettings).one().tts_language == "en-GB"
+
+
+def test_apply_batch_describes_new_events_without_reloading(session_factory):
+    """Added events are published from the flushed rows, not reloaded after the commit."""
+    selects = []
+
+    def record(conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith("SELECT"):
+            selects.append(statement)
+
+    engine = session_factory.kw["bind"]
+    event.listen(engine, "before_cursor_execute", record)
+    with patch.object(db_connector.bot_connector, 'publish_event_changes') as publish:
+        result = db_connector.apply_batch(1, [
+            {"op": "add_static", "time": 60 * minute, "message": f"Stack {minute}"} for minute in range(3)
+        ])
+
+    assert result["applied"] is True
+    assert selects == []
+    changes = publish.call_args.args[0]
+    assert [change.event["message"] for change in changes] == ["Stack 0", "Stack 1", "Stack 2"]
+
+
+def test_apply_batch_rejects_whole_batch_on_error(session_factory):
+    """One invalid operation leaves the database untouched."""
+    result = db_connector.apply_batch(1, [
+        {"op": "add_static", "time": 10, "message": "Fine"},
+        {"op": "remove_periodic", "id": 42},
+        {"op": "explode"},
+    ])
+
+    assert result["applied"] is False
+    assert [r["status"] for r in result["results"]] == ["skipped", "error", "error"]
+    with session_factory() as session:
+        assert session.query(StaticEvent).count() == 0
+
+
+def test_apply_batch_reports_duplicate_removals(session_factory):
+    """Each removal keeps its own result; a repeated one is an error."""
+    with session_factory() as session:
+        session.add(StaticEvent(guild_id="1", mode="regular", time=60, message="Old"))
+        session.commit()
+
+    result = db_connector.apply_batch(1, [{"op": "remove_static", "id": 1}, {"op": "remove_static", "id": 1}])
+
+    assert result["applied"] is False
+    assert [r["status"] for r in result["results"]] == ["skipped", "error"]
+    assert "operation 0" in result["results"][1]["message"]
+    with session_factory() as session:
+        assert session.query(StaticEvent).count() == 1
+
+
+def test_writes_bump_the_guild_version(session_factory):
+    """Every committed write counts toward its guild's events or settings version."""
+    assert db_connector.get_data_version(1, 'events') == (0, 0.0)
+
+    event_id = db_connector.add_event(1, 'static', time=60, message="Stack")
+    db_connector.update_settings(1, {"tts_language": "en-GB"})
+    events_version, updated_at = db_connector.get_data_version(1, 'events')
+    assert events_version == 1 and updated_at > 0
+    assert db_connector.get_data_version(1, 'settings')[0] == 1
+    assert db_connector.get_data_version(2, 'events')[0] == 0
+
+    db_connector.remove_event(1, event_id)
+    assert db_connector.get_data_version(1, 'events')[0] == 2
+
+    # A rejected batch rolls its version change back too
+    db_connector.apply_batch(1, [{"op": "add_static", "time": 10, "message": "Fine"}, {"op": "explode"}])
+    assert db_connector.get_data_version(1, 'events')[0] == 2
+
+
+def test_versions_without_upsert_support(session_factory, monkeypatch):
+    """Databases without an upsert statement update the version row, then insert it."""
+    monkeypatch.setattr(database, "UPSERT_DIALECTS", {})
+    db_connector.add_event(1, 'static', time=60, message="Stack")
+    db_connector.add_event(1, 'static', time=90, message="Rune")
+    assert db_connector.get_data_version(1, 'events')[0] == 2
+    assert db_connector.get_data_version(2, 'events')[0] == 0
+
+
+def test_bulk_deletes_bump_the_guild_version(session_factory):
+    with session_factory() as session:
+        session.add(StaticEvent(guild_id="1", mode="regular", time=60, message="Stack"))
+        session.commit()
+        session.query(StaticEvent).filter_by(guild_id="1").delete()
+        session.commit()
+    assert db_connector.get_data_version(1, 'events')[0] == 2
+    assert db_connector.get_data_version(2, 'events')[0] == 0
+
+    # Imports add rows with a bulk insert
+    db_connector.add_event(3, 'static', time=60, message="Stack")
+    assert db_connector.import_events(4, db_connector.export_events(3))["applied"]
+    assert db_connector.get_data_version(4, 'events')[0] == 1
+
+    # Without a guild in the statement, every guild's version changes
+    with session_factory() as session:
+        session.query(PeriodicEvent).delete()
+        session.commit()
+    assert db_connector.get_data_version(2, 'events')[0] == 1
@@ -0,0 +1,46 @@
+from flask import Flask
+
+from src.webapp.backend.response_cache import ResponseCache, conditional_json
+
+
+def make_app(cache, state):
+    app = Flask(__name__)
+
+    @app.route('/data')
+    def data():
+        def build():
+            state["builds"] += 1
+            return {"version": state["version"]}
+        return conditional_json(("data",), state["version"], 1700000000.0, build, cache)
+
+    return app.test_client()
+
+
+def test_unchanged_data_is_not_sent_or_built_again():
+    cache = ResponseCache()
+    state = {"version": 1, "builds": 0}
+    client = make_app(cache, state)
+
+    first = client.get('/data')
+    assert first.status_code == 200 and first.get_json()["data"] == {"version": 1}
+    etag = first.headers["ETag"]
+    assert first.headers["Cache-Control"] == "no-cache" and first.headers["Last-Modified"]
+
+    assert client.get('/data', headers={"If-None-Match": etag}).status_code == 304
+    assert client.get('/data', headers={"If-Modified-Since": first.headers["Last-Modified"]}).status_code == 304
+    assert client.get('/data').get_json()["data"] == {"version": 1}
+    assert state["builds"] == 1 and cache.hits == 1
+
+    state["version"] = 2
+    changed = client.get('/data', headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.get_json()["data"] == {"version": 2}
+    assert changed.headers["ETag"] != etag and state["builds"] == 2
+
+
+def test_least_recently_used_responses_are_evicted():
+    cache = ResponseCache(max_entries=2)
+    cache.put("a", b"1")
+    cache.put("b", b"2")
+    assert cache.get("a") == b"1"
+    cache.put("c", b"3")
+    assert cache.get("b") is None and len(cache) == 2
@@ -0,0 +1,101 @@
+import json
+import queue
+
+import pytest
+
+from src.ipc.client import IPCConnectionError
+from src.webapp.backend.state_stream import GuildStateStream, StreamLimitError
+
+RUNNING = {"timer": {"elapsed_time": 10, "paused": False}, "gsi": {"sync": False}}
+
+
+class FakeClient:
+    """Stands in for IPCClient; pushes put on the queue are delivered to the subscription."""
+
+    timeout = 1.0
+
+    def __init__(self, reachable=True):
+        self.reachable = reachable
+        self.pushes = queue.Queue()
+
+    def subscribe(self, topics):
+        if not self.reachable:
+            raise IPCConnectionError("Bot is not reachable")
+        while True:
+            push = self.pushes.get()
+            if push is None:
+                raise IPCConnectionError("Bot went away")
+            yield push
+
+    def push(self, states):
+        self.pushes.put({"topic": "guilds", "data": states})
+
+
+def parse(chunk):
+    lines = dict(line.split(": ", 1) for line in chunk.strip().splitlines())
+    return lines.get("event"), json.loads(lines["data"]) if "data" in lines else None
+
+
+def next_event(events):
+    event = parse(next(events))
+    while event[0] == "heartbeat":
+        event = parse(next(events))
+    return event
+
+
+@pytest.fixture
+def client():
+    return FakeClient()
+
+
+@pytest.fixture
+def stream(client):
+    stream = GuildStateStream(client, heartbeat_interval=0.1, max_clients=2)
+    yield stream
+    stream.close()
+    client.pushes.put(None)
+
+
+def test_snapshot_then_changed_guilds_only(client, stream):
+    client.push({1: RUNNING, 2: RUNNING})
+    events = stream.open([1])
+    assert next(events).startswith("retry:")
+    assert next_event(events) == ("snapshot", {"connected": True, "guilds": {"1": RUNNING}})
+
+    ticked = {**RUNNING, "timer": {"elapsed_time": 11, "paused": False}}
+    client.push({1: ticked, 2: ticked, 3: RUNNING})
+    assert next_event(events) == ("guild", {"guild_id": "1", "state": ticked})
+
+    client.push({2: ticked, 3: RUNNING})
+    assert next_event(events) == ("removed", {"guild_id": "1"})
+    events.close()
+    assert stream.client_count == 0
+
+
+def test_slow_client_receives_latest_state(client, stream):
+    client.push({1: RUNNING})
+    events = stream.open()
+    next(events)
+    next_event(events)
+
+    # States arrive faster than the client reads them
+    for elapsed in range(11, 16):
+        stream._update({1: {**RUNNING, "timer": {"elapsed_time": elapsed, "paused": False}}}, connected=True)
+    event, data = next_event(events)
+    assert event == "guild" and data["state"]["timer"]["elapsed_time"] == 15
+
+    assert parse(next(events)) == ("heartbeat", {"coalesced": 4})
+    events.close()
+
+
+def test_unreachable_bot_and_client_limit():
+    stream = GuildStateStream(FakeClient(reachable=False), heartbeat_interval=0.1, max_clients=1)
+    try:
+        events = stream.open()
+        next(events)
+        assert next_event(events) == ("snapshot", {"connected": False, "guilds": {}})
+        with pytest.raises(StreamLimitError):
+            stream.open()
+        events.close()
+    finally:
+        stream.close()
@@ -0,0 +1,56 @@
+import gzip
+
+import pytest
+from flask import Flask
+
+from src.webapp.backend import static_assets
+from src.webapp.backend.static_assets import AssetManifest, IMMUTABLE_CACHE
+
+SCRIPT = b"console.log('timer');\n" * 200
+
+
+@pytest.fixture
+def build(tmp_path):
+    (tmp_path / "static" / "js").mkdir(parents=True)
+    (tmp_path / "index.html").write_bytes(b"<html>dashboard</html>")
+    (tmp_path / "static" / "js" / "main.3f2a1b9c.js").write_bytes(SCRIPT)
+    (tmp_path / "static" / "js" / "main.3f2a1b9c.js.gz").write_bytes(gzip.compress(SCRIPT))
+    return tmp_path
+
+
+def client_for(manifest):
+    app = Flask(__name__, static_folder=None)
+
+    @app.route('/<path:path>')
+    def serve(path):
+        return manifest.response(path) or ("", 404)
+
+    return app.test_client()
+
+
+def test_files_are_served_from_memory(build):
+    manifest = AssetManifest(str(build))
+    assert sorted(manifest.assets) == ["index.html", "static/js/main.3f2a1b9c.js"]
+    (build / "index.html").unlink()
+    client = client_for(manifest)
+
+    page = client.get('/index.html')
+    assert page.data == b"<html>dashboard</html>" and page.mimetype == "text/html"
+    assert page.headers["Cache-Control"] == "no-cache"
+    assert client.get('/index.html', headers={"If-None-Match": page.headers["ETag"]}).status_code == 304
+    assert client.get('/missing.js').status_code == 404
+
+
+def test_hashed_assets_are_compressed_and_immutable(build, monkeypatch):
+    monkeypatch.setattr(static_assets, "brotli", None)
+    client = client_for(AssetManifest(str(build)))
+
+    plain = client.get('/static/js/main.3f2a1b9c.js')
+    assert plain.data == SCRIPT and "Content-Encoding" not in plain.headers
+    assert plain.headers["Cache-Control"] == IMMUTABLE_CACHE and plain.headers["Vary"] == "Accept-Encoding"
+
+    compressed = client.get('/static/js/main.3f2a1b9c.js', headers={"Accept-Encoding": "br, gzip"})
+    assert compressed.headers["Content-Encoding"] == "gzip" and gzip.decompress(compressed.data) == SCRIPT
+    assert compressed.headers["ETag"] != plain.headers["ETag"]
+    assert client.get('/static/js/main.3f2a1b9c.js', headers={
+        "Accept-Encoding": "gzip", "If-None-Match": compressed.headers["ETag"]}).status_code == 304